@@ -5,6 +5,7 @@ from poke_env.player import Player
 from sb3_contrib import MaskablePPO
 
 from env.battle_config import BattleConfig
+from env.protocol_log import ProtocolLogRecorder
 from env.singles_env_wrapper import PokemonRLWrapper
 
 
@@ -20,6 +21,8 @@ class PolicyPlayer(Player):
         Defaults to Gen 1.
     :param deterministic: Use deterministic action selection (default True).
     :param verbose: Print the full BattleState description on every turn.
+    :param protocol_log: Optional gzip file the raw protocol of every battle,
+        and the orders sent, are appended to (see ``env.protocol_log``).
     """
 
     def __init__(
@@ -30,6 +33,7 @@ class PolicyPlayer(Player):
         battle_config: BattleConfig | None = None,
         deterministic: bool = True,
         verbose: bool = True,
+        protocol_log: str | None = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -38,12 +42,26 @@ class PolicyPlayer(Player):
         self._wrapper = wrapper
         self._deterministic = deterministic
         self._verbose = verbose
+        self._protocol_log = (
+            ProtocolLogRecorder(protocol_log, self.username) if protocol_log is not None else None
+        )
 
     # ------------------------------------------------------------------
     # Core interface
     # ------------------------------------------------------------------
 
+    async def _handle_battle_message(self, split_messages):
+        if self._protocol_log is not None:
+            self._protocol_log.record_messages(split_messages)
+        await super()._handle_battle_message(split_messages)
+
     def choose_move(self, battle):
+        order = self._choose_order(battle)
+        if self._protocol_log is not None:
+            self._protocol_log.record_choice(battle.battle_tag, order.message)
+        return order
+
+    def _choose_order(self, battle):
         if self._verbose:
             turn = getattr(battle, "turn", "?")
             print(f"\n{'='*60}")
@@ -92,7 +110,3 @@ class PolicyPlayer(Player):
         if self._wrapper is not None:
             return self._wrapper.action_to_order(action, battle, strict=False)
         return SinglesEnv.action_to_order(action, battle, strict=False)
-
-
-
-
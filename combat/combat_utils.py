@@ -1,9 +1,18 @@
 from dataclasses import dataclass
 from functools import lru_cache
+from typing import Iterable, Sequence
 
+import numpy as np
 from poke_env.battle import MoveCategory, Move, Weather, PokemonType, SideCondition, Status, Pokemon, Battle
 from poke_env.data import GenData
 
+ALL_TYPES: tuple[PokemonType, ...] = tuple(PokemonType)
+N_TYPES = len(ALL_TYPES)
+NO_TYPE = N_TYPES  # defender index for "no (second) type"
+
+_TYPE_INDEX: dict[PokemonType, int] = {t: i for i, t in enumerate(ALL_TYPES)}
+_NEUTRAL_TYPES = {PokemonType.THREE_QUESTION_MARKS, PokemonType.STELLAR}
+
 
 @lru_cache(maxsize=None)
 def type_chart_for_gen(gen: int):
@@ -11,6 +20,84 @@ def type_chart_for_gen(gen: int):
     return GenData.from_gen(gen).type_chart
 
 
+@lru_cache(maxsize=None)
+def type_effectiveness_tensor(gen: int) -> np.ndarray:
+    """Return the dense damage-multiplier tensor for a generation.
+
+    ``tensor[attack, defend_1, defend_2]`` is the multiplier of an ``attack``-type
+    move against a Pokémon typed ``(defend_1, defend_2)``.  Indices follow
+    ``ALL_TYPES``; ``NO_TYPE`` stands for a missing type and contributes 1.0.
+    Matches ``PokemonType.damage_multiplier`` for every pair it supports.
+
+    :param gen: Generation whose type chart to use.
+    :returns: Read-only float32 array of shape ``(N_TYPES, N_TYPES + 1, N_TYPES + 1)``.
+    """
+    chart = type_chart_for_gen(gen)
+    single = np.ones((N_TYPES, N_TYPES + 1), dtype=np.float32)
+    for a, attack in enumerate(ALL_TYPES):
+        if attack in _NEUTRAL_TYPES:
+            continue
+        for d, defend in enumerate(ALL_TYPES):
+            if defend in _NEUTRAL_TYPES:
+                continue
+            single[a, d] = chart.get(defend.name, {}).get(attack.name, 1.0)
+
+    tensor = single[:, :, None] * single[:, None, :]
+    # A neutral first type short-circuits to 1.0, as in poke-env.
+    for defend in _NEUTRAL_TYPES:
+        tensor[:, _TYPE_INDEX[defend], :] = 1.0
+    tensor.flags.writeable = False
+    return tensor
+
+
+def type_index(pokemon_type) -> int:
+    """Index of ``pokemon_type`` in ``ALL_TYPES``; ``NO_TYPE`` for ``None``/unknown."""
+    return _TYPE_INDEX.get(pokemon_type, NO_TYPE)
+
+
+@lru_cache(maxsize=1024)
+def defender_type_indices(defending_types: tuple) -> tuple[int, int]:
+    """Return the ``(defend_1, defend_2)`` tensor indices for a type tuple."""
+    type_it = iter(defending_types)
+    return type_index(next(type_it, None)), type_index(next(type_it, None))
+
+
+def damage_multiplier(move_type, defending_types: Iterable, gen: int) -> float:
+    """Scalar lookup of one move type against one defender's types."""
+    d1, d2 = defender_type_indices(tuple(defending_types))
+    a = type_index(move_type)
+    if a == NO_TYPE:
+        return 1.0
+    return float(type_effectiveness_tensor(gen)[a, d1, d2])
+
+
+def damage_multipliers(
+    move_types: Sequence,
+    defenders_types: Sequence[Iterable],
+    gen: int,
+) -> np.ndarray:
+    """Vectorised multipliers for every move type against every defender.
+
+    Typical use is the 4 moves of the active Pokémon against the 6 opposing
+    team slots in a single gather.
+
+    :param move_types: ``M`` move types (``None`` or unknown → neutral).
+    :param defenders_types: ``D`` type tuples, one per defender.
+    :param gen: Generation whose type chart to use.
+    :returns: float32 array of shape ``(M, D)``.
+    """
+    attack = np.fromiter((type_index(t) for t in move_types), dtype=np.intp, count=len(move_types))
+    defend = np.array(
+        [defender_type_indices(tuple(types)) for types in defenders_types], dtype=np.intp,
+    ).reshape(-1, 2)
+
+    tensor = type_effectiveness_tensor(gen)
+    known = attack != NO_TYPE
+    out = np.ones((len(attack), len(defend)), dtype=np.float32)
+    out[known] = tensor[attack[known][:, None], defend[None, :, 0], defend[None, :, 1]]
+    return out
+
+
 def tracker_key(battle) -> str:
     """Build a stable tracker-history key scoped to battle and opponent species."""
     return f"{battle.battle_tag}"
@@ -69,7 +156,7 @@ def calc_modifier(
     # --- Type effectiveness ---
     defending_types = [t for t in defender.types if t is not None]
     if defending_types:
-        mod *= move.type.damage_multiplier(*defending_types, type_chart=type_chart_for_gen(battle.gen))
+        mod *= damage_multiplier(move.type, defending_types, battle.gen)
 
     # --- Weather ---
     weather = next(iter(battle.weather), None)
@@ -0,0 +1,764 @@
+"""
+Vectorized Gen 1 singles battle engine: N battles as structure-of-arrays.
+
+``Gen1BatchEngine`` keeps the state of ``n`` battles in NumPy arrays — HP,
+stats, boosts, statuses and PP indexed by ``(battle, side, slot)`` — and
+resolves one decision of every battle per ``step`` with whole-array
+operations: turn order, accuracy, crits, damage rolls, type effectiveness,
+status and secondary effects are drawn for all battles at once from a single
+generator.  There is no protocol log and no poke-env ``Battle``; callers read
+the arrays directly (``env.batch_vec_env`` encodes them for the policy).
+
+Mechanics are those of ``combat.gen1_engine`` — the same stats, damage
+formula, crit rates, accuracy stages, statuses, confusion, flinch, recharge,
+recoil, drain, fixed damage, OHKO, multi-hit, healing and Rest — minus the
+effects that need per-battle bookkeeping: Reflect, Light Screen,
+Substitute, Leech Seed and Haze fail here, as do the moves the scalar engine
+already fails.  Multi-hit moves repeat their first hit's damage, as in the
+cartridge.  Use it for bulk self-play; use ``Gen1Engine`` when a poke-env
+view of the battle is needed.
+
+Side 0 is ``p1`` (the agent), side 1 is ``p2``.  Actions use the env's
+action space: ``0..5`` switch to that team slot, ``6..9`` use that move slot.
+
+Usage
+-----
+    engine = Gen1BatchEngine(1024, seed=0)
+    engine.start(np.arange(1024))                      # random roster teams
+    while not engine.finished.all():
+        p1 = pick(engine.action_masks(0))              # (N,) actions
+        p2 = pick(engine.action_masks(1))
+        engine.step(np.stack([p1, p2], axis=1))
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+from poke_env.battle import PokemonType
+from poke_env.data import GenData
+from poke_env.teambuilder import ConstantTeambuilder, Teambuilder
+
+from combat.combat_utils import NO_TYPE, type_effectiveness_tensor, type_index
+from combat.gen1_engine import (
+    BOOSTS, FAILING_MOVES, GEN1_OU_ROSTER, MAX_TURNS, SPECIAL_TYPES, STAGE_MULTIPLIERS,
+    STATUS_IMMUNE_TYPES, STATS, BattleMon, move_entry,
+)
+
+MAX_TEAM = 6
+MAX_MOVES = 4
+N_ACTIONS = MAX_TEAM + MAX_MOVES
+
+# Status codes of ``Gen1BatchEngine.status``; 0 is no status (fainting is hp == 0).
+STATUSES = ("brn", "frz", "par", "psn", "slp", "tox")
+NONE, BRN, FRZ, PAR, PSN, SLP, TOX = range(len(STATUSES) + 1)
+ATK, DEF, SPC, SPE = range(len(STATS))
+ACCURACY, EVASION = BOOSTS.index("accuracy"), BOOSTS.index("evasion")
+
+SPECIES: tuple[str, ...] = tuple(GenData.from_gen(1).pokedex)
+_SPECIES_INDEX = {s: i for i, s in enumerate(SPECIES)}
+_STAGES = np.array([STAGE_MULTIPLIERS[s] for s in range(-6, 7)])
+
+# Fixed-damage kinds of ``MoveTableGen1.fixed`` (positive values are the damage itself).
+FIXED_LEVEL, FIXED_SUPER_FANG, FIXED_PSYWAVE = -1, -2, -3
+# Healing kinds of ``MoveTableGen1.heal``.
+HEAL_HALF, HEAL_REST = 1, 2
+# Status moves whose effect needs state this engine does not keep.
+UNSUPPORTED_MOVES = frozenset({"reflect", "lightscreen", "substitute", "leechseed", "haze"})
+
+
+def _type_index(name: str) -> int:
+    return type_index(PokemonType.from_name(name))
+
+
+# Type that can never receive each status code.
+_STATUS_IMMUNE_TYPE = np.array([NO_TYPE] + [
+    _type_index(STATUS_IMMUNE_TYPES[s]) if s in STATUS_IMMUNE_TYPES else NO_TYPE for s in STATUSES
+])
+_FIRE = _type_index("FIRE")
+
+
+def _status_code(status: str | None) -> int:
+    return STATUSES.index(status) + 1 if status else NONE
+
+
+def _boost_vector(boosts: dict[str, int] | None) -> np.ndarray:
+    """Showdown boosts as a ``BOOSTS``-ordered vector (Special is one stat in Gen 1)."""
+    out = np.zeros(len(BOOSTS), dtype=np.int8)
+    for stat, amount in (boosts or {}).items():
+        if stat == "spd" and "spa" in boosts:
+            continue
+        out[BOOSTS.index("spc" if stat in ("spa", "spd") else stat)] = amount
+    return out
+
+
+class MoveTableGen1:
+    """Every Gen 1 move's battle data as arrays indexed by move number.
+
+    ``ids[i]`` is the move id of row ``i``; ``index`` maps ids back.  Built
+    once per process (``shared()``) from poke-env's Gen 1 data plus
+    ``struggle`` and ``recharge``.
+    """
+
+    _shared: "MoveTableGen1 | None" = None
+
+    def __init__(self):
+        ids = [*GenData.from_gen(1).moves, "struggle", "recharge"]
+        self.ids: tuple[str, ...] = tuple(ids)
+        self.index: dict[str, int] = {m: i for i, m in enumerate(ids)}
+        n = len(ids)
+        self.power = np.zeros(n, dtype=np.int64)
+        self.type = np.full(n, NO_TYPE, dtype=np.intp)
+        self.special = np.zeros(n, dtype=bool)
+        # Accuracy threshold out of 256; -1 never misses.
+        self.accuracy = np.full(n, -1, dtype=np.int64)
+        self.priority = np.zeros(n, dtype=np.int64)
+        self.high_crit = np.zeros(n, dtype=bool)
+        self.pp = np.zeros(n, dtype=np.int16)
+        self.damaging = np.zeros(n, dtype=bool)
+        self.fixed = np.zeros(n, dtype=np.int64)
+        self.ohko = np.zeros(n, dtype=bool)
+        self.ignore_immunity = np.zeros(n, dtype=bool)
+        self.min_hits = np.ones(n, dtype=np.int64)
+        self.max_hits = np.ones(n, dtype=np.int64)
+        self.recoil = np.zeros((n, 2), dtype=np.int64)
+        self.drain = np.zeros((n, 2), dtype=np.int64)
+        self.crash = np.zeros(n, dtype=bool)
+        self.selfdestruct = np.zeros(n, dtype=bool)
+        self.recharge = np.zeros(n, dtype=bool)
+        self.heal = np.zeros(n, dtype=np.int8)
+        self.status = np.zeros(n, dtype=np.int8)
+        self.confuse = np.zeros(n, dtype=bool)
+        self.boosts = np.zeros((n, len(BOOSTS)), dtype=np.int8)
+        self.self_boosts = np.zeros((n, len(BOOSTS)), dtype=np.int8)
+        self.sec_chance = np.zeros(n, dtype=np.int64)
+        self.sec_status = np.zeros(n, dtype=np.int8)
+        self.sec_boosts = np.zeros((n, len(BOOSTS)), dtype=np.int8)
+        self.sec_confuse = np.zeros(n, dtype=bool)
+        self.sec_flinch = np.zeros(n, dtype=bool)
+        for i, move_id in enumerate(ids):
+            self._fill(i, move_id, move_entry(move_id))
+        self.foe_effect = (self.status > 0) | self.confuse | self.boosts.any(axis=1)
+        self.struggle = self.index["struggle"]
+        self.recharge_move = self.index["recharge"]
+
+    @classmethod
+    def shared(cls) -> "MoveTableGen1":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _fill(self, i: int, move_id: str, entry: dict):
+        move_type = entry["type"].upper()
+        self.power[i] = entry.get("basePower", 0)
+        self.type[i] = _type_index(move_type)
+        self.special[i] = move_type in SPECIAL_TYPES
+        accuracy = entry.get("accuracy", True)
+        if accuracy is not True:
+            self.accuracy[i] = accuracy * 255 // 100
+        self.priority[i] = entry.get("priority", 0)
+        self.high_crit[i] = entry.get("critRatio", 1) > 1
+        self.pp[i] = entry.get("pp", 1) * 8 // 5
+
+        damaging = entry.get("basePower", 0) > 0 or "damage" in entry or bool(entry.get("ohko"))
+        if entry.get("target") == "self" or entry.get("category") == "Status" or not damaging:
+            if move_id in FAILING_MOVES or move_id in UNSUPPORTED_MOVES:
+                return
+            if move_id in ("recover", "softboiled"):
+                self.heal[i] = HEAL_HALF
+            elif move_id == "rest":
+                self.heal[i] = HEAL_REST
+            elif entry.get("target") == "self":
+                self.self_boosts[i] = _boost_vector(entry.get("boosts"))
+            elif entry.get("status"):
+                self.status[i] = _status_code(entry["status"])
+            elif entry.get("volatileStatus") == "confusion":
+                self.confuse[i] = True
+            else:
+                self.boosts[i] = _boost_vector(entry.get("boosts"))
+            return
+
+        self.damaging[i] = True
+        damage = entry.get("damage")
+        if damage == "level":
+            self.fixed[i] = FIXED_LEVEL
+        elif isinstance(damage, int):
+            self.fixed[i] = damage
+        elif move_id == "superfang":
+            self.fixed[i] = FIXED_SUPER_FANG
+        elif move_id == "psywave":
+            self.fixed[i] = FIXED_PSYWAVE
+        self.ohko[i] = bool(entry.get("ohko"))
+        self.ignore_immunity[i] = bool(entry.get("ignoreImmunity"))
+        multihit = entry.get("multihit")
+        if isinstance(multihit, int):
+            self.min_hits[i] = self.max_hits[i] = multihit
+        elif multihit is not None:
+            self.min_hits[i], self.max_hits[i] = multihit
+        self.recoil[i] = entry.get("recoil", (0, 1))
+        self.drain[i] = entry.get("drain", (0, 1))
+        self.crash[i] = bool(entry.get("hasCrashDamage"))
+        self.selfdestruct[i] = bool(entry.get("selfdestruct"))
+        self.recharge[i] = entry.get("self", {}).get("volatileStatus") == "mustrecharge"
+        secondary = entry.get("secondary")
+        if secondary:
+            self.sec_chance[i] = secondary.get("chance", 100)
+            self.sec_status[i] = _status_code(secondary.get("status"))
+            self.sec_boosts[i] = _boost_vector(secondary.get("boosts"))
+            self.sec_confuse[i] = secondary.get("volatileStatus") == "confusion"
+            self.sec_flinch[i] = secondary.get("volatileStatus") == "flinch"
+
+
+@dataclass(frozen=True)
+class TeamArrays:
+    """One team's static data in ``Gen1BatchEngine`` layout (slots beyond the team are empty)."""
+    present: np.ndarray     # (6,) bool
+    species: np.ndarray     # (6,) intp — index into SPECIES
+    level: np.ndarray       # (6,) int64
+    types: np.ndarray       # (6, 2) intp — type indices, NO_TYPE for a missing second type
+    base_speed: np.ndarray  # (6,) int64
+    max_hp: np.ndarray      # (6,) int64
+    stats: np.ndarray       # (6, 4) int64 — atk, def, spc, spe
+    move_ids: np.ndarray    # (6, 4) intp — MoveTableGen1 rows, -1 when empty
+    max_pp: np.ndarray      # (6, 4) int16
+
+    @classmethod
+    def stack(cls, teams: Sequence["TeamArrays"]) -> "TeamArrays":
+        """Teams stacked along a new leading axis."""
+        return cls(*(np.stack([getattr(t, f) for t in teams]) for f in cls.__dataclass_fields__))
+
+
+@lru_cache(maxsize=1024)
+def team_arrays(team: str) -> TeamArrays:
+    """``TeamArrays`` of a packed or Showdown-export team (memoised per team string)."""
+    packed = ConstantTeambuilder(team).yield_team()
+    mons = [BattleMon.from_set(m) for m in Teambuilder.parse_packed_team(packed)][:MAX_TEAM]
+    moves = MoveTableGen1.shared()
+    out = TeamArrays(
+        present=np.zeros(MAX_TEAM, dtype=bool),
+        species=np.zeros(MAX_TEAM, dtype=np.intp),
+        level=np.zeros(MAX_TEAM, dtype=np.int64),
+        types=np.full((MAX_TEAM, 2), NO_TYPE, dtype=np.intp),
+        base_speed=np.zeros(MAX_TEAM, dtype=np.int64),
+        max_hp=np.zeros(MAX_TEAM, dtype=np.int64),
+        stats=np.zeros((MAX_TEAM, len(STATS)), dtype=np.int64),
+        move_ids=np.full((MAX_TEAM, MAX_MOVES), -1, dtype=np.intp),
+        max_pp=np.zeros((MAX_TEAM, MAX_MOVES), dtype=np.int16),
+    )
+    for i, mon in enumerate(mons):
+        out.present[i] = True
+        out.species[i] = _SPECIES_INDEX[mon.species]
+        out.level[i] = mon.level
+        out.types[i, : len(mon.types)] = [_type_index(t) for t in mon.types[:2]]
+        out.base_speed[i] = mon.base_speed
+        out.max_hp[i] = mon.max_hp
+        out.stats[i] = [mon.stats[s] for s in STATS]
+        for k, move_id in enumerate(mon.moves[:MAX_MOVES]):
+            out.move_ids[i, k] = moves.index[move_id]
+            out.max_pp[i, k] = mon.max_pp[k]
+    for field in out.__dataclass_fields__:
+        getattr(out, field).setflags(write=False)
+    return out
+
+
+@lru_cache(maxsize=None)
+def _roster() -> TeamArrays:
+    """One single-Pokémon ``TeamArrays`` row per ``GEN1_OU_ROSTER`` species, stacked."""
+    pokedex = GenData.from_gen(1).pokedex
+    rows = [
+        team_arrays(f"{pokedex[s]['name']}||||{','.join(moves)}|||||||")
+        for s, moves in sorted(GEN1_OU_ROSTER.items())
+    ]
+    return TeamArrays(*(np.stack([getattr(r, f)[0] for r in rows]) for f in TeamArrays.__dataclass_fields__))
+
+
+class Gen1BatchEngine:
+    """``n`` Gen 1 singles battles advanced in lockstep.
+
+    Per-Pokémon arrays are indexed ``[battle, side, slot]``; per-side arrays
+    (the active Pokémon's volatile state) ``[battle, side]``.  A battle either
+    waits for both sides' turn decisions or, after a faint, for the forced
+    switches of the sides in ``must_switch``.  Finished battles stay frozen
+    until they are ``start``-ed again.
+
+    :param n: Number of battles.
+    :param seed: Seed or ``numpy`` generator for every random roll.
+    :param max_turns: Turn after which a battle ends in a tie.
+    """
+
+    def __init__(
+            self,
+            n: int,
+            seed: int | np.random.Generator | None = None,
+            max_turns: int = MAX_TURNS,
+    ):
+        self.n = n
+        self.rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        self.max_turns = max_turns
+        self.moves = MoveTableGen1.shared()
+        self._type_chart = type_effectiveness_tensor(1)
+
+        team = (n, 2, MAX_TEAM)
+        self.present = np.zeros(team, dtype=bool)
+        self.species = np.zeros(team, dtype=np.intp)
+        self.level = np.zeros(team, dtype=np.int64)
+        self.types = np.full(team + (2,), NO_TYPE, dtype=np.intp)
+        self.base_speed = np.zeros(team, dtype=np.int64)
+        self.max_hp = np.zeros(team, dtype=np.int64)
+        self.hp = np.zeros(team, dtype=np.int64)
+        self.stats = np.zeros(team + (len(STATS),), dtype=np.int64)
+        self.move_ids = np.full(team + (MAX_MOVES,), -1, dtype=np.intp)
+        self.pp = np.zeros(team + (MAX_MOVES,), dtype=np.int16)
+        self.max_pp = np.zeros(team + (MAX_MOVES,), dtype=np.int16)
+        self.status = np.zeros(team, dtype=np.int8)
+        self.sleep = np.zeros(team, dtype=np.int8)
+        # Order in which the other side saw each Pokémon and move (-1: not yet).
+        self.seen = np.full(team, -1, dtype=np.int8)
+        self.n_seen = np.zeros((n, 2), dtype=np.int8)
+        self.move_seen = np.full(team + (MAX_MOVES,), -1, dtype=np.int8)
+        self.n_moves_seen = np.zeros(team, dtype=np.int8)
+
+        self.active = np.zeros((n, 2), dtype=np.intp)
+        self.boosts = np.zeros((n, 2, len(BOOSTS)), dtype=np.int8)
+        self.toxic = np.zeros((n, 2), dtype=np.int64)
+        self.confusion = np.zeros((n, 2), dtype=np.int8)
+        self.recharge = np.zeros((n, 2), dtype=bool)
+        # Whether the foe was told the active Pokémon must recharge and has not seen it move since.
+        self.shown_recharge = np.zeros((n, 2), dtype=bool)
+        self.flinch = np.zeros((n, 2), dtype=bool)
+        self.must_switch = np.zeros((n, 2), dtype=bool)
+
+        self.turn = np.zeros(n, dtype=np.int64)
+        self.finished = np.ones(n, dtype=bool)
+        # 0 or 1 for the winning side, -1 for a tie (or no result yet).
+        self.winner = np.full(n, -1, dtype=np.int8)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def start(self, battles: np.ndarray, teams: Sequence[tuple[str | None, str | None]] | None = None):
+        """(Re)start ``battles`` with the leads of both teams out on turn 1.
+
+        :param battles: Indices of the battles to start.
+        :param teams: ``(p1 team, p2 team)`` per battle, packed or Showdown
+            export; ``None`` (or a ``None`` team) draws six distinct
+            ``GEN1_OU_ROSTER`` Pokémon."""
+        battles = np.asarray(battles, dtype=np.intp)
+        if teams is None:
+            teams = [(None, None)] * len(battles)
+        for side in (0, 1):
+            given = [i for i, pair in enumerate(teams) if pair[side]]
+            randomized = np.array([i for i, pair in enumerate(teams) if not pair[side]], dtype=np.intp)
+            if given:
+                self._load_team(battles[given], side, TeamArrays.stack([team_arrays(teams[i][side]) for i in given]))
+            if len(randomized):
+                roster = _roster()
+                picks = np.argsort(self.rng.random((len(randomized), len(roster.species))), axis=1)[:, :MAX_TEAM]
+                self._load_team(battles[randomized], side, TeamArrays(
+                    *(getattr(roster, f)[picks] for f in TeamArrays.__dataclass_fields__)
+                ))
+
+        b = battles
+        self.hp[b] = self.max_hp[b]
+        self.pp[b] = self.max_pp[b]
+        self.status[b] = NONE
+        self.sleep[b] = 0
+        self.seen[b] = -1
+        self.move_seen[b] = -1
+        self.n_seen[b] = 0
+        self.n_moves_seen[b] = 0
+        self.boosts[b] = 0
+        self.toxic[b] = 0
+        self.confusion[b] = 0
+        self.recharge[b] = False
+        self.shown_recharge[b] = False
+        self.flinch[b] = False
+        self.must_switch[b] = False
+        self.turn[b] = 1
+        self.finished[b] = False
+        self.winner[b] = -1
+        for side in (0, 1):
+            self._switch(b, np.full(len(b), side), np.zeros(len(b), dtype=np.intp))
+
+    def _load_team(self, b: np.ndarray, side: int, team: TeamArrays):
+        for field in TeamArrays.__dataclass_fields__:
+            getattr(self, field)[b, side] = getattr(team, field)
+
+    def action_masks(self, side: int) -> np.ndarray:
+        """``(n, 10)`` legal actions of ``side`` for its pending decision.
+
+        Mirrors poke-env's ``SinglesEnv.get_action_mask``: switches to living
+        bench slots, then usable moves; a recharging or out-of-PP Pokémon only
+        has move slot 0 (``recharge``/``struggle``), a recharging one cannot
+        switch, and a forced switch offers switches only.  Rows of finished
+        battles and of sides waiting on the other's forced switch are empty."""
+        ar = np.arange(self.n)
+        active = self.active[:, side]
+        switches = self.present[:, side] & (self.hp[:, side] > 0)
+        switches[ar, active] = False
+        usable = (self.pp[ar, side, active] > 0) & (self.move_ids[ar, side, active] >= 0)
+        recharge = self.recharge[:, side]
+        locked = recharge | ~usable.any(axis=1)
+
+        mask = np.zeros((self.n, N_ACTIONS), dtype=bool)
+        mask[:, :MAX_TEAM] = switches & ~recharge[:, None]
+        mask[:, MAX_TEAM:] = usable & ~locked[:, None]
+        mask[:, MAX_TEAM] |= locked
+        forced = self.must_switch.any(axis=1)
+        mask[forced] = False
+        must = self.must_switch[:, side]
+        mask[must, :MAX_TEAM] = switches[must]
+        mask[self.finished] = False
+        return mask
+
+    def step(self, actions: np.ndarray, battles: np.ndarray | None = None):
+        """Resolve the pending decision of every battle selected by ``battles``.
+
+        :param actions: ``(n, 2)`` actions per battle and side; entries of
+            sides without a decision are ignored.
+        :param battles: Boolean mask of the battles to advance; all unfinished
+            battles by default.
+        :raises ValueError: If a deciding side's action is illegal."""
+        actions = np.asarray(actions, dtype=np.intp)
+        todo = ~self.finished if battles is None else np.asarray(battles, dtype=bool) & ~self.finished
+        for side in (0, 1):
+            deciding = todo & (self.must_switch[:, side] | ~self.must_switch.any(axis=1))
+            legal = self.action_masks(side)
+            rows = np.flatnonzero(deciding)
+            action = actions[rows, side]
+            if ((action < 0) | (action >= N_ACTIONS)).any() or not legal[rows, action].all():
+                raise ValueError(f"Illegal actions for side {side} in battles {rows.tolist()}")
+
+        b = np.flatnonzero(todo)
+        forced = self.must_switch[b].any(axis=1)
+        switching = b[forced]
+        for side in (0, 1):
+            sel = switching[self.must_switch[switching, side]]
+            self._switch(sel, np.full(len(sel), side), actions[sel, side])
+        self.must_switch[switching] = False
+        self._next_turns(switching)
+
+        turns = b[~forced]
+        if len(turns):
+            self._resolve_turns(turns, actions[turns])
+
+    # ------------------------------------------------------------------
+    # Turn resolution
+    # ------------------------------------------------------------------
+
+    def _resolve_turns(self, b: np.ndarray, actions: np.ndarray):
+        k = len(b)
+        ar = np.arange(k)
+        switching = actions < MAX_TEAM
+        for side in (0, 1):
+            sel = switching[:, side]
+            self._switch(b[sel], np.full(int(sel.sum()), side), actions[sel, side])
+
+        move, slot = self._chosen_moves(b, actions)
+        priority = self.moves.priority[move]
+        speed = np.stack([self._effective(b, np.full(k, side), self.active[b, side], SPE) for side in (0, 1)], axis=1)
+        p1_first = (priority[:, 0] > priority[:, 1]) | (priority[:, 0] == priority[:, 1]) & (
+            (speed[:, 0] > speed[:, 1]) | (speed[:, 0] == speed[:, 1]) & (self.rng.random(k) < 0.5)
+        )
+        first = np.where(p1_first, 0, 1)
+
+        for second in (False, True):
+            user = 1 - first if second else first
+            foe = 1 - user
+            acting = (
+                ~switching[ar, user]
+                & (self.hp[b, user, self.active[b, user]] > 0)
+                & (self.hp[b, foe, self.active[b, foe]] > 0)
+            )
+            # Switching counts as having moved for flinch purposes.
+            target_moved = switching[ar, foe] | second
+            self._use_moves(b[acting], user[acting], move[ar, user][acting], slot[ar, user][acting],
+                            target_moved[acting])
+        self._residuals(b)
+        self._end_turns(b)
+
+    def _chosen_moves(self, b: np.ndarray, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Move row and move slot (-1 for recharge/struggle and switches) per battle and side."""
+        move = np.zeros(actions.shape, dtype=np.intp)
+        slot = np.full(actions.shape, -1, dtype=np.intp)
+        for side in (0, 1):
+            a = self.active[b, side]
+            chosen = np.clip(actions[:, side] - MAX_TEAM, 0, MAX_MOVES - 1)
+            pp = self.pp[b, side, a]
+            recharge = self.recharge[b, side]
+            struggle = ~(pp > 0).any(axis=1)
+            move[:, side] = np.where(
+                recharge, self.moves.recharge_move,
+                np.where(struggle, self.moves.struggle, self.move_ids[b, side, a, chosen]),
+            )
+            uses_slot = (actions[:, side] >= MAX_TEAM) & ~recharge & ~struggle
+            slot[:, side] = np.where(uses_slot, chosen, -1)
+        return move, slot
+
+    def _end_turns(self, b: np.ndarray):
+        self.flinch[b] = False
+        defeated = ~(self.hp[b] > 0).any(axis=2)
+        over = defeated.any(axis=1)
+        self.finished[b[over]] = True
+        self.winner[b[over]] = np.where(defeated[over].all(axis=1), -1, np.where(defeated[over, 1], 0, 1))
+        fainted = np.stack([self.hp[b, side, self.active[b, side]] == 0 for side in (0, 1)], axis=1)
+        self.must_switch[b] = fainted & ~over[:, None]
+        self._next_turns(b[~over & ~fainted.any(axis=1)])
+
+    def _next_turns(self, b: np.ndarray):
+        self.turn[b] += 1
+        expired = b[self.turn[b] > self.max_turns]
+        self.finished[expired] = True
+        self.winner[expired] = -1
+
+    def _switch(self, b: np.ndarray, side: np.ndarray, slot: np.ndarray):
+        self.active[b, side] = slot
+        self.boosts[b, side] = 0
+        self.confusion[b, side] = 0
+        self.recharge[b, side] = False
+        self.shown_recharge[b, side] = False
+        self.flinch[b, side] = False
+        self.toxic[b, side] = np.where(self.status[b, side, slot] == TOX, 1, 0)
+        new = self.seen[b, side, slot] < 0
+        b, side, slot = b[new], side[new], slot[new]
+        self.seen[b, side, slot] = self.n_seen[b, side]
+        self.n_seen[b, side] += 1
+
+    # ------------------------------------------------------------------
+    # Moves
+    # ------------------------------------------------------------------
+
+    def _use_moves(self, b, user, move, slot, target_moved):
+        can = self._can_move(b, user)
+        b, user, move, slot, target_moved = b[can], user[can], move[can], slot[can], target_moved[can]
+        self.shown_recharge[b, user] = False
+        a = self.active[b, user]
+        used = slot >= 0
+        bu, uu, au, su = b[used], user[used], a[used], slot[used]
+        self.pp[bu, uu, au, su] = np.maximum(0, self.pp[bu, uu, au, su] - 1)
+        new = self.move_seen[bu, uu, au, su] < 0
+        bu, uu, au, su = bu[new], uu[new], au[new], su[new]
+        self.move_seen[bu, uu, au, su] = self.n_moves_seen[bu, uu, au]
+        self.n_moves_seen[bu, uu, au] += 1
+
+        damaging = self.moves.damaging[move]
+        self._damaging_moves(b[damaging], user[damaging], move[damaging], target_moved[damaging])
+        status = ~damaging
+        self._status_moves(b[status], user[status], move[status])
+
+    def _can_move(self, b: np.ndarray, side: np.ndarray) -> np.ndarray:
+        k = len(b)
+        a = self.active[b, side]
+        can = ~self.recharge[b, side] & ~self.flinch[b, side]
+        self.recharge[b, side] = False
+        self.flinch[b, side] = False
+
+        status = self.status[b, side, a]
+        asleep = can & (status == SLP)
+        self.sleep[b[asleep], side[asleep], a[asleep]] -= 1
+        woke = asleep & (self.sleep[b, side, a] <= 0)
+        self.status[b[woke], side[woke], a[woke]] = NONE
+        can &= ~asleep & (status != FRZ)
+
+        confused = can & (self.confusion[b, side] > 0)
+        self.confusion[b[confused], side[confused]] -= 1
+        hurt = confused & (self.confusion[b, side] > 0) & (self.rng.random(k) < 0.5)
+        if hurt.any():
+            bh, sh, ah = b[hurt], side[hurt], a[hurt]
+            damage = self._formula(self.level[bh, sh, ah], 40, self._effective(bh, sh, ah, ATK),
+                                   self._effective(bh, sh, ah, DEF))
+            self._hurt(bh, sh, damage)
+        can &= ~hurt
+        can &= ~((status == PAR) & (self.rng.random(k) < 0.25))
+        return can
+
+    def _damaging_moves(self, b, user, move, target_moved):
+        k = len(b)
+        m = self.moves
+        foe = 1 - user
+        a, d = self.active[b, user], self.active[b, foe]
+        hit = self._hits(b, user, move)
+        effectiveness = self._type_chart[m.type[move], self.types[b, foe, d, 0], self.types[b, foe, d, 1]]
+        effectiveness = np.where(m.ignore_immunity[move] & (effectiveness == 0), 1.0, effectiveness)
+        landed = hit & (effectiveness > 0)
+
+        crash = ~hit & m.crash[move]
+        self._hurt(b[crash], user[crash], np.ones(int(crash.sum()), dtype=np.int64))
+
+        # Showdown's 2-5 hit distribution: 3/8, 3/8, 1/8, 1/8.
+        spread = np.searchsorted([3 / 8, 6 / 8, 7 / 8], self.rng.random(k), side="right") + 2
+        hits = np.where(m.min_hits[move] != m.max_hits[move], spread, m.min_hits[move])
+        damage = self._damage_rolls(b, user, move, effectiveness) * hits
+        hp = self.hp[b, foe, d]
+        dealt = np.where(landed, np.minimum(hp, damage), 0)
+        self.hp[b, foe, d] = hp - dealt
+        target_alive = self.hp[b, foe, d] > 0
+
+        # Self-Destruct and Explosion faint the user whether or not they connect.
+        boom = m.selfdestruct[move]
+        self.hp[b[boom], user[boom], a[boom]] = 0
+        for ratio, sign in ((m.recoil[move], 1), (m.drain[move], -1)):
+            amount = np.maximum(1, dealt * ratio[:, 0] // ratio[:, 1])
+            sel = (ratio[:, 0] > 0) & (dealt > 0)
+            self._hurt(b[sel], user[sel], sign * amount[sel])
+        recharge = landed & m.recharge[move] & target_alive
+        self.recharge[b[recharge], user[recharge]] = True
+        self.shown_recharge[b[recharge], user[recharge]] = True
+
+        live = landed & target_alive
+        thaw = live & (m.type[move] == _FIRE) & (self.status[b, foe, d] == FRZ)
+        self.status[b[thaw], foe[thaw], d[thaw]] = NONE
+
+        secondary = live & (m.sec_chance[move] > 0) & (self.rng.random(k) * 100 < m.sec_chance[move])
+        sel = secondary & (m.sec_status[move] > 0)
+        self._apply_status(b[sel], foe[sel], m.sec_status[move][sel], move[sel], primary=False)
+        sel = secondary & m.sec_boosts[move].any(axis=1)
+        self._boost(b[sel], foe[sel], m.sec_boosts[move][sel])
+        sel = secondary & m.sec_confuse[move]
+        self._confuse(b[sel], foe[sel])
+        sel = secondary & m.sec_flinch[move] & ~target_moved
+        self.flinch[b[sel], foe[sel]] = True
+
+    def _status_moves(self, b, user, move):
+        m = self.moves
+        foe = 1 - user
+        a = self.active[b, user]
+        hp, max_hp = self.hp[b, user, a], self.max_hp[b, user, a]
+        hurt = hp < max_hp
+
+        heal = (m.heal[move] == HEAL_HALF) & hurt
+        self.hp[b[heal], user[heal], a[heal]] = np.minimum(max_hp, hp + max_hp // 2)[heal]
+        rest = (m.heal[move] == HEAL_REST) & hurt
+        br, ur, ar = b[rest], user[rest], a[rest]
+        self.hp[br, ur, ar] = max_hp[rest]
+        self.status[br, ur, ar] = SLP
+        self.sleep[br, ur, ar] = 2
+        self.toxic[br, ur] = 0
+
+        sel = m.self_boosts[move].any(axis=1)
+        self._boost(b[sel], user[sel], m.self_boosts[move][sel])
+
+        aimed = m.foe_effect[move]
+        b, user, foe, move = b[aimed], user[aimed], foe[aimed], move[aimed]
+        hit = self._hits(b, user, move)
+        sel = hit & (m.status[move] > 0)
+        self._apply_status(b[sel], foe[sel], m.status[move][sel], move[sel], primary=True)
+        sel = hit & m.confuse[move]
+        self._confuse(b[sel], foe[sel])
+        sel = hit & m.boosts[move].any(axis=1)
+        self._boost(b[sel], foe[sel], m.boosts[move][sel])
+
+    def _apply_status(self, b, side, status, move, primary: bool):
+        d = self.active[b, side]
+        types = self.types[b, side, d]
+        move_type = self.moves.type[move]
+        immune_type = _STATUS_IMMUNE_TYPE[status]
+        ok = (self.status[b, side, d] == NONE) & (self.hp[b, side, d] > 0)
+        ok &= ~((types == immune_type[:, None]) & (immune_type[:, None] != NO_TYPE)).any(axis=1)
+        if primary:
+            # Thunder Wave cannot paralyze a Pokémon immune to its type.
+            ok &= ~((status == PAR) & (self._type_chart[move_type, types[:, 0], types[:, 1]] == 0))
+        else:
+            ok &= ~(types == move_type[:, None]).any(axis=1)
+        b, side, d, status = b[ok], side[ok], d[ok], status[ok]
+        self.status[b, side, d] = status
+        asleep = status == SLP
+        self.sleep[b[asleep], side[asleep], d[asleep]] = self.rng.integers(1, 8, int(asleep.sum()))
+        toxic = status == TOX
+        self.toxic[b[toxic], side[toxic]] = 1
+
+    def _confuse(self, b, side):
+        fresh = self.confusion[b, side] == 0
+        b, side = b[fresh], side[fresh]
+        self.confusion[b, side] = self.rng.integers(2, 6, len(b))
+
+    def _boost(self, b, side, boosts):
+        self.boosts[b, side] = np.clip(self.boosts[b, side] + boosts, -6, 6)
+
+    # ------------------------------------------------------------------
+    # Damage
+    # ------------------------------------------------------------------
+
+    def _effective(self, b, side, slot, stat) -> np.ndarray:
+        """Boosted, paralysis/burn-adjusted stat of the active Pokémon (stat index per row)."""
+        value = self.stats[b, side, slot, stat] * _STAGES[self.boosts[b, side, stat] + 6]
+        status = self.status[b, side, slot]
+        value = np.where((stat == SPE) & (status == PAR), value * 0.25, value)
+        value = np.where((stat == ATK) & (status == BRN), value * 0.5, value)
+        return np.clip(value.astype(np.int64), 1, 999)
+
+    def _hits(self, b, user, move) -> np.ndarray:
+        m = self.moves
+        foe = 1 - user
+        accuracy = m.accuracy[move]
+        stage = np.clip(self.boosts[b, user, ACCURACY].astype(np.int64) - self.boosts[b, foe, EVASION], -6, 6)
+        threshold = np.minimum(255, (accuracy * _STAGES[stage + 6]).astype(np.int64))
+        hit = (accuracy < 0) | (self.rng.integers(0, 256, len(b)) < threshold)
+        slower = (
+            self._effective(b, user, self.active[b, user], SPE)
+            < self._effective(b, foe, self.active[b, foe], SPE)
+        )
+        return hit & ~(m.ohko[move] & (accuracy >= 0) & slower)
+
+    def _damage_rolls(self, b, user, move, effectiveness) -> np.ndarray:
+        k = len(b)
+        m = self.moves
+        foe = 1 - user
+        a, d = self.active[b, user], self.active[b, foe]
+        level = self.level[b, user, a]
+        crit_rate = self.base_speed[b, user, a] // 2 * np.where(m.high_crit[move], 8, 1)
+        crit = self.rng.integers(0, 256, k) < np.minimum(255, crit_rate)
+        attack_stat = np.where(m.special[move], SPC, ATK)
+        defense_stat = np.where(m.special[move], SPC, DEF)
+        attack = np.where(crit, self.stats[b, user, a, attack_stat], self._effective(b, user, a, attack_stat))
+        defense = np.where(crit, self.stats[b, foe, d, defense_stat], self._effective(b, foe, d, defense_stat))
+        defense = np.where(m.selfdestruct[move], np.maximum(1, defense // 2), defense)
+        damage = self._formula(level * np.where(crit, 2, 1), m.power[move], attack, defense)
+        stab = (self.types[b, user, a] == m.type[move][:, None]).any(axis=1)
+        damage = np.where(stab, damage * 3 // 2, damage)
+        damage = (damage * effectiveness).astype(np.int64)
+        damage = np.where(damage > 1, damage * self.rng.integers(217, 256, k) // 255, damage)
+        damage = np.maximum(1, damage)
+
+        fixed = m.fixed[move]
+        hp = self.hp[b, foe, d]
+        psywave = np.maximum(1, self.rng.integers(1, np.maximum(2, level * 3 // 2)))
+        return np.select(
+            [fixed > 0, fixed == FIXED_LEVEL, fixed == FIXED_SUPER_FANG, fixed == FIXED_PSYWAVE, m.ohko[move]],
+            [fixed, level, np.maximum(1, hp // 2), psywave, hp],
+            damage,
+        )
+
+    @staticmethod
+    def _formula(level, power, attack, defense) -> np.ndarray:
+        scaled = (attack > 255) | (defense > 255)
+        attack = np.where(scaled, np.maximum(1, attack // 4), attack)
+        defense = np.where(scaled, np.maximum(1, defense // 4), defense)
+        return np.minimum(997, (2 * level // 5 + 2) * power * attack // defense // 50) + 2
+
+    def _hurt(self, b, side, amount):
+        """Damage (or, for negative ``amount``, heal) the active Pokémon of ``side``."""
+        a = self.active[b, side]
+        self.hp[b, side, a] = np.clip(self.hp[b, side, a] - amount, 0, self.max_hp[b, side, a])
+
+    def _residuals(self, b: np.ndarray):
+        for side in (0, 1):
+            sides = np.full(len(b), side)
+            a = self.active[b, side]
+            status = self.status[b, side, a]
+            max_hp = self.max_hp[b, side, a]
+            alive = self.hp[b, side, a] > 0
+            damage = np.where(
+                (status == BRN) | (status == PSN), np.maximum(1, max_hp // 16),
+                np.where(status == TOX, np.maximum(1, max_hp * self.toxic[b, side] // 16), 0),
+            )
+            sel = alive & (damage > 0)
+            self._hurt(b[sel], sides[sel], damage[sel])
+            self.toxic[b, side] += alive & (status == TOX)
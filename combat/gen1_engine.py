@@ -0,0 +1,844 @@
+"""
+In-process Gen 1 singles battle engine speaking the Showdown protocol.
+
+``Gen1Engine`` resolves turns of a Gen 1 battle in pure Python/NumPy and
+writes, for each side, exactly what a Showdown server would send that player:
+battle-log lines (``|move|``, ``|-damage|``, ``|switch|`` ...) and request
+JSON.  Feeding those into poke-env ``Battle.parse_message`` /
+``parse_request`` yields ordinary poke-env battles, so the state encoders,
+action masking and reward code run on them unchanged.
+
+Mechanics follow Showdown's ``gen1`` mod where it matters for training —
+stats (DV 15, 252 EVs by default), the damage formula with 217–255 rolls,
+speed-based crits, STAB and the Gen 1 type chart, physical/special split by
+type, accuracy stages, paralysis/burn/poison/toxic/sleep/freeze, confusion,
+flinch, Hyper Beam recharge, recoil, drain, fixed damage, OHKO, multi-hit,
+healing, Rest, Reflect/Light Screen, Substitute, Leech Seed and Haze.
+Two-turn moves resolve in one turn, partial trapping only deals damage, and
+moves with bespoke effects (Counter, Metronome, Mimic, Transform, Disable,
+Bide, ...) fail.  It is a training stand-in, not a replacement for
+Showdown's validator or replays.
+
+Usage
+-----
+    engine = Gen1Engine(packed_team1, packed_team2, usernames=("me", "foe"), seed=0)
+    engine.start()
+    while not engine.finished:
+        for role in engine.pending:
+            lines, request = engine.messages(role), engine.request(role)
+            engine.choose(role, "move 1")
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import numpy as np
+from poke_env.battle import PokemonType
+from poke_env.data import GenData, to_id_str
+from poke_env.teambuilder import Teambuilder
+
+from combat.combat_utils import type_effectiveness_tensor, type_index
+
+ROLES = ("p1", "p2")
+STATS = ("atk", "def", "spc", "spe")
+BOOSTS = ("atk", "def", "spc", "spe", "accuracy", "evasion")
+# Gen 1 stat-stage multipliers, shared by stats, accuracy and evasion.
+STAGE_MULTIPLIERS = {
+    -6: 25 / 100, -5: 28 / 100, -4: 33 / 100, -3: 40 / 100, -2: 50 / 100, -1: 66 / 100,
+    0: 1.0, 1: 1.5, 2: 2.0, 3: 2.5, 4: 3.0, 5: 3.5, 6: 4.0,
+}
+SPECIAL_TYPES = frozenset({"FIRE", "WATER", "GRASS", "ELECTRIC", "ICE", "PSYCHIC", "DRAGON"})
+# Status a type cannot receive from a move of its own type (Gen 1 secondary rule) or at all.
+STATUS_IMMUNE_TYPES = {"brn": "FIRE", "frz": "ICE", "psn": "POISON", "tox": "POISON"}
+MAX_TURNS = 1000
+
+# Compact Gen 1 OU roster used when a side has no team.
+GEN1_OU_ROSTER = {
+    "tauros": ["bodyslam", "hyperbeam", "blizzard", "earthquake"],
+    "chansey": ["softboiled", "icebeam", "thunderwave", "seismictoss"],
+    "alakazam": ["psychic", "recover", "thunderwave", "seismictoss"],
+    "snorlax": ["bodyslam", "amnesia", "rest", "blizzard"],
+    "starmie": ["surf", "thunderbolt", "recover", "thunderwave"],
+    "exeggutor": ["sleeppowder", "psychic", "explosion", "stunspore"],
+    "zapdos": ["thunderbolt", "drillpeck", "thunderwave", "agility"],
+    "rhydon": ["earthquake", "rockslide", "bodyslam", "substitute"],
+    "jynx": ["lovelykiss", "blizzard", "psychic", "rest"],
+    "gengar": ["hypnosis", "thunderbolt", "nightshade", "explosion"],
+    "lapras": ["blizzard", "thunderbolt", "sing", "confuseray"],
+    "cloyster": ["clamp", "blizzard", "explosion", "rest"],
+    "slowbro": ["amnesia", "surf", "rest", "thunderwave"],
+    "golem": ["earthquake", "rockslide", "explosion", "bodyslam"],
+}
+
+_STRUGGLE = {"name": "Struggle", "type": "Normal", "basePower": 50, "accuracy": True, "pp": 1,
+             "priority": 0, "target": "normal", "recoil": [1, 2]}
+_RECHARGE = {"name": "Recharge", "type": "Normal", "basePower": 0, "accuracy": True, "pp": 1,
+             "priority": 0, "target": "self"}
+FAILING_MOVES = frozenset({
+    "counter", "metronome", "mimic", "transform", "disable", "bide", "mirrormove", "conversion",
+    "focusenergy", "mist", "teleport", "whirlwind", "roar", "splash", "rage",
+})
+
+
+@lru_cache(maxsize=None)
+def _gen1() -> GenData:
+    return GenData.from_gen(1)
+
+
+def move_entry(move_id: str) -> dict:
+    """Showdown data of a Gen 1 move (``struggle`` and ``recharge`` included)."""
+    if move_id == "struggle":
+        return _STRUGGLE
+    if move_id == "recharge":
+        return _RECHARGE
+    return _gen1().moves[move_id]
+
+
+def random_team(rng: np.random.Generator, size: int = 6) -> str:
+    """Packed team of ``size`` distinct ``GEN1_OU_ROSTER`` Pokémon."""
+    species = rng.choice(sorted(GEN1_OU_ROSTER), size=size, replace=False)
+    return "]".join(
+        f"{_gen1().pokedex[s]['name']}||||{','.join(GEN1_OU_ROSTER[s])}|||||||" for s in species
+    )
+
+
+@dataclass
+class BattleMon:
+    """One Pokémon's battle state; stats are already Gen 1 level-scaled."""
+
+    species: str
+    name: str
+    level: int
+    types: tuple[str, ...]
+    base_speed: int
+    max_hp: int
+    stats: dict[str, int]
+    moves: list[str]
+    max_pp: list[int]
+    hp: int = 0
+    pp: list[int] = field(default_factory=list)
+    status: str | None = None
+    sleep_turns: int = 0
+    toxic_counter: int = 0
+    boosts: dict[str, int] = field(default_factory=lambda: dict.fromkeys(BOOSTS, 0))
+    # confusion (turns left), recharge, reflect, lightscreen, substitute (hp), leechseed
+    volatiles: dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.hp = self.hp or self.max_hp
+        self.pp = self.pp or list(self.max_pp)
+
+    @property
+    def fainted(self) -> bool:
+        return self.hp <= 0
+
+    @property
+    def species_name(self) -> str:
+        return _gen1().pokedex[self.species]["name"]
+
+    @property
+    def details(self) -> str:
+        return self.species_name if self.level == 100 else f"{self.species_name}, L{self.level}"
+
+    def condition(self, exact: bool) -> str:
+        """Showdown HP string: ``cur/max`` for its own side, percent for the foe."""
+        if self.fainted:
+            return "0 fnt"
+        if exact:
+            hp = f"{self.hp}/{self.max_hp}"
+        else:
+            percent = math.ceil(100 * self.hp / self.max_hp)
+            hp = f"{99 if percent == 100 and self.hp < self.max_hp else percent}/100"
+        return f"{hp} {self.status}" if self.status else hp
+
+    def effective(self, stat: str) -> int:
+        value = self.stats[stat] * STAGE_MULTIPLIERS[self.boosts[stat]]
+        if stat == "spe" and self.status == "par":
+            value *= 0.25
+        elif stat == "atk" and self.status == "brn":
+            value *= 0.5
+        return max(1, min(999, int(value)))
+
+    def clear_volatiles(self):
+        self.boosts = dict.fromkeys(BOOSTS, 0)
+        self.volatiles = {}
+        if self.status == "tox":
+            self.toxic_counter = 1
+
+    @classmethod
+    def from_set(cls, mon) -> "BattleMon":
+        """Build from a poke-env ``TeambuilderPokemon``."""
+        species = to_id_str(mon.species or mon.nickname)
+        entry = _gen1().pokedex[species]
+        level = mon.level or 100
+        evs = mon.evs if mon.evs else [252] * 6
+        ivs = mon.ivs if mon.ivs else [30] * 6
+        base = entry["baseStats"]
+
+        def stat(key: str, i: int) -> int:
+            return (2 * base[key] + ivs[i] + evs[i] // 4) * level // 100
+
+        moves = [to_id_str(m) for m in mon.moves][:4]
+        return cls(
+            species=species,
+            name=mon.nickname or entry["name"],
+            level=level,
+            types=tuple(t.upper() for t in entry["types"]),
+            base_speed=base["spe"],
+            max_hp=stat("hp", 0) + level + 10,
+            stats={"atk": stat("atk", 1) + 5, "def": stat("def", 2) + 5,
+                   "spc": stat("spa", 3) + 5, "spe": stat("spe", 5) + 5},
+            moves=moves,
+            max_pp=[move_entry(m)["pp"] * 8 // 5 for m in moves],
+        )
+
+
+@dataclass
+class Side:
+    role: str
+    username: str
+    team: list[BattleMon]
+    active: int = 0
+    choice: str | None = None
+    # "move", "switch" or None (wait) for the decision currently asked for.
+    asked: str | None = None
+
+    @property
+    def mon(self) -> BattleMon:
+        return self.team[self.active]
+
+    def ident(self, mon: BattleMon | None = None, active: bool = True) -> str:
+        mon = mon or self.mon
+        return f"{self.role}{'a' if active else ''}: {mon.name}"
+
+    def switch_targets(self) -> list[int]:
+        return [i for i, mon in enumerate(self.team) if i != self.active and not mon.fainted]
+
+    @property
+    def defeated(self) -> bool:
+        return all(mon.fainted for mon in self.team)
+
+
+class Gen1Engine:
+    """One Gen 1 singles battle between two packed teams.
+
+    Decisions follow Showdown's ``/choose`` syntax: ``"move N"`` and
+    ``"switch N"`` (1-based), ``"default"`` or ``"forfeit"``.  A turn is
+    resolved once every side in ``pending`` has chosen.
+
+    :param team1: Packed team of ``p1``, or ``None`` for a random one.
+    :param team2: Packed team of ``p2``, or ``None`` for a random one.
+    :param usernames: Player names of ``p1`` and ``p2``.
+    :param seed: Seed or ``numpy`` generator for every random roll.
+    :param max_turns: Turn after which the battle ends in a tie.
+    """
+
+    def __init__(
+            self,
+            team1: str | None,
+            team2: str | None,
+            *,
+            usernames: tuple[str, str] = ("p1", "p2"),
+            seed: int | np.random.Generator | None = None,
+            max_turns: int = MAX_TURNS,
+    ):
+        self.rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        self.sides = {
+            role: Side(role, name, [BattleMon.from_set(m) for m in Teambuilder.parse_packed_team(
+                team if team else random_team(self.rng)
+            )])
+            for role, name, team in zip(ROLES, usernames, (team1, team2))
+        }
+        self.turn = 0
+        self.max_turns = max_turns
+        self.finished = False
+        self.winner: str | None = None
+        self._logs: dict[str, list[str]] = {role: [] for role in ROLES}
+        self._rqid = 0
+        self._type_chart = type_effectiveness_tensor(1)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Write the battle preamble and lead switch-ins, then ask for turn 1."""
+        for role, side in self.sides.items():
+            self._log("player", role, side.username, "")
+        for role, side in self.sides.items():
+            self._log("teamsize", role, str(len(side.team)))
+        self._log("gen", "1")
+        self._log("tier", "[Gen 1] OU (simulated)")
+        self._log("start")
+        for side in self.sides.values():
+            self._log_switch(side)
+        self._next_turn()
+
+    @property
+    def pending(self) -> list[str]:
+        """Roles that still owe a decision for the current request."""
+        if self.finished:
+            return []
+        return [role for role, side in self.sides.items() if side.asked and side.choice is None]
+
+    def messages(self, role: str) -> list[str]:
+        """Protocol lines for ``role`` since the previous call."""
+        lines, self._logs[role] = self._logs[role], []
+        return lines
+
+    def request(self, role: str) -> dict | None:
+        """Request JSON ``role`` would receive now, or ``None`` once the battle ended."""
+        if self.finished:
+            return None
+        side = self.sides[role]
+        self._rqid += 1
+        request = {"side": self._side_json(side), "rqid": self._rqid}
+        if side.asked == "move":
+            request["active"] = [{"moves": self._active_moves(side)}]
+            if side.mon.volatiles.get("recharge"):
+                # A recharging Pokémon cannot switch out.
+                request["active"][0]["trapped"] = True
+        elif side.asked == "switch":
+            request["forceSwitch"] = [True]
+            request["noCancel"] = True
+        else:
+            request["wait"] = True
+        return request
+
+    def choose(self, role: str, choice: str):
+        """Record ``role``'s decision; resolves the turn once nobody is pending.
+
+        :raises ValueError: If ``choice`` is not legal for the current request."""
+        side = self.sides[role]
+        if self.finished or not side.asked or side.choice is not None:
+            raise ValueError(f"{role} has no decision to make")
+        if choice == "forfeit":
+            self._log("-message", f"{side.username} forfeited.")
+            self._end(winner=self._foe(side).role)
+            return
+        side.choice = self._validate(side, choice)
+        if not self.pending:
+            self._resolve()
+
+    # ------------------------------------------------------------------
+    # Decisions
+    # ------------------------------------------------------------------
+
+    def _validate(self, side: Side, choice: str) -> str:
+        kind, _, arg = choice.partition(" ")
+        targets = side.switch_targets()
+        if kind == "default":
+            if side.asked == "switch":
+                return f"switch {targets[0] + 1}"
+            return f"move {self._usable_moves(side)[0] + 1}"
+        if kind == "switch" and arg.isdigit() and int(arg) - 1 in targets:
+            if side.asked == "switch" or not side.mon.volatiles.get("recharge"):
+                return choice
+        if kind == "move" and side.asked == "move" and arg.isdigit():
+            if int(arg) - 1 in self._usable_moves(side):
+                return choice
+        raise ValueError(f"Invalid choice {choice!r} for {side.role}")
+
+    def _usable_moves(self, side: Side) -> list[int]:
+        mon = side.mon
+        if mon.volatiles.get("recharge"):
+            return [0]
+        usable = [i for i, pp in enumerate(mon.pp) if pp > 0]
+        return usable or [0]
+
+    def move_ids(self, role: str) -> list[str]:
+        """Move ids ``role``'s active Pokémon chooses from (``recharge``/``struggle`` when forced)."""
+        mon = self.sides[role].mon
+        if mon.volatiles.get("recharge"):
+            return ["recharge"]
+        if not any(mon.pp):
+            return ["struggle"]
+        return mon.moves
+
+    def _active_moves(self, side: Side) -> list[dict]:
+        mon = side.mon
+        forced = self.move_ids(side.role) != mon.moves
+        moves = []
+        for i, move_id in enumerate(self.move_ids(side.role)):
+            entry = move_entry(move_id)
+            moves.append({
+                "move": entry["name"], "id": move_id,
+                "pp": 1 if forced else mon.pp[i], "maxpp": 1 if forced else mon.max_pp[i],
+                "target": entry["target"], "disabled": not forced and mon.pp[i] == 0,
+            })
+        return moves
+
+    def _side_json(self, side: Side) -> dict:
+        return {
+            "name": side.username,
+            "id": side.role,
+            "pokemon": [
+                {
+                    "ident": side.ident(mon, active=False),
+                    "details": mon.details,
+                    "condition": mon.condition(exact=True),
+                    "active": i == side.active,
+                    "stats": {"atk": mon.stats["atk"], "def": mon.stats["def"], "spa": mon.stats["spc"],
+                              "spd": mon.stats["spc"], "spe": mon.stats["spe"]},
+                    "moves": list(mon.moves),
+                    "baseAbility": "noability",
+                    "ability": "noability",
+                    "item": "",
+                    "pokeball": "pokeball",
+                }
+                for i, mon in enumerate(side.team)
+            ],
+        }
+
+    # ------------------------------------------------------------------
+    # Turn resolution
+    # ------------------------------------------------------------------
+
+    def _resolve(self):
+        sides = [side for side in self.sides.values() if side.choice is not None]
+        if all(side.asked == "switch" for side in sides):
+            for side in sides:
+                self._switch_in(side, int(side.choice.split()[1]) - 1)
+            self._next_turn()
+            return
+
+        actions = []
+        for side in sides:
+            kind, arg = side.choice.split()
+            if kind == "switch":
+                actions.append((side, None, (1, 7, 0.0)))
+            else:
+                move_ids = self.move_ids(side.role)
+                move_id = move_ids[min(int(arg), len(move_ids)) - 1]
+                priority = move_entry(move_id).get("priority", 0)
+                actions.append((side, move_id, (0, priority, side.mon.effective("spe"))))
+        # Switches first, then priority, then speed with random ties.
+        actions.sort(key=lambda a: (a[2], self.rng.random()), reverse=True)
+
+        moved: set[str] = set()
+        for side, move_id, _ in actions:
+            if self.finished:
+                return
+            if move_id is None:
+                self._switch_in(side, int(side.choice.split()[1]) - 1)
+            elif not side.mon.fainted and not self._foe(side).mon.fainted:
+                self._use_move(side, move_id, target_moved=self._foe(side).role in moved)
+            moved.add(side.role)
+        if not self.finished:
+            self._residuals()
+        self._after_faints()
+
+    def _after_faints(self):
+        for side in self.sides.values():
+            side.choice = None
+        defeated = [side for side in self.sides.values() if side.defeated]
+        if defeated:
+            self._end(winner=None if len(defeated) == 2 else self._foe(defeated[0]).role)
+            return
+        needs_switch = {role: side.mon.fainted for role, side in self.sides.items()}
+        if any(needs_switch.values()):
+            for role, side in self.sides.items():
+                side.asked = "switch" if needs_switch[role] else None
+            return
+        self._next_turn()
+
+    def _next_turn(self):
+        for side in self.sides.values():
+            side.choice = None
+            side.asked = "move"
+        self.turn += 1
+        if self.turn > self.max_turns:
+            self._end(winner=None)
+            return
+        self._log("turn", str(self.turn))
+
+    def _end(self, winner: str | None):
+        self.finished = True
+        for side in self.sides.values():
+            side.asked = side.choice = None
+        self.winner = winner
+        if winner is None:
+            self._log("tie")
+        else:
+            self._log("win", self.sides[winner].username)
+
+    def _switch_in(self, side: Side, index: int):
+        side.mon.clear_volatiles()
+        side.active = index
+        self._log_switch(side)
+
+    # ------------------------------------------------------------------
+    # Moves
+    # ------------------------------------------------------------------
+
+    def _use_move(self, side: Side, move_id: str, target_moved: bool):
+        user, foe = side.mon, self._foe(side)
+        target = foe.mon
+        if not self._can_move(side, target_moved):
+            return
+        if move_id != "struggle" and move_id in user.moves:
+            slot = user.moves.index(move_id)
+            user.pp[slot] = max(0, user.pp[slot] - 1)
+        entry = move_entry(move_id)
+        self._log("move", side.ident(), entry["name"], foe.ident())
+
+        if entry.get("target") == "self" or entry.get("category") == "Status" or not self._is_damaging(move_id, entry):
+            if move_id in FAILING_MOVES:
+                self._log("-fail", side.ident())
+                return
+            self._status_move(side, foe, move_id, entry)
+            return
+
+        if not self._hits(user, target, entry):
+            self._log("-miss", side.ident(), foe.ident())
+            if entry.get("hasCrashDamage"):
+                self._damage(side, user, 1, "[from] recoil")
+            self._self_destruct(side, entry)
+            return
+        effectiveness = self._effectiveness(entry["type"], target)
+        if effectiveness == 0 and not entry.get("ignoreImmunity"):
+            self._log("-immune", foe.ident())
+            self._self_destruct(side, entry)
+            return
+
+        hits = self._hit_count(entry)
+        total = 0
+        for _ in range(hits):
+            damage, crit = self._damage_roll(move_id, entry, user, target, effectiveness)
+            if crit:
+                self._log("-crit", foe.ident())
+            total += self._damage_target(foe, damage)
+            if target.fainted or "substitute" in target.volatiles:
+                break
+        if hits > 1:
+            self._log("-hitcount", foe.ident(), str(hits))
+        if effectiveness > 1:
+            self._log("-supereffective", foe.ident())
+        elif 0 < effectiveness < 1:
+            self._log("-resisted", foe.ident())
+
+        self._self_destruct(side, entry)
+        if "recoil" in entry and total:
+            num, den = entry["recoil"]
+            self._damage(side, user, max(1, total * num // den), "[from] Recoil")
+        if "drain" in entry and total:
+            num, den = entry["drain"]
+            self._heal(side, user, max(1, total * num // den), "[from] drain")
+        if entry.get("self", {}).get("volatileStatus") == "mustrecharge" and not target.fainted:
+            user.volatiles["recharge"] = 1
+            self._log("-mustrecharge", side.ident())
+        if target.fainted:
+            return
+        if target.status == "frz" and entry["type"].upper() == "FIRE":
+            target.status = None
+            self._log("-curestatus", foe.ident(), "frz", "[msg]")
+        if "substitute" not in target.volatiles:
+            self._secondary(side, foe, entry, target_moved)
+
+    def _self_destruct(self, side: Side, entry: dict):
+        """Self-Destruct and Explosion faint the user whether or not they connect."""
+        if entry.get("selfdestruct"):
+            self._damage(side, side.mon, side.mon.hp)
+
+    def _can_move(self, side: Side, target_moved: bool) -> bool:
+        mon = side.mon
+        if mon.volatiles.pop("recharge", None):
+            self._log("cant", side.ident(), "recharge")
+            return False
+        if mon.volatiles.pop("flinch", None):
+            self._log("cant", side.ident(), "flinch")
+            return False
+        if mon.status == "slp":
+            mon.sleep_turns -= 1
+            if mon.sleep_turns <= 0:
+                mon.status = None
+                self._log("-curestatus", side.ident(), "slp", "[msg]")
+            else:
+                self._log("cant", side.ident(), "slp")
+            return False
+        if mon.status == "frz":
+            self._log("cant", side.ident(), "frz")
+            return False
+        if "confusion" in mon.volatiles:
+            mon.volatiles["confusion"] -= 1
+            if mon.volatiles["confusion"] <= 0:
+                del mon.volatiles["confusion"]
+                self._log("-end", side.ident(), "confusion")
+            else:
+                self._log("-activate", side.ident(), "confusion")
+                if self.rng.random() < 0.5:
+                    damage = self._formula(mon.level, 40, mon.effective("atk"), mon.effective("def"))
+                    self._damage(side, mon, damage, "[from] confusion")
+                    return False
+        if mon.status == "par" and self.rng.random() < 0.25:
+            self._log("cant", side.ident(), "par")
+            return False
+        return True
+
+    @staticmethod
+    def _is_damaging(move_id: str, entry: dict) -> bool:
+        return entry.get("basePower", 0) > 0 or "damage" in entry or bool(entry.get("ohko"))
+
+    def _status_move(self, side: Side, foe: Side, move_id: str, entry: dict):
+        user, target = side.mon, foe.mon
+        if move_id in ("recover", "softboiled"):
+            if user.hp == user.max_hp:
+                self._log("-fail", side.ident())
+            else:
+                self._heal(side, user, user.max_hp // 2)
+            return
+        if move_id == "rest":
+            if user.hp == user.max_hp:
+                self._log("-fail", side.ident())
+                return
+            user.status, user.sleep_turns, user.toxic_counter = "slp", 2, 0
+            self._log("-status", side.ident(), "slp", "[from] move: Rest")
+            self._heal(side, user, user.max_hp - user.hp, "[silent]")
+            return
+        if move_id == "haze":
+            for s in self.sides.values():
+                s.mon.boosts = dict.fromkeys(BOOSTS, 0)
+                s.mon.volatiles.pop("confusion", None)
+                s.mon.volatiles.pop("leechseed", None)
+            if target.status in ("slp", "frz"):
+                target.status = None
+            self._log("-clearallboost")
+            return
+        if move_id in ("reflect", "lightscreen", "substitute"):
+            self._self_volatile(side, move_id, entry)
+            return
+
+        boosts = entry.get("boosts")
+        if entry.get("target") == "self":
+            if boosts:
+                self._boost(side, boosts)
+            return
+
+        if "substitute" in target.volatiles or not self._hits(user, target, entry):
+            self._log("-miss" if "substitute" not in target.volatiles else "-fail", side.ident(), foe.ident())
+            return
+        if move_id == "leechseed":
+            if "GRASS" in target.types or "leechseed" in target.volatiles:
+                self._log("-immune", foe.ident())
+            else:
+                target.volatiles["leechseed"] = 1
+                self._log("-start", foe.ident(), "move: Leech Seed")
+            return
+        if entry.get("status"):
+            if not self._apply_status(foe, entry["status"], entry["type"], primary=True):
+                self._log("-fail", side.ident())
+            return
+        if entry.get("volatileStatus") == "confusion":
+            if "confusion" in target.volatiles:
+                self._log("-fail", side.ident())
+            else:
+                self._confuse(foe)
+            return
+        if boosts:
+            self._boost(foe, boosts)
+            return
+        self._log("-fail", side.ident())
+
+    def _self_volatile(self, side: Side, move_id: str, entry: dict):
+        mon = side.mon
+        if move_id in mon.volatiles:
+            self._log("-fail", side.ident())
+            return
+        if move_id == "substitute":
+            cost = mon.max_hp // 4
+            if mon.hp <= cost:
+                self._log("-fail", side.ident())
+                return
+            mon.volatiles["substitute"] = cost + 1
+            self._log("-start", side.ident(), "Substitute")
+            self._damage(side, mon, cost)
+            return
+        mon.volatiles[move_id] = 1
+        self._log("-start", side.ident(), entry["name"])
+
+    def _secondary(self, side: Side, foe: Side, entry: dict, target_moved: bool):
+        secondary = entry.get("secondary")
+        if not secondary or self.rng.random() * 100 >= secondary.get("chance", 100):
+            return
+        if secondary.get("status"):
+            self._apply_status(foe, secondary["status"], entry["type"], primary=False)
+        if secondary.get("boosts"):
+            self._boost(foe, secondary["boosts"])
+        volatile = secondary.get("volatileStatus")
+        if volatile == "confusion" and "confusion" not in foe.mon.volatiles:
+            self._confuse(foe)
+        elif volatile == "flinch" and not target_moved:
+            foe.mon.volatiles["flinch"] = 1
+
+    def _apply_status(self, side: Side, status: str, move_type: str, primary: bool) -> bool:
+        mon = side.mon
+        move_type = move_type.upper()
+        if mon.status is not None:
+            return False
+        if STATUS_IMMUNE_TYPES.get(status) in mon.types:
+            return False
+        if not primary and move_type in mon.types:
+            return False
+        if status == "par" and primary and self._effectiveness(move_type, mon) == 0:
+            return False
+        mon.status = status
+        if status == "slp":
+            mon.sleep_turns = int(self.rng.integers(1, 8))
+        elif status == "tox":
+            mon.toxic_counter = 1
+        self._log("-status", side.ident(), status)
+        return True
+
+    def _confuse(self, side: Side):
+        side.mon.volatiles["confusion"] = int(self.rng.integers(2, 6))
+        self._log("-start", side.ident(), "confusion")
+
+    def _boost(self, side: Side, boosts: dict[str, int]):
+        mon = side.mon
+        for stat, amount in boosts.items():
+            key = "spc" if stat in ("spa", "spd") else stat
+            if stat == "spd" and "spa" in boosts:
+                continue  # Special is one stat in Gen 1.
+            before = mon.boosts[key]
+            mon.boosts[key] = max(-6, min(6, before + amount))
+            delta = mon.boosts[key] - before
+            stats = ("spa", "spd") if key == "spc" else (key,)
+            for shown in stats:
+                self._log("-boost" if amount > 0 else "-unboost", side.ident(), shown, str(abs(delta)))
+
+    # ------------------------------------------------------------------
+    # Damage
+    # ------------------------------------------------------------------
+
+    def _hits(self, user: BattleMon, target: BattleMon, entry: dict) -> bool:
+        accuracy = entry.get("accuracy", True)
+        if accuracy is True:
+            return True
+        if entry.get("ohko") and user.effective("spe") < target.effective("spe"):
+            return False
+        threshold = accuracy * 255 // 100
+        stage = max(-6, min(6, user.boosts["accuracy"] - target.boosts["evasion"]))
+        threshold = min(255, int(threshold * STAGE_MULTIPLIERS[stage]))
+        return int(self.rng.integers(0, 256)) < threshold
+
+    def _effectiveness(self, move_type: str, target: BattleMon) -> float:
+        attack = type_index(PokemonType.from_name(move_type))
+        defend = [type_index(PokemonType.from_name(t)) for t in target.types] + [type_index(None)]
+        return float(self._type_chart[attack, defend[0], defend[1]])
+
+    def _hit_count(self, entry: dict) -> int:
+        multihit = entry.get("multihit")
+        if multihit is None:
+            return 1
+        if isinstance(multihit, int):
+            return multihit
+        return int(self.rng.choice([2, 3, 4, 5], p=[3 / 8, 3 / 8, 1 / 8, 1 / 8]))
+
+    def _damage_roll(self, move_id: str, entry: dict, user: BattleMon, target: BattleMon,
+                     effectiveness: float) -> tuple[int, bool]:
+        fixed = entry.get("damage")
+        if fixed == "level":
+            return user.level, False
+        if isinstance(fixed, int):
+            return fixed, False
+        if move_id == "superfang":
+            return max(1, target.hp // 2), False
+        if move_id == "psywave":
+            return max(1, int(self.rng.integers(1, user.level * 3 // 2))), False
+        if entry.get("ohko"):
+            return target.hp, False
+
+        crit_rate = user.base_speed // 2 * (8 if entry.get("critRatio", 1) > 1 else 1)
+        crit = int(self.rng.integers(0, 256)) < min(255, crit_rate)
+        special = entry["type"].upper() in SPECIAL_TYPES
+        attack_stat, defense_stat = ("spc", "spc") if special else ("atk", "def")
+        if crit:
+            attack, defense = user.stats[attack_stat], target.stats[defense_stat]
+        else:
+            attack, defense = user.effective(attack_stat), target.effective(defense_stat)
+            if ("lightscreen" if special else "reflect") in target.volatiles:
+                defense *= 2
+        if entry.get("selfdestruct"):
+            defense = max(1, defense // 2)
+        level = user.level * (2 if crit else 1)
+        damage = self._formula(level, entry["basePower"], attack, defense)
+        if entry["type"].upper() in user.types:
+            damage = damage * 3 // 2
+        damage = int(damage * effectiveness)
+        if damage > 1:
+            damage = damage * int(self.rng.integers(217, 256)) // 255
+        return max(1, damage), crit
+
+    @staticmethod
+    def _formula(level: int, power: int, attack: int, defense: int) -> int:
+        if attack > 255 or defense > 255:
+            attack, defense = max(1, attack // 4), max(1, defense // 4)
+        return min(997, (2 * level // 5 + 2) * power * attack // defense // 50) + 2
+
+    def _damage_target(self, side: Side, damage: int) -> int:
+        mon = side.mon
+        if "substitute" in mon.volatiles:
+            sub = mon.volatiles["substitute"] - 1
+            if damage >= sub:
+                del mon.volatiles["substitute"]
+                self._log("-end", side.ident(), "Substitute")
+            else:
+                mon.volatiles["substitute"] -= damage
+                self._log("-activate", side.ident(), "Substitute", "[damage]")
+            return min(damage, sub)
+        return self._damage(side, mon, damage)
+
+    def _damage(self, side: Side, mon: BattleMon, amount: int, *tags: str) -> int:
+        dealt = min(mon.hp, amount)
+        mon.hp -= dealt
+        self._log_hp("-damage", side, mon, *tags)
+        if mon.fainted:
+            mon.status = None
+            self._log("faint", side.ident(mon))
+        return dealt
+
+    def _heal(self, side: Side, mon: BattleMon, amount: int, *tags: str):
+        mon.hp = min(mon.max_hp, mon.hp + amount)
+        self._log_hp("-heal", side, mon, *tags)
+
+    def _residuals(self):
+        for side in self.sides.values():
+            mon = side.mon
+            if mon.fainted:
+                continue
+            if mon.status in ("brn", "psn"):
+                self._damage(side, mon, max(1, mon.max_hp // 16), f"[from] {mon.status}")
+            elif mon.status == "tox":
+                self._damage(side, mon, max(1, mon.max_hp * mon.toxic_counter // 16), "[from] psn")
+                mon.toxic_counter += 1
+            if not mon.fainted and "leechseed" in mon.volatiles:
+                foe = self._foe(side)
+                drained = self._damage(side, mon, max(1, mon.max_hp // 16), "[from] Leech Seed",
+                                       f"[of] {foe.ident()}")
+                if not foe.mon.fainted:
+                    self._heal(foe, foe.mon, drained, "[silent]")
+
+    # ------------------------------------------------------------------
+    # Logging
+    # ------------------------------------------------------------------
+
+    def _foe(self, side: Side) -> Side:
+        return self.sides["p2" if side.role == "p1" else "p1"]
+
+    def _log(self, *parts: str):
+        line = "|" + "|".join(parts)
+        for log in self._logs.values():
+            log.append(line)
+
+    def _log_hp(self, kind: str, side: Side, mon: BattleMon, *tags: str):
+        """A line carrying ``mon``'s HP: exact for its own side, percent for the other."""
+        for role, log in self._logs.items():
+            log.append("|" + "|".join((kind, side.ident(mon), mon.condition(role == side.role), *tags)))
+
+    def _log_switch(self, side: Side):
+        mon = side.mon
+        for role, log in self._logs.items():
+            log.append("|" + "|".join(("switch", side.ident(), mon.details, mon.condition(role == side.role))))
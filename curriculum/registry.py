@@ -66,8 +66,12 @@ def build_opponent_player(
     battle_format: str,
     server_configuration,
     account_configuration,
+    start_listening: bool = True,
 ) -> Player:
-    """Instantiate an opponent Player from a curriculum spec."""
+    """Instantiate an opponent Player from a curriculum spec.
+
+    ``start_listening=False`` keeps the player off the server whatever the
+    spec says, for opponents driven in process (see ``env.simulated_env``)."""
     reserved = _RESERVED_PLAYER_KWARGS.intersection(spec.kwargs)
     if reserved:
         reserved_args = ", ".join(sorted(reserved))
@@ -75,10 +79,13 @@ def build_opponent_player(
             f"Opponent player kwargs cannot override framework-managed arguments: {reserved_args}"
         )
 
+    player_kwargs = dict(spec.kwargs)
+    if not start_listening:
+        player_kwargs["start_listening"] = False
     player_cls = resolve_opponent_player_class(spec)
     return player_cls(
         account_configuration=account_configuration,
         battle_format=battle_format,
         server_configuration=server_configuration,
-        **spec.kwargs,
+        **player_kwargs,
     )
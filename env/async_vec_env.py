@@ -0,0 +1,571 @@
+"""
+Single-process vectorized environment hosting many concurrent battles.
+
+``SubprocVecEnv`` gives every battle its own process, with its own asyncio
+loop, pair of Showdown connections and copy of torch.  ``AsyncBattleVecEnv``
+runs ``n_envs`` battles for one agent/opponent account pair on poke-env's
+shared event loop instead: ``step_async`` hands every battle its order at
+once and ``step_wait`` gathers the next decision requests, so the Showdown
+round trips of different battles overlap.
+
+Encoding, action masking and reward shaping are delegated to one
+``PokemonRLWrapper`` that never connects (its per-battle caches are already
+keyed by battle), so every battle is observed exactly as ``build_env`` would
+observe it.  Opponent moves are chosen on the event loop by the curriculum's
+opponent ``Player``, without a round trip through the training thread.
+
+With ``prewarm`` every slot starts its next battle as soon as the current
+one has begun, so an episode end picks up a battle that is already waiting
+for its first order instead of paying for the challenge/accept handshake.
+
+``SubprocBattleVecEnv`` scales this out to ``P`` worker processes of ``K``
+battles each: one pipe message per process and step instead of one per env.
+
+Usage
+-----
+    vec_env = AsyncBattleVecEnv(
+        16, battle_format="gen1ou", opponent_player_spec=OpponentPlayerSpec(id="max-power"),
+        unique_id="123_0", opponent_team_generator=generator,
+    )
+    obs = vec_env.reset()
+    obs, rewards, dones, infos = vec_env.step(actions)
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+import numpy as np
+from poke_env import AccountConfiguration, LocalhostServerConfiguration, ServerConfiguration
+from poke_env.battle import AbstractBattle
+from poke_env.concurrency import POKE_LOOP
+from poke_env.data import to_id_str
+from poke_env.player.battle_order import BattleOrder, ForfeitBattleOrder
+from poke_env.player.player import Player
+from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnvIndices
+
+from curriculum.models import OpponentPlayerSpec
+from curriculum.registry import build_opponent_player
+from env.battle_config import BattleConfig
+from env.singles_env_wrapper import PokemonRLWrapper
+from env.worker_vec_env import WorkerVecEnv, serve_worker, set_reset_arguments, start_worker_env
+
+
+async def _gather(coros) -> list:
+    return await asyncio.gather(*coros)
+
+
+class _RoutedPlayer(Player):
+    """Player whose decisions are made by the ``AsyncBattleVecEnv`` owning it.
+
+    Plays up to ``max_concurrent_battles`` battles on one connection.  Unlike
+    ``send_challenges``/``accept_challenges``, ``challenge_once`` and
+    ``accept_once`` return as soon as the battle has started rather than when
+    every battle of the player has finished.
+    """
+
+    def __init__(
+            self,
+            choose: Callable[[AbstractBattle], BattleOrder | Awaitable[BattleOrder]],
+            on_finished: Callable[[AbstractBattle], None] | None = None,
+            **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self._choose = choose
+        self._on_finished = on_finished
+        # Retired battles this player has not seen the end of yet.
+        self._retired: set[str] = set()
+
+    def choose_move(self, battle: AbstractBattle):
+        return self._choose(battle)
+
+    def forget_battle(self, battle_tag: str):
+        """Drop a retired battle from ``_battles``, or as soon as it ends for this player.
+
+        poke-env only clears ``_battles`` in ``reset_battles``; without this
+        every battle ever played, and the codec caches keyed by it, stays alive.
+        """
+        battle = self._battles.get(battle_tag)
+        if battle is not None and not battle.finished:
+            self._retired.add(battle_tag)
+        else:
+            self._battles.pop(battle_tag, None)
+
+    def _battle_finished_callback(self, battle: AbstractBattle):
+        if self._on_finished is not None:
+            self._on_finished(battle)
+        if battle.battle_tag in self._retired:
+            self._retired.discard(battle.battle_tag)
+            self._battles.pop(battle.battle_tag, None)
+
+    async def challenge_once(self, opponent: str):
+        """Challenge ``opponent`` and wait until the battle has been created."""
+        await self.ps_client.logged_in.wait()
+        await self.ps_client.challenge(to_id_str(opponent), self.format, self.next_team)
+        await self._battle_semaphore.acquire()
+
+    async def accept_once(self, opponent: str):
+        """Accept the next challenge from ``opponent`` and wait until its battle exists."""
+        await self.ps_client.logged_in.wait()
+        opponent = to_id_str(opponent)
+        while to_id_str(await self._challenge_queue.get()) != opponent:
+            pass
+        await self.ps_client.accept_challenge(opponent, self.next_team)
+        await self._battle_semaphore.acquire()
+
+
+class _Match:
+    """One started battle: where its decision requests go and who plays against it."""
+
+    def __init__(self, opponent: Player):
+        self.opponent = opponent
+        # (battle, order future) per decision request; the future is None once the battle ended.
+        self.requests: asyncio.Queue = asyncio.Queue()
+
+
+class _BattleSlot:
+    """One of the env's battles.
+
+    Also the object ``get_attr``/``env_method`` resolve against, so it exposes
+    the same methods as ``_PokemonEnvBridge`` does for ``SubprocVecEnv``.
+    """
+
+    def __init__(self, index: int, opponent_player_spec: OpponentPlayerSpec, opponent: Player):
+        self.index = index
+        self.render_mode = None
+        self.battle: AbstractBattle | None = None
+        self.last_battle: AbstractBattle | None = None
+        self.mask: np.ndarray | None = None
+        # Future the agent player is awaiting for this battle's next order.
+        self.order: asyncio.Future | None = None
+        self.match: _Match | None = None
+        # Task starting the slot's next battle in the background (``prewarm``).
+        self.warm: asyncio.Task | None = None
+        self.opponent = opponent
+        self._current_opponent_player_spec = opponent_player_spec
+        self._pending_opponent_player_spec: OpponentPlayerSpec | None = None
+
+    def action_masks(self) -> np.ndarray:
+        return self.mask
+
+    def get_last_battle(self):
+        return self.last_battle
+
+    def get_opponent_player_spec(self) -> OpponentPlayerSpec:
+        """Return the currently active opponent-player spec."""
+        return self._current_opponent_player_spec
+
+    def schedule_opponent_player(self, opponent_player_spec: OpponentPlayerSpec):
+        """Queue an opponent policy change for this slot's next battle."""
+        if opponent_player_spec == self._current_opponent_player_spec:
+            self._pending_opponent_player_spec = None
+            return
+        self._pending_opponent_player_spec = opponent_player_spec
+
+    def _maybe_swap_opponent_player(self, policy_for: Callable[[OpponentPlayerSpec], Player]):
+        if self._pending_opponent_player_spec is None:
+            return
+        self.opponent = policy_for(self._pending_opponent_player_spec)
+        self._current_opponent_player_spec = self._pending_opponent_player_spec
+        self._pending_opponent_player_spec = None
+
+
+class AsyncBattleVecEnv(VecEnv):
+    """SB3 ``VecEnv`` running ``n_envs`` concurrent battles on a single event loop.
+
+    Observations, rewards, infos and action masks match ``build_env``; episode
+    ends are handled the ``DummyVecEnv`` way (``terminal_observation`` in the
+    info, the returned observation is the first of the next battle).
+    """
+
+    def __init__(
+            self,
+            n_envs: int,
+            *,
+            battle_format: str,
+            opponent_player_spec: OpponentPlayerSpec,
+            unique_id: str,
+            rounds_per_opponent: int = 2_000,
+            agent_team_generator=None,
+            opponent_team_generator=None,
+            battle_team_generator=None,
+            strict: bool = True,
+            battle_config: BattleConfig | None = None,
+            obs_dtype: str = "float32",
+            reward_components: bool = False,
+            incremental_encoding: bool = False,
+            server_configuration: ServerConfiguration = LocalhostServerConfiguration,
+            start_listening: bool = True,
+            challenge_timeout: float | None = 60.0,
+            prewarm: bool = False,
+    ):
+        """
+        :param n_envs: Number of concurrent battles.
+        :param battle_format: Showdown battle format name.
+        :param opponent_player_spec: Opponent Player spec every battle starts with.
+        :param unique_id: Suffix of the account names, unique across processes.
+        :param rounds_per_opponent: Battles played before rotating teams.
+        :param agent_team_generator: Optional generator for agent teams.
+        :param opponent_team_generator: Optional generator for opponent teams.
+        :param battle_team_generator: Optional generator yielding both teams.
+        :param strict: Reject illegal actions instead of playing the default order.
+        :param battle_config: Generation config. Defaults to Gen 1.
+        :param obs_dtype: Observation storage dtype (see ``build_env``).
+        :param reward_components: Report per-component reward deltas in step infos.
+        :param incremental_encoding: Encode incrementally (see ``build_env``).
+        :param server_configuration: Showdown server to play on.
+        :param start_listening: Connect the players to the server.
+        :param challenge_timeout: Seconds to wait for a new battle to start.
+        :param prewarm: Start every slot's next battle as soon as its current
+            one has started, so a reset picks up a battle that is already
+            waiting for its first order instead of waiting for the
+            challenge/accept handshake.  Team rotations and scheduled opponent
+            swaps still apply from the next battle on; a pre-warmed battle
+            against a replaced opponent is forfeited."""
+        self._unique_id = unique_id
+        self._battle_format = battle_format
+        self._server_configuration = server_configuration
+        self._start_listening = start_listening
+        self._challenge_timeout = challenge_timeout
+        self._strict = strict
+        self._prewarm = prewarm
+
+        agent_account = AccountConfiguration(f"Player_{unique_id}", None)
+        opponent_account = AccountConfiguration(f"Opponent_{unique_id}", None)
+        self._codec = PokemonRLWrapper(
+            battle_format=battle_format,
+            battle_team_generator=battle_team_generator,
+            agent_team_generator=agent_team_generator,
+            opponent_team_generator=opponent_team_generator,
+            rounds_per_opponents=rounds_per_opponent,
+            server_configuration=server_configuration,
+            account_configuration1=agent_account,
+            account_configuration2=opponent_account,
+            start_listening=False,
+            strict=strict,
+            battle_config=battle_config,
+            obs_dtype=obs_dtype,
+            reward_components=reward_components,
+            incremental_encoding=incremental_encoding,
+        )
+        player_kwargs = dict(
+            battle_format=battle_format,
+            server_configuration=server_configuration,
+            # A pre-warmed battle runs next to each slot's current one.
+            max_concurrent_battles=2 * n_envs if prewarm else n_envs,
+            start_listening=start_listening,
+        )
+        self._agent = _RoutedPlayer(
+            self._agent_decision, self._battle_finished,
+            account_configuration=agent_account, **player_kwargs,
+        )
+        self._opponent = _RoutedPlayer(
+            self._opponent_decision, account_configuration=opponent_account, **player_kwargs,
+        )
+
+        self._opponent_policies: list[tuple[OpponentPlayerSpec, Player]] = []
+        self._opponent_player_revision = 0
+        opponent = self._opponent_policy(opponent_player_spec)
+        self._slots = [_BattleSlot(i, opponent_player_spec, opponent) for i in range(n_envs)]
+        self._matches: dict[str, _Match] = {}
+        # Battle being started; new battle tags are routed to it.
+        self._challenger: _Match | None = None
+        self._challenge_lock = asyncio.Lock()
+        self._pending_step = None
+        self.closed = False
+
+        agent = self._codec.possible_agents[0]
+        super().__init__(
+            n_envs, self._codec.observation_spaces[agent], self._codec.action_spaces[agent],
+        )
+
+    # ------------------------------------------------------------------
+    # VecEnv API
+    # ------------------------------------------------------------------
+
+    def reset(self):
+        results = self._run(_gather(self._reset_slot(slot) for slot in self._slots))
+        self.reset_infos = [{} for _ in self._slots]
+        self._reset_seeds()
+        self._reset_options()
+        return self._stack_obs(results)
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._pending_step = asyncio.run_coroutine_threadsafe(
+            _gather(self._step_slot(slot, action) for slot, action in zip(self._slots, actions)),
+            POKE_LOOP,
+        )
+
+    def step_wait(self):
+        results = self._pending_step.result()
+        self._pending_step = None
+        obs, rewards, dones, infos = zip(*results)
+        return (
+            self._stack_obs(obs),
+            np.array(rewards, dtype=np.float32),
+            np.array(dones, dtype=bool),
+            list(infos),
+        )
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self._run(self._close())
+        self.closed = True
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> list[Any]:
+        return [getattr(self._slots[i], attr_name) for i in self._get_indices(indices)]
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        for i in self._get_indices(indices):
+            setattr(self._slots[i], attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> list[Any]:
+        return [
+            getattr(self._slots[i], method_name)(*method_args, **method_kwargs)
+            for i in self._get_indices(indices)
+        ]
+
+    def env_is_wrapped(self, wrapper_class, indices: VecEnvIndices = None) -> list[bool]:
+        return [False for _ in self._get_indices(indices)]
+
+    def action_masks(self) -> np.ndarray:
+        return np.stack([slot.mask for slot in self._slots])
+
+    # ------------------------------------------------------------------
+    # Battles (run on POKE_LOOP)
+    # ------------------------------------------------------------------
+
+    async def _reset_slot(self, slot: _BattleSlot) -> dict[str, np.ndarray]:
+        if slot.order is not None:
+            await self._forfeit(slot.match, slot.order)
+            slot.order = None
+        if slot.battle is not None:
+            self._retire(slot.battle)
+
+        warm, slot.warm = slot.warm, None
+        if warm is not None and slot._pending_opponent_player_spec is not None:
+            await self._discard(warm)
+            warm = None
+        slot._maybe_swap_opponent_player(self._opponent_policy)
+        slot.match, slot.battle, slot.order = await (warm if warm is not None else self._new_match(slot))
+        if self._prewarm:
+            slot.warm = asyncio.ensure_future(self._new_match(slot))
+        return self._observe(slot)
+
+    async def _new_match(self, slot: _BattleSlot) -> tuple[_Match, AbstractBattle, asyncio.Future]:
+        """Start a battle against ``slot``'s opponent; returns it with its first request."""
+        match = _Match(slot.opponent)
+        async with self._challenge_lock:
+            self._codec.maybe_update_teams(self._agent, self._opponent)
+            self._challenger = match
+            try:
+                await asyncio.wait_for(self._challenge(), self._challenge_timeout)
+                battle, order = await asyncio.wait_for(match.requests.get(), self._challenge_timeout)
+            except asyncio.TimeoutError:
+                raise asyncio.TimeoutError("Agent is not challenging") from None
+            finally:
+                self._challenger = None
+        return match, battle, order
+
+    async def _challenge(self):
+        """Challenge/accept handshake between the env's two players."""
+        await asyncio.gather(
+            self._agent.challenge_once(self._opponent.username),
+            self._opponent.accept_once(self._agent.username),
+        )
+
+    async def _step_slot(self, slot: _BattleSlot, action) -> tuple:
+        self._codec.action_mask.set(slot.mask)
+        order = self._codec.action_to_order(action, slot.battle, strict=self._strict)
+        slot.order.set_result(order)
+        slot.battle, slot.order = await slot.match.requests.get()
+
+        battle = slot.battle
+        obs = self._observe(slot)
+        reward = self._codec.calc_reward(battle)
+        terminated, truncated = self._codec.calc_term_trunc(battle)
+        info = self._codec.get_additional_info()[self._codec.possible_agents[0]]
+        done = terminated or truncated
+        if done:
+            slot.last_battle = battle
+            if "battle_outcome" in info:
+                info["battle_outcome"] = info["battle_outcome"].with_opponent(slot.get_opponent_player_spec())
+            info["terminal_observation"] = obs
+            info["TimeLimit.truncated"] = truncated and not terminated
+            obs = await self._reset_slot(slot)
+        return obs, reward, done, info
+
+    @staticmethod
+    async def _forfeit(match: _Match, order: asyncio.Future):
+        """Forfeit ``match`` from its pending ``order`` and wait until the battle has ended."""
+        while order is not None:
+            order.set_result(ForfeitBattleOrder())
+            _, order = await match.requests.get()
+
+    async def _discard(self, warm: asyncio.Task):
+        """Forfeit the pre-warmed battle started by ``warm``."""
+        try:
+            match, battle, order = await warm
+        except asyncio.TimeoutError:
+            return
+        await self._forfeit(match, order)
+        self._retire(battle)
+
+    def _retire(self, battle: AbstractBattle):
+        """Forget a battle that has ended for the agent."""
+        self._matches.pop(battle.battle_tag, None)
+        self._agent.forget_battle(battle.battle_tag)
+        self._opponent.forget_battle(battle.battle_tag)
+
+    async def _close(self):
+        for slot in self._slots:
+            warm, slot.warm = slot.warm, None
+            if warm is not None:
+                try:
+                    _, _, order = await warm
+                except asyncio.TimeoutError:
+                    pass
+                else:
+                    order.set_result(ForfeitBattleOrder())
+            if slot.order is not None:
+                slot.order.set_result(ForfeitBattleOrder())
+                slot.order = None
+        if self._start_listening:
+            await asyncio.gather(self._agent.ps_client.stop_listening(), self._opponent.ps_client.stop_listening())
+
+    def _observe(self, slot: _BattleSlot) -> dict[str, np.ndarray]:
+        battle = slot.battle
+        obs = {
+            "observation": self._codec.embed_battle(battle),
+            "action_mask": np.array(self._codec.get_action_mask(battle), dtype=np.int8),
+        }
+        slot.mask = self._codec.action_masks()
+        return obs
+
+    # ------------------------------------------------------------------
+    # Player callbacks (run on POKE_LOOP)
+    # ------------------------------------------------------------------
+
+    async def _agent_decision(self, battle: AbstractBattle) -> BattleOrder:
+        order = asyncio.get_running_loop().create_future()
+        self._match_of(battle).requests.put_nowait((battle, order))
+        return await order
+
+    def _battle_finished(self, battle: AbstractBattle):
+        self._match_of(battle).requests.put_nowait((battle, None))
+
+    def _opponent_decision(self, battle: AbstractBattle):
+        return self._match_of(battle).opponent.choose_move(battle)
+
+    def _match_of(self, battle: AbstractBattle) -> _Match:
+        match = self._matches.get(battle.battle_tag)
+        if match is None:
+            if self._challenger is None:
+                raise RuntimeError(f"Battle {battle.battle_tag} was not started by this env.")
+            match = self._matches[battle.battle_tag] = self._challenger
+        return match
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _opponent_policy(self, spec: OpponentPlayerSpec) -> Player:
+        """Opponent Player for ``spec``, shared by every slot using that spec.
+
+        Only its ``choose_move`` is called (through the routed opponent), so it
+        never connects to the server."""
+        for known, policy in self._opponent_policies:
+            if known == spec:
+                return policy
+        policy = build_opponent_player(
+            spec,
+            battle_format=self._battle_format,
+            server_configuration=self._server_configuration,
+            account_configuration=AccountConfiguration(
+                f"Opp_{self._unique_id}_{self._opponent_player_revision}", None,
+            ),
+            start_listening=False,
+        )
+        self._opponent_player_revision += 1
+        self._opponent_policies.append((spec, policy))
+        return policy
+
+    def _stack_obs(self, obs) -> dict[str, np.ndarray]:
+        return {key: np.stack([o[key] for o in obs]) for key in self.observation_space.spaces}
+
+    @staticmethod
+    def _run(coro):
+        return asyncio.run_coroutine_threadsafe(coro, POKE_LOOP).result()
+
+
+# ------------------------------------------------------------------------------
+# P processes x K battles
+# ------------------------------------------------------------------------------
+
+def _battle_worker(remote, parent_remote, env_fn_wrapper: CloudpickleWrapper) -> None:
+    """Serve one ``AsyncBattleVecEnv`` over ``remote``, one reply per command."""
+    env = start_worker_env(remote, parent_remote, env_fn_wrapper)
+
+    def step(actions: np.ndarray):
+        env.step_async(actions)
+        return env.step_wait()
+
+    def reset(reset_arguments: tuple[list, list]):
+        set_reset_arguments(env, reset_arguments)
+        return env.reset(), env.reset_infos
+
+    serve_worker(remote, env, {"step": step, "reset": reset})
+
+
+class SubprocBattleVecEnv(WorkerVecEnv):
+    """``SubprocVecEnv`` whose workers each host an ``AsyncBattleVecEnv``.
+
+    ``env_fns`` build one ``AsyncBattleVecEnv`` per worker process, so ``P``
+    workers of ``K`` battles give ``P * K`` envs.  A step is one pipe round
+    trip per process carrying the ``K`` actions and the already stacked
+    observations back, and ``env_method``/``get_attr`` group the requested
+    indices into one call per process (see ``WorkerVecEnv``).
+
+    :param env_fns: Factories of the per-process ``AsyncBattleVecEnv``.
+    :param start_method: ``multiprocessing`` start method. Defaults to
+        ``forkserver`` where available, else ``spawn`` (poke-env's event loop
+        thread does not survive ``fork``).
+    """
+
+    def __init__(self, env_fns: list[Callable[[], AsyncBattleVecEnv]], start_method: str | None = None):
+        super().__init__(env_fns, _battle_worker, start_method)
+
+    def step_async(self, actions: np.ndarray) -> None:
+        for w, remote in enumerate(self.remotes):
+            remote.send(("step", actions[self._worker_rows(w)]))
+        self.waiting = True
+
+    def step_wait(self):
+        results = [remote.recv() for remote in self.remotes]
+        self.waiting = False
+        obs, rewards, dones, infos = zip(*results)
+        return (
+            self._concat_obs(obs),
+            np.concatenate(rewards),
+            np.concatenate(dones),
+            [info for worker_infos in infos for info in worker_infos],
+        )
+
+    def reset(self):
+        # Seeds and options set through seed()/set_options() apply to this reset only.
+        for w, remote in enumerate(self.remotes):
+            remote.send(("reset", self._reset_arguments(w)))
+        obs, infos = zip(*[remote.recv() for remote in self.remotes])
+        self.reset_infos = [info for worker_infos in infos for info in worker_infos]
+        self._reset_seeds()
+        self._reset_options()
+        return self._concat_obs(obs)
+
+    def action_masks(self) -> np.ndarray:
+        return np.stack(self.env_method("action_masks"))
+
+    def _concat_obs(self, obs) -> dict[str, np.ndarray]:
+        return {key: np.concatenate([o[key] for o in obs]) for key in self.observation_space.spaces}
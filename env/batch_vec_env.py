@@ -0,0 +1,495 @@
+"""
+SB3 ``VecEnv`` over the vectorized Gen 1 engine.
+
+``BatchBattleVecEnv`` plays ``n_envs`` battles on one
+``combat.gen1_batch_engine.Gen1BatchEngine``: every ``step`` resolves the
+agent's actions of all battles in a handful of whole-array NumPy operations,
+with no Showdown server, no poke-env ``Battle`` and no per-battle Python
+loop.  Observations are written straight from the engine's arrays into
+``BattleColumnsGen1`` and encoded by ``BatchBattleEncoderGen1.encode_columns``,
+so they have the ``BattleStateGen1.array_len()`` layout (and the
+``obs_dtype`` quantization) every policy here — ``AttentionPointerPolicy``
+included — is built for.  Masks follow poke-env's ``get_action_mask`` and
+rewards are ``state_value_from_obs`` deltas, as in ``build_env``.
+
+The opponent is vectorized too: only the built-in ``random`` and
+``max-power`` policies are available, decided from the engine's arrays.  Its
+forced switches are resolved inside ``step``, so the agent is only asked for
+its own decisions.  Engine mechanics are a subset of Showdown's (see
+``combat.gen1_batch_engine``); there are no ``Battle`` objects to inspect,
+so ``get_last_battle`` returns ``None``.
+
+Usage
+-----
+    vec_env = BatchBattleVecEnv(256, opponent_player_spec=OpponentPlayerSpec(id="random"), seed=0)
+    obs = vec_env.reset()
+    obs, rewards, dones, infos = vec_env.step(actions)
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import gymnasium
+import numpy as np
+from poke_env.battle import Effect, Move, Status
+from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import VecEnvIndices
+
+from combat.gen1_batch_engine import MAX_MOVES, MAX_TEAM, MAX_TURNS, STATUSES, Gen1BatchEngine, SPECIES
+from curriculum.models import OpponentPlayerSpec
+from env.battle_config import BattleConfig
+from env.observation_quantizer import ObservationQuantizer
+from env.reward import (
+    state_value_component_weights, state_value_components_from_obs, state_value_from_obs,
+    state_value_weights,
+)
+from env.singles_env_wrapper import BattleOutcome
+from env.states.gen1.arena_state_gen1 import ArenaStateGen1
+from env.states.gen1.batch_encoder_gen1 import BatchBattleEncoderGen1, BattleColumnsGen1, SideColumnsGen1
+from env.states.gen1.my_pokemon_state_gen_1 import MyPokemonStateGen1
+from env.states.gen1.stat_table_gen1 import GEN1_DEX_STATS, GEN1_SPECIES
+from env.states.move_feature_table import MoveFeatureTable
+from env.states.state_utils import ALL_STATUSES
+
+OPPONENT_POLICIES = ("random", "max-power")
+
+# Engine status code -> ALL_STATUSES index (-1 for none).
+_STATUS_INDEX = np.array([-1] + [ALL_STATUSES.index(Status[s.upper()]) for s in STATUSES], dtype=np.intp)
+_FAINTED = ALL_STATUSES.index(Status.FNT)
+_STAT_COLS = [MyPokemonStateGen1.STAT_KEYS.index(k) for k in ("hp", "atk", "def", "spe")]
+_CONFUSION = MyPokemonStateGen1.TRACKED_EFFECTS.index(Effect.CONFUSION)
+# Engine species index -> GEN1_DEX_STATS row.
+_DEX_ROWS = np.array([GEN1_SPECIES.index(s) for s in SPECIES], dtype=np.intp)
+# poke-env's STAB multiplier for every known Pokémon.
+_STAB = 1.5
+
+
+class _BatchSlot:
+    """One of the env's battles, as seen by ``get_attr``/``env_method``.
+
+    Exposes the same methods as ``_PokemonEnvBridge`` does for ``SubprocVecEnv``."""
+
+    def __init__(self, env: "BatchBattleVecEnv", index: int, opponent_player_spec: OpponentPlayerSpec):
+        self.index = index
+        self.render_mode = None
+        self._env = env
+        self._current_opponent_player_spec = opponent_player_spec
+        self._pending_opponent_player_spec: OpponentPlayerSpec | None = None
+
+    def action_masks(self) -> np.ndarray:
+        return self._env.action_masks()[self.index]
+
+    def get_last_battle(self):
+        return None
+
+    def get_opponent_player_spec(self) -> OpponentPlayerSpec:
+        """Return the currently active opponent-player spec."""
+        return self._current_opponent_player_spec
+
+    def schedule_opponent_player(self, opponent_player_spec: OpponentPlayerSpec):
+        """Queue an opponent policy change for this slot's next battle.
+
+        :raises ValueError: If the spec is not one of ``OPPONENT_POLICIES``."""
+        _opponent_policy(opponent_player_spec)
+        if opponent_player_spec == self._current_opponent_player_spec:
+            self._pending_opponent_player_spec = None
+            return
+        self._pending_opponent_player_spec = opponent_player_spec
+
+    def _maybe_swap_opponent_player(self) -> bool:
+        if self._pending_opponent_player_spec is None:
+            return False
+        self._current_opponent_player_spec = self._pending_opponent_player_spec
+        self._pending_opponent_player_spec = None
+        return True
+
+
+def _opponent_policy(spec: OpponentPlayerSpec) -> int:
+    """Index of ``spec`` in ``OPPONENT_POLICIES``.
+
+    :raises ValueError: For custom classes or other built-in players."""
+    if spec.class_path is not None or spec.id not in OPPONENT_POLICIES:
+        raise ValueError(
+            f"BatchBattleVecEnv opponents are decided from engine arrays; supported ids are "
+            f"{', '.join(OPPONENT_POLICIES)}, got {spec.id or spec.class_path!r}."
+        )
+    return OPPONENT_POLICIES.index(spec.id)
+
+
+class BatchBattleVecEnv(VecEnv):
+    """SB3 ``VecEnv`` of ``n_envs`` Gen 1 battles on one ``Gen1BatchEngine``.
+
+    Episode ends are handled the ``DummyVecEnv`` way (``terminal_observation``
+    in the info, the returned observation is the first of the next battle)."""
+
+    def __init__(
+            self,
+            n_envs: int,
+            *,
+            opponent_player_spec: OpponentPlayerSpec | None = None,
+            rounds_per_opponent: int = 2_000,
+            agent_team_generator=None,
+            opponent_team_generator=None,
+            battle_team_generator=None,
+            strict: bool = True,
+            battle_config: BattleConfig | None = None,
+            obs_dtype: str = "float32",
+            reward_components: bool = False,
+            seed: int | None = None,
+            max_turns: int = MAX_TURNS,
+    ):
+        """
+        :param n_envs: Number of battles.
+        :param opponent_player_spec: Opponent every battle starts with; ``random``
+            or ``max-power`` (the default).
+        :param rounds_per_opponent: Battles played before rotating teams.
+        :param agent_team_generator: Optional generator for agent teams.
+        :param opponent_team_generator: Optional generator for opponent teams.
+        :param battle_team_generator: Optional generator yielding both teams.
+            Sides without a generator get random ``GEN1_OU_ROSTER`` teams.
+        :param strict: Reject illegal actions instead of playing the first legal one.
+        :param battle_config: Generation config; must be Gen 1.
+        :param obs_dtype: Observation storage dtype (see ``build_env``).
+        :param reward_components: Report per-component reward deltas in step infos.
+        :param seed: Seed of the engine's and the opponent's RNG.
+        :param max_turns: Turn after which a battle ends in a tie.
+        :raises ValueError: For a non-Gen 1 config or an unsupported opponent."""
+        self._battle_config = battle_config if battle_config is not None else BattleConfig.gen1()
+        if self._battle_config.gen != 1:
+            raise ValueError("BatchBattleVecEnv only simulates Gen 1 battles.")
+        opponent_player_spec = opponent_player_spec or OpponentPlayerSpec(id="max-power")
+        policy = _opponent_policy(opponent_player_spec)
+
+        self._rng = np.random.default_rng(seed)
+        self._engine = Gen1BatchEngine(n_envs, seed=self._rng, max_turns=max_turns)
+        self._encoder = BatchBattleEncoderGen1()
+        self._quantizer = ObservationQuantizer(self._battle_config, obs_dtype)
+        self._strict = strict
+        self._value_weights = state_value_weights(self._battle_config)
+        self._component_weights = (
+            state_value_component_weights(self._battle_config) if reward_components else None
+        )
+        # MoveFeatureTable row per engine move, plus EMPTY_ROW for the -1 of empty slots.
+        self._move_rows = np.full(len(self._engine.moves) + 1, MoveFeatureTable.EMPTY_ROW, dtype=np.intp)
+        self._has_row = np.zeros(len(self._engine.moves), dtype=bool)
+
+        self.battle_team_generator = battle_team_generator
+        self.agent_team_generator = agent_team_generator
+        self.opponent_team_generator = opponent_team_generator
+        self.rounds_per_opponents = rounds_per_opponent
+        self.rounds_played = 0
+        self._last_team_update_round = None
+        self._teams: tuple[str | None, str | None] = (None, None)
+
+        self._slots = [_BatchSlot(self, i, opponent_player_spec) for i in range(n_envs)]
+        self._opponent = np.full(n_envs, policy, dtype=np.intp)
+        self._values = np.zeros(n_envs)
+        self._components: np.ndarray | None = None
+        self._masks = np.zeros((n_envs, self._battle_config.action_space_size), dtype=bool)
+        self._actions: np.ndarray | None = None
+
+        observation_space = gymnasium.spaces.Dict({
+            "action_mask": gymnasium.spaces.Box(0, 1, shape=(self._battle_config.action_space_size,), dtype=np.int8),
+            "observation": self._quantizer.observation_space(),
+        })
+        super().__init__(n_envs, observation_space, gymnasium.spaces.Discrete(self._battle_config.action_space_size))
+
+    # ------------------------------------------------------------------
+    # VecEnv API
+    # ------------------------------------------------------------------
+
+    def reset(self):
+        self._start(np.arange(self.num_envs))
+        self.reset_infos = [{} for _ in self._slots]
+        self._reset_seeds()
+        self._reset_options()
+        obs, _ = self._observe()
+        return obs
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._actions = np.asarray(actions, dtype=np.intp).reshape(self.num_envs)
+
+    def step_wait(self):
+        engine = self._engine
+        actions = self._legal_actions(self._actions)
+        self._actions = None
+        engine.step(np.stack([actions, self._opponent_actions()], axis=1))
+        # The agent waits while the opponent replaces a fainted Pokémon.
+        while True:
+            waiting = engine.must_switch[:, 1] & ~engine.must_switch[:, 0] & ~engine.finished
+            if not waiting.any():
+                break
+            engine.step(np.stack([actions, self._opponent_actions()], axis=1), battles=waiting)
+
+        obs, (values, components) = self._observe()
+        rewards = (values - self._values).astype(np.float32)
+        infos: list[dict[str, Any]] = [{} for _ in self._slots]
+        if components is not None:
+            for info, delta in zip(infos, components - self._components):
+                info["reward_components"] = delta
+            self._components = components
+        self._values = values
+
+        dones = engine.finished.copy()
+        done = np.flatnonzero(dones)
+        if len(done):
+            defeated = (~(engine.hp[done] > 0).any(axis=2)).any(axis=1)
+            for i, terminated, outcome in zip(done, defeated, self._outcomes(done)):
+                slot = self._slots[i]
+                infos[i]["battle_outcome"] = outcome.with_opponent(slot.get_opponent_player_spec())
+                infos[i]["terminal_observation"] = {key: value[i].copy() for key, value in obs.items()}
+                infos[i]["TimeLimit.truncated"] = not terminated
+            self._start(done, count_rounds=True)
+            fresh, _ = self._observe(done)
+            for key, value in fresh.items():
+                obs[key][done] = value
+        return obs, rewards, dones, infos
+
+    def close(self) -> None:
+        pass
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> list[Any]:
+        return [getattr(self._slots[i], attr_name) for i in self._get_indices(indices)]
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        for i in self._get_indices(indices):
+            setattr(self._slots[i], attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> list[Any]:
+        return [
+            getattr(self._slots[i], method_name)(*method_args, **method_kwargs)
+            for i in self._get_indices(indices)
+        ]
+
+    def env_is_wrapped(self, wrapper_class, indices: VecEnvIndices = None) -> list[bool]:
+        return [False for _ in self._get_indices(indices)]
+
+    def action_masks(self) -> np.ndarray:
+        return self._masks
+
+    # ------------------------------------------------------------------
+    # Battles
+    # ------------------------------------------------------------------
+
+    def _start(self, battles: np.ndarray, count_rounds: bool = False):
+        """Start new battles in ``battles``, applying team rotations and opponent swaps.
+
+        :param count_rounds: The previous battles of ``battles`` just finished."""
+        teams = []
+        for i in battles:
+            if count_rounds:
+                self.rounds_played += 1
+            self._maybe_update_teams()
+            teams.append(self._teams)
+            slot = self._slots[i]
+            if slot._maybe_swap_opponent_player():
+                self._opponent[i] = _opponent_policy(slot.get_opponent_player_spec())
+        self._engine.start(battles, teams)
+        self._values[battles] = 0.0
+        if self._component_weights is not None:
+            if self._components is None:
+                self._components = np.zeros((self.num_envs, len(self._component_weights)))
+            self._components[battles] = 0.0
+        moves = np.unique(self._engine.move_ids[battles])
+        self._encode_moves(moves[moves >= 0])
+
+    def _maybe_update_teams(self):
+        """``PokemonRLWrapper.maybe_update_teams`` for the env-wide current teams."""
+        if (
+                self.rounds_played % self.rounds_per_opponents == 0
+                and self._last_team_update_round != self.rounds_played
+        ):
+            agent_team, opponent_team = self._teams
+            if self.battle_team_generator is not None:
+                agent_team, opponent_team = next(self.battle_team_generator)
+            else:
+                if self.agent_team_generator is not None:
+                    agent_team = next(self.agent_team_generator)
+                if self.opponent_team_generator is not None:
+                    opponent_team = next(self.opponent_team_generator)
+            self._teams = (agent_team, opponent_team)
+            self._last_team_update_round = self.rounds_played
+
+    def _legal_actions(self, actions: np.ndarray) -> np.ndarray:
+        legal = self._masks[np.arange(self.num_envs), np.clip(actions, 0, self._masks.shape[1] - 1)]
+        legal &= (actions >= 0) & (actions < self._masks.shape[1])
+        if legal.all():
+            return actions
+        if self._strict:
+            bad = np.flatnonzero(~legal)
+            raise ValueError(f"Invalid actions {actions[bad].tolist()} in envs {bad.tolist()}.")
+        return np.where(legal, actions, self._masks.argmax(axis=1))
+
+    def _opponent_actions(self) -> np.ndarray:
+        """Decisions of every battle's opponent policy (``OPPONENT_POLICIES``)."""
+        engine = self._engine
+        mask = engine.action_masks(1)
+        noise = self._rng.random(mask.shape)
+        actions = np.where(mask, noise, -1.0).argmax(axis=1)
+
+        # max-power: the highest base power among legal moves (first on ties), else random.
+        ar = np.arange(engine.n)
+        moves = engine.move_ids[ar, 1, engine.active[:, 1]]
+        power = np.where(mask[:, MAX_TEAM:], engine.moves.power[moves], -1)
+        max_power = (self._opponent == OPPONENT_POLICIES.index("max-power")) & mask[:, MAX_TEAM:].any(axis=1)
+        return np.where(max_power, power.argmax(axis=1) + MAX_TEAM, actions)
+
+    def _outcomes(self, battles: np.ndarray) -> list[BattleOutcome]:
+        engine = self._engine
+        present = engine.present[battles]
+        fraction = engine.hp[battles] / np.maximum(engine.max_hp[battles], 1)
+        my_hp = np.where(present[:, 0], fraction[:, 0], 0.0).sum(axis=1) / present[:, 0].sum(axis=1)
+        seen = engine.seen[battles, 1] >= 0
+        n_seen = seen.sum(axis=1)
+        n_opponents = np.maximum(n_seen, present[:, 0].sum(axis=1))
+        opponent_hp = (np.where(seen, _shown_hp(fraction[:, 1]), 0.0).sum(axis=1) + n_opponents - n_seen) / n_opponents
+        return [
+            BattleOutcome(
+                won=bool(winner == 0), lost=bool(winner == 1), turns=int(turns),
+                hp_fraction=float(mine), opponent_hp_fraction=float(theirs),
+            )
+            for winner, turns, mine, theirs in zip(
+                engine.winner[battles], engine.turn[battles], my_hp, opponent_hp,
+            )
+        ]
+
+    # ------------------------------------------------------------------
+    # Observation
+    # ------------------------------------------------------------------
+
+    def _observe(self, battles: np.ndarray | None = None):
+        """Observations and masks of ``battles`` (all by default), and their state values."""
+        engine = self._engine
+        battles = np.arange(self.num_envs) if battles is None else battles
+        masks = engine.action_masks(0)[battles]
+        self._masks[battles] = masks
+        encoded = self._encoder.encode_columns(self._columns(battles))
+
+        n_team = engine.present[battles, 0].sum(axis=1)
+        n_opponent_team = engine.n_seen[battles, 1]
+        won, lost = engine.winner[battles] == 0, engine.winner[battles] == 1
+        finished = engine.finished[battles]
+        won, lost = won & finished, lost & finished
+        if self._component_weights is not None:
+            components = state_value_components_from_obs(
+                encoded, n_team, n_opponent_team, won, lost, self._component_weights,
+            )
+            values = components.sum(axis=1)
+        else:
+            components = None
+            values = state_value_from_obs(encoded, n_team, n_opponent_team, won, lost, self._value_weights)
+        obs = {
+            "action_mask": masks.astype(np.int8),
+            "observation": self._quantizer.quantize(encoded),
+        }
+        return obs, (values, components)
+
+    def _columns(self, b: np.ndarray) -> BattleColumnsGen1:
+        """What poke-env's ``Battle`` would hold for the agent, gathered from engine arrays."""
+        engine = self._engine
+        k = len(b)
+        ar = np.arange(k)
+        empty = MoveFeatureTable.EMPTY_ROW
+        rows = self._move_rows
+
+        # --- Agent side: team order, exact HP, request stats. ---
+        present = engine.present[b, 0]
+        hp = engine.hp[b, 0]
+        fainted = present & (hp == 0)
+        active_slot = engine.active[b, 0]
+        active = np.zeros((k, MAX_TEAM), dtype=bool)
+        active[ar, active_slot] = True
+        my = self._side(
+            present, np.where(present, hp / np.maximum(engine.max_hp[b, 0], 1), 0.0),
+            engine.status[b, 0], fainted, active, engine.boosts[b, 0], engine.confusion[b, 0] > 0,
+        )
+        stats = np.stack([engine.max_hp[b, 0], *np.moveaxis(engine.stats[b, 0][..., [0, 1, 3]], -1, 0)], axis=-1)
+        my.stats[..., _STAT_COLS] = stats
+
+        my_moves = engine.move_ids[b, 0]
+        my_move_rows = rows[my_moves]
+        # The active Pokémon only shows the moves it can pick; none when recharging or struggling.
+        choosing = ~engine.must_switch[b, 0] & ~engine.finished[b]
+        usable = (engine.pp[b, 0, active_slot] > 0) & (my_moves[ar, active_slot] >= 0)
+        usable &= ~engine.recharge[b, 0, None] & usable.any(axis=1, keepdims=True)
+        my_move_rows[ar, active_slot] = np.where(
+            choosing[:, None] & ~usable, empty, my_move_rows[ar, active_slot],
+        )
+
+        # --- Opponent side: slots in reveal order, HP rounded as the protocol shows it. ---
+        order = np.argsort(np.where(engine.seen[b, 1] >= 0, engine.seen[b, 1], MAX_TEAM), axis=1, kind="stable")
+        seen = np.take_along_axis(engine.seen[b, 1] >= 0, order, axis=1)
+        opp_hp = np.take_along_axis(engine.hp[b, 1], order, axis=1)
+        opp_max_hp = np.take_along_axis(engine.max_hp[b, 1], order, axis=1)
+        opp_active_slot = engine.active[b, 1]
+        opp_active = seen & (order == opp_active_slot[:, None])
+        position = opp_active.argmax(axis=1)
+        opp = self._side(
+            seen, np.where(seen, _shown_hp(opp_hp / np.maximum(opp_max_hp, 1)), 0.0),
+            np.take_along_axis(engine.status[b, 1], order, axis=1), seen & (opp_hp == 0), opp_active,
+            engine.boosts[b, 1], engine.confusion[b, 1] > 0, position,
+        )
+        species = np.take_along_axis(engine.species[b, 1], order, axis=1)
+        opp.stats[:] = np.where(seen[..., None], GEN1_DEX_STATS[_DEX_ROWS[species]], 0.0)
+
+        revealed = engine.move_seen[b, 1, opp_active_slot]
+        move_order = np.argsort(np.where(revealed >= 0, revealed, MAX_MOVES), axis=1, kind="stable")
+        opp_moves = np.take_along_axis(engine.move_ids[b, 1, opp_active_slot], move_order, axis=1)
+        opp_move_rows = np.where(np.take_along_axis(revealed >= 0, move_order, axis=1), rows[opp_moves], empty)
+
+        # Gen 1 Showdown reports Reflect/Light Screen as volatiles, never as side conditions.
+        n_screens = len(ArenaStateGen1.TRACKED_SCREENS)
+        opp_recharge = np.zeros((k, MAX_TEAM))
+        opp_recharge[ar, position] = engine.shown_recharge[b, 1]
+        my_types = engine.types[b, 0]
+        return BattleColumnsGen1(
+            turn=engine.turn[b].astype(float),
+            my_screens=np.zeros((k, n_screens), dtype=bool),
+            opp_screens=np.zeros((k, n_screens), dtype=bool),
+            my=my,
+            opp=opp,
+            opp_preparing=np.zeros((k, MAX_TEAM)),
+            opp_recharge=opp_recharge,
+            opp_protect=np.where(seen, 0.0, -1.0),
+            my_move_rows=my_move_rows,
+            my_types=my_types,
+            opp_move_rows=opp_move_rows,
+            my_active_types=my_types[ar, active_slot],
+            opp_active_types=engine.types[b, 1, opp_active_slot],
+        )
+
+    @staticmethod
+    def _side(present, hp, status, fainted, active, boosts, confused, position=None) -> SideColumnsGen1:
+        """Side columns; ``boosts`` and ``confused`` belong to the active slot (``position``)."""
+        k = len(present)
+        ar = np.arange(k)
+        position = active.argmax(axis=1) if position is None else position
+        side_boosts = np.zeros((k, MAX_TEAM, boosts.shape[1]), dtype=np.float32)
+        side_boosts[ar, position] = boosts
+        effects = np.zeros((k, MAX_TEAM, len(MyPokemonStateGen1.TRACKED_EFFECTS)), dtype=bool)
+        effects[ar, position, _CONFUSION] = confused
+        return SideColumnsGen1(
+            present=present,
+            hp=hp,
+            stats=np.zeros((k, MAX_TEAM, len(MyPokemonStateGen1.STAT_KEYS)), dtype=np.float32),
+            boosts=side_boosts,
+            status=np.where(fainted, _FAINTED, np.where(present, _STATUS_INDEX[status], -1)),
+            effects=effects,
+            stab=np.where(present, _STAB, 0.0),
+            active=active,
+            fainted=fainted,
+        )
+
+    def _encode_moves(self, moves: np.ndarray):
+        """Give engine moves not seen before their ``MoveFeatureTable`` rows."""
+        table = self._encoder.move_table
+        for i in moves[~self._has_row[moves]]:
+            self._move_rows[i] = table.row(Move(self._engine.moves.ids[i], gen=1), (), ())
+            self._has_row[i] = True
+
+
+def _shown_hp(fraction: np.ndarray) -> np.ndarray:
+    """HP fraction as the foe sees it: whole percent rounded up, 99% unless full."""
+    percent = np.ceil(100 * fraction)
+    return np.where((percent == 100) & (fraction < 1), 99, percent) / 100
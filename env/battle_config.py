@@ -4,7 +4,8 @@ BattleConfig — generation-specific configuration for the battle state and poli
 Threading the right state classes through the policy extractor, env wrapper, and policy
 player so that adding Gen 2 requires only:
   1. New state classes (BattleStateGen2, MyPokemonStateGen2)
-  2. A new factory:  BattleConfig.gen2()
+  2. A feature spec (GEN2_FEATURE_SPEC) for the compiled encoder
+  3. A new factory:  BattleConfig.gen2()
 
 No changes to core policy or env code are needed.
 
@@ -19,7 +20,8 @@ Usage
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Callable
 
 
 @dataclass(frozen=True)
@@ -35,17 +37,30 @@ class BattleConfig:
     ----------
     gen                  : generation number (1, 2, ...)
     battle_state_cls     : BattleState class for this gen.
-                           Must implement ``array_len()`` and ``battle_before_me_len()``.
+                           Must implement ``array_len()``, ``battle_before_me_len()``
+                           and ``layout()``.
     my_pokemon_state_cls : MyPokemonState class for this gen.
                            Must implement ``array_len()``.
     action_space_size    : total number of discrete actions (moves + switches).
                            Gen 1 = 10 (6 switches + 4 moves).
+    incremental_encoder_cls : optional per-battle encoder that re-encodes only the
+                           slices that changed since the previous turn.
+                           Must implement ``encode(battle) -> np.ndarray`` and
+                           match ``battle_state_cls(battle).to_array()`` exactly,
+                           so it is not part of config equality.
+    encoder              : optional encoder compiled from the generation's declarative
+                           ``BattleSpec`` (see ``env.states.feature_spec``).
+                           ``encoder(battle) -> np.ndarray`` matches
+                           ``battle_state_cls(battle).to_array()`` exactly, so it is
+                           not part of config equality either.
     """
 
     gen: int
     battle_state_cls: type
     my_pokemon_state_cls: type
     action_space_size: int = 10
+    incremental_encoder_cls: type | None = field(default=None, compare=False)
+    encoder: Callable | None = field(default=None, compare=False)
 
     # ── Derived dimensions ────────────────────────────────────────────────────
 
@@ -54,10 +69,15 @@ class BattleConfig:
         """Total observation vector length."""
         return self.battle_state_cls.array_len()
 
+    @property
+    def layout(self):
+        """``ObservationLayout`` of the observation — section offsets and named views."""
+        return self.battle_state_cls.layout()
+
     @property
     def arena_opponent_len(self) -> int:
         """Length of the context slice (arena + opponent state) before my_pokemon."""
-        return self.battle_state_cls.battle_before_me_len()
+        return self.layout.arena_opponent_len
 
     @property
     def my_pokemon_len(self) -> int:
@@ -72,14 +92,17 @@ class BattleConfig:
     @property
     def move_len(self) -> int:
         """Length of a single MoveState feature vector."""
-        from env.states.move_state import MoveState
-        return MoveState.array_len()
+        return self.layout.move_len
 
     @property
     def my_moves_start(self) -> int:
         """Offset within the my_pokemon block where move features begin."""
-        from env.states.state_utils import MAX_MOVES
-        return self.my_pokemon_len - self.move_len * MAX_MOVES
+        return self.layout.my_moves_start
+
+    @property
+    def obs_signed_mask(self):
+        """Boolean mask of observation features in [-1, 1] (the rest are in [0, 1])."""
+        return self.battle_state_cls.signed_feature_mask()
 
     @property
     def n_switch_actions(self) -> int:
@@ -94,9 +117,13 @@ class BattleConfig:
         """Return the canonical configuration for Gen 1."""
         from env.states.gen1.battle_state_gen_1 import BattleStateGen1
         from env.states.gen1.my_pokemon_state_gen_1 import MyPokemonStateGen1
+        from env.states.gen1.incremental_encoder_gen1 import IncrementalBattleEncoderGen1
+        from env.states.gen1.feature_spec_gen1 import GEN1_FEATURE_SPEC
         return cls(
             gen=1,
             battle_state_cls=BattleStateGen1,
             my_pokemon_state_cls=MyPokemonStateGen1,
             action_space_size=10,
+            incremental_encoder_cls=IncrementalBattleEncoderGen1,
+            encoder=GEN1_FEATURE_SPEC.compile(),
         )
@@ -1,3 +1,4 @@
+import os
 import time
 
 import gymnasium
@@ -5,12 +6,17 @@ import numpy as np
 from poke_env import LocalhostServerConfiguration, AccountConfiguration
 from poke_env.environment import SingleAgentWrapper
 
-from stable_baselines3.common.vec_env import SubprocVecEnv, VecMonitor
+from stable_baselines3.common.vec_env import SubprocVecEnv, VecEnvWrapper, VecMonitor
+from stable_baselines3.common.vec_env.base_vec_env import VecEnvIndices
 from stable_baselines3.common.utils import set_random_seed
 
 from curriculum.models import OpponentPlayerSpec
 from curriculum.registry import build_opponent_player
+from env.async_vec_env import AsyncBattleVecEnv, SubprocBattleVecEnv
+from env.batch_vec_env import BatchBattleVecEnv
 from env.battle_config import BattleConfig
+from env.shared_memory_vec_env import SharedMemoryVecEnv
+from env.simulated_env import SimulatedSinglesEnv
 from env.singles_env_wrapper import PokemonRLWrapper
 from env.runtime_safety import (
     ThirdPartyBattleError,
@@ -35,9 +41,11 @@ class _PokemonEnvBridge(gymnasium.Wrapper):
         battle_format: str,
         unique_id: str,
         opponent_player_spec: OpponentPlayerSpec,
+        start_listening: bool = True,
     ):
         super().__init__(env)
         self._battle_format = battle_format
+        self._start_listening = start_listening
         self._unique_id = unique_id
         self._current_opponent_player_spec = opponent_player_spec
         self._pending_opponent_player_spec: OpponentPlayerSpec | None = None
@@ -71,11 +79,15 @@ class _PokemonEnvBridge(gymnasium.Wrapper):
 
     def step(self, action):
         try:
-            return super().step(action)
+            obs, reward, terminated, truncated, info = super().step(action)
         except Exception as exc:
             if is_external_battle_exception(exc):
                 raise ThirdPartyBattleError("Fatal poke-env/showdown error during step") from exc
             raise
+        outcome = info.get("battle_outcome")
+        if outcome is not None:
+            info["battle_outcome"] = outcome.with_opponent(self._current_opponent_player_spec)
+        return obs, reward, terminated, truncated, info
 
     def _maybe_swap_opponent_player(self):
         if self._pending_opponent_player_spec is None:
@@ -89,15 +101,54 @@ class _PokemonEnvBridge(gymnasium.Wrapper):
                 f"Opp_{self._unique_id}_{self._opponent_player_revision}",
                 None,
             ),
+            start_listening=self._start_listening,
         )
         self._opponent_player_revision += 1
         self._current_opponent_player_spec = self._pending_opponent_player_spec
         self._pending_opponent_player_spec = None
 
 
+class VecObservedActionMasks(VecEnvWrapper):
+    """Serves ``action_masks()`` from the ``"action_mask"`` of the last observation.
+
+    ``SingleAgentWrapper`` already ships the mask in every step/reset
+    observation, so answering ``MaskablePPO``'s ``env_method("action_masks")``
+    from that copy saves one round trip to every worker per step.
+    """
+
+    def __init__(self, venv):
+        super().__init__(venv)
+        self._masks: np.ndarray | None = None
+
+    def reset(self):
+        obs = self.venv.reset()
+        self._masks = obs["action_mask"].astype(bool)
+        return obs
+
+    def step_wait(self):
+        obs, rewards, dones, infos = self.venv.step_wait()
+        self._masks = obs["action_mask"].astype(bool)
+        return obs, rewards, dones, infos
+
+    def action_masks(self) -> np.ndarray:
+        if self._masks is None:
+            return np.stack(self.venv.env_method("action_masks"))
+        return self._masks.copy()
+
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs):
+        if method_name == "action_masks" and self._masks is not None and not method_args and not method_kwargs:
+            return [self._masks[i].copy() for i in self._get_indices(indices)]
+        return self.venv.env_method(method_name, *method_args, indices=indices, **method_kwargs)
+
+
 DEFAULT_OPPONENT_PLAYER_SPEC = OpponentPlayerSpec(id="max-power")
 
 
+def _unique_id(worker_id: int) -> str:
+    """Account-name suffix that differs between runs and between workers."""
+    return f"{int(time.time() * 1000) % 100000}_{worker_id}"
+
+
 def build_env(
         battle_format: str,
         opponent_generator,
@@ -108,6 +159,11 @@ def build_env(
         strict: bool = True,
         battle_config: BattleConfig | None = None,
         worker_id: int = 0,
+        obs_dtype: str = "float32",
+        reward_components: bool = False,
+        incremental_encoding: bool = False,
+        simulated: bool = False,
+        protocol_log_dir: str | None = None,
 ) -> _PokemonEnvBridge:
     """Construct the single-agent battle environment.
 
@@ -125,19 +181,37 @@ def build_env(
     :param battle_team_generator: Optional generator yielding both teams.
     :param battle_config: Generation config. Defaults to Gen 1.
     :param worker_id: Index used to ensure unique account names across parallel workers.
+    :param obs_dtype: Observation storage dtype: ``"float32"``, ``"float16"`` or
+        ``"uint8"`` (quantised, dequantised by ``AttentionPointerPolicy``).
+    :param reward_components: If true, each step's info carries the per-component
+        reward delta under ``"reward_components"``.
+    :param incremental_encoding: Encode with a per-battle encoder that only
+        re-encodes the slices changed since the previous turn, instead of the
+        generation's compiled encoder (see ``PokemonRLWrapper``).
+    :param simulated: Play battles on the in-process Gen 1 engine
+        (``SimulatedSinglesEnv``) instead of a Showdown server.
+    :param protocol_log_dir: Directory the agent's battles are recorded to, as
+        ``<username>.log.gz`` Showdown protocol logs (``env.protocol_log``).
     :returns: A configured ``SingleAgentWrapper`` environment."""
 
     configure_external_runtime_messages()
 
-    unique_id = f"{int(time.time() * 1000) % 100000}_{worker_id}"
+    unique_id = _unique_id(worker_id)
     resolved_opponent_player_spec = opponent_player_spec or DEFAULT_OPPONENT_PLAYER_SPEC
     opponent_policy = build_opponent_player(
         resolved_opponent_player_spec,
         battle_format=battle_format,
         server_configuration=LocalhostServerConfiguration,
         account_configuration=AccountConfiguration(f"Opp_{unique_id}_0", None),
+        start_listening=not simulated,
     )
 
+    agent_username = f"Player_{unique_id}"
+    protocol_log = None
+    if protocol_log_dir is not None:
+        os.makedirs(protocol_log_dir, exist_ok=True)
+        protocol_log = os.path.join(protocol_log_dir, f"{agent_username}.log.gz")
+
     agent = PokemonRLWrapper(
         battle_format=battle_format,
         battle_team_generator=battle_team_generator,
@@ -145,18 +219,27 @@ def build_env(
         opponent_team_generator=opponent_generator,
         rounds_per_opponents=rounds_per_opponent,
         server_configuration=LocalhostServerConfiguration,
-        account_configuration1=AccountConfiguration(f"Player_{unique_id}", None),
+        account_configuration1=AccountConfiguration(agent_username, None),
         account_configuration2=AccountConfiguration(f"Opponent_{unique_id}", None),
         strict=strict,
         battle_config=battle_config,
+        obs_dtype=obs_dtype,
+        reward_components=reward_components,
+        incremental_encoding=incremental_encoding,
+        protocol_log=protocol_log,
+        start_listening=not simulated,
     )
 
-    env = SingleAgentWrapper(agent, opponent_policy)
+    if simulated:
+        env = SimulatedSinglesEnv(agent, opponent_policy)
+    else:
+        env = SingleAgentWrapper(agent, opponent_policy)
     return _PokemonEnvBridge(
         env,
         battle_format=battle_format,
         unique_id=unique_id,
         opponent_player_spec=resolved_opponent_player_spec,
+        start_listening=not simulated,
     )
 
 
@@ -174,6 +257,50 @@ def _fork_generator(gen, worker_id: int):
     return gen.fork(worker_id)
 
 
+def build_async_vec_env(
+        n_battles: int,
+        battle_format: str,
+        opponent_generator,
+        rounds_per_opponent: int,
+        opponent_player_spec: OpponentPlayerSpec | None = None,
+        agent_team_generator=None,
+        battle_team_generator=None,
+        strict: bool = True,
+        battle_config: BattleConfig | None = None,
+        worker_id: int = 0,
+        obs_dtype: str = "float32",
+        reward_components: bool = False,
+        incremental_encoding: bool = False,
+        prewarm: bool = False,
+) -> AsyncBattleVecEnv:
+    """Construct ``n_battles`` concurrent battles on this process's event loop.
+
+    Takes the same options as ``build_env``; the battles share one agent and
+    one opponent account.
+
+    :param n_battles: Number of concurrent battles.
+    :param worker_id: Index used to ensure unique account names across processes.
+    :param prewarm: Start each battle's successor in the background.
+    :returns: An ``AsyncBattleVecEnv``."""
+    configure_external_runtime_messages()
+    return AsyncBattleVecEnv(
+        n_battles,
+        battle_format=battle_format,
+        opponent_player_spec=opponent_player_spec or DEFAULT_OPPONENT_PLAYER_SPEC,
+        unique_id=_unique_id(worker_id),
+        rounds_per_opponent=rounds_per_opponent,
+        agent_team_generator=agent_team_generator,
+        opponent_team_generator=opponent_generator,
+        battle_team_generator=battle_team_generator,
+        strict=strict,
+        battle_config=battle_config,
+        obs_dtype=obs_dtype,
+        reward_components=reward_components,
+        incremental_encoding=incremental_encoding,
+        prewarm=prewarm,
+    )
+
+
 def build_vec_env(
         n_envs: int,
         battle_format: str,
@@ -184,13 +311,50 @@ def build_vec_env(
         battle_team_generator=None,
         strict: bool = True,
         battle_config: BattleConfig | None = None,
+        obs_dtype: str = "float32",
+        reward_components: bool = False,
+        incremental_encoding: bool = False,
+        battles_per_process: int = 1,
+        async_battles: bool = False,
+        shared_memory: bool = False,
+        prewarm_battles: bool = False,
+        simulated: bool = False,
+        batch_engine: bool = False,
+        protocol_log_dir: str | None = None,
 ) -> VecMonitor:
     """Construct a vectorized environment with ``n_envs`` parallel workers.
 
-    Each worker runs in its own subprocess with its own asyncio event loop and
-    Pokémon Showdown connections, enabling true parallel rollout collection.
+    By default each worker runs in its own subprocess with its own asyncio
+    event loop and Pokémon Showdown connections, enabling true parallel
+    rollout collection.  Two other topologies host several battles per event
+    loop (``AsyncBattleVecEnv``):
+
+    * ``battles_per_process=K`` — ``n_envs / K`` subprocesses of ``K``
+      concurrent battles each (``SubprocBattleVecEnv``).
+    * ``async_battles`` — all ``n_envs`` battles in this process.
+
+    With ``shared_memory`` the worker processes (of either subprocess
+    topology) return observations, action masks, rewards and dones through a
+    shared-memory ring instead of pickling them (``SharedMemoryVecEnv``).
+    Otherwise ``VecObservedActionMasks`` answers ``action_masks()`` from the
+    observations, so masks never need a separate call to the workers.
+
+    ``prewarm_battles`` starts every battle's successor while it is still
+    being played, hiding the challenge handshake from ``reset``; it hosts
+    each worker's battles in an ``AsyncBattleVecEnv`` even when
+    ``battles_per_process`` is 1.
+
+    ``simulated`` plays every battle on the in-process Gen 1 engine instead
+    of Showdown; it needs one battle per worker process.
+
+    ``batch_engine`` steps all ``n_envs`` battles together on the vectorized
+    Gen 1 engine in this process (``BatchBattleVecEnv``); its opponent must be
+    ``random`` or ``max-power``.
 
-    :param n_envs: Number of parallel environment workers.
+    ``protocol_log_dir`` records every worker's battles as Showdown protocol
+    logs; it needs one battle per worker process.
+
+    :param n_envs: Number of parallel environments (battles).
     :param battle_format: Showdown battle format name.
     :param opponent_generator: Optional generator for opponent teams.
     :param rounds_per_opponent: Battles played before rotating opponent teams.
@@ -198,7 +362,76 @@ def build_vec_env(
     :param agent_team_generator: Optional generator for agent teams.
     :param battle_team_generator: Optional generator yielding both teams.
     :param battle_config: Generation config. Defaults to Gen 1.
-    :returns: A ``SubprocVecEnv`` wrapping ``n_envs`` independent environments."""
+    :param obs_dtype: Observation storage dtype (see ``build_env``).
+    :param reward_components: Report per-component reward deltas in step infos.
+    :param incremental_encoding: Encode incrementally (see ``build_env``).
+        Ignored with ``batch_engine``.
+    :param battles_per_process: Concurrent battles hosted by each subprocess.
+        Must divide ``n_envs``.
+    :param async_battles: Host every battle in this process's event loop.
+    :param shared_memory: Exchange step results with the worker processes
+        through shared memory. Ignored with ``async_battles``.
+    :param prewarm_battles: Start each battle's successor in the background.
+    :param simulated: Play battles on the in-process Gen 1 engine.
+    :param batch_engine: Play all battles on the vectorized Gen 1 engine.
+    :param protocol_log_dir: Directory of the workers' protocol logs.
+    :returns: A ``VecMonitor`` over the chosen vectorized environment."""
+    if battles_per_process < 1 or n_envs % battles_per_process:
+        raise ValueError(
+            f"battles_per_process ({battles_per_process}) must be a positive divisor of n_envs ({n_envs})."
+        )
+    if simulated and (async_battles or battles_per_process > 1 or prewarm_battles):
+        raise ValueError(
+            "simulated battles run one per worker process; they cannot be combined with "
+            "async_battles, battles_per_process > 1 or prewarm_battles."
+        )
+    if batch_engine and (simulated or async_battles or battles_per_process > 1 or prewarm_battles):
+        raise ValueError(
+            "batch_engine hosts every battle in this process; it cannot be combined with "
+            "simulated, async_battles, battles_per_process > 1 or prewarm_battles."
+        )
+    if protocol_log_dir is not None and (
+            batch_engine or async_battles or battles_per_process > 1 or prewarm_battles
+    ):
+        raise ValueError(
+            "protocol_log_dir records one battle per worker process; it cannot be combined with "
+            "batch_engine, async_battles, battles_per_process > 1 or prewarm_battles."
+        )
+    if batch_engine:
+        return VecMonitor(BatchBattleVecEnv(
+            n_envs,
+            opponent_player_spec=opponent_player_spec or DEFAULT_OPPONENT_PLAYER_SPEC,
+            rounds_per_opponent=rounds_per_opponent,
+            agent_team_generator=agent_team_generator,
+            opponent_team_generator=opponent_generator,
+            battle_team_generator=battle_team_generator,
+            strict=strict,
+            battle_config=battle_config,
+            obs_dtype=obs_dtype,
+            reward_components=reward_components,
+        ))
+    env_kwargs = dict(
+        battle_format=battle_format,
+        rounds_per_opponent=rounds_per_opponent,
+        opponent_player_spec=opponent_player_spec,
+        strict=strict,
+        battle_config=battle_config,
+        obs_dtype=obs_dtype,
+        reward_components=reward_components,
+        incremental_encoding=incremental_encoding,
+    )
+
+    if async_battles:
+        return VecMonitor(build_async_vec_env(
+            n_envs,
+            opponent_generator=opponent_generator,
+            agent_team_generator=agent_team_generator,
+            battle_team_generator=battle_team_generator,
+            prewarm=prewarm_battles,
+            **env_kwargs,
+        ))
+
+    hosts_battles = battles_per_process > 1 or prewarm_battles
 
     def make_env(worker_id: int):
         forked_opponent = _fork_generator(opponent_generator, worker_id)
@@ -207,18 +440,32 @@ def build_vec_env(
 
         def _init():
             set_random_seed(worker_id)
+            if hosts_battles:
+                return build_async_vec_env(
+                    battles_per_process,
+                    opponent_generator=forked_opponent,
+                    agent_team_generator=forked_agent,
+                    battle_team_generator=forked_battle,
+                    worker_id=worker_id,
+                    prewarm=prewarm_battles,
+                    **env_kwargs,
+                )
             return build_env(
-                battle_format=battle_format,
                 opponent_generator=forked_opponent,
-                rounds_per_opponent=rounds_per_opponent,
-                opponent_player_spec=opponent_player_spec,
                 agent_team_generator=forked_agent,
                 battle_team_generator=forked_battle,
-                strict=strict,
-                battle_config=battle_config,
                 worker_id=worker_id,
+                simulated=simulated,
+                protocol_log_dir=protocol_log_dir,
+                **env_kwargs,
             )
         return _init
 
-    vec_env = SubprocVecEnv([make_env(i) for i in range(n_envs)])
+    n_processes = n_envs // battles_per_process
+    if shared_memory:
+        vec_env = SharedMemoryVecEnv([make_env(i) for i in range(n_processes)])
+    elif hosts_battles:
+        vec_env = VecObservedActionMasks(SubprocBattleVecEnv([make_env(i) for i in range(n_processes)]))
+    else:
+        vec_env = VecObservedActionMasks(SubprocVecEnv([make_env(i) for i in range(n_processes)]))
     return VecMonitor(vec_env)
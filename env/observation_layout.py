@@ -0,0 +1,214 @@
+"""
+ObservationLayout — named, zero-copy views over flat battle observations.
+
+The flat vector produced by ``BattleState.to_array()`` is laid out as::
+
+    arena        (arena_len)
+    opp_moves    (n_moves × move_len)
+    opp_team     (team_size × opp_pokemon_len)
+    opp_alive    (team_size)
+    my_team      (team_size × my_pokemon_len)   each: features | n_moves × move_len
+    my_alive     (team_size)
+
+``ObservationLayout`` holds the section offsets, computed once per generation
+(see ``BattleStateGen1.layout()`` / ``BattleConfig.layout``).  ``view(obs)``
+wraps a NumPy array or torch tensor of shape ``(..., obs_dim)`` and exposes
+every section as a basic-indexed view — nothing is copied, so writes through a
+view land in ``obs``.
+
+Usage
+-----
+    view = BattleConfig.gen1().layout.view(obs)
+    view.arena                   # (..., arena_len)
+    view.my_team.data            # (..., 6, my_pokemon_len)
+    view.my_team[slot].moves[i]  # (..., move_len)
+    view.my_alive                # (..., 6)
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+
+from env.states.state_utils import MAX_MOVES, MAX_TEAM_SIZE
+
+
+def _unflatten(x, shape: tuple[int, ...]):
+    """Split the last axis of ``x`` into ``shape`` without copying."""
+    if isinstance(x, np.ndarray):
+        return x.reshape(x.shape[:-1] + shape, copy=False)
+    return x.view(*x.shape[:-1], *shape)
+
+
+class SlotsView:
+    """
+    ``n`` equally sized slots stacked along axis ``-2`` of ``data``.
+
+    Indexing returns slot ``i`` as ``data[..., i, :]`` (optionally wrapped by
+    ``item``), so leading batch dimensions are left untouched.
+    """
+
+    __slots__ = ("data", "_item")
+
+    def __init__(self, data, item=None) -> None:
+        self.data = data
+        self._item = item
+
+    def __len__(self) -> int:
+        return self.data.shape[-2]
+
+    def __getitem__(self, i: int):
+        if not -len(self) <= i < len(self):
+            raise IndexError(f"slot {i} out of range for {len(self)} slots")
+        slot = self.data[..., i, :]
+        return slot if self._item is None else self._item(slot)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class MyPokemonView:
+    """One of my team slots: Pokémon features followed by its move block."""
+
+    __slots__ = ("data", "_layout")
+
+    def __init__(self, data, layout: ObservationLayout) -> None:
+        self.data = data
+        self._layout = layout
+
+    @property
+    def features(self):
+        """Pokémon features without the moves, ``(..., my_moves_start)``."""
+        return self.data[..., : self._layout.my_moves_start]
+
+    @property
+    def moves(self) -> SlotsView:
+        """The slot's moves, ``data`` of shape ``(..., n_moves, move_len)``."""
+        lay = self._layout
+        return SlotsView(_unflatten(self.data[..., lay.my_moves_start :], (lay.n_moves, lay.move_len)))
+
+
+class ObservationView:
+    """Named sections of one observation (or a batch); see ``ObservationLayout.view``."""
+
+    __slots__ = ("obs", "layout")
+
+    def __init__(self, obs, layout: ObservationLayout) -> None:
+        if obs.shape[-1] != layout.obs_dim:
+            raise ValueError(f"expected last dim {layout.obs_dim}, got {obs.shape[-1]}")
+        self.obs = obs
+        self.layout = layout
+
+    @property
+    def arena(self):
+        return self.obs[..., self.layout.arena]
+
+    @property
+    def opp_moves(self) -> SlotsView:
+        lay = self.layout
+        return SlotsView(_unflatten(self.obs[..., lay.opp_moves], (lay.n_moves, lay.move_len)))
+
+    @property
+    def opp_team(self) -> SlotsView:
+        lay = self.layout
+        return SlotsView(_unflatten(self.obs[..., lay.opp_team], (lay.team_size, lay.opp_pokemon_len)))
+
+    @property
+    def opp_alive(self):
+        return self.obs[..., self.layout.opp_alive]
+
+    @property
+    def arena_opponent(self):
+        """Everything before my team: arena, opponent moves, team and alive vector."""
+        return self.obs[..., : self.layout.arena_opponent_len]
+
+    @property
+    def my_team(self) -> SlotsView:
+        lay = self.layout
+        return SlotsView(
+            _unflatten(self.obs[..., lay.my_team], (lay.team_size, lay.my_pokemon_len)),
+            item=lambda slot: MyPokemonView(slot, lay),
+        )
+
+    @property
+    def my_moves(self):
+        """Moves of every team slot at once, ``(..., team_size, n_moves, move_len)``."""
+        lay = self.layout
+        return _unflatten(self.my_team.data[..., lay.my_moves_start :], (lay.n_moves, lay.move_len))
+
+    @property
+    def my_alive(self):
+        return self.obs[..., self.layout.my_alive]
+
+
+@dataclass(frozen=True)
+class ObservationLayout:
+    """
+    Section offsets of a generation's flat observation.
+
+    Parameters
+    ----------
+    arena_len       : length of the arena block
+    move_len        : length of one MoveState block
+    opp_pokemon_len : length of one opponent Pokémon block
+    my_pokemon_len  : length of one of my Pokémon blocks, moves included
+    my_moves_start  : offset of the move block inside one of my Pokémon blocks
+    n_moves         : move slots per Pokémon
+    team_size       : Pokémon slots per side
+    """
+
+    arena_len: int
+    move_len: int
+    opp_pokemon_len: int
+    my_pokemon_len: int
+    my_moves_start: int
+    n_moves: int = MAX_MOVES
+    team_size: int = MAX_TEAM_SIZE
+
+    # ── Sections (computed once, then cached on the instance) ────────────────
+
+    @cached_property
+    def arena(self) -> slice:
+        return slice(0, self.arena_len)
+
+    @cached_property
+    def opp_moves(self) -> slice:
+        return slice(self.arena.stop, self.arena.stop + self.n_moves * self.move_len)
+
+    @cached_property
+    def opp_team(self) -> slice:
+        return slice(self.opp_moves.stop, self.opp_moves.stop + self.team_size * self.opp_pokemon_len)
+
+    @cached_property
+    def opp_alive(self) -> slice:
+        return slice(self.opp_team.stop, self.opp_team.stop + self.team_size)
+
+    @cached_property
+    def my_team(self) -> slice:
+        return slice(self.opp_alive.stop, self.opp_alive.stop + self.team_size * self.my_pokemon_len)
+
+    @cached_property
+    def my_alive(self) -> slice:
+        return slice(self.my_team.stop, self.my_team.stop + self.team_size)
+
+    @property
+    def arena_opponent_len(self) -> int:
+        """Length of everything before my team."""
+        return self.my_team.start
+
+    @property
+    def obs_dim(self) -> int:
+        return self.my_alive.stop
+
+    def sections(self) -> dict[str, slice]:
+        """Top-level sections in observation order, e.g. for debugging dumps."""
+        return {
+            name: getattr(self, name)
+            for name in ("arena", "opp_moves", "opp_team", "opp_alive", "my_team", "my_alive")
+        }
+
+    def view(self, obs) -> ObservationView:
+        """Named zero-copy views over ``obs`` (NumPy array or torch tensor, ``(..., obs_dim)``)."""
+        return ObservationView(obs, self)
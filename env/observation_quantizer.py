@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import gymnasium as gym
+import numpy as np
+
+from env.battle_config import BattleConfig
+
+OBS_DTYPES = ("float32", "float16", "uint8")
+
+# uint8 codes: unsigned features map [0, 1] -> [0, 255]; signed features map
+# [-1, 1] -> [0, 254] around a zero point of 127 so that -1, 0 and 1 are exact.
+_UNSIGNED_ZERO_POINT, _UNSIGNED_DIVISOR = 0.0, 255.0
+_SIGNED_ZERO_POINT, _SIGNED_DIVISOR = 127.0, 127.0
+
+
+def quantization_table(battle_config: BattleConfig) -> tuple[np.ndarray, np.ndarray]:
+    """Per-feature ``(zero_point, divisor)`` for the uint8 encoding of ``battle_config``.
+
+    Derived from ``battle_config.obs_signed_mask``: features in [-1, 1] use the
+    signed scale, the rest the unsigned one.  Dequantisation is
+    ``(q - zero_point) / divisor``.
+    """
+    signed = battle_config.obs_signed_mask
+    zero_point = np.where(signed, _SIGNED_ZERO_POINT, _UNSIGNED_ZERO_POINT).astype(np.float32)
+    divisor = np.where(signed, _SIGNED_DIVISOR, _UNSIGNED_DIVISOR).astype(np.float32)
+    return zero_point, divisor
+
+
+class ObservationQuantizer:
+    """
+    Converts float32 observations to a compact storage dtype and back.
+
+    ``float32`` is the identity, ``float16`` a plain cast, and ``uint8`` an
+    affine code with the per-feature scale table from ``quantization_table``.
+    0 and 1 (and -1 on signed features) survive every mode exactly, so the
+    one-hot sections (types, status, effects, screens, ...) are lossless;
+    continuous features are rounded to 1/255 (1/127 when signed).
+
+    Usage
+    -----
+        quantizer = ObservationQuantizer(BattleConfig.gen1(), "uint8")
+        q = quantizer.quantize(obs)           # uint8, 4x smaller
+        obs_hat = quantizer.dequantize(q)     # float32
+    """
+
+    def __init__(self, battle_config: BattleConfig, dtype: str = "float32") -> None:
+        if dtype not in OBS_DTYPES:
+            raise ValueError(f"obs dtype must be one of {OBS_DTYPES}, got {dtype!r}")
+        self.dtype = np.dtype(dtype)
+        self.obs_dim = battle_config.obs_dim
+        self.zero_point, self.divisor = quantization_table(battle_config)
+        self._low = np.where(battle_config.obs_signed_mask, -1.0, 0.0).astype(np.float32)
+
+    @property
+    def is_identity(self) -> bool:
+        return self.dtype == np.float32
+
+    def quantize(self, obs: np.ndarray) -> np.ndarray:
+        """Encode float32 ``obs`` (shape ``(..., obs_dim)``) into ``self.dtype``."""
+        if self.is_identity:
+            return obs
+        if self.dtype == np.float16:
+            return obs.astype(np.float16)
+        clipped = np.clip(obs, self._low, 1.0)
+        return np.rint(clipped * self.divisor + self.zero_point).astype(np.uint8)
+
+    def dequantize(self, obs: np.ndarray) -> np.ndarray:
+        """Decode ``obs`` back to float32."""
+        if obs.dtype == np.uint8:
+            return ((obs.astype(np.float32) - self.zero_point) / self.divisor).astype(np.float32)
+        return obs.astype(np.float32, copy=False)
+
+    def observation_space(self) -> gym.spaces.Box:
+        """Observation space of the quantised observations."""
+        if self.dtype == np.uint8:
+            return gym.spaces.Box(low=0, high=255, shape=(self.obs_dim,), dtype=np.uint8)
+        return gym.spaces.Box(low=-1.0, high=1.0, shape=(self.obs_dim,), dtype=self.dtype)
@@ -0,0 +1,183 @@
+"""
+Showdown protocol logs of played battles.
+
+``ProtocolLogRecorder`` keeps one player's raw protocol lines and the choices
+it sent, per battle, and appends each finished battle to a gzip file as its
+own gzip member.  Files are therefore append-only: a crash loses at most the
+battles still in progress, and concatenated files are still valid logs.
+
+A battle record is plain text::
+
+    >battle-gen1ou-42|Player_123_0
+    |init|battle
+    |player|p1|Player_123_0|
+    ...
+    |request|{"active": ...}
+    >/choose move bodyslam
+    ...
+    |win|Player_123_0
+
+The header names the battle and the recording player, every following line
+is either a protocol line as received or, prefixed with ``>``, the message
+the player answered with.
+
+``env.protocol_replay`` turns the records back into encoded decisions.
+
+Usage
+-----
+    recorder = ProtocolLogRecorder("logs/Player_1.log.gz", player.username)
+    recorder.attach(player)
+    ...
+    for record in read_protocol_log("logs/Player_1.log.gz"):
+        record.battle_tag, record.lines
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import zlib
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from poke_env.player import Player
+
+# Prefix of the lines a player sent (battle headers and choices).
+OUTGOING_PREFIX = ">"
+
+_READ_SIZE = 1 << 16
+
+_logger = logging.getLogger(__name__)
+
+
+class ProtocolLogRecorder:
+    """Append one player's battles, as seen from its side, to a gzip protocol log.
+
+    :param path: Log file; created on the first finished battle, appended to after.
+    :param username: Showdown username of the recorded player.
+    :param compresslevel: gzip compression level of each battle.
+    """
+
+    def __init__(self, path: str, username: str, compresslevel: int = 6):
+        self.path = path
+        self.username = username
+        self._compresslevel = compresslevel
+        self._battles: dict[str, list[str]] = {}
+        self.battles_written = 0
+
+    def attach(self, player: Player):
+        """Record every battle message ``player`` receives before it handles it.
+
+        For players whose class is not ours (``PokeEnv``'s ``_EnvPlayer``);
+        ``PolicyPlayer`` records from its own ``_handle_battle_message``."""
+        handle = player.ps_client._on_battle_message
+
+        async def _on_battle_message(split_messages: list[list[str]]):
+            self.record_messages(split_messages)
+            await handle(split_messages)
+
+        player.ps_client._on_battle_message = _on_battle_message
+
+    def record_messages(self, split_messages: list[list[str]]):
+        """Record one websocket frame of a battle room, split like ``PSClient`` splits it."""
+        room = split_messages[0][0]
+        if not room.startswith(">battle"):
+            return
+        self.record(room[1:], ("|".join(message) for message in split_messages[1:]))
+
+    def record(self, battle_tag: str, lines: Iterable[str]):
+        """Record protocol lines of ``battle_tag``; a ``win`` or ``tie`` line ends the battle."""
+        battle = self._battles.get(battle_tag)
+        if battle is None:
+            battle = self._battles[battle_tag] = [f">{battle_tag}|{self.username}"]
+        finished = False
+        for line in lines:
+            if not line:
+                continue
+            battle.append(line)
+            finished = finished or line.startswith(("|win|", "|tie|")) or line == "|tie"
+        if finished:
+            self._write(self._battles.pop(battle_tag))
+
+    def record_choice(self, battle_tag: str, message: str):
+        """Record the message the player answered a request of ``battle_tag`` with.
+
+        Ignored for battles this recorder has not seen a protocol line of."""
+        battle = self._battles.get(battle_tag)
+        if battle is not None and message:
+            battle.append(f"{OUTGOING_PREFIX}{message}")
+
+    def close(self):
+        """Write the battles still in progress; their replays have no terminal step."""
+        for battle_tag in list(self._battles):
+            self._write(self._battles.pop(battle_tag))
+
+    def _write(self, lines: list[str]):
+        text = "\n".join(lines) + "\n"
+        with gzip.open(self.path, "ab", compresslevel=self._compresslevel) as f:
+            f.write(text.encode("utf-8"))
+        self.battles_written += 1
+
+
+@dataclass(frozen=True)
+class BattleRecord:
+    """One battle of a protocol log.
+
+    :ivar battle_tag: Showdown room id, e.g. ``battle-gen1ou-42``.
+    :ivar username: The recorded player.
+    :ivar lines: Protocol lines and ``>``-prefixed choices, in recorded order."""
+
+    battle_tag: str
+    username: str
+    lines: tuple[str, ...]
+
+    @property
+    def battle_format(self) -> str:
+        return self.battle_tag.split("-")[1]
+
+
+def read_protocol_log(path: str) -> Iterator[BattleRecord]:
+    """Yield the battles of a protocol log in the order they were written.
+
+    A battle cut short by a crash while it was being appended is skipped."""
+    for member in _gzip_members(path):
+        header, lines = None, []
+        for line in member.decode("utf-8").splitlines():
+            if line.startswith(">battle"):
+                if header is not None:
+                    yield _record(header, lines)
+                header, lines = line, []
+            elif header is not None:
+                lines.append(line)
+        if header is not None:
+            yield _record(header, lines)
+
+
+def _gzip_members(path: str) -> Iterator[bytes]:
+    """Decompressed gzip members of ``path``, streamed; a truncated last member is dropped."""
+    with open(path, "rb") as f:
+        data = b""
+        while True:
+            data = data or f.read(_READ_SIZE)
+            if not data:
+                return
+            member = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            parts = []
+            try:
+                while True:
+                    parts.append(member.decompress(data))
+                    if member.eof:
+                        data = member.unused_data
+                        break
+                    data = f.read(_READ_SIZE)
+                    if not data:
+                        raise EOFError
+            except (EOFError, zlib.error):
+                _logger.warning("Ignoring the truncated end of %s.", path)
+                return
+            yield b"".join(parts)
+
+
+def _record(header: str, lines: list[str]) -> BattleRecord:
+    battle_tag, username = header[1:].split("|", 1)
+    return BattleRecord(battle_tag, username, tuple(lines))
@@ -0,0 +1,195 @@
+"""
+Offline replay of Showdown protocol logs into encoded decisions.
+
+``replay_battle`` feeds a ``ProtocolLogRecorder`` record back into a fresh
+poke-env ``Battle``, the way ``Player`` would, without a server, and encodes
+every decision with the current ``BattleConfig``: the observation and action
+mask the agent saw, the action it took and the reward ``PokemonRLWrapper``
+gave for it.  Changing features in ``env/states`` then only needs a replay of
+the logs, not new battles; ``replay_protocol_logs`` spreads the files over
+worker processes.
+
+Usage
+-----
+    for replayed in replay_protocol_logs(glob.glob("logs/*.log.gz"), n_workers=8):
+        replayed.observations, replayed.action_masks, replayed.actions, replayed.rewards
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from multiprocessing import Pool
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
+import orjson
+from poke_env.battle import Battle
+from poke_env.data import GenData
+from poke_env.environment import SinglesEnv
+from poke_env.player import Player
+
+from env.battle_config import BattleConfig
+from env.observation_quantizer import ObservationQuantizer
+from env.protocol_log import OUTGOING_PREFIX, BattleRecord, read_protocol_log
+from env.reward import fused_state_value, state_value_weights
+from env.singles_env_wrapper import BattleOutcome
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ReplayedBattle:
+    """Decisions of one recorded battle, encoded as ``PokemonRLWrapper`` encodes them.
+
+    ``rewards[t]`` is the reward of the step that answered decision ``t``; the
+    first decision's state value counts from 0 like the live env's.  Choices
+    that map to no action of the action space (``/choose default``,
+    ``/forfeit``) are skipped, their rewards fold into the previous decision.
+
+    :ivar battle_tag: Showdown room id.
+    :ivar observations: ``(T, obs_dim)`` observations.
+    :ivar action_masks: ``(T, action_space_size)`` boolean masks.
+    :ivar actions: ``(T,)`` actions taken.
+    :ivar rewards: ``(T,)`` rewards.
+    :ivar outcome: Result of the battle, ``None`` when the log ends before it."""
+
+    battle_tag: str
+    observations: np.ndarray
+    action_masks: np.ndarray
+    actions: np.ndarray
+    rewards: np.ndarray
+    outcome: BattleOutcome | None
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+
+def replay_battle(
+        record: BattleRecord,
+        battle_config: BattleConfig | None = None,
+        obs_dtype: str = "float32",
+) -> ReplayedBattle:
+    """Re-encode ``record``'s decisions with ``battle_config`` (Gen 1 by default).
+
+    :param record: A battle read by ``read_protocol_log``.
+    :param battle_config: Generation config to encode with.
+    :param obs_dtype: Observation dtype (see ``build_env``).
+    :returns: The battle's decisions as arrays."""
+    cfg = battle_config if battle_config is not None else BattleConfig.gen1()
+    quantizer = ObservationQuantizer(cfg, obs_dtype)
+    weights = state_value_weights(cfg)
+    gen = GenData.from_format(record.battle_format).gen
+    battle = Battle(record.battle_tag, record.username, _logger, gen=gen)
+
+    def encode() -> np.ndarray:
+        if cfg.encoder is not None:
+            return cfg.encoder(battle)
+        return cfg.battle_state_cls(battle).to_array()
+
+    observations, masks, actions, values = [], [], [], []
+    for line in record.lines:
+        if line.startswith(OUTGOING_PREFIX):
+            mask = np.asarray(SinglesEnv.get_action_mask(battle), dtype=bool)
+            action = _choice_action(line[len(OUTGOING_PREFIX):], battle, mask)
+            if action is None:
+                continue
+            encoded = encode()
+            observations.append(quantizer.quantize(encoded))
+            masks.append(mask)
+            actions.append(action)
+            values.append(fused_state_value(encoded, battle, weights))
+        else:
+            _parse_line(battle, line.split("|"))
+
+    if battle.finished and actions:
+        values.append(fused_state_value(encode(), battle, weights))
+    elif actions:
+        # No terminal state: the last decision's reward is unknown, not negative.
+        values.append(values[-1])
+    values = np.asarray(values, dtype=np.float64)
+    rewards = np.diff(values)
+    if len(rewards):
+        # The live env counts its first reward from 0, not from the first state's value.
+        rewards[0] = values[1]
+    return ReplayedBattle(
+        battle_tag=record.battle_tag,
+        observations=(
+            np.stack(observations) if observations
+            else np.zeros((0, cfg.obs_dim), dtype=quantizer.dtype)
+        ),
+        action_masks=np.stack(masks) if masks else np.zeros((0, cfg.action_space_size), dtype=bool),
+        actions=np.asarray(actions, dtype=np.int64),
+        rewards=rewards.astype(np.float32),
+        outcome=BattleOutcome.from_battle(battle) if battle.finished else None,
+    )
+
+
+def _parse_line(battle: Battle, split_message: list[str]):
+    """``Player._handle_battle_message`` for one line of a singles battle, without replies."""
+    if len(split_message) < 2:
+        return
+    kind = split_message[1]
+    if kind == "":
+        battle.parse_message(split_message)
+    elif kind in Player.MESSAGES_TO_IGNORE or kind in ("error", "bigerror", "showteam"):
+        pass
+    elif kind == "request":
+        if split_message[2]:
+            battle.parse_request(orjson.loads(split_message[2]))
+    elif kind == "win":
+        battle.won_by(split_message[2])
+    elif kind == "tie":
+        battle.tied()
+    else:
+        battle.parse_message(split_message)
+
+
+def _choice_action(message: str, battle: Battle, mask: np.ndarray) -> int | None:
+    """The legal action whose order ``SinglesEnv`` would have sent as ``message``."""
+    for action in np.flatnonzero(mask):
+        if SinglesEnv.action_to_order(np.int64(action), battle, strict=False).message == message:
+            return int(action)
+    return None
+
+
+def replay_protocol_log(
+        path: str,
+        battle_config_factory: Callable[[], BattleConfig] = BattleConfig.gen1,
+        obs_dtype: str = "float32",
+) -> list[ReplayedBattle]:
+    """Replay every battle of one log file.
+
+    :param battle_config_factory: Builds the config to encode with; a factory
+        because compiled configs do not pickle to worker processes."""
+    cfg = battle_config_factory()
+    return [replay_battle(record, cfg, obs_dtype) for record in read_protocol_log(path)]
+
+
+def replay_protocol_logs(
+        paths: Iterable[str],
+        battle_config_factory: Callable[[], BattleConfig] = BattleConfig.gen1,
+        obs_dtype: str = "float32",
+        n_workers: int | None = None,
+) -> Iterator[ReplayedBattle]:
+    """Replay many log files, one file per task on ``n_workers`` processes.
+
+    :param paths: Protocol log files.
+    :param battle_config_factory: Picklable factory of the config to encode with.
+    :param obs_dtype: Observation dtype (see ``build_env``).
+    :param n_workers: Worker processes; ``0`` replays in this process and
+        ``None`` uses one per CPU.
+    :returns: Replayed battles, file by file in ``paths`` order."""
+    paths = list(paths)
+    if n_workers == 0:
+        for path in paths:
+            yield from replay_protocol_log(path, battle_config_factory, obs_dtype)
+        return
+    with Pool(n_workers) as pool:
+        tasks = [(path, battle_config_factory, obs_dtype) for path in paths]
+        for battles in pool.imap(_replay_task, tasks):
+            yield from battles
+
+
+def _replay_task(task: tuple) -> list[ReplayedBattle]:
+    return replay_protocol_log(*task)
@@ -1,6 +1,11 @@
+from functools import lru_cache
+
+import numpy as np
 from poke_env.battle import Status, AbstractBattle
 
+from env.battle_config import BattleConfig
 from env.states.gen1.battle_state_gen_1 import MAX_TEAM_SIZE
+from env.states.state_utils import ALL_STATUSES, BOOST_NORM
 
 # ============================================================================
 # HP & FAINTING REWARDS
@@ -53,6 +58,14 @@ OPP_BOOST_PENALTIES = {
 WIN_BONUS = 15.0
 LOSS_PENALTY = -10.0
 
+# ============================================================================
+# COMPONENT BREAKDOWN
+# ============================================================================
+# Fixed layout of the vector returned by ``get_state_value(..., components=True)``;
+# its sum is the scalar state value.  ``hp`` includes the missing-member padding.
+REWARD_COMPONENTS = ("hp", "faint", "status", "boost", "terminal")
+_HP, _FAINT, _STATUS, _BOOST, _TERMINAL = range(len(REWARD_COMPONENTS))
+
 
 def _calculate_boost_value(boosts: dict, boost_values: dict, negate: bool = False) -> float:
     """Calculate total value of stat boosts.
@@ -78,7 +91,7 @@ def _calculate_boost_value(boosts: dict, boost_values: dict, negate: bool = Fals
     return value
 
 
-def get_state_value(battle: AbstractBattle) -> float:
+def get_state_value(battle: AbstractBattle, components: bool = False) -> float | np.ndarray:
     """Calculate the state value for the battle with boost-aware rewards.
 
     In order to calc reward, just need to calculate the delta of values between states.
@@ -92,8 +105,13 @@ def get_state_value(battle: AbstractBattle) -> float:
     6. Game outcome (win/loss)
 
     :param battle: poke-env battle object.
+    :param components: If true, return the per-component breakdown instead
+        (a ``REWARD_COMPONENTS``-ordered float64 vector summing to the value).
     :return: value for the battle.
     """
+    if components:
+        return _state_value_components(battle)
+
     current_value = 0.0
 
     # ========== OWN TEAM VALUE ==========
@@ -136,4 +154,168 @@ def get_state_value(battle: AbstractBattle) -> float:
     elif battle.lost:
         current_value += LOSS_PENALTY
 
-    return current_value
\ No newline at end of file
+    return current_value
+
+
+def _state_value_components(battle: AbstractBattle) -> np.ndarray:
+    """``get_state_value`` split into ``REWARD_COMPONENTS``, in one pass over both teams."""
+    out = np.zeros(len(REWARD_COMPONENTS), dtype=np.float64)
+    for team, side, boost_values in (
+        (battle.team, 1.0, OWN_BOOST_VALUES),
+        (battle.opponent_team, -1.0, OPP_BOOST_PENALTIES),
+    ):
+        for mon in team.values():
+            out[_HP] += side * mon.current_hp_fraction * HP_VALUE
+            if mon.fainted:
+                out[_FAINT] -= side * FAINTED_VALUE
+            elif mon.status is not None:
+                out[_STATUS] -= side * _STATUS_WEIGHTS.get(mon.status, 0.0)
+            out[_BOOST] += _calculate_boost_value(mon.boosts, boost_values, negate=side < 0)
+        out[_HP] += side * (MAX_TEAM_SIZE - len(team)) * HP_VALUE
+
+    if battle.won:
+        out[_TERMINAL] = WIN_BONUS
+    elif battle.lost:
+        out[_TERMINAL] = LOSS_PENALTY
+    return out
+
+
+# ============================================================================
+# FUSED (ENCODED-OBSERVATION) STATE VALUE
+# ============================================================================
+# ``get_state_value`` walks both teams again after ``embed_battle`` already
+# did.  Every per-Pokémon term above is linear in the encoded slot features
+# (hp, status one-hot, boost stage / BOOST_NORM), and padding slots encode to
+# zeros, so the whole team part is one dot product with a fixed weight vector.
+
+def _boost_weights(boost_values: dict, boost_keys: list[str]) -> np.ndarray:
+    """Per-``boost_keys`` weights; a missing ``spd`` key folds into ``spa``.
+
+    Gen 1 has a single Special stat: poke-env tracks equal ``spa`` and ``spd``
+    boosts, but only ``spa`` is encoded.
+    """
+    weights = np.array([boost_values.get(k, 0.0) for k in boost_keys], dtype=np.float64)
+    if "spd" not in boost_keys and "spa" in boost_keys:
+        weights[boost_keys.index("spa")] += boost_values.get("spd", 0.0)
+    return weights
+
+
+def _slot_component_weights(state_cls, slot_len: int, side: float, boost_weights: np.ndarray) -> np.ndarray:
+    """``(len(REWARD_COMPONENTS), slot_len)`` weights of one team slot.
+
+    ``side`` is +1 for my team and -1 for the opponent's.
+    """
+    w = np.zeros((len(REWARD_COMPONENTS), state_cls.array_len()), dtype=np.float64)
+    w[_HP, state_cls.HP_COLUMN] = side * HP_VALUE
+    status_cols = list(state_cls.status_columns())
+    w[_STATUS, status_cols] = -side * np.array([_STATUS_WEIGHTS.get(s, 0.0) for s in ALL_STATUSES])
+    w[_FAINT, status_cols[ALL_STATUSES.index(Status.FNT)]] = -side * FAINTED_VALUE
+    w[_BOOST, list(state_cls.boost_columns())] = boost_weights * BOOST_NORM
+    return w[:, :slot_len]
+
+
+@lru_cache(maxsize=None)
+def state_value_component_weights(battle_config: BattleConfig) -> np.ndarray:
+    """Read-only ``(len(REWARD_COMPONENTS), obs_dim)`` weights: row ``k`` dotted
+    with an observation gives the team part of component ``k``.
+
+    Built from ``_STATUS_WEIGHTS``, ``FAINTED_VALUE`` (on the fainted status
+    column), ``OWN_BOOST_VALUES`` and ``OPP_BOOST_PENALTIES``; opponent slots
+    share the ``[hp | stats | boosts | status]`` prefix of my slots.
+    """
+    state_cls = battle_config.my_pokemon_state_cls
+    keys = list(state_cls.BOOST_KEYS)
+    layout = battle_config.layout
+    weights = np.zeros((len(REWARD_COMPONENTS), layout.obs_dim), dtype=np.float64)
+    view = layout.view(weights)
+
+    view.my_team.data[:] = _slot_component_weights(
+        state_cls, layout.my_pokemon_len, +1.0, _boost_weights(OWN_BOOST_VALUES, keys),
+    )[:, None, :]
+    view.opp_team.data[:] = _slot_component_weights(
+        state_cls, layout.opp_pokemon_len, -1.0, -_boost_weights(OPP_BOOST_PENALTIES, keys),
+    )[:, None, :]
+    weights.setflags(write=False)
+    return weights
+
+
+@lru_cache(maxsize=None)
+def state_value_weights(battle_config: BattleConfig) -> np.ndarray:
+    """Read-only ``(obs_dim,)`` weights so that the team part of ``get_state_value``
+    is ``obs @ weights`` — the sum of ``state_value_component_weights`` rows.
+    """
+    weights = state_value_component_weights(battle_config).sum(axis=0)
+    weights.setflags(write=False)
+    return weights
+
+
+def state_value_from_obs(obs: np.ndarray, n_team, n_opponent_team, won, lost,
+                         weights: np.ndarray | None = None):
+    """``get_state_value`` computed from encoded observations.
+
+    Works on one observation or a batch (``obs`` of shape ``(..., obs_dim)``
+    with the other arguments broadcasting against its leading dimensions).
+
+    :param obs: Float observations from ``battle_state_cls(battle).to_array()``.
+    :param n_team: ``len(battle.team)``.
+    :param n_opponent_team: ``len(battle.opponent_team)``.
+    :param won: ``battle.won``.
+    :param lost: ``battle.lost``.
+    :param weights: ``state_value_weights(config)`` for the layout of ``obs``.
+        Defaults to Gen 1.
+    :returns: State value(s); equal to ``get_state_value`` up to float32 rounding.
+    """
+    if weights is None:
+        weights = state_value_weights(BattleConfig.gen1())
+    value = obs @ weights
+    value = value + (np.asarray(n_opponent_team) - np.asarray(n_team)) * HP_VALUE
+    return value + np.where(won, WIN_BONUS, np.where(lost, LOSS_PENALTY, 0.0))
+
+
+def state_value_components_from_obs(obs: np.ndarray, n_team, n_opponent_team, won, lost,
+                                    component_weights: np.ndarray | None = None) -> np.ndarray:
+    """``get_state_value(..., components=True)`` for a batch of encoded observations.
+
+    Same arguments as ``state_value_from_obs``, with ``obs`` of shape
+    ``(N, obs_dim)``; returns ``(N, len(REWARD_COMPONENTS))``.
+    """
+    if component_weights is None:
+        component_weights = state_value_component_weights(BattleConfig.gen1())
+    out = obs @ component_weights.T
+    out[:, _HP] += (np.asarray(n_opponent_team) - np.asarray(n_team)) * HP_VALUE
+    out[:, _TERMINAL] += np.where(won, WIN_BONUS, np.where(lost, LOSS_PENALTY, 0.0))
+    return out
+
+
+def fused_state_value(obs: np.ndarray, battle: AbstractBattle, weights: np.ndarray | None = None) -> float:
+    """State value of ``battle`` from its already-encoded observation ``obs``.
+
+    Only team sizes and the outcome are read from ``battle``; pass
+    precomputed ``weights`` on hot paths.
+    """
+    if weights is None:
+        weights = state_value_weights(BattleConfig.gen1())
+    value = float(obs @ weights) + (len(battle.opponent_team) - len(battle.team)) * HP_VALUE
+    if battle.won:
+        value += WIN_BONUS
+    elif battle.lost:
+        value += LOSS_PENALTY
+    return value
+
+
+def fused_state_value_components(obs: np.ndarray, battle: AbstractBattle,
+                                 component_weights: np.ndarray | None = None) -> np.ndarray:
+    """``get_state_value(battle, components=True)`` from the encoded observation ``obs``.
+
+    One ``(len(REWARD_COMPONENTS), obs_dim) @ obs`` product plus the padding
+    and outcome terms read from ``battle``.
+    """
+    if component_weights is None:
+        component_weights = state_value_component_weights(BattleConfig.gen1())
+    out = component_weights @ obs
+    out[_HP] += (len(battle.opponent_team) - len(battle.team)) * HP_VALUE
+    if battle.won:
+        out[_TERMINAL] += WIN_BONUS
+    elif battle.lost:
+        out[_TERMINAL] += LOSS_PENALTY
+    return out
@@ -0,0 +1,228 @@
+"""
+Vectorized environment whose workers return step results through shared memory.
+
+``SubprocVecEnv`` pickles every worker's observation, reward, done flag and
+info through a pipe on every step, and ``MaskablePPO`` then makes a second
+``env_method("action_masks")`` round trip per step.  ``SharedMemoryVecEnv``
+keeps one ``multiprocessing.shared_memory`` block per vec env:
+
+* actions are written by the trainer, observations, action masks, rewards,
+  dones and terminal observations by the worker owning the env's row;
+* per step the pipe only carries a ``("step", ring_slot)`` message out and the
+  (small) info dicts back;
+* ``action_masks()`` and ``env_method("action_masks")`` read the block, with
+  no IPC at all.
+
+Observations live in a ring of ``ring_size`` slots indexed by step, and the
+returned observation arrays are views into it: they stay valid for
+``ring_size - 1`` further steps, which is what on-policy rollout collection
+needs (SB3 adds ``_last_obs`` to its buffer after the next ``step``).
+
+A worker hosts either a gymnasium env (one row) or a ``VecEnv`` such as
+``AsyncBattleVecEnv`` (``K`` consecutive rows).
+"""
+
+from __future__ import annotations
+
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable
+
+import gymnasium as gym
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnvIndices
+
+from env.worker_vec_env import WorkerVecEnv, serve_worker, set_reset_arguments, start_worker_env
+
+DEFAULT_RING_SIZE = 2
+_ALIGN = 64
+
+
+class SharedStepBuffers:
+    """NumPy views over one shared-memory block holding a vec env's step results.
+
+    Both sides build the same layout from ``(observation_space, n_actions,
+    n_envs, ring_size)``; the trainer creates the block, workers attach to it
+    by name.
+
+    :ivar obs: ``{key: (ring_size, n_envs, *shape)}`` observations.
+    :ivar terminal_obs: ``{key: (n_envs, *shape)}`` last observation of a finished episode.
+    :ivar masks: ``(ring_size, n_envs, n_actions)`` bool action masks.
+    :ivar rewards: ``(ring_size, n_envs)`` float32.
+    :ivar dones: ``(ring_size, n_envs)`` bool.
+    :ivar actions: ``(n_envs,)`` int64 actions of the current step.
+    """
+
+    def __init__(
+            self,
+            observation_space: gym.spaces.Dict,
+            n_actions: int,
+            n_envs: int,
+            ring_size: int = DEFAULT_RING_SIZE,
+            name: str | None = None,
+    ):
+        fields = []
+        for key, space in observation_space.spaces.items():
+            fields.append((("obs", key), (ring_size, n_envs, *space.shape), space.dtype))
+            fields.append((("terminal_obs", key), (n_envs, *space.shape), space.dtype))
+        fields += [
+            ("masks", (ring_size, n_envs, n_actions), np.dtype(bool)),
+            ("rewards", (ring_size, n_envs), np.dtype(np.float32)),
+            ("dones", (ring_size, n_envs), np.dtype(bool)),
+            ("actions", (n_envs,), np.dtype(np.int64)),
+        ]
+        offsets, size = [], 0
+        for _, shape, dtype in fields:
+            offsets.append(size)
+            size += -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // _ALIGN) * _ALIGN
+
+        self._owner = name is None
+        self.shm = SharedMemory(create=True, size=size) if self._owner else SharedMemory(name=name)
+        self.ring_size = ring_size
+        self.obs: dict[str, np.ndarray] = {}
+        self.terminal_obs: dict[str, np.ndarray] = {}
+        for (field, shape, dtype), offset in zip(fields, offsets):
+            view = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+            if isinstance(field, tuple):
+                getattr(self, field[0])[field[1]] = view
+            else:
+                setattr(self, field, view)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write_obs(self, slot: int, rows: slice, obs: dict[str, np.ndarray]):
+        for key, value in obs.items():
+            self.obs[key][slot, rows] = value
+
+    def read_obs(self, slot: int) -> dict[str, np.ndarray]:
+        return {key: value[slot] for key, value in self.obs.items()}
+
+    def close(self):
+        """Detach the views and the block; the creating side also unlinks it."""
+        self.obs = self.terminal_obs = {}
+        self.masks = self.rewards = self.dones = self.actions = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def _shared_memory_worker(remote, parent_remote, env_fn_wrapper: CloudpickleWrapper) -> None:
+    env = start_worker_env(remote, parent_remote, env_fn_wrapper)
+    name, start, n_envs, ring_size = remote.recv()
+    buffers = SharedStepBuffers(env.observation_space, env.action_space.n, n_envs, ring_size, name=name)
+    rows = slice(start, start + env.num_envs)
+
+    def publish(slot: int, obs: dict[str, np.ndarray]):
+        buffers.write_obs(slot, rows, obs)
+        buffers.masks[slot, rows] = env.env_method("action_masks")
+
+    def step(slot: int):
+        env.step_async(buffers.actions[rows].copy())
+        obs, rewards, dones, infos = env.step_wait()
+        publish(slot, obs)
+        buffers.rewards[slot, rows] = rewards
+        buffers.dones[slot, rows] = dones
+        for row, info in enumerate(infos, start=start):
+            terminal = info.get("terminal_observation")
+            if terminal is not None:
+                for key, value in terminal.items():
+                    buffers.terminal_obs[key][row] = value
+                info["terminal_observation"] = None
+        return infos
+
+    def reset(data):
+        slot, reset_arguments = data
+        set_reset_arguments(env, reset_arguments)
+        publish(slot, env.reset())
+        return env.reset_infos
+
+    try:
+        serve_worker(remote, env, {"step": step, "reset": reset})
+    finally:
+        buffers.close()
+
+
+class SharedMemoryVecEnv(WorkerVecEnv):
+    """Multiprocess ``VecEnv`` exchanging step results through ``SharedStepBuffers``.
+
+    Process startup, index routing and shutdown are ``WorkerVecEnv``'s.
+
+    :param env_fns: One factory per worker process, returning a gymnasium env
+        or a ``VecEnv`` (e.g. ``AsyncBattleVecEnv``).
+    :param ring_size: Observation ring depth; returned observations stay valid
+        for ``ring_size - 1`` further steps.
+    :param start_method: ``multiprocessing`` start method. Defaults to
+        ``forkserver`` where available, else ``spawn``.
+    """
+
+    def __init__(
+            self,
+            env_fns: list[Callable[[], gym.Env | VecEnv]],
+            ring_size: int = DEFAULT_RING_SIZE,
+            start_method: str | None = None,
+    ):
+        if ring_size < 2:
+            raise ValueError(f"ring_size must be at least 2, got {ring_size}")
+        self._ring_size = ring_size
+        self._step_count = 0
+        self._slot = 0
+        super().__init__(env_fns, _shared_memory_worker, start_method)
+
+    def _connect_workers(self, observation_space: gym.spaces.Dict, action_space: gym.spaces.Discrete, n_envs: int):
+        self._buffers = SharedStepBuffers(observation_space, action_space.n, n_envs, self._ring_size)
+        for remote, start in zip(self.remotes, self._bounds):
+            remote.send((self._buffers.name, int(start), n_envs, self._ring_size))
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._buffers.actions[:] = actions
+        self._slot = self._next_slot()
+        for remote in self.remotes:
+            remote.send(("step", self._slot))
+        self.waiting = True
+
+    def step_wait(self):
+        infos = [info for remote in self.remotes for info in remote.recv()]
+        self.waiting = False
+        for i, info in enumerate(infos):
+            if "terminal_observation" in info:
+                info["terminal_observation"] = {
+                    key: value[i].copy() for key, value in self._buffers.terminal_obs.items()
+                }
+        return (
+            self._buffers.read_obs(self._slot),
+            self._buffers.rewards[self._slot].copy(),
+            self._buffers.dones[self._slot].copy(),
+            infos,
+        )
+
+    def reset(self):
+        self._slot = self._next_slot()
+        # Seeds and options set through seed()/set_options() apply to this reset only.
+        for w, remote in enumerate(self.remotes):
+            remote.send(("reset", (self._slot, self._reset_arguments(w))))
+        self.reset_infos = [info for remote in self.remotes for info in remote.recv()]
+        self._reset_seeds()
+        self._reset_options()
+        return self._buffers.read_obs(self._slot)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        super().close()
+        self._buffers.close()
+
+    def action_masks(self) -> np.ndarray:
+        """Masks published with the latest step/reset, read without IPC."""
+        return self._buffers.masks[self._slot].copy()
+
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> list[Any]:
+        if method_name == "action_masks" and not method_args and not method_kwargs:
+            masks = self._buffers.masks[self._slot]
+            return [masks[i].copy() for i in self._get_indices(indices)]
+        return super().env_method(method_name, *method_args, indices=indices, **method_kwargs)
+
+    def _next_slot(self) -> int:
+        self._step_count += 1
+        return self._step_count % self._buffers.ring_size
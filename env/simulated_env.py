@@ -0,0 +1,160 @@
+"""
+Single-agent battle environment backed by the in-process Gen 1 engine.
+
+``SimulatedSinglesEnv`` stands in for poke-env's ``SingleAgentWrapper`` when
+battles should not go through a Showdown server: each episode is a
+``combat.gen1_engine.Gen1Engine`` battle whose protocol lines and requests
+are parsed into ordinary poke-env ``Battle`` objects, one per side.  The
+``PokemonRLWrapper`` it wraps is only used as a codec (observation encoding,
+action masks, action-to-order conversion, rewards, team rotation), exactly
+as ``AsyncBattleVecEnv`` uses it, so observations, masks and rewards match a
+server-backed env.
+
+Like ``SingleAgentWrapper`` it exposes the codec as ``env`` and the opponent
+``Player`` as ``opponent``, so ``_PokemonEnvBridge`` wraps it unchanged.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import gymnasium
+import numpy as np
+from poke_env.battle import Battle, Pokemon
+from poke_env.player import BattleOrder, ForfeitBattleOrder, Player
+
+from combat.gen1_engine import Gen1Engine
+from env.singles_env_wrapper import PokemonRLWrapper
+
+
+class SimulatedSinglesEnv(gymnasium.Env):
+    """Gymnasium env playing ``codec.agent1`` against ``opponent`` on ``Gen1Engine``.
+
+    :param env: ``PokemonRLWrapper`` codec; built with ``start_listening=False``.
+    :param opponent: Player choosing the opponent's orders synchronously.
+    :param seed: Seed of the battle RNG.
+    :param max_turns: Turn after which a battle ends in a tie.
+    """
+
+    def __init__(
+            self,
+            env: PokemonRLWrapper,
+            opponent: Player,
+            seed: int | None = None,
+            max_turns: int = 1000,
+    ):
+        self.env = env
+        self.opponent = opponent
+        self._max_turns = max_turns
+        self._rng = np.random.default_rng(seed)
+        agent = env.possible_agents[0]
+        self.observation_space = env.observation_spaces[agent]
+        self.action_space = env.action_spaces[agent]
+        self._engine: Gen1Engine | None = None
+        self.battle1: Battle | None = None
+        self.battle2: Battle | None = None
+        self._battle_count = 0
+
+    def reset(self, *, seed: int | None = None, options: dict | None = None):
+        super().reset(seed=seed)
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
+        codec = self.env
+        if self._engine is not None and not self._engine.finished:
+            self._engine.choose("p1", "forfeit")
+            self._deliver()
+
+        codec.action_mask.reset()
+        codec.maybe_update_teams(codec.agent1, codec.agent2)
+        self._battle_count += 1
+        tag = f"battle-gen1ou-sim-{self._battle_count}"
+        self.battle1 = Battle(tag, codec.agent1.username, codec.agent1.logger, gen=1)
+        self.battle2 = Battle(tag, codec.agent2.username, codec.agent2.logger, gen=1)
+        self._engine = Gen1Engine(
+            codec.agent1.next_team, codec.agent2.next_team,
+            usernames=(codec.agent1.username, codec.agent2.username),
+            seed=self._rng, max_turns=self._max_turns,
+        )
+        self._engine.start()
+        self._deliver()
+        self.opponent.reset_battles()
+        self.opponent._battles[tag] = self.battle2
+        self._play_opponent()
+        return self._observe(), codec.get_additional_info()[codec.possible_agents[0]]
+
+    def step(self, action) -> tuple[dict[str, np.ndarray], float, bool, bool, dict[str, Any]]:
+        codec = self.env
+        order = codec.action_to_order(action, self.battle1, strict=codec._strict)
+        self._choose("p1", order)
+        self._play_opponent()
+
+        obs = self._observe()
+        reward = codec.calc_reward(self.battle1)
+        terminated, truncated = codec.calc_term_trunc(self.battle1)
+        info = codec.get_additional_info()[codec.possible_agents[0]]
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        self._engine = None
+        if self.env.protocol_log is not None:
+            self.env.protocol_log.close()
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _observe(self) -> dict[str, np.ndarray]:
+        codec = self.env
+        return {
+            "observation": codec.embed_battle(self.battle1),
+            "action_mask": np.array(codec.get_action_mask(self.battle1), dtype=np.int8),
+        }
+
+    def _play_opponent(self):
+        """Let the opponent decide until the agent is asked again or the battle ends."""
+        engine = self._engine
+        while "p2" in engine.pending:
+            self._choose("p2", self.opponent.choose_move(self.battle2))
+
+    def _choose(self, role: str, order: BattleOrder):
+        self._engine.choose(role, self._choice(role, order))
+        self._deliver()
+
+    def _choice(self, role: str, order: BattleOrder) -> str:
+        """``/choose`` argument of ``order`` for the engine's view of ``role``."""
+        if isinstance(order, ForfeitBattleOrder):
+            return "forfeit"
+        side = self._engine.sides[role]
+        chosen = getattr(order, "order", None)
+        if isinstance(chosen, Pokemon):
+            for i, mon in enumerate(side.team):
+                if mon.species == chosen.species:
+                    return f"switch {i + 1}"
+        elif chosen is not None:
+            move_ids = self._engine.move_ids(role)
+            if chosen.id in move_ids:
+                return f"move {move_ids.index(chosen.id) + 1}"
+            if chosen.id in ("recharge", "struggle"):
+                return "move 1"
+        return "default"
+
+    def _deliver(self):
+        """Feed both battles the engine's new protocol lines, then their requests."""
+        for role, battle in (("p1", self.battle1), ("p2", self.battle2)):
+            lines = self._engine.messages(role)
+            for line in lines:
+                split = line.split("|")
+                if split[1] == "win":
+                    battle.won_by(split[2])
+                elif split[1] == "tie":
+                    battle.tied()
+                else:
+                    battle.parse_message(split)
+            request = self._engine.request(role)
+            if request is not None:
+                battle.parse_request(request)
+            if role == "p1" and self.env.protocol_log is not None:
+                if request is not None:
+                    lines = [*lines, f"|request|{json.dumps(request)}"]
+                self.env.protocol_log.record(battle.battle_tag, lines)
@@ -1,3 +1,4 @@
+from dataclasses import dataclass, replace
 from weakref import WeakKeyDictionary
 
 import numpy as np
@@ -5,9 +6,18 @@ import gymnasium as gym
 from poke_env.battle import AbstractBattle, Battle
 from poke_env.environment import SinglesEnv
 
+from curriculum.models import OpponentPlayerSpec
 from env.battle_config import BattleConfig
 from env.action_mask_gen_1 import ActionMaskGen1
-from env.reward import get_state_value
+from env.observation_quantizer import ObservationQuantizer
+from env.protocol_log import ProtocolLogRecorder
+from env.reward import (
+    fused_state_value,
+    fused_state_value_components,
+    get_state_value,
+    state_value_component_weights,
+    state_value_weights,
+)
 from teams.generators import InfinitePoolGenerator
 
 def print_state(battle, *, battle_config: BattleConfig | None = None, prefix="[PokemonRLWrapper]") -> str:
@@ -24,6 +34,58 @@ def print_state(battle, *, battle_config: BattleConfig | None = None, prefix="[P
     return message
 
 
+@dataclass(frozen=True)
+class BattleOutcome:
+    """Compact result of a finished battle, reported in the terminal step's info.
+
+    Cheap to pickle across worker pipes, unlike the poke-env ``Battle`` itself.
+
+    :ivar won: Whether the agent won; ``won`` and ``lost`` are both False on a draw.
+    :ivar lost: Whether the agent lost.
+    :ivar turns: Turns played.
+    :ivar hp_fraction: Agent team's mean remaining HP fraction.
+    :ivar opponent_hp_fraction: Opponent team's mean remaining HP fraction,
+        counting unrevealed Pokémon at full HP.
+    :ivar opponent: Opponent player spec id (or class path), when known."""
+
+    won: bool
+    lost: bool
+    turns: int
+    hp_fraction: float
+    opponent_hp_fraction: float
+    opponent: str | None = None
+
+    @property
+    def draw(self) -> bool:
+        return not (self.won or self.lost)
+
+    @property
+    def score(self) -> float:
+        """1 for a win, 0 for a loss, 0.5 for a draw."""
+        return 1.0 if self.won else 0.0 if self.lost else 0.5
+
+    def with_opponent(self, spec: OpponentPlayerSpec) -> "BattleOutcome":
+        """This outcome tagged with the id (or class path) of the opponent it was played against."""
+        return replace(self, opponent=spec.id or spec.class_path)
+
+    @classmethod
+    def from_battle(cls, battle: AbstractBattle, opponent: str | None = None) -> "BattleOutcome":
+        team = [mon.current_hp_fraction for mon in battle.team.values()]
+        opponent_team = [mon.current_hp_fraction for mon in battle.opponent_team.values()]
+        n_opponents = max(len(opponent_team), len(team))
+        return cls(
+            won=bool(battle.won),
+            lost=bool(battle.lost),
+            turns=int(battle.turn),
+            hp_fraction=float(np.mean(team)) if team else 0.0,
+            opponent_hp_fraction=(
+                (sum(opponent_team) + n_opponents - len(opponent_team)) / n_opponents
+                if n_opponents else 0.0
+            ),
+            opponent=opponent,
+        )
+
+
 class PokemonRLWrapper(SinglesEnv):
     def __init__(
             self,
@@ -33,11 +95,37 @@ class PokemonRLWrapper(SinglesEnv):
             agent_team_generator: InfinitePoolGenerator | None = None,
             opponent_team_generator: InfinitePoolGenerator | None = None,
             battle_config: BattleConfig | None = None,
+            incremental_encoding: bool = False,
+            obs_dtype: str = "float32",
+            fused_reward: bool = True,
+            reward_components: bool = False,
+            protocol_log: str | None = None,
             **kwargs,
     ):
         super().__init__(**kwargs)
 
         self._battle_config = battle_config if battle_config is not None else BattleConfig.gen1()
+        # The compiled encoder costs about as much per turn as the incremental
+        # one's typical partial update, and far less on a battle's first turn
+        # and on switches, which the incremental encoder re-encodes generically.
+        self._incremental_encoding = (
+            incremental_encoding and self._battle_config.incremental_encoder_cls is not None
+        )
+        # Fused reward: the state value is a dot product over the observation
+        # embed_battle just encoded, instead of a second walk over both teams.
+        self._fused_reward = fused_reward
+        self._value_weights = state_value_weights(self._battle_config) if fused_reward else None
+        # Optional per-component reward breakdown, reported in the step info.
+        self._reward_components = reward_components
+        self._component_weights = (
+            state_value_component_weights(self._battle_config) if reward_components else None
+        )
+        self._last_reward_components: np.ndarray | None = None
+        self._last_outcome: BattleOutcome | None = None
+        self._quantizer = ObservationQuantizer(self._battle_config, obs_dtype)
+        self._blank_obs = self._quantizer.quantize(
+            np.zeros(self._battle_config.obs_dim, dtype=np.float32)
+        )
         self.battle_team_generator = battle_team_generator
         self.agent_team_generator = agent_team_generator
         self.opponent_team_generator = opponent_team_generator
@@ -47,8 +135,7 @@ class PokemonRLWrapper(SinglesEnv):
         self._action_space = gym.spaces.Discrete(self._battle_config.action_space_size)
         self.action_spaces = {agent: self._action_space for agent in self.possible_agents}
         self.observation_spaces = {
-            agent: gym.spaces.Box(low=-1.0, high=1.0, shape=(self._battle_config.obs_dim,), dtype=np.float32)
-            for agent in self.possible_agents
+            agent: self._quantizer.observation_space() for agent in self.possible_agents
         }
 
         self._reward_buffer: WeakKeyDictionary[AbstractBattle, float] = (
@@ -57,16 +144,37 @@ class PokemonRLWrapper(SinglesEnv):
         self._obs_cache: WeakKeyDictionary[AbstractBattle, np.ndarray] = (
             WeakKeyDictionary()
         )
+        self._encoders: WeakKeyDictionary[AbstractBattle, object] = (
+            WeakKeyDictionary()
+        )
+        self._state_values: WeakKeyDictionary[AbstractBattle, float | np.ndarray] = (
+            WeakKeyDictionary()
+        )
+        self._component_buffer: WeakKeyDictionary[AbstractBattle, np.ndarray] = (
+            WeakKeyDictionary()
+        )
         self.action_mask = ActionMaskGen1()
 
         self.rounds_played: int = 0
         self.rounds_per_opponents = rounds_per_opponents
 
+        # Raw protocol of every agent1 battle, for re-encoding offline (env.protocol_replay).
+        self.protocol_log: ProtocolLogRecorder | None = None
+        if protocol_log is not None:
+            self.protocol_log = ProtocolLogRecorder(protocol_log, self.agent1.username)
+            self.protocol_log.attach(self.agent1)
+
     # ------------------------------------------------------------------
     # Action handling
     # ------------------------------------------------------------------
 
     def action_to_order(self, action, battle, fake=False, strict=True):
+        order = self._action_to_order(action, battle, fake, strict)
+        if self.protocol_log is not None and self._is_player_turn(battle):
+            self.protocol_log.record_choice(battle.battle_tag, order.message)
+        return order
+
+    def _action_to_order(self, action, battle, fake=False, strict=True):
         if not self._is_player_turn(battle=battle):
             return super().action_to_order(action, battle, fake, strict)
 
@@ -101,18 +209,40 @@ class PokemonRLWrapper(SinglesEnv):
 
     def embed_battle(self, battle: Battle) -> np.ndarray:
         if not self._is_player_turn(battle):
-            return self._obs_cache.get(
-                battle,
-                np.zeros(self._battle_config.obs_dim, dtype=np.float32),
-            )
+            return self._obs_cache.get(battle, self._blank_obs.copy())
 
         mask = self.get_action_mask(battle)
         self.action_mask.set(mask)
 
-        obs = self._battle_config.battle_state_cls(battle).to_array()
+        encoded = self._encode(battle)
+        if self._fused_reward:
+            self._state_values[battle] = (
+                fused_state_value_components(encoded, battle, self._component_weights)
+                if self._reward_components
+                else fused_state_value(encoded, battle, self._value_weights)
+            )
+        obs = self._quantizer.quantize(encoded)
         self._obs_cache[battle] = obs
         return obs
 
+    def _encode(self, battle: Battle) -> np.ndarray:
+        """Encode ``battle`` with the config's compiled encoder.
+
+        Falls back to the generic ``battle_state_cls`` path when the generation
+        has none.  With ``incremental_encoding`` a per-battle encoder re-uses
+        the previous turn's slices instead.
+        """
+        if not self._incremental_encoding:
+            encoder = self._battle_config.encoder
+            if encoder is not None:
+                return encoder(battle)
+            return self._battle_config.battle_state_cls(battle).to_array()
+
+        encoder = self._encoders.get(battle)
+        if encoder is None:
+            encoder = self._encoders[battle] = self._battle_config.incremental_encoder_cls()
+        return encoder.encode(battle)
+
     # ------------------------------------------------------------------
     # Reward
     # ------------------------------------------------------------------
@@ -121,37 +251,73 @@ class PokemonRLWrapper(SinglesEnv):
         if battle not in self._reward_buffer:
             self._reward_buffer[battle] = 0.0
 
-        value = get_state_value(battle)
+        # poke-env embeds before computing rewards, so a fused value from this
+        # step's observation is normally waiting; pop it so it is never reused.
+        value = self._state_values.pop(battle, None)
+        if value is None:
+            value = get_state_value(battle, components=self._reward_components)
+        if self._reward_components:
+            value = self._track_components(battle, value)
         reward = value - self._reward_buffer[battle]
         self._reward_buffer[battle] = value
 
         if battle.finished and self._is_player_turn(battle):
             self.rounds_played += 1
             self._last_finished_battle = battle
+            self._last_outcome = BattleOutcome.from_battle(battle)
 
         return reward
 
+    def _track_components(self, battle, components: np.ndarray) -> float:
+        """Record this step's per-component reward delta and return the scalar value."""
+        previous = self._component_buffer.get(battle)
+        self._component_buffer[battle] = components
+        if self._is_player_turn(battle):
+            self._last_reward_components = (
+                components if previous is None else components - previous
+            )
+        return float(components.sum())
+
+    def get_additional_info(self) -> dict:
+        info = super().get_additional_info()
+        # possible_agents[0] is agent1; ``agents`` is already cleared when a battle ends.
+        agent_info = info[self.possible_agents[0]]
+        if self._last_reward_components is not None:
+            agent_info["reward_components"] = self._last_reward_components
+            self._last_reward_components = None
+        if self._last_outcome is not None:
+            agent_info["battle_outcome"] = self._last_outcome
+            self._last_outcome = None
+        return info
+
     # ------------------------------------------------------------------
     # Reset
     # ------------------------------------------------------------------
 
     def reset(self, *args, **kwargs):
         self.action_mask.reset()
+        self.maybe_update_teams(self.agent1, self.agent2)
+        return super().reset(*args, **kwargs)
+
+    def maybe_update_teams(self, player1, player2):
+        """Give both players fresh teams once every ``rounds_per_opponents`` rounds.
+
+        :param player1: Player taking the agent team (normally ``agent1``).
+        :param player2: Player taking the opponent team (normally ``agent2``)."""
         if (
                 self.rounds_played % self.rounds_per_opponents == 0
                 and self._last_team_update_round != self.rounds_played
         ):
             if self.battle_team_generator is not None:
                 agent1_team, agent2_team = next(self.battle_team_generator)
-                self.agent1.update_team(agent1_team)
-                self.agent2.update_team(agent2_team)
+                player1.update_team(agent1_team)
+                player2.update_team(agent2_team)
             else:
                 if self.agent_team_generator is not None:
-                    self.agent1.update_team(next(self.agent_team_generator))
+                    player1.update_team(next(self.agent_team_generator))
                 if self.opponent_team_generator is not None:
-                    self.agent2.update_team(next(self.opponent_team_generator))
+                    player2.update_team(next(self.opponent_team_generator))
             self._last_team_update_round = self.rounds_played
-        return super().reset(*args, **kwargs)
 
     # ------------------------------------------------------------------
     # Helpers
@@ -162,3 +328,8 @@ class PokemonRLWrapper(SinglesEnv):
 
     def get_last_battle(self):
         return self._last_finished_battle
+
+    def close(self, *args, **kwargs):
+        if self.protocol_log is not None:
+            self.protocol_log.close()
+        super().close(*args, **kwargs)
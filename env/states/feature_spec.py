@@ -0,0 +1,473 @@
+"""
+Declarative feature specs and the specialised encoders generated from them.
+
+A generation's observation is described once, as data:
+
+    RecordSpec   the ordered features of one record — the arena (read from the
+                 battle), one opponent Pokémon, or the feature part of one of
+                 my Pokémon (its move block follows it)
+    BattleSpec   the three record specs plus team size and move slots, laid
+                 out exactly as ``ObservationLayout`` describes
+
+``compile()`` turns a spec into Python source for a single function
+specialised to it — every attribute read, dict key, vocabulary lookup and
+offset is baked in as straight-line code, with no per-call asserts, feature
+dispatch or ``getattr`` fallbacks — and ``exec``s it once.  The generated code
+gathers raw values; normalisation (divide, then clip) is a few vectorised
+NumPy calls over per-column tables derived from the spec.
+
+Feature kinds
+-------------
+    Scalar(name, source, norm=None, symmetric=False)          one attribute
+    DictVector(name, source, keys, norm=None, symmetric=False)
+                                                              dict values in ``keys`` order; missing / falsy → 0
+    OneHot(name, source, vocab)                               one-hot of a single value; ``None`` / unknown → zeros
+    MultiHot(name, source, vocab)                             membership of each ``vocab`` member in a collection
+    Computed(name, fn, width=1, norm=None, symmetric=False)   ``fn(record)`` for derived values (scalar or sequence)
+
+With ``norm`` set, values are divided by it and clipped to [0, 1] ([-1, 1]
+when ``symmetric``); otherwise they are written as they are.
+
+Usage
+-----
+    from env.states.gen1.feature_spec_gen1 import GEN1_FEATURE_SPEC
+
+    encoder = GEN1_FEATURE_SPEC.compile()     # cached per spec
+    obs     = encoder(battle)                 # == BattleStateGen1(battle).to_array()
+    print(encoder.source)                     # the generated code
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable
+
+import numpy as np
+
+from combat.combat_utils import NO_TYPE, defender_type_indices
+from env.observation_layout import ObservationLayout
+from env.states.move_feature_table import MoveFeatureTable
+from env.states.move_state import MoveState
+from env.states.state_utils import MAX_MOVES, MAX_TEAM_SIZE
+
+# (divisor, low, high) of a column that is written as it is.
+_PASS_THROUGH = (1.0, -np.inf, np.inf)
+
+
+def _bounds(norm: float | None, symmetric: bool) -> tuple[float, float, float]:
+    if norm is None:
+        return _PASS_THROUGH
+    return norm, (-1.0 if symmetric else 0.0), 1.0
+
+
+def _check_source(source: str) -> None:
+    if not all(part.isidentifier() for part in source.split(".")):
+        raise ValueError(f"feature source must be an attribute path, got {source!r}")
+
+
+def _check_norm(norm: float | None) -> None:
+    if norm is not None and norm <= 0:
+        raise ValueError(f"feature norm must be positive, got {norm}")
+
+
+class _Namespace(dict):
+    """Globals of the generated code; ``bind`` stores a value under a fresh name."""
+
+    def bind(self, value) -> str:
+        name = f"_k{len(self)}"
+        self[name] = value
+        return name
+
+
+# ------------------------------------------------------------------------------
+# Feature kinds
+# ------------------------------------------------------------------------------
+#
+# Every kind implements
+#     width            number of columns
+#     bounds()         (divisor, low, high) shared by all of its columns
+#     emit(var, ns)    (prelude lines, tuple items) reading the record ``var``
+
+@dataclass(frozen=True)
+class Scalar:
+    name: str
+    source: str
+    norm: float | None = None
+    symmetric: bool = False
+
+    def __post_init__(self) -> None:
+        _check_source(self.source)
+        _check_norm(self.norm)
+
+    @property
+    def width(self) -> int:
+        return 1
+
+    def bounds(self) -> tuple[float, float, float]:
+        return _bounds(self.norm, self.symmetric)
+
+    def emit(self, var: str, ns: _Namespace) -> tuple[list[str], list[str]]:
+        return [], [f"{var}.{self.source}"]
+
+
+@dataclass(frozen=True)
+class DictVector:
+    name: str
+    source: str
+    keys: tuple[str, ...]
+    norm: float | None = None
+    symmetric: bool = False
+
+    def __post_init__(self) -> None:
+        _check_source(self.source)
+        _check_norm(self.norm)
+        object.__setattr__(self, "keys", tuple(self.keys))
+
+    @property
+    def width(self) -> int:
+        return len(self.keys)
+
+    def bounds(self) -> tuple[float, float, float]:
+        return _bounds(self.norm, self.symmetric)
+
+    def emit(self, var: str, ns: _Namespace) -> tuple[list[str], list[str]]:
+        local = f"{var}_{self.name}"
+        return [f"{local} = {var}.{self.source}"], [f"{local}.get({k!r}) or 0" for k in self.keys]
+
+
+@dataclass(frozen=True)
+class OneHot:
+    name: str
+    source: str
+    vocab: tuple
+
+    def __post_init__(self) -> None:
+        _check_source(self.source)
+        object.__setattr__(self, "vocab", tuple(self.vocab))
+
+    @property
+    def width(self) -> int:
+        return len(self.vocab)
+
+    def bounds(self) -> tuple[float, float, float]:
+        return _PASS_THROUGH
+
+    def emit(self, var: str, ns: _Namespace) -> tuple[list[str], list[str]]:
+        eye = np.eye(self.width).tolist()
+        table = ns.bind({v: tuple(eye[i]) for i, v in enumerate(self.vocab)})
+        zeros = ns.bind((0.0,) * self.width)
+        return [], [f"*{table}.get({var}.{self.source}, {zeros})"]
+
+
+@dataclass(frozen=True)
+class MultiHot:
+    name: str
+    source: str
+    vocab: tuple
+
+    def __post_init__(self) -> None:
+        _check_source(self.source)
+        object.__setattr__(self, "vocab", tuple(self.vocab))
+
+    @property
+    def width(self) -> int:
+        return len(self.vocab)
+
+    def bounds(self) -> tuple[float, float, float]:
+        return _PASS_THROUGH
+
+    def emit(self, var: str, ns: _Namespace) -> tuple[list[str], list[str]]:
+        local = f"{var}_{self.name}"
+        return [f"{local} = {var}.{self.source}"], [f"{ns.bind(v)} in {local}" for v in self.vocab]
+
+
+@dataclass(frozen=True)
+class Computed:
+    name: str
+    fn: Callable
+    width: int = 1
+    norm: float | None = None
+    symmetric: bool = False
+
+    def __post_init__(self) -> None:
+        _check_norm(self.norm)
+
+    def bounds(self) -> tuple[float, float, float]:
+        return _bounds(self.norm, self.symmetric)
+
+    def emit(self, var: str, ns: _Namespace) -> tuple[list[str], list[str]]:
+        call = f"{ns.bind(self.fn)}({var})"
+        return [], [call if self.width == 1 else f"*{call}"]
+
+
+# ------------------------------------------------------------------------------
+# Records
+# ------------------------------------------------------------------------------
+
+def _assign(target: str, width: int, items: list[str], indent: str) -> list[str]:
+    """``buf[target:target + width] = (items...)`` as source lines."""
+    return (
+        [f"{indent}buf[{target}:{target} + {width}] = ("]
+        + [f"{indent}    {item}," for item in items]
+        + [f"{indent})"]
+    )
+
+
+@dataclass(frozen=True)
+class RecordSpec:
+    """
+    Ordered features of one record.
+
+    Parameters
+    ----------
+    name     : identifier, used to name the generated function
+    features : feature kinds in output order
+    """
+
+    name: str
+    features: tuple
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "features", tuple(self.features))
+        if not self.name.isidentifier():
+            raise ValueError(f"record name must be an identifier, got {self.name!r}")
+        names = [f.name for f in self.features]
+        if len(set(names)) != len(names):
+            raise ValueError(f"duplicate feature names in {self.name!r}: {names}")
+        for n in names:
+            if not n.isidentifier():
+                raise ValueError(f"feature name must be an identifier, got {n!r}")
+
+    @property
+    def width(self) -> int:
+        return sum(f.width for f in self.features)
+
+    def slices(self) -> dict[str, slice]:
+        """Column range of every feature inside the record."""
+        out, o = {}, 0
+        for f in self.features:
+            out[f.name] = slice(o, o + f.width)
+            o += f.width
+        return out
+
+    def normalization(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per-column ``(divisor, low, high)`` float32 arrays."""
+        cols = np.array([f.bounds() for f in self.features for _ in range(f.width)], dtype=np.float32)
+        cols = cols.reshape(-1, 3)
+        return cols[:, 0].copy(), cols[:, 1].copy(), cols[:, 2].copy()
+
+    def emit(self, var: str, ns: _Namespace) -> tuple[list[str], list[str]]:
+        prelude, items = [], []
+        for f in self.features:
+            p, i = f.emit(var, ns)
+            prelude += p
+            items += i
+        return prelude, items
+
+    def compile(self) -> Callable:
+        """``encode(record, buf, offset) -> end`` writing the normalised features."""
+        return _compile_record(self)
+
+
+@lru_cache(maxsize=None)
+def _compile_record(spec: RecordSpec) -> Callable:
+    ns = _Namespace(np=np)
+    ns["_div"], ns["_low"], ns["_high"] = spec.normalization()
+    prelude, items = spec.emit("x", ns)
+    lines = (
+        [f"def encode_{spec.name}(x, buf, o):"]
+        + [f"    {line}" for line in prelude]
+        + _assign("o", spec.width, items, "    ")
+        + [
+            f"    seg = buf[o:o + {spec.width}]",
+            "    np.divide(seg, _div, out=seg)",
+            "    np.minimum(seg, _high, out=seg)",
+            "    np.maximum(seg, _low, out=seg)",
+            f"    return o + {spec.width}",
+        ]
+    )
+    return _exec("\n".join(lines), ns, f"encode_{spec.name}")
+
+
+def _exec(source: str, ns: _Namespace, name: str) -> Callable:
+    exec(compile(source, f"<feature_spec:{name}>", "exec"), ns)
+    fn = ns[name]
+    fn.source = source
+    return fn
+
+
+# ------------------------------------------------------------------------------
+# Battles
+# ------------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class BattleSpec:
+    """
+    Feature spec of a generation's full observation.
+
+    Parameters
+    ----------
+    gen        : generation number; selects the ``MoveFeatureTable``
+    arena      : record read from the battle itself
+    opponent   : record of one opponent Pokémon
+    mine       : record of one of my Pokémon, without its move block
+    n_moves    : move slots per Pokémon
+    team_size  : Pokémon slots per side
+    """
+
+    gen: int
+    arena: RecordSpec
+    opponent: RecordSpec
+    mine: RecordSpec
+    n_moves: int = MAX_MOVES
+    team_size: int = MAX_TEAM_SIZE
+
+    def layout(self) -> ObservationLayout:
+        move_len = MoveState.array_len()
+        return ObservationLayout(
+            arena_len=self.arena.width,
+            move_len=move_len,
+            opp_pokemon_len=self.opponent.width,
+            my_pokemon_len=self.mine.width + self.n_moves * move_len,
+            my_moves_start=self.mine.width,
+            n_moves=self.n_moves,
+            team_size=self.team_size,
+        )
+
+    def normalization(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per-column ``(divisor, low, high)`` over the whole observation.
+
+        Move blocks and alive flags are already final and pass through.
+        """
+        layout = self.layout()
+        tables = []
+        for i in range(3):
+            col = np.full(layout.obs_dim, _PASS_THROUGH[i], dtype=np.float32)
+            view = layout.view(col)
+            view.arena[:] = self.arena.normalization()[i]
+            view.opp_team.data[:] = self.opponent.normalization()[i]
+            view.my_team.data[..., : layout.my_moves_start] = self.mine.normalization()[i]
+            tables.append(col)
+        return tables[0], tables[1], tables[2]
+
+    def compile(self) -> CompiledBattleEncoder:
+        """Generate and compile the specialised encoder (once per spec)."""
+        return _compile_battle(self)
+
+
+class CompiledBattleEncoder:
+    """
+    A ``BattleSpec`` compiled into one specialised function.
+
+    The generated function gathers every record value (and the alive flags) of
+    a battle into one flat list, normalises it in three NumPy calls and
+    scatters it into the observation; the move blocks are a single
+    ``MoveFeatureTable.encode_rows`` gather.  Together the two scatters cover
+    every column, so ``out`` never needs clearing.
+
+    ``encoder(battle, out=None)`` fills ``out`` (a fresh ``(obs_dim,)`` float32
+    array when omitted) and returns it.  ``source`` holds the generated code.
+    """
+
+    def __init__(self, spec: BattleSpec) -> None:
+        self.spec = spec
+        self.layout = spec.layout()
+        self.move_table = MoveFeatureTable.for_gen(spec.gen)
+        self.value_columns, self.move_columns = self._columns()
+
+        div, low, high = spec.normalization()
+        ns = _Namespace(np=np, defender_type_indices=defender_type_indices, table=self.move_table)
+        ns["_div"], ns["_low"], ns["_high"] = (a[self.value_columns] for a in (div, low, high))
+        ns["_value_columns"], ns["_move_columns"] = self.value_columns, self.move_columns
+        ns["OPP_PAD"] = [0.0] * spec.opponent.width
+        ns["MY_PAD"] = [0.0] * spec.mine.width
+        ns["EMPTY_ROWS"] = [MoveFeatureTable.EMPTY_ROW] * spec.n_moves
+        ns["NO_MOVES"] = [None] * spec.n_moves
+        ns["NO_TYPES"] = (NO_TYPE, NO_TYPE)
+        self._fn = _exec(self._source(ns), ns, f"encode_gen{spec.gen}")
+        self.source = self._fn.source
+
+    def __call__(self, battle, out: np.ndarray | None = None) -> np.ndarray:
+        if out is None:
+            out = np.empty(self.layout.obs_dim, dtype=np.float32)
+        return self._fn(battle, out)
+
+    def _columns(self) -> tuple[np.ndarray, np.ndarray]:
+        """Observation columns of the gathered values and of the move blocks, in write order."""
+        lay = self.layout
+        index = np.arange(lay.obs_dim)
+        view = lay.view(index)
+        values = np.concatenate([
+            view.arena,
+            view.opp_team.data.ravel(),
+            view.opp_alive,
+            view.my_team.data[:, : lay.my_moves_start].ravel(),
+            view.my_alive,
+        ])
+        moves = np.concatenate([view.opp_moves.data.ravel(), view.my_moves.ravel()])
+        return values, moves
+
+    def _source(self, ns: _Namespace) -> str:
+        spec = self.spec
+        n, t = spec.n_moves, spec.team_size
+        arena_pre, arena_items = spec.arena.emit("battle", ns)
+        opp_pre, opp_items = spec.opponent.emit("p", ns)
+        my_pre, my_items = spec.mine.emit("p", ns)
+        alive = "[1.0 if p.active else -1.0 if p.fainted else 0.0 for p in {team}] + [0.0] * ({t} - len({team}))"
+
+        def extend(items: list[str]) -> list[str]:
+            return ["        vals += ("] + [f"            {item}," for item in items] + ["        )"]
+
+        lines = [
+            f"def encode_gen{spec.gen}(battle, buf):",
+            *[f"    {line}" for line in arena_pre],
+            "    vals = [",
+            *[f"        {item}," for item in arena_items],
+            "    ]",
+            "    my_active = battle.active_pokemon",
+            "    opp_active = battle.opponent_active_pokemon",
+            "    my_types = tuple(my_active.types)",
+            "    opp_types = tuple(opp_active.types)",
+            "    row = table.row",
+            f"    rows = [[row(m, my_types, opp_types) for m in (list(opp_active.moves.values()) + NO_MOVES)[:{n}]]]",
+            "    attackers = [defender_type_indices(opp_types)]",
+            "",
+            f"    opp_team = list(battle.opponent_team.values())[:{t}]",
+            "    for p in opp_team:",
+            *[f"        {line}" for line in opp_pre],
+            *extend(opp_items),
+            f"    vals += OPP_PAD * ({t} - len(opp_team))",
+            "    vals += " + alive.format(team="opp_team", t=t),
+            "",
+            "    available = battle.available_moves",
+            f"    team = list(battle.team.values())[:{t}]",
+            "    for p in team:",
+            *[f"        {line}" for line in my_pre],
+            *extend(my_items),
+            "        types = tuple(p.types)",
+            f"        moves = (list(p.moves.values()) + NO_MOVES)[:{n}]",
+            "        if available and p.active:",
+            "            moves = [m if m in available else None for m in moves]",
+            "        rows.append([row(m, opp_types, types) for m in moves])",
+            "        attackers.append(defender_type_indices(types))",
+            f"    vals += MY_PAD * ({t} - len(team))",
+            "    vals += " + alive.format(team="team", t=t),
+            f"    rows += [EMPTY_ROWS] * ({t} - len(team))",
+            f"    attackers += [NO_TYPES] * ({t} - len(team))",
+            "",
+            "    values = np.fromiter(vals, dtype=np.float32, count=len(vals))",
+            "    np.divide(values, _div, out=values)",
+            "    np.minimum(values, _high, out=values)",
+            "    np.maximum(values, _low, out=values)",
+            "    buf[_value_columns] = values",
+            f"    defenders = [defender_type_indices(my_types)] + [defender_type_indices(opp_types)] * {t}",
+            "    buf[_move_columns] = table.encode_rows(np.array(rows), np.array(attackers), np.array(defenders)).ravel()",
+            "    return buf",
+        ]
+        return "\n".join(lines)
+
+
+@lru_cache(maxsize=None)
+def _compile_battle(spec: BattleSpec) -> CompiledBattleEncoder:
+    return CompiledBattleEncoder(spec)
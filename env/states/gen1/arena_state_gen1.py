@@ -33,6 +33,8 @@ class ArenaStateGen1:
 
     TRACKED_SCREENS = GEN1_TRACKED_SCREENS
 
+    __slots__ = ("turn", "my_screens", "opp_screens")
+
     def __init__(self, battle=None):
         if battle is not None:
             self._load_from_battle(battle)
@@ -70,11 +72,20 @@ class ArenaStateGen1:
         """
         Flat encoded array: [turn_encoded, *my_screens, *opp_screens]
         """
-        return np.concatenate([
-            [self.turn_encoded()],
-            self.my_screens,
-            self.opp_screens,
-        ]).astype(np.float32)
+        arr = np.empty(self.array_len(), dtype=np.float32)
+        self.write_into(arr, 0)
+        return arr
+
+    def write_into(self, buf: np.ndarray, offset: int) -> int:
+        """Write ``[turn_encoded, *my_screens, *opp_screens]`` into ``buf``.
+
+        :returns: Offset just past the written slice.
+        """
+        n = len(self.TRACKED_SCREENS)
+        buf[offset] = self.turn_encoded()
+        buf[offset + 1 : offset + 1 + n] = self.my_screens
+        buf[offset + 1 + n : offset + 1 + 2 * n] = self.opp_screens
+        return offset + 1 + 2 * n
 
     @classmethod
     def array_len(cls) -> int:
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+from poke_env.battle import AbstractBattle, Pokemon
+
+from combat.combat_utils import NO_TYPE, defender_type_indices
+from env.states.gen1.arena_state_gen1 import TURN_NORM, ArenaStateGen1
+from env.states.gen1.battle_state_gen_1 import BattleStateGen1
+from env.states.gen1.my_pokemon_state_gen_1 import MyPokemonStateGen1
+from env.states.gen1.stat_table_gen1 import DEFAULT_LEVEL, estimate_team_stats
+from env.states.gen1.opponent_pokemon_state_gen_1 import OpponentPokemonStateGen1
+from env.states.move_feature_table import MoveFeatureTable
+from env.states.state_utils import (
+    ALL_STATUSES, BOOST_NORM, MAX_MOVES, MAX_TEAM_SIZE, STAB_NORM, STAT_NORM, pull_attribute,
+)
+
+_STATUS_INDEX = {s: i for i, s in enumerate(ALL_STATUSES)}
+_STAT_INDEX   = {k: i for i, k in enumerate(MyPokemonStateGen1.STAT_KEYS)}
+_BOOST_INDEX  = {k: i for i, k in enumerate(MyPokemonStateGen1.BOOST_KEYS)}
+
+
+@dataclass
+class SideColumnsGen1:
+    """Raw per-slot scalars for one side of N battles (slots beyond the team are zero)."""
+    present: np.ndarray         # (N, 6) bool — slot backed by a real Pokémon
+    hp: np.ndarray              # (N, 6) float64
+    stats: np.ndarray           # (N, 6, n_stats) float32 — raw stats (mine) or estimated stats (opponent)
+    boosts: np.ndarray          # (N, 6, n_boosts) float32
+    status: np.ndarray          # (N, 6) intp — index into ALL_STATUSES, -1 for none
+    effects: np.ndarray         # (N, 6, n_effects) bool
+    stab: np.ndarray            # (N, 6) float64
+    active: np.ndarray          # (N, 6) bool
+    fainted: np.ndarray         # (N, 6) bool
+
+
+@dataclass
+class BattleColumnsGen1:
+    """Columnar snapshot of N battles — everything ``BattleStateGen1`` reads, as arrays."""
+    turn: np.ndarray            # (N,) float64
+    my_screens: np.ndarray      # (N, n_screens) bool
+    opp_screens: np.ndarray     # (N, n_screens) bool
+    my: SideColumnsGen1
+    opp: SideColumnsGen1
+    opp_preparing: np.ndarray   # (N, 6) float64
+    opp_recharge: np.ndarray    # (N, 6) float64
+    opp_protect: np.ndarray     # (N, 6) float64
+    my_move_rows: np.ndarray    # (N, 6, 4) intp — MoveFeatureTable rows, EMPTY_ROW when padded
+    my_types: np.ndarray        # (N, 6, 2) intp — attacker type indices per slot
+    opp_move_rows: np.ndarray   # (N, 4) intp
+    my_active_types: np.ndarray   # (N, 2) intp
+    opp_active_types: np.ndarray  # (N, 2) intp
+
+
+class BatchBattleEncoderGen1:
+    """
+    Columnar encoder for many battles at once.
+
+    Encoding runs in two passes:
+
+        gather()          one Python pass over the battles that copies the raw
+                          scalars (HP, stats, boosts, statuses, move rows, types)
+                          into ``BattleColumnsGen1`` arrays
+        encode_columns()  normalisation, one-hots, move-row gathers and type
+                          multipliers as whole-array NumPy operations
+
+    Row ``i`` of the result is identical to ``BattleStateGen1(battles[i]).to_array()``.
+
+    Usage
+    -----
+        encoder = BatchBattleEncoderGen1()
+        obs     = encoder.encode(battles)         # (N, BattleStateGen1.array_len())
+    """
+
+    GEN: int = BattleStateGen1.GEN
+
+    def __init__(self) -> None:
+        if not BattleStateGen1._offsets_ready:
+            BattleStateGen1._init_buffer()
+        self.move_table = MoveFeatureTable.for_gen(self.GEN)
+        self.obs_dim = BattleStateGen1.array_len()
+
+    def encode(self, battles: list[AbstractBattle], out: np.ndarray | None = None) -> np.ndarray:
+        """Encode ``battles`` into an ``(N, obs_dim)`` float32 array (``out`` if given)."""
+        return self.encode_columns(self.gather(battles), out)
+
+    # ------------------------------------------------------------------
+    # Gather
+    # ------------------------------------------------------------------
+
+    def gather(self, battles: list[AbstractBattle]) -> BattleColumnsGen1:
+        """Copy every raw input the encoder needs from ``battles`` into arrays."""
+        n = len(battles)
+        screens = ArenaStateGen1.TRACKED_SCREENS
+        cols = BattleColumnsGen1(
+            turn=np.zeros(n),
+            my_screens=np.zeros((n, len(screens)), dtype=bool),
+            opp_screens=np.zeros((n, len(screens)), dtype=bool),
+            my=self._empty_side(n, MyPokemonStateGen1),
+            opp=self._empty_side(n, OpponentPokemonStateGen1),
+            opp_preparing=np.zeros((n, MAX_TEAM_SIZE)),
+            opp_recharge=np.zeros((n, MAX_TEAM_SIZE)),
+            opp_protect=np.full((n, MAX_TEAM_SIZE), -1.0),
+            my_move_rows=np.full((n, MAX_TEAM_SIZE, MAX_MOVES), MoveFeatureTable.EMPTY_ROW, dtype=np.intp),
+            my_types=np.full((n, MAX_TEAM_SIZE, 2), NO_TYPE, dtype=np.intp),
+            opp_move_rows=np.full((n, MAX_MOVES), MoveFeatureTable.EMPTY_ROW, dtype=np.intp),
+            my_active_types=np.full((n, 2), NO_TYPE, dtype=np.intp),
+            opp_active_types=np.full((n, 2), NO_TYPE, dtype=np.intp),
+        )
+        table = self.move_table
+
+        for b, battle in enumerate(battles):
+            cols.turn[b] = battle.turn
+            for j, sc in enumerate(screens):
+                cols.my_screens[b, j] = sc in battle.side_conditions
+                cols.opp_screens[b, j] = sc in battle.opponent_side_conditions
+
+            my_active = battle.active_pokemon
+            opp_active = battle.opponent_active_pokemon
+            my_active_types = tuple(my_active.types)
+            opp_active_types = tuple(opp_active.types)
+            cols.my_active_types[b] = defender_type_indices(my_active_types)
+            cols.opp_active_types[b] = defender_type_indices(opp_active_types)
+
+            # All of the opponent's revealed moves are "available" to it.
+            for k, m in enumerate(list(opp_active.moves.values())[:MAX_MOVES]):
+                cols.opp_move_rows[b, k] = table.row(m, my_active_types, opp_active_types)
+
+            opp_team = list(battle.opponent_team.values())[:MAX_TEAM_SIZE]
+            cols.opp.stats[b, : len(opp_team)] = estimate_team_stats(opp_team, DEFAULT_LEVEL)
+            for i, p in enumerate(opp_team):
+                self._gather_pokemon(cols.opp, b, i, p, None)
+                cols.opp_preparing[b, i] = pull_attribute(p, "preparing", 0.0, float)
+                cols.opp_recharge[b, i] = pull_attribute(p, "must_recharge", 0.0, float)
+                cols.opp_protect[b, i] = pull_attribute(p, "protect_counter", -1.0, float)
+
+            available_moves = battle.available_moves
+            for i, p in enumerate(list(battle.team.values())[:MAX_TEAM_SIZE]):
+                self._gather_pokemon(cols.my, b, i, p, p.stats)
+                attacking_types = tuple(p.types)
+                cols.my_types[b, i] = defender_type_indices(attacking_types)
+                moves = list(pull_attribute(p, "moves", {}, dict).values())[:MAX_MOVES]
+                filter_moves = available_moves if cols.my.active[b, i] else None
+                for k, m in enumerate(moves):
+                    if filter_moves and m not in filter_moves:
+                        continue
+                    cols.my_move_rows[b, i, k] = table.row(m, opp_active_types, attacking_types)
+        return cols
+
+    @staticmethod
+    def _empty_side(n: int, state_cls: type) -> SideColumnsGen1:
+        return SideColumnsGen1(
+            present=np.zeros((n, MAX_TEAM_SIZE), dtype=bool),
+            hp=np.zeros((n, MAX_TEAM_SIZE)),
+            stats=np.zeros((n, MAX_TEAM_SIZE, len(state_cls.STAT_KEYS)), dtype=np.float32),
+            boosts=np.zeros((n, MAX_TEAM_SIZE, len(state_cls.BOOST_KEYS)), dtype=np.float32),
+            status=np.full((n, MAX_TEAM_SIZE), -1, dtype=np.intp),
+            effects=np.zeros((n, MAX_TEAM_SIZE, len(state_cls.TRACKED_EFFECTS)), dtype=bool),
+            stab=np.zeros((n, MAX_TEAM_SIZE)),
+            active=np.zeros((n, MAX_TEAM_SIZE), dtype=bool),
+            fainted=np.zeros((n, MAX_TEAM_SIZE), dtype=bool),
+        )
+
+    @staticmethod
+    def _gather_pokemon(side: SideColumnsGen1, b: int, i: int, p: Pokemon, stats: dict) -> None:
+        side.present[b, i] = True
+        side.hp[b, i] = p.current_hp_fraction
+        # Same skip rules as ``encode_dicts``: unknown keys and falsy values stay 0.
+        for k, v in (stats or {}).items():
+            j = _STAT_INDEX.get(k)
+            if j is not None and v:
+                side.stats[b, i, j] = v
+        for k, v in (p.boosts or {}).items():
+            j = _BOOST_INDEX.get(k)
+            if j is not None and v:
+                side.boosts[b, i, j] = v
+        side.status[b, i] = _STATUS_INDEX.get(p.status, -1) if p.status is not None else -1
+        if p.effects:
+            for j, e in enumerate(MyPokemonStateGen1.TRACKED_EFFECTS):
+                side.effects[b, i, j] = e in p.effects
+        side.stab[b, i] = pull_attribute(p, "stab_multiplier", 0.0, float)
+        side.active[b, i] = bool(pull_attribute(p, "active", 0.0, float))
+        side.fainted[b, i] = bool(pull_attribute(p, "fainted", 0.0, float))
+
+    # ------------------------------------------------------------------
+    # Encode
+    # ------------------------------------------------------------------
+
+    def encode_columns(self, cols: BattleColumnsGen1, out: np.ndarray | None = None) -> np.ndarray:
+        """Vectorised encoding of gathered columns into ``(N, obs_dim)`` float32."""
+        n = len(cols.turn)
+        if out is None:
+            out = np.empty((n, self.obs_dim), dtype=np.float32)
+
+        # --- Arena ---
+        o = BattleStateGen1._o_arena
+        n_screens = cols.my_screens.shape[1]
+        out[:, o] = np.minimum(cols.turn / TURN_NORM, 1.0)
+        out[:, o + 1 : o + 1 + n_screens] = cols.my_screens
+        out[:, o + 1 + n_screens : o + 1 + 2 * n_screens] = cols.opp_screens
+
+        # --- Opponent active moves ---
+        o = BattleStateGen1._o_opp_moves
+        move_block = out[:, o : o + MAX_MOVES * self.move_table.move_len]
+        move_block[:] = self._encode_moves(
+            cols.opp_move_rows, cols.opp_active_types, cols.my_active_types,
+        ).reshape(move_block.shape)
+
+        # --- Opponent team ---
+        slot = OpponentPokemonStateGen1.array_len()
+        o = BattleStateGen1._o_opp_bench
+        team = out[:, o : o + MAX_TEAM_SIZE * slot].reshape(n, MAX_TEAM_SIZE, slot)
+        c = self._write_common(team, cols.opp)
+        team[:, :, c] = cols.opp_preparing
+        team[:, :, c + 1] = cols.opp_recharge
+        team[:, :, c + 2] = np.clip(cols.opp.stab / STAB_NORM, 0.0, 1.0)
+        team[:, :, c + 3] = np.where(cols.opp_protect >= 0, 0.3 ** np.maximum(cols.opp_protect, 0.0), 0.0)
+        self._write_alive(out, o + MAX_TEAM_SIZE * slot, cols.opp)
+
+        # --- My team (each slot followed by its four moves) ---
+        slot = MyPokemonStateGen1.array_len()
+        o = BattleStateGen1._o_my_bench
+        team = out[:, o : o + MAX_TEAM_SIZE * slot].reshape(n, MAX_TEAM_SIZE, slot)
+        c = self._write_common(team, cols.my)
+        team[:, :, c] = np.clip(cols.my.stab / STAB_NORM, 0.0, 1.0)
+        team[:, :, c + 1 :] = self._encode_moves(
+            cols.my_move_rows, cols.my_types, cols.opp_active_types,
+        ).reshape(team[:, :, c + 1 :].shape)
+        self._write_alive(out, o + MAX_TEAM_SIZE * slot, cols.my)
+        return out
+
+    @staticmethod
+    def _write_common(team: np.ndarray, side: SideColumnsGen1) -> int:
+        """Write ``[hp | stats | boosts | status | effects]`` per slot; return the next column."""
+        n_stats, n_boosts, n_effects = side.stats.shape[2], side.boosts.shape[2], side.effects.shape[2]
+        team[:, :, 0] = side.hp
+        c = 1
+        team[:, :, c : c + n_stats] = np.clip(side.stats / STAT_NORM, 0.0, 1.0)
+        c += n_stats
+        team[:, :, c : c + n_boosts] = np.clip(side.boosts / BOOST_NORM, -1.0, 1.0)
+        c += n_boosts
+        team[:, :, c : c + len(ALL_STATUSES)] = side.status[:, :, None] == np.arange(len(ALL_STATUSES))
+        c += len(ALL_STATUSES)
+        team[:, :, c : c + n_effects] = side.effects
+        return c + n_effects
+
+    @staticmethod
+    def _write_alive(out: np.ndarray, o: int, side: SideColumnsGen1) -> None:
+        """Same per-slot value as ``TeamState.encode_active_and_faint``."""
+        out[:, o : o + MAX_TEAM_SIZE] = np.where(side.active, 1.0, np.where(side.fainted, -1.0, 0.0))
+
+    def _encode_moves(self, rows: np.ndarray, attacker: np.ndarray, defender: np.ndarray) -> np.ndarray:
+        """Move embeddings for a block of table rows.
+
+        :param rows: ``(..., MAX_MOVES)`` table rows, ``EMPTY_ROW`` for padding.
+        :param attacker: ``rows.shape[:-1] + (2,)`` attacker type indices.
+        :param defender: ``(N, 2)`` type indices of the defending active Pokémon.
+        :returns: ``rows.shape + (move_len,)`` float32.
+        """
+        extra = (1,) * (rows.ndim - 2)
+        return self.move_table.encode_rows(rows, attacker, defender.reshape(len(defender), *extra, 2))
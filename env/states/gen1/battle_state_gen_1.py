@@ -4,13 +4,14 @@ import threading
 import numpy as np
 from poke_env.battle import AbstractBattle, Move, Pokemon
 
+from env.observation_layout import ObservationLayout
 from env.states.gen1.arena_state_gen1 import ArenaStateGen1
 from env.states.gen1.my_pokemon_state_gen_1 import MyPokemonStateGen1
 from env.states.gen1.opponent_pokemon_state_gen_1 import OpponentPokemonStateGen1
 from env.states.move_state import MoveState
+from env.states.move_feature_table import MoveFeatureTable
 from env.states.team_state import TeamState
 from env.states.state_utils import MAX_TEAM_SIZE, MAX_MOVES
-from env.states.pokemon_state import _get_cached_move_state
 
 
 class BattleStateGen1:
@@ -21,8 +22,10 @@ class BattleStateGen1:
     ------------------------
         arena_state        (ArenaState.array_len)
         opp_moves          (MAX_MOVES × MoveState.array_len)
-        opp_bench_encoded  (5 × OpponentPokemonState.array_len — benched Pokémon only)
-        my_bench_encoded   (5 × (MyPokemonState.array_len + 4×MoveState.array_len) — benched Pokémon + moves)
+        opp_bench_encoded  (6 × OpponentPokemonState.array_len + 6 alive flags)
+        my_bench_encoded   (6 × MyPokemonState.array_len (moves included) + 6 alive flags)
+
+    ``layout()`` describes the same offsets and gives named views over the array.
     """
 
     GEN: int = 1
@@ -37,24 +40,35 @@ class BattleStateGen1:
     _o_my_bench: int = 0
     _move_len: int = 0
     _buf_len: int = 0
+    _layout: ObservationLayout | None = None
     # Each thread gets its own scratch buffer — allocated once per thread, never per instance.
     _thread_local: threading.local = threading.local()
 
     @classmethod
     def _init_buffer(cls) -> None:
-        a  = ArenaStateGen1.array_len()
-        m  = MoveState.array_len()
-        om = m * MAX_MOVES
-        ob = TeamState.compute_array_len(OpponentPokemonStateGen1, 6)
-        mb = TeamState.compute_array_len(MyPokemonStateGen1, 6)
-        cls._o_arena     = 0
-        cls._o_opp_moves = a
-        cls._o_opp_bench = a + om
-        cls._o_my_bench  = a + om + ob
-        cls._move_len    = m
-        cls._buf_len     = a + om + ob + mb
+        layout = cls.layout()
+        cls._o_arena     = layout.arena.start
+        cls._o_opp_moves = layout.opp_moves.start
+        cls._o_opp_bench = layout.opp_team.start
+        cls._o_my_bench  = layout.my_team.start
+        cls._move_len    = layout.move_len
+        cls._buf_len     = layout.obs_dim
         cls._offsets_ready = True
 
+    @classmethod
+    def layout(cls) -> ObservationLayout:
+        """Section offsets of ``to_array()``, built once per class."""
+        if cls._layout is None:
+            move_len = MoveState.array_len()
+            cls._layout = ObservationLayout(
+                arena_len=ArenaStateGen1.array_len(),
+                move_len=move_len,
+                opp_pokemon_len=OpponentPokemonStateGen1.array_len(),
+                my_pokemon_len=MyPokemonStateGen1.array_len(),
+                my_moves_start=MyPokemonStateGen1.array_len() - MAX_MOVES * move_len,
+            )
+        return cls._layout
+
     @classmethod
     def _get_thread_buf(cls) -> np.ndarray:
         """Return the calling thread's scratch buffer, allocating it on first use."""
@@ -82,21 +96,42 @@ class BattleStateGen1:
         # Bench: 5 slots (excluding active)
         self.my_bench_state  : TeamState = TeamState(self.my_bench , MyPokemonStateGen1      , self.MAX_TEAM_SIZE)
         self.opp_bench_state : TeamState = TeamState(self.opp_bench, OpponentPokemonStateGen1, self.MAX_TEAM_SIZE)
-        # Moves
-        self.opp_moves_state: list[MoveState]  = self._encode_moves(self.opp_moves         , self.opp_active, self.my_active)
-        self.my_moves_state : list[MoveState]  = self._encode_moves(self.my_available_moves, self.my_active , self.opp_active)
+        # Moves — opponent moves are written from the move feature table;
+        # MoveState objects are only built on demand (see the properties below).
+        self.move_table: MoveFeatureTable = MoveFeatureTable.for_gen(self.GEN)
+        self.opp_attacking_types: tuple = tuple(self.opp_active.types)
+        self.opp_defending_types: tuple = tuple(self.my_active.types)
+        self.opp_move_rows: list[int] = [
+            self.move_table.row(m, self.opp_defending_types, self.opp_attacking_types)
+            for m in self._filter_moves(self.opp_moves, self.opp_active)
+        ]
 
         if not self.__class__._offsets_ready:
             self.__class__._init_buffer()
 
+    @property
+    def opp_moves_state(self) -> list[MoveState]:
+        return self._encode_moves(self.opp_moves, self.opp_active, self.my_active)
+
+    @property
+    def my_moves_state(self) -> list[MoveState]:
+        return self._encode_moves(self.my_available_moves, self.my_active, self.opp_active)
+
+    @staticmethod
+    def _filter_moves(available_moves: list[Move], attacking_pokemon: Pokemon) -> list[Move | None]:
+        """Up to MAX_MOVES of the attacker's moves, ``None`` where unavailable."""
+        all_moves = list(attacking_pokemon.moves.values()) + [None] * MAX_MOVES
+        return [m if m in available_moves else None for m in all_moves[:MAX_MOVES]]
+
     def _encode_moves(self, available_moves: list[Move], attacking_pokemon: Pokemon, defending_pokemon: Pokemon) -> list[MoveState]:
         """Build up to MAX_MOVES MoveState objects, zero-padded."""
-        all_moves = list(attacking_pokemon.moves.values()) + [None] * MAX_MOVES
-        moves_list = [m if m in available_moves else None for m in all_moves[:MAX_MOVES]]
         attacking_types = tuple(attacking_pokemon.types)
         defending_types = tuple(defending_pokemon.types)
 
-        return [_get_cached_move_state(m, defending_types, attacking_types, self.GEN) for m in moves_list]
+        return [
+            MoveState(m, defending_types, attacking_types, self.GEN)
+            for m in self._filter_moves(available_moves, attacking_pokemon)
+        ]
 
     # ------------------------------------------------------------------
     # Output
@@ -104,42 +139,69 @@ class BattleStateGen1:
 
     def to_array(self) -> np.ndarray:
         """Return the full flat float32 feature vector for this turn."""
-        self.my_bench_state.encode_moves(self.opp_active, gen=self.GEN, available_moves=self.my_available_moves)
-
         buf = self.__class__._get_thread_buf()
-        m = self._move_len
+        self.write_into(buf, 0)
+        return buf.copy()
 
-        buf[self._o_arena    : self._o_opp_moves] = self.arena_state.to_array()
-        off = self._o_opp_moves
-        for ms in self.opp_moves_state:
-            buf[off : off + m] = ms.to_array()
-            off += m
-        buf[self._o_opp_bench : self._o_my_bench] = self.opp_bench_state.to_array()
-        buf[self._o_my_bench  :                  ] = self.my_bench_state.to_array()
+    @classmethod
+    def encode_batch(cls, battles: list[AbstractBattle], out: np.ndarray | None = None) -> np.ndarray:
+        """Encode many battles in one columnar pass.
 
-        return buf.copy()
+        Raw scalars are gathered from every battle first, then normalised and
+        one-hot encoded with whole-array NumPy operations (see
+        ``BatchBattleEncoderGen1``).
+
+        :param battles: Battles to encode.
+        :param out: Optional ``(N, array_len())`` float32 array to write into.
+        :returns: ``(N, array_len())`` float32 array; row ``i`` equals
+            ``BattleStateGen1(battles[i]).to_array()``.
+        """
+        from env.states.gen1.batch_encoder_gen1 import BatchBattleEncoderGen1
+        return BatchBattleEncoderGen1().encode(battles, out)
+
+    def write_into(self, buf: np.ndarray, offset: int) -> int:
+        """Encode this turn straight into ``buf`` starting at ``offset``.
+
+        Every sub-state writes its own slice in place, so no intermediate
+        arrays are allocated.
+
+        :returns: Offset just past the written slice (``offset + array_len()``).
+        """
+        self.my_bench_state.encode_moves(self.opp_active, gen=self.GEN, available_moves=self.my_available_moves)
+
+        o = self.arena_state.write_into(buf, offset + self._o_arena)
+        for row in self.opp_move_rows:
+            o = self.move_table.write_into(buf, o, row, self.opp_attacking_types, self.opp_defending_types)
+        o = self.opp_bench_state.write_into(buf, offset + self._o_opp_bench)
+        o = self.my_bench_state.write_into(buf, offset + self._o_my_bench)
+        return o
 
     @classmethod
     def array_len(cls) -> int:
         """Expected flat vector length (static after construction)."""
-        # Each my team member (active + 5 bench) includes their 4 moves
-        return (
-                ArenaStateGen1.array_len()                                          # arena_state
-                + MoveState.array_len() * MAX_MOVES                                 # opp_moves
-                + TeamState.compute_array_len(OpponentPokemonStateGen1, 6) # opp_bench (5 slots, no moves)
-                + TeamState.compute_array_len(MyPokemonStateGen1, 6)       # my_bench (5 slots × pokemon+moves)
-        )
+        return cls.layout().obs_dim
+
 
+    @classmethod
+    def signed_feature_mask(cls) -> np.ndarray:
+        """Boolean ``(array_len(),)`` mask of features that range over [-1, 1].
+
+        Every other feature lies in [0, 1].  Used to derive per-feature
+        quantisation scales from the layout.
+        """
+        mask = np.zeros(cls.array_len(), dtype=bool)
+        view = cls.layout().view(mask)
+        view.opp_moves.data[..., MoveState.signed_columns()] = True
+        view.opp_team.data[..., OpponentPokemonStateGen1.signed_columns()] = True
+        view.my_team.data[..., MyPokemonStateGen1.signed_columns()] = True
+        view.opp_alive[:] = True                          # 1 active / 0 / -1 fainted
+        view.my_alive[:] = True
+        return mask
 
     @classmethod
     def battle_before_me_len(cls) -> int:
         """Length of context (everything except my_moves) for policy slicing."""
-
-        return (
-                ArenaStateGen1.array_len()                                                  # arena
-                + MoveState.array_len() * MAX_MOVES                                         # opp_moves
-                + TeamState.compute_array_len(OpponentPokemonStateGen1, MAX_TEAM_SIZE)      # opp_bench (6 slots, no moves)
-        )
+        return cls.layout().arena_opponent_len
 
     # ------------------------------------------------------------------
     # Debug
@@ -0,0 +1,65 @@
+"""
+Gen 1 observation as a declarative ``BattleSpec``.
+
+Column for column the same features as ``ArenaStateGen1``,
+``OpponentPokemonStateGen1`` and ``MyPokemonStateGen1``, so the compiled
+encoder reproduces ``BattleStateGen1(battle).to_array()`` exactly.  A new
+generation only needs its own spec module like this one.
+"""
+
+from __future__ import annotations
+
+from poke_env.battle.pokemon import Pokemon
+
+from env.states.feature_spec import BattleSpec, Computed, DictVector, MultiHot, OneHot, RecordSpec, Scalar
+from env.states.gen1.arena_state_gen1 import GEN1_TRACKED_SCREENS, TURN_NORM
+from env.states.gen1.stat_table_gen1 import DEFAULT_LEVEL, estimated_stats
+from env.states.state_utils import (
+    ALL_STATUSES, BOOST_NORM, GEN1_BOOST_KEYS, GEN1_STAT_KEYS, GEN1_TRACKED_EFFECTS, STAB_NORM, STAT_NORM,
+)
+
+
+def _estimated_stats(pokemon: Pokemon):
+    """Opponent stat belief, see ``OpponentPokemonStateGen1.estimate_stats``."""
+    return estimated_stats(pokemon.species, pokemon.base_stats, DEFAULT_LEVEL)
+
+
+def _protect_value(pokemon: Pokemon) -> float:
+    """Same as ``OpponentPokemonStateGen1.protect_value``."""
+    counter = pokemon.protect_counter
+    return 0.3 ** counter if counter >= 0 else 0.0
+
+
+ARENA_SPEC_GEN1 = RecordSpec("arena_gen1", (
+    Scalar("turn", "turn", norm=TURN_NORM),
+    MultiHot("my_screens", "side_conditions", GEN1_TRACKED_SCREENS),
+    MultiHot("opp_screens", "opponent_side_conditions", GEN1_TRACKED_SCREENS),
+))
+
+OPPONENT_POKEMON_SPEC_GEN1 = RecordSpec("opponent_pokemon_gen1", (
+    Scalar("hp", "current_hp_fraction"),
+    Computed("stats", _estimated_stats, width=len(GEN1_STAT_KEYS), norm=STAT_NORM),
+    DictVector("boosts", "boosts", GEN1_BOOST_KEYS, norm=BOOST_NORM, symmetric=True),
+    OneHot("status", "status", ALL_STATUSES),
+    MultiHot("effects", "effects", GEN1_TRACKED_EFFECTS),
+    Scalar("preparing", "preparing"),
+    Scalar("must_recharge", "must_recharge"),
+    Scalar("stab", "stab_multiplier", norm=STAB_NORM),
+    Computed("protect", _protect_value),
+))
+
+MY_POKEMON_SPEC_GEN1 = RecordSpec("my_pokemon_gen1", (
+    Scalar("hp", "current_hp_fraction"),
+    DictVector("stats", "stats", GEN1_STAT_KEYS, norm=STAT_NORM),
+    DictVector("boosts", "boosts", GEN1_BOOST_KEYS, norm=BOOST_NORM, symmetric=True),
+    OneHot("status", "status", ALL_STATUSES),
+    MultiHot("effects", "effects", GEN1_TRACKED_EFFECTS),
+    Scalar("stab", "stab_multiplier", norm=STAB_NORM),
+))
+
+GEN1_FEATURE_SPEC = BattleSpec(
+    gen=1,
+    arena=ARENA_SPEC_GEN1,
+    opponent=OPPONENT_POKEMON_SPEC_GEN1,
+    mine=MY_POKEMON_SPEC_GEN1,
+)
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import numpy as np
+from poke_env.battle import AbstractBattle, Pokemon
+
+from env.states.gen1.arena_state_gen1 import ArenaStateGen1
+from env.states.gen1.battle_state_gen_1 import BattleStateGen1
+from env.states.gen1.my_pokemon_state_gen_1 import MyPokemonStateGen1
+from env.states.gen1.opponent_pokemon_state_gen_1 import OpponentPokemonStateGen1
+from env.states.move_feature_table import MoveFeatureTable
+from env.states.state_utils import MAX_TEAM_SIZE
+
+
+def _dict_key(d) -> tuple:
+    return tuple(d.items()) if isinstance(d, dict) else (d,)
+
+
+def _pokemon_key(p: Pokemon) -> tuple:
+    """Fingerprint of every ``Pokemon`` field the shared ``PokemonState`` base reads."""
+    return (
+        id(p),
+        p.species,
+        p.current_hp_fraction,
+        p.status,
+        _dict_key(p.boosts),
+        tuple(p.effects),
+        tuple(p.types),
+        p.stab_multiplier,
+        p.active,
+        p.fainted,
+    )
+
+
+class IncrementalBattleEncoderGen1:
+    """
+    Per-battle observation encoder that only re-encodes what changed.
+
+    Keeps the previous turn's observation and a fingerprint of the raw inputs
+    behind every slice of the ``BattleStateGen1`` layout:
+
+        arena            turn number and screens
+        opp_moves        opponent active, its revealed moves, both active types
+        opp_team[i]      one opponent Pokémon slot
+        my_team[i]       one agent Pokémon slot, including its move block
+
+    On ``encode()`` each fingerprint is recomputed from attribute reads only and
+    slices whose fingerprint is unchanged are left as they are.  A typical Gen 1
+    turn touches the two active Pokémon, so only those slots are re-encoded.
+
+    The output is always identical to ``BattleStateGen1(battle).to_array()``.
+
+    Usage
+    -----
+        encoder = IncrementalBattleEncoderGen1()     # one per battle
+        obs     = encoder.encode(battle)             # every turn
+    """
+
+    GEN: int = BattleStateGen1.GEN
+
+    def __init__(self) -> None:
+        if not BattleStateGen1._offsets_ready:
+            BattleStateGen1._init_buffer()
+
+        self.obs = np.zeros(BattleStateGen1.array_len(), dtype=np.float32)
+        self.move_table = MoveFeatureTable.for_gen(self.GEN)
+
+        self._arena_len   = ArenaStateGen1.array_len()
+        self._opp_slot    = OpponentPokemonStateGen1.array_len()
+        self._my_slot     = MyPokemonStateGen1.array_len()
+        view = BattleStateGen1.layout().view(self.obs)
+        self._opp_alive_view = view.opp_alive
+        self._my_alive_view  = view.my_alive
+
+        self._arena_key: tuple | None = None
+        self._opp_moves_key: tuple | None = None
+        self._opp_keys: list[tuple | None] = [None] * MAX_TEAM_SIZE
+        self._my_keys: list[tuple | None] = [None] * MAX_TEAM_SIZE
+        self._opp_alive = np.zeros(MAX_TEAM_SIZE, dtype=np.float32)
+        self._my_alive = np.zeros(MAX_TEAM_SIZE, dtype=np.float32)
+
+        # Names of the slices re-encoded by the last ``encode()`` call.
+        self.last_dirty: list[str] = []
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def encode(self, battle: AbstractBattle) -> np.ndarray:
+        """Update the stored observation from ``battle`` and return a copy."""
+        self.last_dirty = []
+        my_active = battle.active_pokemon
+        opp_active = battle.opponent_active_pokemon
+
+        self._encode_arena(battle)
+        self._encode_opp_moves(opp_active, my_active)
+        self._encode_opp_team(list(battle.opponent_team.values()))
+        self._encode_my_team(list(battle.team.values()), opp_active, battle.available_moves)
+        return self.obs.copy()
+
+    # ------------------------------------------------------------------
+    # Sections
+    # ------------------------------------------------------------------
+
+    def _encode_arena(self, battle: AbstractBattle) -> None:
+        key = (
+            battle.turn,
+            tuple(sc in battle.side_conditions for sc in ArenaStateGen1.TRACKED_SCREENS),
+            tuple(sc in battle.opponent_side_conditions for sc in ArenaStateGen1.TRACKED_SCREENS),
+        )
+        if key == self._arena_key:
+            return
+        self._arena_key = key
+        ArenaStateGen1(battle).write_into(self.obs, BattleStateGen1._o_arena)
+        self.last_dirty.append("arena")
+
+    def _encode_opp_moves(self, opp_active: Pokemon, my_active: Pokemon) -> None:
+        attacking_types = tuple(opp_active.types)
+        defending_types = tuple(my_active.types)
+        key = (id(opp_active), tuple(opp_active.moves), attacking_types, defending_types)
+        if key == self._opp_moves_key:
+            return
+        self._opp_moves_key = key
+
+        opp_moves = list(opp_active.moves.values())
+        o = BattleStateGen1._o_opp_moves
+        for m in BattleStateGen1._filter_moves(opp_moves, opp_active):
+            row = self.move_table.row(m, defending_types, attacking_types)
+            o = self.move_table.write_into(self.obs, o, row, attacking_types, defending_types)
+        self.last_dirty.append("opp_moves")
+
+    def _encode_opp_team(self, pokemons: list[Pokemon]) -> None:
+        base = BattleStateGen1._o_opp_bench
+        for i in range(MAX_TEAM_SIZE):
+            p = pokemons[i] if i < len(pokemons) else None
+            if p is None:
+                key = None
+            else:
+                key = _pokemon_key(p) + (
+                    _dict_key(p.base_stats),
+                    p.preparing,
+                    p.must_recharge,
+                    p.protect_counter,
+                )
+            # Empty slots start as zeros with a ``None`` key, so they are never re-encoded.
+            if key == self._opp_keys[i]:
+                continue
+            self._opp_keys[i] = key
+
+            state = OpponentPokemonStateGen1(p)
+            state.write_into(self.obs, base + i * self._opp_slot)
+            self._opp_alive[i] = self._alive_value(state)
+            self.last_dirty.append(f"opp_team[{i}]")
+        self._opp_alive_view[:] = self._opp_alive
+
+    def _encode_my_team(self, pokemons: list[Pokemon], opp_active: Pokemon, available_moves) -> None:
+        base = BattleStateGen1._o_my_bench
+        opp_types = tuple(opp_active.types)
+        available_key = tuple(id(m) for m in available_moves) if available_moves else ()
+        for i in range(MAX_TEAM_SIZE):
+            p = pokemons[i] if i < len(pokemons) else None
+            if p is None:
+                key = None
+            else:
+                key = _pokemon_key(p) + (
+                    _dict_key(p.stats),
+                    tuple(p.moves),
+                    opp_types,
+                    available_key if p.active else None,
+                )
+            if key == self._my_keys[i]:
+                continue
+            self._my_keys[i] = key
+
+            state = MyPokemonStateGen1(p)
+            if p is not None:
+                state.encode_moves(opp_active, self.GEN, available_moves if state.active else None)
+            state.write_into(self.obs, base + i * self._my_slot)
+            self._my_alive[i] = self._alive_value(state)
+            self.last_dirty.append(f"my_team[{i}]")
+        self._my_alive_view[:] = self._my_alive
+
+    @staticmethod
+    def _alive_value(state) -> float:
+        """Same per-slot value as ``TeamState.encode_active_and_faint``."""
+        return 1.0 if state.active else -1.0 if state.fainted else 0.0
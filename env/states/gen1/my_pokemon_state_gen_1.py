@@ -5,7 +5,7 @@ import numpy as np
 from poke_env.battle.pokemon import Pokemon
 
 from env.states.move_state import MoveState
-from env.states.state_utils import STAT_NORM, BOOST_NORM, STAB_NORM, ALL_STATUSES, MAX_MOVES
+from env.states.state_utils import STAT_NORM, BOOST_NORM, STAB_NORM, ALL_STATUSES, MAX_MOVES, write_normalized
 from env.states.pokemon_state import (
     PokemonState
 )
@@ -18,6 +18,8 @@ class MyPokemonStateGen1(PokemonState):
     Extends ``PokemonState`` by adding the ``stats`` field
     """
 
+    __slots__ = ()
+
     # ------------------------------------------------------------------
     # Construction
     # ------------------------------------------------------------------
@@ -34,25 +36,20 @@ class MyPokemonStateGen1(PokemonState):
     # Serialisation
     # ------------------------------------------------------------------
 
-    def to_array(self) -> np.ndarray:
-        """Return the flat float32 feature vector.
+    def write_into(self, buf: np.ndarray, offset: int) -> int:
+        """Write the feature vector into ``buf`` starting at ``offset``.
 
-        Layout: ``[hp | stats_encoded | boosts_encoded | status | effects | stab]``
+        Layout: ``[hp | stats_encoded | boosts_encoded | status | effects | stab | moves]``
         """
-        arr = np.concatenate([
-            [self.hp],
-            self.normalize_vector(self.stats, STAT_NORM),                   # (len(STAT_KEYS),)
-            self.normalize_vector(self.boosts, BOOST_NORM, symmetric=True), # (len(BOOST_KEYS),)
-            self.status,                                                    # (len(ALL_STATUSES),)
-            self.effects,                                                   # (len(TRACKED_EFFECTS),)
-            [self.normalize(self.stab, STAB_NORM)],                         # scalar, normalised to match BattleState
-            np.concatenate([m.to_array() for m in self.moves_states]),      # (MAX_MOVES * MoveState.array_len(),)
-        ]).astype(np.float32)
-
-        assert len(arr) == self.array_len(), (
-            f"MyPokemonState.to_array(): expected {self.array_len()}, got {len(arr)}"
-        )
-        return arr
+        buf[offset] = self.hp
+        o = write_normalized(buf, offset + 1, self.stats, STAT_NORM)                  # (len(STAT_KEYS),)
+        o = write_normalized(buf, o, self.boosts, BOOST_NORM, symmetric=True)         # (len(BOOST_KEYS),)
+        buf[o : o + len(self.status)] = self.status                                   # (len(ALL_STATUSES),)
+        o += len(self.status)
+        buf[o : o + len(self.effects)] = self.effects                                 # (len(TRACKED_EFFECTS),)
+        o += len(self.effects)
+        buf[o] = self.normalize(self.stab, STAB_NORM)                                 # scalar, normalised to match BattleState
+        return self.write_moves_into(buf, o + 1)                                      # (MAX_MOVES * MoveState.array_len(),)
 
     @classmethod
     def array_len(cls) -> int:
@@ -71,6 +68,17 @@ class MyPokemonStateGen1(PokemonState):
             + MAX_MOVES * MoveState.array_len() # moves
         )
 
+    @classmethod
+    def signed_columns(cls) -> list[int]:
+        """Boost columns plus the signed columns of each of the MAX_MOVES move slots."""
+        move_len = MoveState.array_len()
+        moves = cls.array_len() - MAX_MOVES * move_len
+        return super().signed_columns() + [
+            moves + k * move_len + c
+            for k in range(MAX_MOVES)
+            for c in MoveState.signed_columns()
+        ]
+
     def describe(self) -> str:
         """Human-readable breakdown of the pokemon state. Useful for debugging."""
         active_status  = [ALL_STATUSES[i].name for i, v in enumerate(self.status)  if v == 1.0]
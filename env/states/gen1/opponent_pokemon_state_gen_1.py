@@ -4,7 +4,8 @@ from typing import Optional
 import numpy as np
 from poke_env.battle.pokemon import Pokemon
 
-from env.states.state_utils import STAT_NORM, STAB_NORM, BOOST_NORM
+from env.states.gen1.stat_table_gen1 import estimated_stats
+from env.states.state_utils import STAT_NORM, STAB_NORM, BOOST_NORM, write_normalized
 from env.states.pokemon_state import (
     PokemonState,
     ALL_STATUSES,
@@ -16,6 +17,8 @@ class OpponentPokemonStateGen1(PokemonState):
     Opponent-side Pokémon state.
     """
 
+    __slots__ = ("preparing", "must_recharge", "protect")
+
     # ------------------------------------------------------------------
     # Construction
     # ------------------------------------------------------------------
@@ -41,58 +44,44 @@ class OpponentPokemonStateGen1(PokemonState):
     # Initializations
     # ------------------------------------------------------------------
     def estimate_stats(self, pokemon: Pokemon) -> np.ndarray:
-        base_stats = self.encode_dicts(pokemon.base_stats, self.STAT_KEYS)
-
-        level = self.level
-        dv      = 15
-        ev_term = 64
-
-        stats = []
-
-        for i, base in enumerate(base_stats):
-            if self.STAT_KEYS[i] == "hp":
-                stat = ((base + dv) * 2 + ev_term) + level + 10
-            else:
-                stat = ((base + dv) * 2 + ev_term) + 5
-            stats.append(stat)
+        """Gen 1 stat estimate (max DVs, full stat exp) from the per-species table.
 
-        return np.array(stats, dtype=np.float32)
+        The returned array is shared and read-only.
+        """
+        return estimated_stats(pokemon.species, pokemon.base_stats, self.level)
 
     # ------------------------------------------------------------------
     # Encoding helpers
     # ------------------------------------------------------------------
     def normalize_protect(self) -> np.ndarray:
-        value = (0.3 ** self.protect) if self.protect >= 0 else 0
-        return np.array([value], dtype=np.float32)
+        return np.array([self.protect_value()], dtype=np.float32)
+
+    def protect_value(self) -> float:
+        return (0.3 ** self.protect) if self.protect >= 0 else 0
 
     # ------------------------------------------------------------------
     # Serialisation
     # ------------------------------------------------------------------
 
-    def to_array(self) -> np.ndarray:
-        """Return the flat float32 feature vector for the opponent.
+    def write_into(self, buf: np.ndarray, offset: int) -> int:
+        """Write the opponent feature vector into ``buf`` starting at ``offset``.
 
         Layout matches the opponent portion of ``BattleState.to_array()``,
         extended with moves and protect belief so the entire opponent state
         is self-contained.
         """
-        arr = np.concatenate([
-            [self.hp],                  # (1)
-            self.normalize_vector(self.stats, STAT_NORM),     # (6)
-            self.normalize_vector(self.boosts, BOOST_NORM, symmetric=True),    # (7)
-            self.status,                # (7)
-            self.effects,               # (3)
-            [self.preparing],           # (1)
-            [self.must_recharge],       # (1)
-            [self.normalize(self.stab, STAB_NORM)],    # (1)
-            self.normalize_protect(),   # (1)
-        ]).astype(np.float32)
-
-        assert len(arr) == self.array_len(), (
-            f"OpponentPokemonState.to_array(): expected {self.array_len()}, "
-            f"got {len(arr)}"
-        )
-        return arr
+        buf[offset] = self.hp                                                   # (1)
+        o = write_normalized(buf, offset + 1, self.stats, STAT_NORM)            # (6)
+        o = write_normalized(buf, o, self.boosts, BOOST_NORM, symmetric=True)   # (7)
+        buf[o : o + len(self.status)] = self.status                             # (7)
+        o += len(self.status)
+        buf[o : o + len(self.effects)] = self.effects                           # (3)
+        o += len(self.effects)
+        buf[o]     = self.preparing                                             # (1)
+        buf[o + 1] = self.must_recharge                                         # (1)
+        buf[o + 2] = self.normalize(self.stab, STAB_NORM)                       # (1)
+        buf[o + 3] = self.protect_value()                                       # (1)
+        return o + 4
 
     @classmethod
     def array_len(cls) -> int:
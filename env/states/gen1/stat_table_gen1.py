@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Iterable
+
+import numpy as np
+from poke_env.battle.pokemon import Pokemon
+from poke_env.data import GenData
+
+from env.states.state_utils import GEN1_STAT_KEYS
+
+# Opponent stat belief: max DVs and the stat-exp term of a fully trained Pokémon.
+DEFAULT_LEVEL = 100
+DV            = 15
+EV_TERM       = 64
+
+_HP_COL = GEN1_STAT_KEYS.index("hp")
+
+GEN1_POKEDEX: dict = GenData.from_gen(1).pokedex
+GEN1_SPECIES: tuple[str, ...] = tuple(GEN1_POKEDEX)
+_SPECIES_INDEX: dict[str, int] = {s: i for i, s in enumerate(GEN1_SPECIES)}
+
+
+def base_stat_vector(base_stats: dict | None) -> np.ndarray:
+    """``base_stats`` in ``GEN1_STAT_KEYS`` order; missing or falsy entries are 0.
+
+    Same skip rules as ``encode_dicts`` — the Gen 1 dex has no ``spc`` key, so
+    that column is 0 for dex entries.
+    """
+    return np.array(
+        [(base_stats or {}).get(k) or 0 for k in GEN1_STAT_KEYS], dtype=np.float32,
+    )
+
+
+def stat_formula(base: np.ndarray, level: int = DEFAULT_LEVEL) -> np.ndarray:
+    """Gen 1 stat formula applied along the last axis of ``base`` (any leading shape)."""
+    stats = (base + DV) * 2 + EV_TERM
+    bonus = np.full(len(GEN1_STAT_KEYS), 5, dtype=np.float32)
+    bonus[_HP_COL] = level + 10
+    return (stats + bonus).astype(np.float32)
+
+
+def _build_dex_table(level: int) -> np.ndarray:
+    base = np.stack([base_stat_vector(GEN1_POKEDEX[s].get("baseStats")) for s in GEN1_SPECIES])
+    table = stat_formula(base, level)
+    table.setflags(write=False)
+    return table
+
+
+# Estimated stats for every Gen 1 dex entry at DEFAULT_LEVEL, one row per species.
+GEN1_DEX_STATS: np.ndarray = _build_dex_table(DEFAULT_LEVEL)
+
+
+@lru_cache(maxsize=4096)
+def _stats_for(level: int, base: tuple) -> np.ndarray:
+    stats = stat_formula(np.array(base, dtype=np.float32), level)
+    stats.setflags(write=False)
+    return stats
+
+
+def _dex_row(species: str, base_stats: dict | None, level: int) -> int:
+    """Row of ``GEN1_DEX_STATS`` for this Pokémon, or -1 when the table does not apply."""
+    idx = _SPECIES_INDEX.get(species)
+    if (
+        idx is not None
+        and level == DEFAULT_LEVEL
+        and base_stats is GEN1_POKEDEX[species].get("baseStats")
+    ):
+        return idx
+    return -1
+
+
+def estimated_stats(species: str, base_stats: dict | None, level: int = DEFAULT_LEVEL) -> np.ndarray:
+    """Estimated stats for one Pokémon as a read-only ``(len(GEN1_STAT_KEYS),)`` array.
+
+    Untransformed dex Pokémon at ``DEFAULT_LEVEL`` are a row of ``GEN1_DEX_STATS``
+    (poke-env shares the dex ``baseStats`` dict, so an identity check is enough).
+    Anything else — Transform, custom base stats, other levels — is memoised
+    on ``(level, base stats)``.
+    """
+    idx = _dex_row(species, base_stats, level)
+    if idx >= 0:
+        return GEN1_DEX_STATS[idx]
+    return _stats_for(level, tuple(base_stat_vector(base_stats).tolist()))
+
+
+def estimate_team_stats(pokemons: Iterable[Pokemon], level: int = DEFAULT_LEVEL) -> np.ndarray:
+    """Estimated stats for a whole team in one call.
+
+    Dex rows are gathered from ``GEN1_DEX_STATS`` with a single fancy index;
+    only transformed / non-dex Pokémon fall back to ``estimated_stats``.
+
+    :returns: float32 array of shape ``(len(pokemons), len(GEN1_STAT_KEYS))``.
+    """
+    pokemons = list(pokemons)
+    rows = np.fromiter(
+        (_dex_row(p.species, p.base_stats, level) for p in pokemons),
+        dtype=np.intp, count=len(pokemons),
+    )
+    out = GEN1_DEX_STATS[np.maximum(rows, 0)]
+    for i in np.flatnonzero(rows < 0):
+        out[i] = estimated_stats(pokemons[i].species, pokemons[i].base_stats, level)
+    return out
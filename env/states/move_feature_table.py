@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import numpy as np
+from poke_env.battle import Move
+
+from combat.combat_utils import (
+    NO_TYPE, defender_type_indices, type_effectiveness_tensor, type_index,
+)
+from env.states.move_state import MoveState
+
+
+class MoveFeatureTable:
+    """
+    Dense per-generation table of ``MoveState`` features, indexed by move id.
+
+    Everything ``MoveState.to_array()`` produces depends only on the move
+    itself, except two columns:
+
+        - STAB flag        → move type in the attacker's types
+        - type multiplier  → gathered from the generation's type tensor by
+                             (move type, defender types)
+
+    Each move id is encoded once into a row of ``features``; afterwards a move
+    embedding is a row copy plus those two per-matchup columns, instead of
+    re-running the normalise/one-hot work of ``MoveState`` every turn.
+
+    Usage
+    -----
+        table = MoveFeatureTable.for_gen(1)
+        row   = table.row(move, defending_types, attacking_types)
+        end   = table.write_into(buf, offset, row, attacking_types, defending_types)
+    """
+
+    EMPTY_ROW: int = -1
+    INITIAL_CAPACITY: int = 256
+
+    _tables: dict[int, "MoveFeatureTable"] = {}
+
+    def __init__(self, gen: int) -> None:
+        self.gen = gen
+        self.move_len = MoveState.array_len()
+        self.stab_col = MoveState.stab_index()
+        self.type_col = MoveState.type_multiplier_index()
+
+        self.features = np.zeros((self.INITIAL_CAPACITY, self.move_len), dtype=np.float32)
+        self.move_type_idx = np.full(self.INITIAL_CAPACITY, NO_TYPE, dtype=np.intp)
+        self.move_types: list = []
+        self._rows: dict[str, int] = {}
+
+        # Type multipliers pre-encoded exactly as MoveState encodes them, with an
+        # extra all-neutral attacker row (NO_TYPE) for moves of unknown type.
+        tensor = type_effectiveness_tensor(gen)
+        neutral = np.ones((1,) + tensor.shape[1:], dtype=np.float32)
+        multipliers = np.concatenate([tensor, neutral])
+        with np.errstate(divide="ignore"):
+            encoded = np.where(multipliers == 0.0, -1.0, np.log2(multipliers) / 2.0)
+        self.encoded_type_tensor = encoded.astype(np.float32)
+
+    @classmethod
+    def for_gen(cls, gen: int) -> "MoveFeatureTable":
+        """Return the shared table for ``gen``, creating it on first use."""
+        table = cls._tables.get(gen)
+        if table is None:
+            table = cls._tables[gen] = cls(gen)
+        return table
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ------------------------------------------------------------------
+    # Rows
+    # ------------------------------------------------------------------
+
+    def row(self, move: Move | None, defending_types: tuple, attacking_types: tuple) -> int:
+        """Return the row index for ``move``, encoding it on first sight.
+
+        :returns: Row index, or ``EMPTY_ROW`` for ``None`` (padding slot).
+        """
+        if move is None:
+            return self.EMPTY_ROW
+        row = self._rows.get(move.id)
+        if row is None:
+            row = self._add_row(move, defending_types, attacking_types)
+        return row
+
+    def _add_row(self, move: Move, defending_types: tuple, attacking_types: tuple) -> int:
+        row = len(self._rows)
+        # The last row is never filled, so ``EMPTY_ROW`` (-1) always gathers zeros / NO_TYPE.
+        if row == len(self.features) - 1:
+            grown = np.zeros((2 * len(self.features), self.move_len), dtype=np.float32)
+            grown[:row] = self.features[:row]
+            self.features = grown
+            grown_idx = np.full(len(grown), NO_TYPE, dtype=np.intp)
+            grown_idx[:row] = self.move_type_idx[:row]
+            self.move_type_idx = grown_idx
+
+        MoveState(move, defending_types, attacking_types, self.gen).write_into(self.features[row], 0)
+        # Per-matchup columns are filled in at write time.
+        self.features[row, self.stab_col] = 0.0
+        self.features[row, self.type_col] = 0.0
+        self.move_types.append(getattr(move, "type", None))
+        self.move_type_idx[row] = type_index(self.move_types[row])
+        self._rows[move.id] = row
+        return row
+
+    # ------------------------------------------------------------------
+    # Per-matchup columns
+    # ------------------------------------------------------------------
+
+    def type_value(self, row: int, defending_types: tuple) -> float:
+        """Encoded type multiplier of ``row``'s move against ``defending_types``."""
+        d1, d2 = defender_type_indices(defending_types)
+        return float(self.encoded_type_tensor[self.move_type_idx[row], d1, d2])
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def encode_rows(self, rows: np.ndarray, attacker: np.ndarray, defender: np.ndarray) -> np.ndarray:
+        """Move embeddings for a whole block of rows in a few NumPy operations.
+
+        :param rows: ``(..., n_moves)`` table rows, ``EMPTY_ROW`` for padding.
+        :param attacker: ``rows.shape[:-1] + (2,)`` attacker type indices.
+        :param defender: Defender type indices, broadcastable to ``rows.shape[:-1] + (2,)``.
+        :returns: ``rows.shape + (move_len,)`` float32; each row equals ``write_into``'s output.
+        """
+        feats = self.features[rows]             # EMPTY_ROW reads the reserved all-zero last row
+        move_types = self.move_type_idx[rows]
+        stab = (move_types != NO_TYPE) & (
+            (move_types == attacker[..., :1]) | (move_types == attacker[..., 1:])
+        )
+        feats[..., self.stab_col] = stab
+        # NO_TYPE attackers gather the neutral row, which encodes to 0.0.
+        feats[..., self.type_col] = self.encoded_type_tensor[move_types, defender[..., :1], defender[..., 1:]]
+        return feats
+
+    def write_into(
+        self,
+        buf: np.ndarray,
+        offset: int,
+        row: int,
+        attacking_types: tuple,
+        defending_types: tuple,
+    ) -> int:
+        """Write the move embedding for ``row`` into ``buf`` at ``offset``.
+
+        :returns: Offset just past the written slice.
+        """
+        end = offset + self.move_len
+        if row == self.EMPTY_ROW:
+            buf[offset:end] = 0.0
+            return end
+        buf[offset:end] = self.features[row]
+        buf[offset + self.stab_col] = float(self.move_types[row] in attacking_types)
+        buf[offset + self.type_col] = self.type_value(row, defending_types)
+        return end
@@ -3,9 +3,9 @@ from __future__ import annotations
 import numpy as np
 from poke_env.battle import Move, MoveCategory
 
-from combat.combat_utils import type_chart_for_gen
+from combat.combat_utils import damage_multiplier
 from env.states.state_utils import (
-    normalize, normalize_vector, encode_enum, encode_dicts, pull_attribute,
+    normalize, pull_attribute, write_enum, write_dicts,
     BOOST_NORM, GEN1_BOOST_KEYS, ALL_STATUSES,
 )
 
@@ -16,6 +16,13 @@ class MoveState:
     """Snapshot of a move's relevant battle state, ready for embedding."""
     BOOST_KEYS: list[str]   = GEN1_BOOST_KEYS
 
+    __slots__ = (
+        "min_hits", "max_hits", "type_multiplier", "id", "base_power", "accuracy",
+        "max_pp", "priority", "heal", "crit_ratio", "category", "is_protect_move",
+        "breaks_protect", "is_stab", "status", "opp_boosts", "self_boost",
+        "recoil", "drain", "_is_zero",
+    )
+
     def __init__(
         self,
         move: Move | None,
@@ -23,6 +30,7 @@ class MoveState:
         my_types,
         gen: int,
     ):
+        self._is_zero = False
         if move is None:
             self.min_hits = self.max_hits = 0
             self.type_multiplier = 1.0
@@ -52,12 +60,7 @@ class MoveState:
             else:
                 self.min_hits = self.max_hits = 1
 
-            type_it = iter(opp_types)
-            type1 = next(type_it, None)
-            type2 = next(type_it, None)
-            self.type_multiplier = move.type.damage_multiplier(
-                type1, type2, type_chart=type_chart_for_gen(gen)
-            )
+            self.type_multiplier = damage_multiplier(move.type, opp_types, gen)
 
             acc = getattr(move, "accuracy", None)
             self.id              = getattr(move, "id", None)
@@ -79,37 +82,62 @@ class MoveState:
 
     def to_array(self) -> np.ndarray:
         """Return the fixed-length feature vector for this move."""
-        if getattr(self, "_is_zero", False):
-            return np.zeros(self.array_len(), dtype=np.float32)
-
-        arr = np.concatenate([
-            [normalize(self.base_power, 200.0)],
-            [self.accuracy],
-            [normalize(self.priority, 7.0)],
-            [normalize(self.heal, 1.0)],
-            [normalize(self.crit_ratio, 6.0)],
-            encode_enum(self.category, MOVE_CATEGORIES),
-            [self.is_protect_move],
-            [self.breaks_protect],
-            [self.is_stab],
-            encode_enum(self.status, ALL_STATUSES),
-            normalize_vector(encode_dicts(self.opp_boosts, self.BOOST_KEYS), BOOST_NORM, symmetric=True),
-            normalize_vector(encode_dicts(self.self_boost, self.BOOST_KEYS), BOOST_NORM, symmetric=True),
-            self._encode_type_multiplier(self.type_multiplier),
-            [self.recoil],
-            [self.drain],
-            [normalize(self.min_hits, 5.0)],
-            [normalize(self.max_hits, 5.0)],
-        ]).astype(np.float32)
-
-        # vec.append(_scale_01(self.damage_fraction, 1.0))
-        assert len(arr) == self.array_len(), f"embed: expected {self.array_len()}, got {len(arr)}"
+        arr = np.empty(self.array_len(), dtype=np.float32)
+        end = self.write_into(arr, 0)
+        assert end == self.array_len(), f"embed: expected {self.array_len()}, got {end}"
         return arr
 
+    def write_into(self, buf: np.ndarray, offset: int) -> int:
+        """Write this move's features into ``buf`` starting at ``offset``.
+
+        :returns: Offset just past the written slice.
+        """
+        if self._is_zero:
+            end = offset + self.array_len()
+            buf[offset:end] = 0.0
+            return end
+
+        o = offset
+        buf[o]     = normalize(self.base_power, 200.0)
+        buf[o + 1] = self.accuracy
+        buf[o + 2] = normalize(self.priority, 7.0)
+        buf[o + 3] = normalize(self.heal, 1.0)
+        buf[o + 4] = normalize(self.crit_ratio, 6.0)
+        o = write_enum(buf, o + 5, self.category, MOVE_CATEGORIES)
+        buf[o]     = self.is_protect_move
+        buf[o + 1] = self.breaks_protect
+        buf[o + 2] = self.is_stab
+        o = write_enum(buf, o + 3, self.status, ALL_STATUSES)
+        o = write_dicts(buf, o, self.opp_boosts, self.BOOST_KEYS, BOOST_NORM, symmetric=True)
+        o = write_dicts(buf, o, self.self_boost, self.BOOST_KEYS, BOOST_NORM, symmetric=True)
+        buf[o]     = self._type_multiplier_value(self.type_multiplier)
+        buf[o + 1] = self.recoil
+        buf[o + 2] = self.drain
+        buf[o + 3] = normalize(self.min_hits, 5.0)
+        buf[o + 4] = normalize(self.max_hits, 5.0)
+        # buf[o + 5] = _scale_01(self.damage_fraction, 1.0)
+        return o + 5
+
     @classmethod
     def array_len(cls) -> int:
         return 13 + len(MOVE_CATEGORIES) + len(ALL_STATUSES) + 2 * len(cls.BOOST_KEYS)
 
+    @classmethod
+    def stab_index(cls) -> int:
+        """Position of the STAB flag inside ``to_array()``."""
+        return 5 + len(MOVE_CATEGORIES) + 2
+
+    @classmethod
+    def type_multiplier_index(cls) -> int:
+        """Position of the encoded type multiplier inside ``to_array()``."""
+        return cls.stab_index() + 1 + len(ALL_STATUSES) + 2 * len(cls.BOOST_KEYS)
+
+    @classmethod
+    def signed_columns(cls) -> list[int]:
+        """Positions inside ``to_array()`` that range over [-1, 1]; all others are in [0, 1]."""
+        boosts = cls.stab_index() + 1 + len(ALL_STATUSES)
+        return list(range(boosts, boosts + 2 * len(cls.BOOST_KEYS))) + [cls.type_multiplier_index()]
+
     def describe(self) -> str:
         """Human-readable breakdown of the move state. Useful for debugging."""
         opp_boost_str = " | ".join(
@@ -163,5 +191,8 @@ class MoveState:
     # ------------------------------------------------------------------
     @staticmethod
     def _encode_type_multiplier(type_multiplier: float) -> np.ndarray:
-        val = -1.0 if type_multiplier == 0.0 else float(np.log2(type_multiplier) / 2.0)
-        return np.array([val], dtype=np.float32)
\ No newline at end of file
+        return np.array([MoveState._type_multiplier_value(type_multiplier)], dtype=np.float32)
+
+    @staticmethod
+    def _type_multiplier_value(type_multiplier: float) -> float:
+        return -1.0 if type_multiplier == 0.0 else float(np.log2(type_multiplier) / 2.0)
\ No newline at end of file
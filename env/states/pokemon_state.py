@@ -1,6 +1,6 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from functools import lru_cache
+from types import MappingProxyType
 from typing import Optional
 
 import numpy as np
@@ -9,25 +9,12 @@ from poke_env.battle.pokemon import Pokemon
 from poke_env.battle.effect import Effect
 
 from env.states.move_state import MoveState
+from env.states.move_feature_table import MoveFeatureTable
 from env.states.state_utils import GEN1_BOOST_KEYS, ALL_STATUSES, GEN1_TRACKED_EFFECTS, GEN1_STAT_KEYS, MAX_MOVES
 from env.states.state_utils import normalize, normalize_vector, encode_enum, encode_dicts, pull_attribute
 
-# Module-level cache: survives across BattleStateGen1 reconstructions each turn.
-# Key: (move_id, defending_types_tuple, attacking_types_tuple, gen)
-_MOVE_STATE_CACHE: dict[tuple, MoveState] = {}
-
-@lru_cache(maxsize=10000)
-def _get_cached_move_state(move, defending_types: tuple, attacking_types: tuple, gen: int) -> MoveState:
-    if move is None:
-        key = (None,)
-    else:
-        # PokemonType enum members are hashable — use them directly as key
-        key = (move.id, defending_types, attacking_types, gen)
-    cached = _MOVE_STATE_CACHE.get(key)
-    if cached is None:
-        cached = MoveState(move, defending_types, attacking_types, gen)
-        _MOVE_STATE_CACHE[key] = cached
-    return cached
+# Shared, read-only move dict for empty (padding) slots.
+_NO_MOVES = MappingProxyType({})
 
 
 class PokemonState(ABC):
@@ -38,14 +25,25 @@ class PokemonState(ABC):
       - Common field population from a poke-env ``Pokemon`` object.
       - All static encoding helpers.
       - ``boosts_encoded()`` convenience method.
-      - Abstract ``to_array()`` and ``array_len()``.
+      - ``to_array()`` as a thin wrapper over the abstract ``write_into()``.
+      - Abstract ``array_len()``.
 
     Class variables (override in subclasses)
     -----------------------------------------
     STAT_KEYS   controls which stat keys are read from ``pokemon.stats``.
     BOOST_KEYS  controls which boost keys are read from ``pokemon.boosts``.
+
+    Up to a dozen of these are built per turn, so fields live in ``__slots__``
+    (subclasses declare their own extra slots) and ``moves`` references the
+    Pokémon's move dict instead of copying it.
     """
 
+    __slots__ = (
+        "level", "move_table", "move_rows", "attacking_types", "defending_types",
+        "hp", "species", "stats", "boosts", "types", "status", "effects",
+        "stab", "active", "fainted", "moves",
+    )
+
     STAT_KEYS: list[str]    = GEN1_STAT_KEYS
     BOOST_KEYS: list[str]   = GEN1_BOOST_KEYS
     TRACKED_EFFECTS: list[Effect] = GEN1_TRACKED_EFFECTS
@@ -55,7 +53,10 @@ class PokemonState(ABC):
     # ------------------------------------------------------------------
     def __init__(self, pokemon: Optional[Pokemon] = None):
         self.level = 100
-        self.moves_states: list[MoveState] = [MoveState.zero()] * MAX_MOVES
+        self.move_table: MoveFeatureTable | None = None
+        self.move_rows: list[int] = [MoveFeatureTable.EMPTY_ROW] * MAX_MOVES
+        self.attacking_types: tuple = ()
+        self.defending_types: tuple = ()
         if pokemon is not None:
             self.hp      = pokemon.current_hp_fraction
             self.species = pokemon.species
@@ -67,7 +68,8 @@ class PokemonState(ABC):
             self.stab    = self.pull_attribute(pokemon, "stab_multiplier", default_value=0.0, type_value=float)
             self.active  = self.pull_attribute(pokemon, "active", default_value=0.0, type_value=float)
             self.fainted = self.pull_attribute(pokemon, "fainted", default_value=0.0, type_value=float)
-            self.moves   = self.pull_attribute(pokemon, "moves", default_value={}, type_value=dict)
+            moves        = getattr(pokemon, "moves", None)
+            self.moves   = moves if moves is not None else _NO_MOVES
         else:
             self.hp      = 0.0
             self.species = "none"
@@ -79,15 +81,27 @@ class PokemonState(ABC):
             self.stab    = self.pull_attribute(None, "stab_multiplier", default_value=0.0, type_value=float)
             self.active = self.pull_attribute(None, "active", default_value=0.0, type_value=float)
             self.fainted = self.pull_attribute(None, "fainted", default_value=0.0, type_value=float)
-            self.moves = self.pull_attribute(None, "moves", default_value={}, type_value=dict)
+            self.moves = _NO_MOVES
 
     # ------------------------------------------------------------------
     # Abstract interface
     # ------------------------------------------------------------------
 
-    @abstractmethod
     def to_array(self) -> np.ndarray:
         """Return the flat float32 feature vector for this Pokémon."""
+        arr = np.empty(self.array_len(), dtype=np.float32)
+        end = self.write_into(arr, 0)
+        assert end == self.array_len(), (
+            f"{type(self).__name__}.to_array(): expected {self.array_len()}, got {end}"
+        )
+        return arr
+
+    @abstractmethod
+    def write_into(self, buf: np.ndarray, offset: int) -> int:
+        """Write the feature vector into ``buf`` starting at ``offset``.
+
+        :returns: Offset just past the written slice.
+        """
 
     @classmethod
     @abstractmethod
@@ -97,26 +111,63 @@ class PokemonState(ABC):
         Must satisfy ``len(self.to_array()) == self.array_len()`` at all times.
         """
 
+    # Every subclass writes ``[hp | stats | boosts | status | ...]`` first, so
+    # these positions hold for both sides.
+    HP_COLUMN: int = 0
+
+    @classmethod
+    def boost_columns(cls) -> range:
+        """Positions of the ``BOOST_KEYS`` boosts (stage / BOOST_NORM) inside ``to_array()``."""
+        boosts = 1 + len(cls.STAT_KEYS)
+        return range(boosts, boosts + len(cls.BOOST_KEYS))
+
+    @classmethod
+    def status_columns(cls) -> range:
+        """Positions of the ``ALL_STATUSES`` one-hot inside ``to_array()``."""
+        status = cls.boost_columns().stop
+        return range(status, status + len(ALL_STATUSES))
+
+    @classmethod
+    def signed_columns(cls) -> list[int]:
+        """Positions inside ``to_array()`` that range over [-1, 1] (the boosts)."""
+        return list(cls.boost_columns())
+
     def encode_moves(self, defending_pokemon: Pokemon, gen=1, available_moves=None):
-        """Build up to MAX_MOVES MoveState objects, zero-padded.
+        """Resolve up to MAX_MOVES move rows in the generation's feature table.
 
-        MoveState objects are cached globally by (move_id, defending_types,
-        attacking_types, gen) so repeated reconstruction of PokemonState each
-        turn hits the cache rather than rebuilding from scratch.
+        Unknown or unavailable slots map to ``MoveFeatureTable.EMPTY_ROW`` and
+        are zero-padded when written.  Static move features are encoded once per
+        move id, so repeated reconstruction of PokemonState each turn only pays
+        for a dict lookup per move.
         """
-        defending_types = tuple(defending_pokemon.types)
-        attacking_types = tuple(self.types)
+        self.move_table = MoveFeatureTable.for_gen(gen)
+        self.defending_types = tuple(defending_pokemon.types)
+        self.attacking_types = tuple(self.types)
         all_moves = list(self.moves.values()) + [None] * MAX_MOVES
         moves_list = (
             [m if m in available_moves else None for m in all_moves[:MAX_MOVES]]
             if available_moves
             else all_moves[:MAX_MOVES]
         )
-        self.moves_states = [
-            _get_cached_move_state(m, defending_types, attacking_types, gen)
+        self.move_rows = [
+            self.move_table.row(m, self.defending_types, self.attacking_types)
             for m in moves_list
         ]
 
+    def write_moves_into(self, buf: np.ndarray, offset: int) -> int:
+        """Write the MAX_MOVES move embeddings into ``buf`` starting at ``offset``.
+
+        :returns: Offset just past the written slice.
+        """
+        if self.move_table is None:
+            end = offset + MAX_MOVES * MoveState.array_len()
+            buf[offset:end] = 0.0
+            return end
+        o = offset
+        for row in self.move_rows:
+            o = self.move_table.write_into(buf, o, row, self.attacking_types, self.defending_types)
+        return o
+
     @abstractmethod
     def describe(self) -> str:
         """Human-readable breakdown of the pokemon state. Useful for debugging."""
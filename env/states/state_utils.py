@@ -85,6 +85,63 @@ def encode_dicts(_dict: dict, _keys: list[str]) -> np.ndarray:
                 out[i] = v
     return out
 
+def write_normalized(buf: np.ndarray, offset: int, vec, vec_max: float, symmetric: bool = False) -> int:
+    """In-place counterpart of ``normalize_vector``.
+
+    Writes ``vec / vec_max`` (clipped) into ``buf[offset:offset + len(vec)]``
+    without allocating an intermediate array.
+
+    :returns: Offset just past the written slice.
+    """
+    end = offset + len(vec)
+    out = buf[offset:end]
+    if vec_max <= 0:
+        out[:] = 0.0
+        return end
+    np.divide(vec, vec_max, out=out)
+    if symmetric:
+        np.clip(out, -1.0, 1.0, out=out)
+    else:
+        np.clip(out, 0.0, 1.0, out=out)
+    return end
+
+def write_enum(buf: np.ndarray, offset: int, value, enums_list) -> int:
+    """In-place counterpart of ``encode_enum``.
+
+    :returns: Offset just past the written slice.
+    """
+    if enums_list is None:
+        raise ValueError("enums_list cannot be None")
+    end = offset + len(enums_list)
+    buf[offset:end] = 0.0
+    if value is None:
+        return end
+    if isinstance(value, (dict, set, list, frozenset)):
+        for i, s in enumerate(enums_list):
+            if s in value:
+                buf[offset + i] = 1.0
+        return end
+    for i, s in enumerate(enums_list):
+        if value == s:
+            buf[offset + i] = 1.0
+    return end
+
+def write_dicts(buf: np.ndarray, offset: int, _dict: dict, _keys: list[str],
+                vec_max: float = 1.0, symmetric: bool = False) -> int:
+    """In-place counterpart of ``normalize_vector(encode_dicts(...))``.
+
+    :returns: Offset just past the written slice.
+    """
+    end = offset + len(_keys)
+    buf[offset:end] = 0.0
+    if _dict and vec_max > 0:
+        idx_map = _build_key_index(tuple(_keys))
+        for k, v in _dict.items():
+            i = idx_map.get(k)
+            if i is not None and v:
+                buf[offset + i] = normalize(v, vec_max, symmetric=symmetric)
+    return end
+
 def pull_attribute(obj, key, default_value, type_value):
     try:
         if obj is None or key is None:
@@ -51,10 +51,20 @@ class TeamState:
 
         :returns: float32 array of shape ``(max_size * slot_len,)``.
         """
-        return np.concatenate([
-            np.concatenate([m.to_array() for m in self.members]),
-            self.alive_vector, # vector the size of max_size with 1 if active, -1 if fainted and 0 else
-        ]).astype(np.float32)
+        arr = np.empty(self.array_len(), dtype=np.float32)
+        self.write_into(arr, 0)
+        return arr
+
+    def write_into(self, buf: np.ndarray, offset: int) -> int:
+        """Write every slot followed by the alive vector into ``buf``.
+
+        :returns: Offset just past the written slice.
+        """
+        o = offset
+        for m in self.members:
+            o = m.write_into(buf, o)
+        buf[o : o + self.max_size] = self.alive_vector # vector the size of max_size with 1 if active, -1 if fainted and 0 else
+        return o + self.max_size
 
     def array_len(self) -> int:
         """Expected total flat vector length."""
@@ -0,0 +1,165 @@
+"""
+Shared plumbing of the multiprocess vec envs whose workers host a ``VecEnv``.
+
+``SubprocBattleVecEnv`` and ``SharedMemoryVecEnv`` both run one worker
+process per env factory, and each worker may host several envs (e.g. an
+``AsyncBattleVecEnv`` of ``K`` battles).  ``WorkerVecEnv`` owns what they
+have in common:
+
+* starting the processes and reading each worker's spaces and env count;
+* mapping global env indices onto ``(worker, local index)`` so that
+  ``env_method``/``get_attr``/``set_attr``/``env_is_wrapped`` send one
+  message per worker;
+* forwarding the seeds and options set through ``seed()``/``set_options()``
+  with each worker's ``reset``;
+* shutting the workers down.
+
+On the worker side ``start_worker_env`` builds the env and reports its spaces,
+and ``serve_worker`` answers the generic commands, leaving ``step`` and
+``reset`` to the transport.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+from typing import Any, Callable
+
+import gymnasium as gym
+import numpy as np
+from stable_baselines3.common.vec_env import DummyVecEnv, VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnvIndices
+
+
+def start_worker_env(remote, parent_remote, env_fn_wrapper: CloudpickleWrapper) -> VecEnv:
+    """Build the worker's env (a gymnasium env is wrapped in a ``DummyVecEnv``)
+    and send its ``(observation_space, action_space, num_envs)`` to the parent."""
+    parent_remote.close()
+    built = env_fn_wrapper.var()
+    env = built if isinstance(built, VecEnv) else DummyVecEnv([lambda: built])
+    remote.send((env.observation_space, env.action_space, env.num_envs))
+    return env
+
+
+def set_reset_arguments(env: VecEnv, reset_arguments: tuple[list, list]) -> None:
+    """Install the ``(seeds, options)`` sent with a ``reset`` for ``env``'s next reset."""
+    env._seeds, env._options = reset_arguments
+
+
+def serve_worker(remote, env: VecEnv, commands: dict[str, Callable[[Any], Any]]) -> None:
+    """Answer the parent's commands until ``close``, one reply per command.
+
+    :param commands: Transport-specific handlers (``step``, ``reset``, ...),
+        each returning the reply to send."""
+    while True:
+        try:
+            cmd, data = remote.recv()
+            if cmd in commands:
+                remote.send(commands[cmd](data))
+            elif cmd == "env_method":
+                method_name, args, kwargs, indices = data
+                remote.send(env.env_method(method_name, *args, indices=indices, **kwargs))
+            elif cmd == "get_attr":
+                remote.send(env.get_attr(*data))
+            elif cmd == "set_attr":
+                remote.send(env.set_attr(*data))
+            elif cmd == "is_wrapped":
+                remote.send(env.env_is_wrapped(*data))
+            elif cmd == "close":
+                env.close()
+                remote.close()
+                break
+            else:
+                raise NotImplementedError(f"`{cmd}` is not implemented in the worker")
+        except (EOFError, KeyboardInterrupt):
+            break
+
+
+class WorkerVecEnv(VecEnv):
+    """Base of the ``VecEnv``s whose worker processes each host a ``VecEnv``.
+
+    :param env_fns: One factory per worker process.
+    :param worker: Worker entry point ``worker(remote, parent_remote, env_fn_wrapper)``;
+        it must start with ``start_worker_env`` and end with ``serve_worker``.
+    :param start_method: ``multiprocessing`` start method. Defaults to
+        ``forkserver`` where available, else ``spawn`` (poke-env's event loop
+        thread does not survive ``fork``).
+    """
+
+    def __init__(self, env_fns: list[Callable[[], gym.Env | VecEnv]], worker: Callable, start_method: str | None = None):
+        self.waiting = False
+        self.closed = False
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in env_fns])
+        self.processes = []
+        for work_remote, remote, env_fn in zip(self.work_remotes, self.remotes, env_fns):
+            process = ctx.Process(target=worker, args=(work_remote, remote, CloudpickleWrapper(env_fn)), daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        spaces = [remote.recv() for remote in self.remotes]
+        observation_space, action_space, _ = spaces[0]
+        sizes = [n for _, _, n in spaces]
+        # Global env index i lives in worker _owners[i] at local index _locals[i].
+        self._owners = np.repeat(np.arange(len(sizes)), sizes)
+        self._locals = np.concatenate([np.arange(n) for n in sizes])
+        self._bounds = np.cumsum([0] + sizes)
+        n_envs = int(self._bounds[-1])
+        # VecEnv.__init__ already queries the workers (render modes).
+        self._connect_workers(observation_space, action_space, n_envs)
+        super().__init__(n_envs, observation_space, action_space)
+
+    def _connect_workers(self, observation_space: gym.spaces.Space, action_space: gym.spaces.Space, n_envs: int):
+        """Transport-specific handshake, after the workers reported their spaces and
+        before any command is sent."""
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        if self.waiting:
+            for remote in self.remotes:
+                remote.recv()
+        for remote in self.remotes:
+            remote.send(("close", None))
+        for process in self.processes:
+            process.join()
+        self.closed = True
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> list[Any]:
+        return self._call("get_attr", lambda local: (attr_name, local), indices)
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        self._call("set_attr", lambda local: (attr_name, value, local), indices)
+
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> list[Any]:
+        return self._call("env_method", lambda local: (method_name, method_args, method_kwargs, local), indices)
+
+    def env_is_wrapped(self, wrapper_class, indices: VecEnvIndices = None) -> list[bool]:
+        return self._call("is_wrapped", lambda local: (wrapper_class, local), indices)
+
+    def _worker_rows(self, w: int) -> slice:
+        """Global env indices hosted by worker ``w``."""
+        return slice(int(self._bounds[w]), int(self._bounds[w + 1]))
+
+    def _reset_arguments(self, w: int) -> tuple[list, list]:
+        """Worker ``w``'s share of the seeds and options set for the next reset."""
+        rows = self._worker_rows(w)
+        return self._seeds[rows], self._options[rows]
+
+    def _call(self, cmd: str, payload: Callable[[list[int]], tuple], indices: VecEnvIndices) -> list[Any]:
+        """Send ``cmd`` once to every worker owning one of ``indices``; results in ``indices`` order."""
+        indices = list(self._get_indices(indices))
+        by_worker: dict[int, list[int]] = {}
+        for i in indices:
+            by_worker.setdefault(int(self._owners[i]), []).append(i)
+        for w, owned in by_worker.items():
+            self.remotes[w].send((cmd, payload([int(self._locals[i]) for i in owned])))
+        results = {}
+        for w, owned in by_worker.items():
+            reply = self.remotes[w].recv()
+            if reply is not None:
+                results.update(zip(owned, reply))
+        return [results.get(i) for i in indices]
@@ -23,7 +23,7 @@ import torch
 import torch.nn as nn
 
 from env.battle_config import BattleConfig
-from env.states.state_utils import MAX_TEAM_SIZE, MAX_MOVES
+from env.states.state_utils import MAX_MOVES
 from .attention import CrossAttention
 from .mlp import build_mlp
 
@@ -64,6 +64,7 @@ class AttentionPointerExtractor(nn.Module):
         super().__init__()
 
         # Cache slicing constants from the config as instance attrs for performance.
+        self._layout             = battle_config.layout
         self._arena_opponent_len = battle_config.arena_opponent_len
         self._my_pokemon_len     = battle_config.my_pokemon_len
         self._context_len        = battle_config.context_len
@@ -98,12 +99,10 @@ class AttentionPointerExtractor(nn.Module):
 
     def _slice_observation(self, obs: torch.Tensor):
         B = obs.shape[0]
-        arena_opponent_vector = obs[:, :self._arena_opponent_len]                     # (B, arena_opp_len)
-        my_pokemon_vector     = obs[:, self._arena_opponent_len:-MAX_TEAM_SIZE]       # (B, 6*my_pokemon_len)
-        alive_vector          = obs[:, -MAX_TEAM_SIZE:]                               # (B, 6)
-
-        # Reshape into per-slot blocks — no loop needed
-        my_team_flat = my_pokemon_vector.reshape(B, MAX_TEAM_SIZE, self._my_pokemon_len)  # (B, 6, my_pokemon_len)
+        view = self._layout.view(obs)
+        arena_opponent_vector = view.arena_opponent                                   # (B, arena_opp_len)
+        alive_vector          = view.my_alive                                         # (B, 6)
+        my_team_flat          = view.my_team.data                                     # (B, 6, my_pokemon_len)
 
         # Zero fainted slots in one vectorised op
         is_fainted = (alive_vector == -1).unsqueeze(-1)   # (B, 6, 1)
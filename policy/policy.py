@@ -29,6 +29,7 @@ from stable_baselines3.common.type_aliases import PyTorchObs, Schedule
 from .constants import N_SWITCH_ACTIONS
 from .extractor import AttentionPointerExtractor, ExtractorOutput
 from env.battle_config import BattleConfig
+from env.observation_quantizer import quantization_table
 
 
 class AttentionPointerPolicy(MaskableActorCriticPolicy):
@@ -65,6 +66,11 @@ class AttentionPointerPolicy(MaskableActorCriticPolicy):
         kwargs.setdefault("net_arch", [])   # disable SB3's default MLP extractor
         super().__init__(observation_space, action_space, lr_schedule, **kwargs)
 
+        # uint8 observations (obs_dtype="uint8") are dequantised on the fly.
+        zero_point, divisor = quantization_table(self._battle_config)
+        self.register_buffer("obs_zero_point", torch.as_tensor(zero_point), persistent=False)
+        self.register_buffer("obs_divisor", torch.as_tensor(divisor), persistent=False)
+
     # ── extractor ──────────────────────────────────────────────────────────
 
     def _build_mlp_extractor(self) -> None:
@@ -213,5 +219,7 @@ class AttentionPointerPolicy(MaskableActorCriticPolicy):
 
         if not isinstance(obs_tensor, torch.Tensor):
             obs_tensor = torch.as_tensor(obs_tensor, device=self.device)
+        if obs_tensor.dtype == torch.uint8:
+            obs_tensor = (obs_tensor.float() - self.obs_zero_point) / self.obs_divisor
         return self.mlp_extractor(obs_tensor.float())
 
@@ -0,0 +1,290 @@
+"""
+bench_encoders.py  --  Micro-benchmarks for the observation / reward pipeline.
+
+Drives the per-turn hot path (``BattleStateGen1``, the encoder compiled from
+``GEN1_FEATURE_SPEC``, ``TeamState``, ``MoveState.to_array``,
+``ActionMaskGen1`` and ``reward.get_state_value``)
+over synthetic early-, mid- and late-game 6v6 battles built by
+``tests.conftest.make_synthetic_battle``.  No Showdown server is needed.
+
+For every (stage, component) pair it reports:
+
+* ``ns_per_turn``              median wall time of one turn
+* ``ns_per_turn_min``          best repeat, least affected by noise
+* ``alloc_bytes_per_turn``     mean transient allocation high-water mark of one turn (tracemalloc)
+* ``peak_bytes``               largest such high-water mark over all battles of the stage
+* ``retained_blocks_per_turn`` net memory blocks still alive per turn (non-zero means growth / leaks)
+
+Usage
+-----
+From the repo root:
+
+    # Run and save
+    python -m scripts.bench_encoders --out bench/HEAD.json
+
+    # Compare with an earlier run; exits 1 if any component got slower than --threshold
+    python -m scripts.bench_encoders --out bench/new.json --compare bench/HEAD.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import median
+
+import numpy as np
+from poke_env.environment import SinglesEnv
+
+from env.action_mask_gen_1 import ActionMaskGen1
+from env.reward import get_state_value
+from env.states.gen1.battle_state_gen_1 import BattleStateGen1
+from env.states.gen1.feature_spec_gen1 import GEN1_FEATURE_SPEC
+from env.states.gen1.my_pokemon_state_gen_1 import MyPokemonStateGen1
+from env.states.move_state import MoveState
+from env.states.team_state import TeamState
+from tests.conftest import SYNTHETIC_STAGES, make_synthetic_battles
+
+DEFAULT_SEEDS = 8
+DEFAULT_REPEATS = 5
+DEFAULT_NUMBER = 20
+DEFAULT_THRESHOLD = 1.2
+
+# ------------------------------------------------------------------------------
+# Components — each runs one turn's worth of work for a single battle
+# ------------------------------------------------------------------------------
+
+_ACTION_MASK = ActionMaskGen1()
+_COMPILED = GEN1_FEATURE_SPEC.compile()
+
+
+def _battle_state(battle):
+    BattleStateGen1(battle).to_array()
+
+
+def _compiled_state(battle):
+    _COMPILED(battle)
+
+
+def _team_state(battle):
+    team = TeamState(list(battle.team.values()), MyPokemonStateGen1)
+    team.encode_moves(battle.opponent_active_pokemon, gen=1, available_moves=battle.available_moves)
+    team.to_array()
+
+
+def _move_state(battle):
+    attacking = tuple(battle.active_pokemon.types)
+    defending = tuple(battle.opponent_active_pokemon.types)
+    for move in battle.active_pokemon.moves.values():
+        MoveState(move, defending, attacking, 1).to_array()
+
+
+def _action_mask(battle):
+    _ACTION_MASK.set(SinglesEnv.get_action_mask(battle))
+
+
+def _reward(battle):
+    get_state_value(battle)
+
+
+COMPONENTS = {
+    "battle_state": _battle_state,
+    "compiled_state": _compiled_state,
+    "team_state": _team_state,
+    "move_state": _move_state,
+    "action_mask": _action_mask,
+    "reward": _reward,
+}
+
+# ------------------------------------------------------------------------------
+# Measurement
+# ------------------------------------------------------------------------------
+
+def _time_per_turn(fn, battles, repeats: int, number: int) -> list[float]:
+    """ns per turn for each of ``repeats`` runs of ``number`` passes over ``battles``."""
+    for b in battles:                       # warm caches before timing
+        fn(b)
+    turns = number * len(battles)
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            for b in battles:
+                fn(b)
+        samples.append((time.perf_counter_ns() - start) / turns)
+    return samples
+
+
+def _memory_per_turn(fn, battles, number: int) -> dict:
+    """Transient and retained memory per turn, measured under tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        peaks = []
+        for b in battles:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            fn(b)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - base)
+    finally:
+        tracemalloc.stop()
+
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    for _ in range(number):
+        for b in battles:
+            fn(b)
+    gc.collect()
+    retained = sys.getallocatedblocks() - blocks
+    return {
+        "alloc_bytes_per_turn": float(np.mean(peaks)),
+        "peak_bytes": int(max(peaks)),
+        "retained_blocks_per_turn": retained / (number * len(battles)),
+    }
+
+
+def run_benchmarks(
+        seeds: int = DEFAULT_SEEDS,
+        repeats: int = DEFAULT_REPEATS,
+        number: int = DEFAULT_NUMBER,
+        stages=SYNTHETIC_STAGES,
+        components: dict | None = None,
+) -> dict:
+    """Run every component over every stage and return the JSON-ready result dict.
+
+    :param seeds: Synthetic battles per stage.
+    :param repeats: Timed repeats; the median is reported.
+    :param number: Passes over the battles per repeat.
+    :param stages: Game stages to build battles for.
+    :param components: ``{name: fn(battle)}``; defaults to ``COMPONENTS``.
+    :returns: ``{"meta": {...}, "results": {stage: {component: metrics}}}``."""
+    components = components if components is not None else COMPONENTS
+    battles = make_synthetic_battles(seeds, stages)
+    results = {}
+    for stage, stage_battles in battles.items():
+        results[stage] = {}
+        for name, fn in components.items():
+            samples = _time_per_turn(fn, stage_battles, repeats, number)
+            results[stage][name] = {
+                "ns_per_turn": median(samples),
+                "ns_per_turn_min": min(samples),
+                **_memory_per_turn(fn, stage_battles, number),
+            }
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seeds": seeds,
+            "repeats": repeats,
+            "number": number,
+        },
+        "results": results,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# ------------------------------------------------------------------------------
+# Reporting
+# ------------------------------------------------------------------------------
+
+def find_regressions(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """(stage, component) pairs whose median ns/turn grew by more than ``threshold``×.
+
+    Pairs missing from either run are ignored."""
+    regressions = []
+    for stage, comps in current["results"].items():
+        for name, metrics in comps.items():
+            old = baseline.get("results", {}).get(stage, {}).get(name)
+            if old is None or old["ns_per_turn"] <= 0:
+                continue
+            ratio = metrics["ns_per_turn"] / old["ns_per_turn"]
+            if ratio > threshold:
+                regressions.append({
+                    "stage": stage, "component": name,
+                    "old_ns": old["ns_per_turn"], "new_ns": metrics["ns_per_turn"], "ratio": ratio,
+                })
+    return regressions
+
+
+def format_report(report: dict, baseline: dict | None = None) -> str:
+    """Plain-text table of a run, with ratios against ``baseline`` when given."""
+    header = f"{'stage':<6} {'component':<14} {'ns/turn':>11} {'alloc B/turn':>13} {'peak B':>9} {'retained':>9}"
+    if baseline is not None:
+        header += f" {'vs base':>8}"
+    lines = [header, "-" * len(header)]
+    for stage, comps in report["results"].items():
+        for name, m in comps.items():
+            line = (
+                f"{stage:<6} {name:<14} {m['ns_per_turn']:>11,.0f} {m['alloc_bytes_per_turn']:>13,.0f}"
+                f" {m['peak_bytes']:>9,} {m['retained_blocks_per_turn']:>9.2f}"
+            )
+            if baseline is not None:
+                old = baseline.get("results", {}).get(stage, {}).get(name)
+                line += f" {m['ns_per_turn'] / old['ns_per_turn']:>7.2f}x" if old else f" {'-':>8}"
+            lines.append(line)
+    return "\n".join(lines)
+
+# ------------------------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------------------------
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Micro-benchmark the observation encoders on synthetic battles.")
+    parser.add_argument("--out", type=str, default=None, help="Write results as JSON to this path.")
+    parser.add_argument("--compare", type=str, default=None, help="Earlier JSON run to compare against.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown ratio above which a component counts as a regression.")
+    parser.add_argument("--seeds", type=int, default=DEFAULT_SEEDS, help="Synthetic battles per stage.")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--number", type=int, default=DEFAULT_NUMBER, help="Passes over the battles per repeat.")
+    parser.add_argument("--stages", nargs="+", default=list(SYNTHETIC_STAGES), choices=SYNTHETIC_STAGES)
+    parser.add_argument("--components", nargs="+", default=list(COMPONENTS), choices=list(COMPONENTS))
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    report = run_benchmarks(
+        seeds=args.seeds,
+        repeats=args.repeats,
+        number=args.number,
+        stages=args.stages,
+        components={name: COMPONENTS[name] for name in args.components},
+    )
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print(format_report(report, baseline))
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2))
+        print(f"\nSaved results to {out}")
+
+    if baseline is not None:
+        regressions = find_regressions(baseline, report, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['stage']}/{r['component']}: "
+                  f"{r['old_ns']:,.0f} -> {r['new_ns']:,.0f} ns/turn ({r['ratio']:.2f}x)")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, PropertyMock, patch
 
 import numpy as np
 
@@ -134,6 +134,29 @@ class TestPolicyPlayer(unittest.TestCase):
         model.predict.assert_not_called()
         mock_action_to_order.assert_called_once_with(np.int64(-2), battle, strict=False)
 
+    @patch("agents.policy_player.Player.username", new_callable=PropertyMock, return_value="agent")
+    @patch("agents.policy_player.Player.__init__", return_value=None)
+    @patch("agents.policy_player.MaskablePPO.load")
+    @patch("agents.policy_player.ProtocolLogRecorder")
+    def test_protocol_log_records_chosen_orders(self, mock_recorder, mock_load, _mock_player_init, _username):
+        battle = MagicMock(battle_tag="battle-gen1ou-1")
+        battle._wait = True
+        battle.valid_orders = []
+        order = MagicMock(message="/choose default")
+
+        player = PolicyPlayer(
+            model_path="models\\6v6_gen1_1M_meta.zip",
+            battle_config=MagicMock(),
+            verbose=False,
+            protocol_log="agent.log.gz",
+        )
+
+        with patch("agents.policy_player.SinglesEnv.action_to_order", return_value=order):
+            player.choose_move(battle)
+
+        mock_recorder.assert_called_once_with("agent.log.gz", "agent")
+        mock_recorder.return_value.record_choice.assert_called_once_with("battle-gen1ou-1", "/choose default")
+
 
 if __name__ == "__main__":
     unittest.main()
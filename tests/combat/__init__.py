@@ -0,0 +1 @@
+"""__init__ file for combat tests."""
@@ -0,0 +1,83 @@
+"""
+Tests for the dense type-effectiveness helpers in combat.combat_utils.
+
+Covers:
+  1. type_effectiveness_tensor — shape, read-only, agrees with poke-env's chart
+  2. damage_multiplier         — scalar lookup incl. missing / unknown types
+  3. damage_multipliers        — (moves × defenders) gather in one call
+"""
+import unittest
+
+import numpy as np
+from poke_env.battle import PokemonType as T
+
+from combat.combat_utils import (
+    ALL_TYPES,
+    N_TYPES,
+    NO_TYPE,
+    damage_multiplier,
+    damage_multipliers,
+    type_chart_for_gen,
+    type_effectiveness_tensor,
+    type_index,
+)
+
+
+class TestTypeEffectivenessTensor(unittest.TestCase):
+
+    def test_shape(self):
+        self.assertEqual(type_effectiveness_tensor(1).shape, (N_TYPES, N_TYPES + 1, N_TYPES + 1))
+
+    def test_read_only(self):
+        with self.assertRaises(ValueError):
+            type_effectiveness_tensor(1)[0, 0, 0] = 3.0
+
+    def test_matches_poke_env_gen1(self):
+        chart = type_chart_for_gen(1)
+        charted = [t for t in ALL_TYPES if t.name in chart]
+        for attack in ALL_TYPES:
+            for d1 in charted:
+                for d2 in charted + [None]:
+                    expected = attack.damage_multiplier(d1, d2, type_chart=chart)
+                    types = (d1,) if d2 is None else (d1, d2)
+                    self.assertEqual(damage_multiplier(attack, types, 1), expected, msg=(attack, d1, d2))
+
+    def test_gen1_ghost_does_not_hit_psychic(self):
+        # Gen 1 chart quirk must come through the tensor unchanged.
+        self.assertEqual(damage_multiplier(T.GHOST, (T.PSYCHIC,), 1), 0.0)
+
+
+class TestScalarLookup(unittest.TestCase):
+
+    def test_none_and_unknown_are_neutral(self):
+        self.assertEqual(type_index(None), NO_TYPE)
+        self.assertEqual(type_index("not-a-type"), NO_TYPE)
+        self.assertEqual(damage_multiplier(None, (T.WATER,), 1), 1.0)
+        self.assertEqual(damage_multiplier(T.WATER, (), 1), 1.0)
+
+    def test_none_second_type(self):
+        self.assertEqual(damage_multiplier(T.WATER, (T.FIRE, None), 1), 2.0)
+
+
+class TestBatchedLookup(unittest.TestCase):
+
+    def test_moves_by_defenders(self):
+        move_types = [T.ELECTRIC, T.GROUND, T.ICE, None]
+        defenders = [
+            (T.WATER, T.FLYING), (T.GROUND, T.ROCK), (T.GRASS, T.POISON),
+            (T.NORMAL,), (T.DRAGON,), (T.GHOST, T.POISON),
+        ]
+        out = damage_multipliers(move_types, defenders, 1)
+        self.assertEqual(out.shape, (4, 6))
+        self.assertEqual(out.dtype, np.float32)
+        for i, mt in enumerate(move_types):
+            for j, types in enumerate(defenders):
+                self.assertEqual(out[i, j], damage_multiplier(mt, types, 1))
+
+    def test_empty_inputs(self):
+        self.assertEqual(damage_multipliers([], [(T.WATER,)], 1).shape, (0, 1))
+        self.assertEqual(damage_multipliers([T.WATER], [], 1).shape, (1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+Tests for the vectorized Gen 1 battle engine in combat.gen1_batch_engine.
+
+Covers:
+  1. Teams      — stats shared with the scalar engine, random roster teams
+  2. Decisions  — action masks, illegal actions, forced switches
+  3. Mechanics  — immunity, fixed damage, status, recharge, Explosion
+  4. Battles    — every battle finishes with a consistent winner, seeded runs repeat
+"""
+import unittest
+
+import numpy as np
+
+from combat.gen1_batch_engine import ACCURACY, PAR, SPECIES, STATS, Gen1BatchEngine, MoveTableGen1, team_arrays
+from combat.gen1_engine import Gen1Engine
+
+TAUROS = "Tauros||||bodyslam,hyperbeam,earthquake,blizzard|||||||"
+CHANSEY = "Chansey||||softboiled,icebeam,thunderwave,seismictoss|||||||"
+GENGAR = "Gengar||||hypnosis,thunderbolt,nightshade,explosion|||||||"
+GOLEM = "Golem||||earthquake,rockslide,explosion,bodyslam|||||||"
+
+
+def _engine(team1=TAUROS, team2=CHANSEY, n=1, seed=0) -> Gen1BatchEngine:
+    engine = Gen1BatchEngine(n, seed=seed)
+    engine.start(np.arange(n), [(team1, team2)] * n)
+    return engine
+
+
+def _step(engine: Gen1BatchEngine, p1: int, p2: int):
+    engine.step(np.tile([p1, p2], (engine.n, 1)))
+
+
+def _random_actions(engine: Gen1BatchEngine, rng: np.random.Generator) -> np.ndarray:
+    actions = []
+    for side in (0, 1):
+        mask = engine.action_masks(side)
+        actions.append(np.where(mask, rng.random(mask.shape), -1).argmax(axis=1))
+    return np.stack(actions, axis=1)
+
+
+# ---------------------------------------------------------------------------
+# 1. Teams
+# ---------------------------------------------------------------------------
+
+class TestTeams(unittest.TestCase):
+
+    def test_stats_match_the_scalar_engine(self):
+        engine = _engine()
+        chansey = Gen1Engine(TAUROS, CHANSEY).sides["p2"].mon
+        self.assertEqual(engine.max_hp[0, 1, 0], chansey.max_hp)
+        self.assertEqual(engine.stats[0, 1, 0].tolist(), [chansey.stats[s] for s in STATS])
+        self.assertEqual(engine.pp[0, 1, 0].tolist(), chansey.max_pp)
+        self.assertEqual(SPECIES[engine.species[0, 1, 0]], "chansey")
+
+    def test_team_arrays_are_cached_and_read_only(self):
+        team = team_arrays(TAUROS)
+        self.assertIs(team, team_arrays(TAUROS))
+        self.assertEqual(team.present.tolist(), [True] + [False] * 5)
+        with self.assertRaises(ValueError):
+            team.max_hp[0] = 1
+
+    def test_random_roster_teams(self):
+        engine = Gen1BatchEngine(8, seed=1)
+        engine.start(np.arange(8))
+        self.assertTrue(engine.present.all())
+        for b in range(8):
+            for side in (0, 1):
+                self.assertEqual(len(set(engine.species[b, side])), 6)
+        self.assertEqual(engine.turn.tolist(), [1] * 8)
+        self.assertEqual(engine.seen[:, :, 0].tolist(), [[0, 0]] * 8)
+
+
+# ---------------------------------------------------------------------------
+# 2. Decisions
+# ---------------------------------------------------------------------------
+
+class TestDecisions(unittest.TestCase):
+
+    def test_turn_one_masks(self):
+        engine = _engine(team1=f"{TAUROS}]{GENGAR}")
+        self.assertEqual(np.flatnonzero(engine.action_masks(0)[0]).tolist(), [1, 6, 7, 8, 9])
+        self.assertEqual(np.flatnonzero(engine.action_masks(1)[0]).tolist(), [6, 7, 8, 9])
+
+    def test_illegal_actions_raise(self):
+        engine = _engine()
+        with self.assertRaises(ValueError):
+            _step(engine, 1, 6)
+        with self.assertRaises(ValueError):
+            _step(engine, 10, 6)
+
+    def test_forced_switch_after_faint(self):
+        engine = _engine(team2=f"{GENGAR}]{CHANSEY}", seed=3)
+        engine.hp[0, 1, 0] = 1
+        _step(engine, 9, 7)
+        self.assertTrue(engine.must_switch[0, 1])
+        self.assertFalse(engine.action_masks(0)[0].any())
+        self.assertEqual(np.flatnonzero(engine.action_masks(1)[0]).tolist(), [1])
+        self.assertEqual(engine.turn[0], 1)
+        engine.step(np.array([[-1, 1]]))
+        self.assertEqual(engine.active[0, 1], 1)
+        self.assertEqual(engine.turn[0], 2)
+        self.assertEqual(engine.seen[0, 1].tolist(), [0, 1, -1, -1, -1, -1])
+
+
+# ---------------------------------------------------------------------------
+# 3. Mechanics
+# ---------------------------------------------------------------------------
+
+class TestMechanics(unittest.TestCase):
+
+    def test_normal_moves_cannot_hit_ghosts(self):
+        engine = _engine(team2=GENGAR, n=16)
+        _step(engine, 6, 8)
+        self.assertTrue((engine.hp[:, 1, 0] == engine.max_hp[:, 1, 0]).all())
+
+    def test_seismic_toss_deals_level_damage(self):
+        engine = _engine(n=16)
+        _step(engine, 8, 9)
+        self.assertTrue((engine.max_hp[:, 0, 0] - engine.hp[:, 0, 0] == 100).all())
+        self.assertTrue((engine.pp[:, 1, 0, 3] == engine.max_pp[:, 1, 0, 3] - 1).all())
+        self.assertTrue((engine.move_seen[:, 1, 0].tolist() == np.array([-1, -1, -1, 0])).all())
+
+    def test_thunder_wave_paralyzes(self):
+        engine = _engine(n=16)
+        _step(engine, 8, 8)
+        self.assertTrue((engine.status[:, 0, 0] == PAR).all())
+
+    def test_hyper_beam_recharges_unless_it_kos(self):
+        engine = _engine(n=16, seed=5)
+        engine.boosts[:, 0, ACCURACY] = 6
+        _step(engine, 7, 6)
+        survived = engine.hp[:, 1, 0] > 0
+        self.assertTrue(survived.any() and not survived.all())
+        np.testing.assert_array_equal(engine.recharge[:, 0], survived)
+        recharging = int(np.flatnonzero(survived)[0])
+        self.assertEqual(np.flatnonzero(engine.action_masks(0)[recharging]).tolist(), [6])
+
+    def test_explosion_faints_the_user_even_against_a_ghost(self):
+        engine = _engine(team1=f"{GOLEM}]{TAUROS}", team2=GENGAR)
+        _step(engine, 8, 8)
+        self.assertEqual(engine.hp[0, 0, 0], 0)
+        self.assertEqual(engine.hp[0, 1, 0], engine.max_hp[0, 1, 0])
+        self.assertTrue(engine.must_switch[0, 0])
+
+    def test_move_table(self):
+        moves = MoveTableGen1.shared()
+        bodyslam, thunderwave = moves.index["bodyslam"], moves.index["thunderwave"]
+        self.assertTrue(moves.damaging[bodyslam])
+        self.assertEqual((moves.sec_chance[bodyslam], moves.sec_status[bodyslam]), (30, PAR))
+        self.assertFalse(moves.damaging[thunderwave])
+        self.assertEqual(moves.status[thunderwave], PAR)
+        self.assertFalse(moves.foe_effect[moves.index["substitute"]])
+
+
+# ---------------------------------------------------------------------------
+# 4. Battles
+# ---------------------------------------------------------------------------
+
+class TestBattles(unittest.TestCase):
+
+    def _play(self, seed: int) -> Gen1BatchEngine:
+        engine = Gen1BatchEngine(64, seed=seed)
+        engine.start(np.arange(64))
+        rng = np.random.default_rng(seed)
+        while not engine.finished.all():
+            engine.step(_random_actions(engine, rng))
+        return engine
+
+    def test_random_battles_finish(self):
+        engine = self._play(0)
+        defeated = ~(engine.hp > 0).any(axis=2)
+        for b in range(engine.n):
+            winner = engine.winner[b]
+            if winner >= 0:
+                self.assertTrue(defeated[b, 1 - winner])
+                self.assertFalse(defeated[b, winner])
+            else:
+                self.assertTrue(defeated[b].all() or engine.turn[b] > engine.max_turns)
+
+    def test_seeded_battles_are_reproducible(self):
+        first, second = self._play(7), self._play(7)
+        np.testing.assert_array_equal(first.turn, second.turn)
+        np.testing.assert_array_equal(first.hp, second.hp)
+
+
+if __name__ == "__main__":
+    unittest.main()
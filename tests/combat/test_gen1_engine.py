@@ -0,0 +1,212 @@
+"""
+Tests for the in-process Gen 1 battle engine in combat.gen1_engine.
+
+Covers:
+  1. Teams      — Gen 1 stats from packed sets, random roster teams
+  2. Protocol   — preamble, HP strings per side, requests
+  3. Decisions  — validation, forfeit, forced switches
+  4. Mechanics  — damage, immunity, status, recharge, full battles to the end
+"""
+import unittest
+
+import numpy as np
+
+from combat.gen1_engine import Gen1Engine, random_team
+
+TAUROS = "Tauros||||bodyslam,hyperbeam,earthquake,blizzard|||||||"
+CHANSEY = "Chansey||||softboiled,icebeam,thunderwave,seismictoss|||||||"
+GENGAR = "Gengar||||hypnosis,thunderbolt,nightshade,explosion|||||||"
+
+
+def _engine(team1=TAUROS, team2=CHANSEY, seed=0) -> Gen1Engine:
+    engine = Gen1Engine(team1, team2, usernames=("alice", "bob"), seed=seed)
+    engine.start()
+    return engine
+
+
+def _play_out(engine: Gen1Engine, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    while not engine.finished:
+        for role in engine.pending:
+            request = engine.request(role)
+            if "forceSwitch" in request:
+                engine.choose(role, "default")
+            else:
+                moves = [i for i, m in enumerate(request["active"][0]["moves"]) if not m["disabled"]]
+                engine.choose(role, f"move {rng.choice(moves) + 1}")
+
+
+# ---------------------------------------------------------------------------
+# 1. Teams
+# ---------------------------------------------------------------------------
+
+class TestTeams(unittest.TestCase):
+
+    def test_gen1_stats(self):
+        chansey = _engine().sides["p2"].mon
+        self.assertEqual(chansey.max_hp, 703)
+        self.assertEqual(chansey.stats, {"atk": 108, "def": 108, "spc": 308, "spe": 198})
+        self.assertEqual(chansey.max_pp, [16, 16, 32, 32])
+
+    def test_level_and_nickname(self):
+        engine = _engine(team1="Bull|Tauros|||bodyslam||||||88|")
+        bull = engine.sides["p1"].mon
+        self.assertEqual((bull.name, bull.species, bull.level), ("Bull", "tauros", 88))
+        self.assertIn("|switch|p1a: Bull|Tauros, L88|", "\n".join(engine.messages("p1")))
+
+    def test_random_team(self):
+        engine = Gen1Engine(random_team(np.random.default_rng(1)), None, seed=1)
+        for side in engine.sides.values():
+            self.assertEqual(len(side.team), 6)
+            self.assertEqual(len({mon.species for mon in side.team}), 6)
+
+
+# ---------------------------------------------------------------------------
+# 2. Protocol
+# ---------------------------------------------------------------------------
+
+class TestProtocol(unittest.TestCase):
+
+    def test_preamble(self):
+        lines = _engine().messages("p1")
+        self.assertEqual(lines[:2], ["|player|p1|alice|", "|player|p2|bob|"])
+        self.assertIn("|gen|1", lines)
+        self.assertEqual(lines[-1], "|turn|1")
+
+    def test_hp_is_exact_for_own_side_only(self):
+        engine = _engine()
+        self.assertIn("|switch|p2a: Chansey|Chansey|703/703", engine.messages("p2"))
+        self.assertIn("|switch|p2a: Chansey|Chansey|100/100", engine.messages("p1"))
+
+    def test_move_request(self):
+        request = _engine().request("p1")
+        moves = request["active"][0]["moves"]
+        self.assertEqual([m["id"] for m in moves], ["bodyslam", "hyperbeam", "earthquake", "blizzard"])
+        self.assertEqual(moves[1], {
+            "move": "Hyper Beam", "id": "hyperbeam", "pp": 8, "maxpp": 8,
+            "target": "normal", "disabled": False,
+        })
+        self.assertTrue(request["side"]["pokemon"][0]["active"])
+
+
+# ---------------------------------------------------------------------------
+# 3. Decisions
+# ---------------------------------------------------------------------------
+
+class TestDecisions(unittest.TestCase):
+
+    def test_turn_resolves_once_both_sides_chose(self):
+        engine = _engine()
+        engine.choose("p1", "move 1")
+        self.assertEqual(engine.pending, ["p2"])
+        engine.choose("p2", "move 4")
+        self.assertEqual(engine.turn, 2)
+        self.assertEqual(engine.pending, ["p1", "p2"])
+
+    def test_invalid_choices(self):
+        engine = _engine()
+        for choice in ("move 5", "switch 1", "dance"):
+            with self.assertRaises(ValueError):
+                engine.choose("p1", choice)
+        engine.choose("p1", "move 1")
+        with self.assertRaises(ValueError):
+            engine.choose("p1", "move 1")
+
+    def test_forfeit(self):
+        engine = _engine()
+        engine.choose("p2", "forfeit")
+        self.assertTrue(engine.finished)
+        self.assertEqual(engine.winner, "p1")
+        self.assertEqual(engine.messages("p2")[-1], "|win|alice")
+        self.assertIsNone(engine.request("p1"))
+
+    def test_forced_switch_after_faint(self):
+        engine = _engine(team1=TAUROS, team2=f"{GENGAR}]{CHANSEY}", seed=3)
+        engine.sides["p2"].mon.hp = 1
+        engine.choose("p1", "move 4")
+        engine.choose("p2", "move 2")
+        self.assertEqual(engine.pending, ["p2"])
+        self.assertTrue(engine.request("p2")["forceSwitch"][0])
+        self.assertTrue(engine.request("p1")["wait"])
+        engine.choose("p2", "switch 2")
+        self.assertEqual(engine.sides["p2"].mon.species, "chansey")
+        self.assertEqual(engine.turn, 2)
+
+
+# ---------------------------------------------------------------------------
+# 4. Mechanics
+# ---------------------------------------------------------------------------
+
+class TestMechanics(unittest.TestCase):
+
+    def test_normal_moves_cannot_hit_ghosts(self):
+        engine = _engine(team2=GENGAR)
+        engine.choose("p1", "move 1")
+        engine.choose("p2", "move 3")
+        self.assertIn("|-immune|p2a: Gengar", engine.messages("p1"))
+        self.assertEqual(engine.sides["p2"].mon.hp, engine.sides["p2"].mon.max_hp)
+
+    def test_seismic_toss_deals_level_damage(self):
+        engine = _engine()
+        engine.choose("p1", "move 3")
+        engine.choose("p2", "move 4")
+        tauros = engine.sides["p1"].mon
+        self.assertEqual(tauros.max_hp - tauros.hp, 100)
+
+    def test_thunder_wave_paralyzes(self):
+        engine = _engine()
+        engine.choose("p1", "move 3")
+        engine.choose("p2", "move 3")
+        self.assertEqual(engine.sides["p1"].mon.status, "par")
+        self.assertLess(engine.sides["p1"].mon.effective("spe"), engine.sides["p1"].mon.stats["spe"])
+
+    def test_hyper_beam_recharges_unless_it_kos(self):
+        engine = _engine(seed=5)
+        engine.sides["p1"].mon.boosts["accuracy"] = 6
+        engine.choose("p1", "move 2")
+        engine.choose("p2", "move 3")
+        self.assertEqual(engine.move_ids("p1"), ["recharge"])
+        engine.choose("p1", "move 1")
+        engine.choose("p2", "move 2")
+        self.assertIn("|cant|p1a: Tauros|recharge", engine.messages("p1"))
+        self.assertEqual(engine.move_ids("p1"), ["bodyslam", "hyperbeam", "earthquake", "blizzard"])
+
+    def test_recharging_pokemon_cannot_switch(self):
+        engine = _engine(team1=f"{TAUROS}]{GENGAR}", seed=5)
+        engine.sides["p1"].mon.boosts["accuracy"] = 6
+        engine.choose("p1", "move 2")
+        engine.choose("p2", "move 1")
+        self.assertTrue(engine.request("p1")["active"][0]["trapped"])
+        with self.assertRaises(ValueError):
+            engine.choose("p1", "switch 2")
+
+    def test_explosion_faints_the_user_even_against_a_ghost(self):
+        engine = _engine(team1=f"{GENGAR}]{TAUROS}", team2=GENGAR)
+        engine.choose("p1", "move 4")
+        engine.choose("p2", "move 3")
+        self.assertEqual(engine.sides["p1"].mon.hp, 0)
+        self.assertEqual(engine.sides["p2"].mon.hp, engine.sides["p2"].mon.max_hp)
+        self.assertEqual(engine.pending, ["p1"])
+
+    def test_random_battles_finish(self):
+        for seed in range(20):
+            engine = Gen1Engine(None, None, seed=seed)
+            engine.start()
+            _play_out(engine, seed)
+            self.assertIn(engine.winner, ("p1", "p2", None))
+            if engine.winner is not None:
+                loser = engine.sides["p2" if engine.winner == "p1" else "p1"]
+                self.assertTrue(loser.defeated)
+
+    def test_seeded_battles_are_reproducible(self):
+        logs = []
+        for _ in range(2):
+            engine = Gen1Engine(None, None, seed=7)
+            engine.start()
+            _play_out(engine, 7)
+            logs.append(engine.messages("p1"))
+        self.assertEqual(logs[0], logs[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 """Shared pytest configuration and fixtures for all tests."""
 import json
+import logging
+import random
 from unittest.mock import MagicMock, patch
 from dataclasses import dataclass
 
@@ -137,3 +139,124 @@ class MockTeamGenerator:
         """Reset the generator index."""
         self.index = 0
         self.reset_count += 1
+
+
+# ===========================================================================
+# Synthetic Battles
+# ===========================================================================
+# Real poke-env ``Battle`` objects driven through the Showdown protocol parser
+# offline — no server needed.  Used by state-encoder tests and by
+# ``scripts/bench_encoders.py``.
+
+SYNTHETIC_STAGES = ("early", "mid", "late")
+
+# Gen 1 OU roster with more candidate moves than slots, so seeds vary move sets.
+SYNTHETIC_ROSTER = {
+    "tauros":    ["bodyslam", "hyperbeam", "blizzard", "earthquake", "thunderbolt", "fireblast"],
+    "chansey":   ["softboiled", "icebeam", "thunderwave", "seismictoss", "thunderbolt", "reflect"],
+    "alakazam":  ["psychic", "recover", "thunderwave", "seismictoss", "reflect", "counter"],
+    "snorlax":   ["bodyslam", "amnesia", "rest", "selfdestruct", "blizzard", "hyperbeam"],
+    "starmie":   ["surf", "thunderbolt", "recover", "thunderwave", "blizzard", "psychic"],
+    "exeggutor": ["sleeppowder", "psychic", "explosion", "stunspore", "megadrain", "doubleedge"],
+    "zapdos":    ["thunderbolt", "drillpeck", "thunderwave", "agility", "thunder", "reflect"],
+    "rhydon":    ["earthquake", "rockslide", "bodyslam", "substitute", "hyperbeam", "fireblast"],
+    "jynx":      ["lovelykiss", "blizzard", "psychic", "rest", "counter", "seismictoss"],
+    "gengar":    ["hypnosis", "thunderbolt", "nightshade", "explosion", "megadrain", "psychic"],
+    "lapras":    ["blizzard", "thunderbolt", "sing", "confuseray", "bodyslam", "hyperbeam"],
+    "cloyster":  ["clamp", "blizzard", "explosion", "rest", "surf", "hyperbeam"],
+    "slowbro":   ["amnesia", "surf", "rest", "thunderwave", "psychic", "blizzard"],
+    "golem":     ["earthquake", "rockslide", "explosion", "bodyslam", "substitute", "counter"],
+}
+
+_SYNTHETIC_TURN = {"early": 1, "mid": 12, "late": 40}
+_SYNTHETIC_OPP_SEEN = {"early": 1, "mid": 4, "late": 6}
+
+
+def _synthetic_team(rng: random.Random) -> list[tuple[str, list[str]]]:
+    species = rng.sample(sorted(SYNTHETIC_ROSTER), 6)
+    return [(s, rng.sample(SYNTHETIC_ROSTER[s], 4)) for s in species]
+
+
+def _synthetic_request(team, active, hp, status, disabled) -> dict:
+    pokemon = []
+    for i, (species, moves) in enumerate(team):
+        condition = "0 fnt" if hp[i] == 0 else f"{hp[i]}/350" + (f" {status[i]}" if status[i] else "")
+        pokemon.append({
+            "ident": f"p1: {species.capitalize()}",
+            "details": f"{species.capitalize()}, L100",
+            "condition": condition,
+            "active": i == active,
+            "stats": {"atk": 250, "def": 230, "spa": 220, "spd": 220, "spe": 280},
+            "moves": moves,
+            "baseAbility": "noability",
+            "item": "",
+            "pokeball": "pokeball",
+        })
+    active_moves = [
+        {"move": m, "id": m, "pp": 10, "maxpp": 16, "target": "normal", "disabled": m in disabled}
+        for m in team[active][1]
+    ]
+    return {"side": {"name": "me", "id": "p1", "pokemon": pokemon}, "active": [{"moves": active_moves}], "rqid": 1}
+
+
+def make_synthetic_battle(stage: str = "mid", seed: int = 0):
+    """Build a realistic 6v6 Gen 1 ``Battle`` at the given game stage.
+
+    * ``early`` — turn 1, full HP, one opponent revealed.
+    * ``mid``   — turn 12, chip damage, statuses, boosts, four opponents revealed.
+    * ``late``  — turn 40, fainted Pokémon on both sides, whole opponent team seen.
+
+    Teams and move sets are sampled from ``SYNTHETIC_ROSTER`` with ``seed``.
+
+    :param stage: One of ``SYNTHETIC_STAGES``.
+    :param seed: Seed for team, move set and damage sampling.
+    :returns: A ``poke_env.battle.Battle`` from the agent's (p1) point of view."""
+    from poke_env.battle import Battle
+
+    if stage not in SYNTHETIC_STAGES:
+        raise ValueError(f"stage must be one of {SYNTHETIC_STAGES}, got {stage!r}")
+    rng = random.Random(f"{stage}-{seed}")
+    my_team, opp_team = _synthetic_team(rng), _synthetic_team(rng)
+
+    battle = Battle(f"battle-gen1ou-{stage}{seed}", "me", logging.getLogger("synthetic"), gen=1)
+    battle._player_role = "p1"
+
+    hp, status = [350] * 6, [None] * 6
+    if stage != "early":
+        for i in range(1, 6):
+            hp[i] = rng.choice([350, 280, 120, 0 if stage == "late" else 200])
+            status[i] = rng.choice([None, None, "par", "slp", "brn"])
+        hp[0] = rng.choice([350, 200, 90])
+    disabled = set(rng.sample(my_team[0][1], 1)) if stage == "late" else set()
+    battle.parse_request(_synthetic_request(my_team, 0, hp, status, disabled))
+
+    me = f"p1a: {my_team[0][0].capitalize()}"
+    for i, (species, moves) in enumerate(opp_team[: _SYNTHETIC_OPP_SEEN[stage]]):
+        ident = f"p2a: {species.capitalize()}"
+        battle.parse_message(["", "switch", ident, f"{species.capitalize()}, L100", "100/100"])
+        for move in moves[: rng.randint(1, 4)]:
+            battle.parse_message(["", "move", ident, move, me])
+        if stage == "late" and i < 3:
+            battle.parse_message(["", "-damage", ident, "0 fnt"])
+            battle.parse_message(["", "faint", ident])
+        elif stage != "early":
+            battle.parse_message(["", "-damage", ident, f"{rng.randint(10, 90)}/100"])
+            if rng.random() < 0.5:
+                battle.parse_message(["", "-boost", ident, "atk", "1"])
+                battle.parse_message(["", "-unboost", ident, "spe", "2"])
+            if rng.random() < 0.3:
+                battle.parse_message(["", "-status", ident, rng.choice(["par", "brn", "frz"])])
+
+    battle.parse_message(["", "switch", me, f"{my_team[0][0].capitalize()}, L100", f"{hp[0]}/350"])
+    if stage != "early":
+        # Gen 1 Special is one stat: Showdown boosts spa and spd together.
+        for stat in {"atk": ["atk"], "spc": ["spa", "spd"], "spe": ["spe"]}[rng.choice(["atk", "spc", "spe"])]:
+            battle.parse_message(["", "-boost", me, stat, "1"])
+        battle.parse_message(["", "-sidestart", "p2: opp", "Reflect"])
+    battle.parse_message(["", "turn", str(_SYNTHETIC_TURN[stage])])
+    return battle
+
+
+def make_synthetic_battles(seeds: int = 3, stages=SYNTHETIC_STAGES) -> dict:
+    """``{stage: [battle per seed]}`` for every requested stage."""
+    return {stage: [make_synthetic_battle(stage, s) for s in range(seeds)] for stage in stages}
@@ -71,6 +71,21 @@ class TestRegistry(unittest.TestCase):
         self.assertEqual(player.kwargs["server_configuration"], "server")
         self.assertEqual(player.kwargs["account_configuration"], "account")
         self.assertTrue(player.kwargs["custom_flag"])
+        self.assertNotIn("start_listening", player.kwargs)
+
+    def test_build_opponent_player_can_stay_off_the_server(self):
+        spec = OpponentPlayerSpec(id="random", kwargs={"start_listening": True})
+
+        with patch("curriculum.registry.resolve_opponent_player_class", return_value=StubPlayer):
+            player = build_opponent_player(
+                spec,
+                battle_format="gen1ou",
+                server_configuration="server",
+                account_configuration="account",
+                start_listening=False,
+            )
+
+        self.assertFalse(player.kwargs["start_listening"])
 
     def test_build_opponent_player_rejects_reserved_kwargs(self):
         spec = OpponentPlayerSpec(
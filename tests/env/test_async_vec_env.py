@@ -0,0 +1,469 @@
+"""
+Tests for env.async_vec_env.AsyncBattleVecEnv.
+
+A fake Showdown handshake stands in for the server: it drives the env's
+player callbacks exactly as poke-env's websocket handlers would, one
+coroutine per battle on the shared event loop.
+
+Covers:
+  1. reset/step — stacked dict observations, masks, rewards and infos
+  2. Episode ends — terminal_observation and auto-reset onto a new battle
+  3. Concurrency — battles are stepped together on one event loop
+  4. Opponents — moves chosen by the slot's policy, scheduled swaps
+  5. env_method / get_attr — the _PokemonEnvBridge methods per slot
+  6. SubprocBattleVecEnv — P worker processes of K battles each
+  7. Pre-warming — resets pick up battles started in the background
+"""
+import asyncio
+import unittest
+from functools import partial
+
+import numpy as np
+from poke_env.player.battle_order import ForfeitBattleOrder
+
+from curriculum.models import OpponentPlayerSpec
+from env.async_vec_env import AsyncBattleVecEnv, SubprocBattleVecEnv
+from env.env_builder import build_vec_env
+from env.battle_config import BattleConfig
+from env.singles_env_wrapper import PokemonRLWrapper
+from tests.conftest import make_synthetic_battle
+
+RANDOM = OpponentPlayerSpec(id="random")
+MAX_POWER = OpponentPlayerSpec(id="max-power")
+
+
+class FakeShowdown:
+    """Plays ``turns`` decisions per battle, then ends it in a win for the agent."""
+
+    def __init__(self, env: AsyncBattleVecEnv, turns: int = 2, delay: float = 0.0):
+        self.env = env
+        self.turns = turns
+        self.delay = delay
+        self.battles = []
+        self.tasks = []
+        self.orders = []
+        self.opponent_orders = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        env._challenge = self.challenge
+
+    async def challenge(self):
+        battle = make_synthetic_battle("mid", seed=len(self.battles))
+        battle._battle_tag = f"battle-gen1ou-{len(self.battles)}"
+        battle.player_username = self.env._agent.username
+        battle.parse_message(["", "teamsize", "p1", "6"])
+        battle.parse_message(["", "teamsize", "p2", "6"])
+        self.battles.append(battle)
+        self.tasks.append(asyncio.ensure_future(self._play(battle)))
+
+    async def _play(self, battle):
+        for _ in range(self.turns):
+            self.opponent_orders.append(self.env._opponent_decision(battle))
+            order = await self.env._agent_decision(battle)
+            self.orders.append((battle.battle_tag, order))
+            if isinstance(order, ForfeitBattleOrder):
+                break
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(self.delay)
+            self.in_flight -= 1
+            battle.turn += 1
+        battle.won_by(battle.player_username)
+        self.env._battle_finished(battle)
+
+
+class PlayerShowdown(FakeShowdown):
+    """``FakeShowdown`` that registers and ends battles through the players' poke-env handlers."""
+
+    async def challenge(self):
+        await super().challenge()
+        battle = self.battles[-1]
+        for player in (self.env._agent, self.env._opponent):
+            await player._create_battle([">battle", "gen1ou", battle.battle_tag.rsplit("-", 1)[1]])
+        self.env._agent._battles[battle.battle_tag] = battle
+
+    async def _play(self, battle):
+        agent, opponent = self.env._agent, self.env._opponent
+        for _ in range(self.turns):
+            self.opponent_orders.append(self.env._opponent_decision(battle))
+            self.orders.append((battle.battle_tag, await self.env._agent_decision(battle)))
+            if isinstance(self.orders[-1][1], ForfeitBattleOrder):
+                break
+        # As poke-env handles ``|win|``; the opponent sees it after the agent.
+        for player, player_battle in ((agent, battle), (opponent, opponent._battles[battle.battle_tag])):
+            player_battle.won_by(agent.username)
+            await player._battle_count_queue.get()
+            player._battle_count_queue.task_done()
+            player._battle_finished_callback(player_battle)
+            await asyncio.sleep(0.01)
+
+
+class _EnvTestCase(unittest.TestCase):
+
+    def make_env(self, n_envs: int = 2, spec: OpponentPlayerSpec = RANDOM, **kwargs) -> AsyncBattleVecEnv:
+        env = AsyncBattleVecEnv(
+            n_envs, battle_format="gen1ou", opponent_player_spec=spec,
+            unique_id="test", start_listening=False, challenge_timeout=5.0, **kwargs,
+        )
+        self.addCleanup(env.close)
+        return env
+
+
+def _fake_battles(n_envs: int) -> AsyncBattleVecEnv:
+    """Worker-process factory: an env playing against ``FakeShowdown``."""
+    env = AsyncBattleVecEnv(
+        n_envs, battle_format="gen1ou", opponent_player_spec=RANDOM,
+        unique_id="worker", start_listening=False, challenge_timeout=5.0,
+    )
+    env.server = FakeShowdown(env, turns=1)
+    return env
+
+
+def _seed_recording_battles(n_envs: int) -> AsyncBattleVecEnv:
+    """``_fake_battles`` reporting the seeds and options of each reset in ``reset_infos``."""
+    env = _fake_battles(n_envs)
+    reset = env.reset
+
+    def recording_reset():
+        seeds, options = env._seeds, env._options
+        obs = reset()
+        env.reset_infos = [{"seed": seed, "options": opts} for seed, opts in zip(seeds, options)]
+        return obs
+
+    env.reset = recording_reset
+    return env
+
+
+async def _result(task):
+    return await task
+
+
+def _legal_actions(env: AsyncBattleVecEnv) -> np.ndarray:
+    return np.array([np.flatnonzero(mask)[-1] for mask in env.action_masks()])
+
+
+# ---------------------------------------------------------------------------
+# 1. reset / step
+# ---------------------------------------------------------------------------
+
+class TestResetAndStep(_EnvTestCase):
+
+    def setUp(self):
+        self.env = self.make_env(3)
+        self.server = FakeShowdown(self.env)
+
+    def test_reset_stacks_dict_observations(self):
+        obs = self.env.reset()
+        obs_dim = BattleConfig.gen1().obs_dim
+        self.assertEqual(obs["observation"].shape, (3, obs_dim))
+        self.assertEqual(obs["action_mask"].shape, (3, 10))
+        self.assertEqual(obs["action_mask"].dtype, np.int8)
+        self.assertEqual(len(self.server.battles), 3)
+
+    def test_observation_matches_single_env_encoding(self):
+        obs = self.env.reset()
+        reference = PokemonRLWrapper(battle_format="gen1ou", start_listening=False)
+        for i, battle in enumerate(self.server.battles):
+            battle.player_username = reference.agent1.username
+            np.testing.assert_array_equal(obs["observation"][i], reference.embed_battle(battle))
+
+    def test_action_masks_follow_each_battle(self):
+        obs = self.env.reset()
+        masks = self.env.action_masks()
+        self.assertEqual(masks.dtype, bool)
+        np.testing.assert_array_equal(masks, obs["action_mask"].astype(bool))
+        np.testing.assert_array_equal(masks, np.stack(self.env.env_method("action_masks")))
+
+    def test_step_sends_one_order_per_battle(self):
+        self.env.reset()
+        obs, rewards, dones, infos = self.env.step(_legal_actions(self.env))
+        self.assertEqual(len(self.server.orders), 3)
+        self.assertEqual({tag for tag, _ in self.server.orders}, {b.battle_tag for b in self.server.battles})
+        self.assertEqual(rewards.shape, (3,))
+        self.assertEqual(rewards.dtype, np.float32)
+        self.assertFalse(dones.any())
+        self.assertEqual(len(infos), 3)
+
+    def test_illegal_action_is_rejected_when_strict(self):
+        self.env.reset()
+        illegal = np.array([np.flatnonzero(~mask)[0] for mask in self.env.action_masks()])
+        with self.assertRaises(ValueError):
+            self.env.step(illegal)
+
+    def test_reward_components_reported_per_battle(self):
+        env = self.make_env(2, reward_components=True)
+        FakeShowdown(env)
+        env.reset()
+        _, rewards, _, infos = env.step(_legal_actions(env))
+        for reward, info in zip(rewards, infos):
+            self.assertAlmostEqual(float(info["reward_components"].sum()), float(reward), places=5)
+
+    def test_incremental_encoding_matches_compiled_encoder(self):
+        env = self.make_env(2, incremental_encoding=True)
+        server = FakeShowdown(env)
+        obs = env.reset()
+        reference = PokemonRLWrapper(battle_format="gen1ou", start_listening=False)
+        for i, battle in enumerate(server.battles):
+            battle.player_username = reference.agent1.username
+            np.testing.assert_array_equal(obs["observation"][i], reference.embed_battle(battle))
+        self.assertEqual(len(env._codec._encoders), 2)
+
+
+# ---------------------------------------------------------------------------
+# 2. Episode ends
+# ---------------------------------------------------------------------------
+
+class TestEpisodeEnd(_EnvTestCase):
+
+    def test_finished_battle_is_replaced(self):
+        env = self.make_env(2)
+        server = FakeShowdown(env, turns=1)
+        env.reset()
+        obs, rewards, dones, infos = env.step(_legal_actions(env))
+        self.assertTrue(dones.all())
+        for info in infos:
+            self.assertIn("terminal_observation", info)
+            self.assertIn("TimeLimit.truncated", info)
+        self.assertEqual(len(server.battles), 4)
+        self.assertEqual(obs["observation"].shape[0], 2)
+        finished = env.env_method("get_last_battle")
+        self.assertEqual({b.battle_tag for b in finished}, {b.battle_tag for b in server.battles[:2]})
+        self.assertTrue(all(b.won for b in finished))
+        outcomes = [info["battle_outcome"] for info in infos]
+        self.assertTrue(all(o.won and o.opponent == "random" for o in outcomes))
+
+    def test_reset_forfeits_running_battles(self):
+        env = self.make_env(2)
+        server = FakeShowdown(env, turns=5)
+        env.reset()
+        env.reset()
+        forfeits = [order for _, order in server.orders if isinstance(order, ForfeitBattleOrder)]
+        self.assertEqual(len(forfeits), 2)
+        self.assertEqual(len(server.battles), 4)
+
+    def test_players_forget_finished_battles(self):
+        env = self.make_env(2)
+        PlayerShowdown(env, turns=1)
+        env.reset()
+        for _ in range(5):
+            env.step(_legal_actions(env))
+        env.reset()
+        live = {slot.battle.battle_tag for slot in env._slots}
+        self.assertEqual(set(env._agent._battles), live)
+        # Forfeited battles end for the opponent after the agent moved on.
+        self._wait_for(lambda: set(env._opponent._battles) == live)
+        self.assertEqual(set(env._matches), live)
+
+    def _wait_for(self, condition, timeout: float = 2.0):
+        async def wait():
+            while not condition():
+                await asyncio.sleep(0.01)
+
+        AsyncBattleVecEnv._run(asyncio.wait_for(wait(), timeout))
+
+    def test_teams_rotate_on_finished_rounds(self):
+        from tests.conftest import MockTeamGenerator
+
+        generator = MockTeamGenerator(["team-a", "team-b", "team-c"])
+        env = self.make_env(1, opponent_team_generator=generator, rounds_per_opponent=1)
+        FakeShowdown(env, turns=1)
+        env.reset()
+        env.step(_legal_actions(env))
+        self.assertEqual(generator.index, 2)
+
+
+# ---------------------------------------------------------------------------
+# 3. Concurrency
+# ---------------------------------------------------------------------------
+
+class TestConcurrency(_EnvTestCase):
+
+    def test_battles_wait_on_the_server_together(self):
+        env = self.make_env(4)
+        server = FakeShowdown(env, turns=3, delay=0.05)
+        env.reset()
+        env.step(_legal_actions(env))
+        self.assertEqual(server.max_in_flight, 4)
+
+    def test_step_async_returns_before_results(self):
+        env = self.make_env(2)
+        FakeShowdown(env, turns=3, delay=0.05)
+        env.reset()
+        env.step_async(_legal_actions(env))
+        obs, _, _, _ = env.step_wait()
+        self.assertEqual(obs["observation"].shape[0], 2)
+
+
+# ---------------------------------------------------------------------------
+# 4. Opponents
+# ---------------------------------------------------------------------------
+
+class TestOpponents(_EnvTestCase):
+
+    def test_opponent_moves_come_from_the_policy(self):
+        env = self.make_env(2)
+        server = FakeShowdown(env)
+        env.reset()
+        self.assertEqual(len(server.opponent_orders), 2)
+        self.assertTrue(all(order.message.startswith("/choose") for order in server.opponent_orders))
+
+    def test_scheduled_opponent_swaps_on_next_battle(self):
+        env = self.make_env(2)
+        FakeShowdown(env, turns=1)
+        env.reset()
+        env.env_method("schedule_opponent_player", MAX_POWER)
+        self.assertEqual(env.env_method("get_opponent_player_spec"), [RANDOM, RANDOM])
+        env.step(_legal_actions(env))
+        self.assertEqual(env.env_method("get_opponent_player_spec"), [MAX_POWER, MAX_POWER])
+        opponents = env.get_attr("opponent")
+        self.assertIs(opponents[0], opponents[1])
+
+    def test_opponent_policies_stay_off_the_server(self):
+        env = self.make_env(1)
+        for spec in (RANDOM, MAX_POWER):
+            self.assertFalse(hasattr(env._opponent_policy(spec).ps_client, "_listening_coroutine"))
+
+    def test_rescheduling_current_spec_cancels_pending_swap(self):
+        env = self.make_env(1)
+        env.env_method("schedule_opponent_player", MAX_POWER)
+        env.env_method("schedule_opponent_player", RANDOM)
+        FakeShowdown(env)
+        env.reset()
+        self.assertEqual(env.env_method("get_opponent_player_spec"), [RANDOM])
+
+
+# ---------------------------------------------------------------------------
+# 5. env_method / get_attr
+# ---------------------------------------------------------------------------
+
+class TestVecEnvMethods(_EnvTestCase):
+
+    def test_indices_select_slots(self):
+        env = self.make_env(3)
+        self.assertEqual(env.get_attr("index", indices=[2, 0]), [2, 0])
+        env.set_attr("last_battle", "x", indices=1)
+        self.assertEqual(env.env_method("get_last_battle"), [None, "x", None])
+        self.assertEqual(env.env_is_wrapped(object), [False] * 3)
+
+    def test_spaces_match_single_env(self):
+        env = self.make_env(2, obs_dtype="uint8")
+        self.assertEqual(env.observation_space["observation"].dtype, np.uint8)
+        self.assertEqual(env.action_space.n, 10)
+        self.assertEqual(env.num_envs, 2)
+
+
+# ---------------------------------------------------------------------------
+# 6. SubprocBattleVecEnv
+# ---------------------------------------------------------------------------
+
+class TestSubprocBattleVecEnv(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.env = SubprocBattleVecEnv([partial(_fake_battles, 2), partial(_fake_battles, 3)])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.env.close()
+
+    def test_envs_span_every_worker(self):
+        self.assertEqual(self.env.num_envs, 5)
+        obs = self.env.reset()
+        self.assertEqual(obs["observation"].shape, (5, BattleConfig.gen1().obs_dim))
+        self.assertEqual(obs["action_mask"].shape, (5, 10))
+
+    def test_step_concatenates_worker_results(self):
+        self.env.reset()
+        obs, rewards, dones, infos = self.env.step(_legal_actions(self.env))
+        self.assertEqual(rewards.shape, (5,))
+        self.assertTrue(dones.all())
+        self.assertEqual(len(infos), 5)
+        self.assertTrue(all("terminal_observation" in info for info in infos))
+
+    def test_indices_map_to_worker_slots(self):
+        self.assertEqual(self.env.get_attr("index"), [0, 1, 0, 1, 2])
+        self.assertEqual(self.env.get_attr("index", indices=[4, 0, 2]), [2, 0, 0])
+        self.env.set_attr("last_battle", "x", indices=[1, 3])
+        self.assertEqual(self.env.env_method("get_last_battle", indices=[0, 1, 3]), [None, "x", "x"])
+
+    def test_action_masks_match_observation(self):
+        obs = self.env.reset()
+        np.testing.assert_array_equal(self.env.action_masks(), obs["action_mask"].astype(bool))
+
+    def test_reset_forwards_seeds_and_options(self):
+        env = SubprocBattleVecEnv([partial(_seed_recording_battles, 1), partial(_seed_recording_battles, 2)])
+        self.addCleanup(env.close)
+        env.seed(7)
+        env.set_options([{}, {"k": 1}, {"k": 2}])
+        env.reset()
+        self.assertEqual([info["seed"] for info in env.reset_infos], [7, 8, 9])
+        self.assertEqual([info["options"] for info in env.reset_infos], [{}, {"k": 1}, {"k": 2}])
+        env.reset()
+        self.assertEqual([info["seed"] for info in env.reset_infos], [None, None, None])
+
+
+class TestBuildVecEnvTopology(unittest.TestCase):
+
+    def test_battles_per_process_must_divide_n_envs(self):
+        with self.assertRaises(ValueError):
+            build_vec_env(6, "gen1ou", None, 10, battles_per_process=4)
+        with self.assertRaises(ValueError):
+            build_vec_env(6, "gen1ou", None, 10, battles_per_process=0)
+
+
+# ---------------------------------------------------------------------------
+# 7. Pre-warming
+# ---------------------------------------------------------------------------
+
+class TestPrewarm(_EnvTestCase):
+
+    @staticmethod
+    def tags(battles) -> set[str]:
+        return {b.battle_tag for b in battles}
+
+    def test_reset_returns_battles_started_in_the_background(self):
+        env = self.make_env(2, prewarm=True)
+        server = FakeShowdown(env, turns=1)
+        env.reset()
+        warm = [env._run(_result(slot.warm)) for slot in env._slots]
+        self.assertEqual(len(server.battles), 4)
+
+        _, _, dones, _ = env.step(_legal_actions(env))
+
+        self.assertTrue(dones.all())
+        self.assertEqual(self.tags(env.get_attr("battle")), self.tags(b for _, b, _ in warm))
+        self.assertEqual(self.tags(env.env_method("get_last_battle")), self.tags(server.battles[:2]))
+
+    def test_players_host_a_warm_battle_per_slot(self):
+        env = self.make_env(3, prewarm=True)
+        self.assertEqual(env._agent._max_concurrent_battles, 6)
+        self.assertEqual(self.make_env(3)._agent._max_concurrent_battles, 3)
+
+    def test_reset_forfeits_current_battle_and_keeps_warm_one(self):
+        env = self.make_env(1, prewarm=True)
+        server = FakeShowdown(env, turns=5)
+        env.reset()
+        _, warm_battle, _ = env._run(_result(env._slots[0].warm))
+        env.reset()
+        forfeited = [tag for tag, order in server.orders if isinstance(order, ForfeitBattleOrder)]
+        self.assertEqual(forfeited, [server.battles[0].battle_tag])
+        self.assertIs(env.get_attr("battle")[0], warm_battle)
+
+    def test_warm_battle_against_replaced_opponent_is_forfeited(self):
+        env = self.make_env(1, prewarm=True)
+        server = FakeShowdown(env, turns=1)
+        env.reset()
+        _, stale, _ = env._run(_result(env._slots[0].warm))
+        env.env_method("schedule_opponent_player", MAX_POWER)
+
+        env.step(_legal_actions(env))
+
+        self.assertIn((stale.battle_tag, ForfeitBattleOrder()), [
+            (tag, order) for tag, order in server.orders if isinstance(order, ForfeitBattleOrder)
+        ])
+        self.assertIsNot(env.get_attr("battle")[0], stale)
+        self.assertEqual(env.env_method("get_opponent_player_spec"), [MAX_POWER])
+
+
+if __name__ == "__main__":
+    unittest.main()
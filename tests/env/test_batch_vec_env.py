@@ -0,0 +1,216 @@
+"""
+Tests for env.batch_vec_env.BatchBattleVecEnv.
+
+Covers:
+  1. Observations and masks match the codec's encoding of the same battle
+  2. Steps: reward components, episode ends with outcomes, auto-reset, illegal actions
+  3. Opponents: scheduling and unsupported specs
+  4. build_vec_env(batch_engine=True) and the options it rejects
+"""
+import dataclasses
+import itertools
+import unittest
+
+import numpy as np
+from stable_baselines3.common.vec_env import VecMonitor
+
+from combat.gen1_batch_engine import BOOSTS, STATUSES
+from curriculum.models import OpponentPlayerSpec
+from env.batch_vec_env import BatchBattleVecEnv
+from env.battle_config import BattleConfig
+from env.env_builder import build_env, build_vec_env
+
+RANDOM = OpponentPlayerSpec(id="random")
+
+
+def _random_actions(env, rng) -> np.ndarray:
+    masks = env.action_masks()
+    return np.where(masks, rng.random(masks.shape), -1).argmax(axis=1)
+
+
+def _packed_teams(engine) -> list[str]:
+    return [
+        "]".join(f"{mon.species_name}||||{','.join(mon.moves)}|||||||" for mon in engine.sides[role].team)
+        for role in ("p1", "p2")
+    ]
+
+
+def _sync(batch, engine, battle):
+    """Copy the scalar engine's state (and what the agent has seen) into battle 0 of ``batch``."""
+    for s, role in enumerate(("p1", "p2")):
+        side = engine.sides[role]
+        batch.active[0, s] = side.active
+        for i, mon in enumerate(side.team):
+            batch.hp[0, s, i] = mon.hp
+            batch.status[0, s, i] = STATUSES.index(mon.status) + 1 if mon.status else 0
+            batch.pp[0, s, i, :len(mon.pp)] = mon.pp
+        batch.boosts[0, s] = [side.mon.boosts[k] for k in BOOSTS]
+        batch.confusion[0, s] = side.mon.volatiles.get("confusion", 0)
+        batch.recharge[0, s] = bool(side.mon.volatiles.get("recharge"))
+        batch.must_switch[0, s] = side.asked == "switch"
+    batch.shown_recharge[0, 1] = battle.opponent_active_pokemon.must_recharge
+    batch.turn[0] = engine.turn
+
+    opponents = engine.sides["p2"].team
+    species = [mon.species for mon in opponents]
+    batch.seen[0, 1] = -1
+    batch.move_seen[0, 1] = -1
+    for rank, pokemon in enumerate(battle.opponent_team.values()):
+        i = species.index(pokemon.species)
+        batch.seen[0, 1, i] = rank
+        for order, move in enumerate(pokemon.moves):
+            batch.move_seen[0, 1, i, opponents[i].moves.index(move)] = order
+
+
+# ---------------------------------------------------------------------------
+# 1. Observations
+# ---------------------------------------------------------------------------
+
+class TestObservationParity(unittest.TestCase):
+
+    def setUp(self):
+        self.env = build_env("gen1ou", None, 10, simulated=True)
+        self.rng = np.random.default_rng(1)
+
+    def _batch_env(self, teams) -> BatchBattleVecEnv:
+        return BatchBattleVecEnv(
+            1, opponent_player_spec=RANDOM, seed=0,
+            agent_team_generator=itertools.repeat(teams[0]),
+            opponent_team_generator=itertools.repeat(teams[1]),
+        )
+
+    def test_reset_matches_the_codec(self):
+        for seed in range(5):
+            obs, _ = self.env.reset(seed=seed)
+            batch_env = self._batch_env(_packed_teams(self.env.unwrapped._engine))
+            batch_obs = batch_env.reset()
+            self.assertEqual(batch_obs["observation"].shape, (1, BattleConfig.gen1().obs_dim))
+            np.testing.assert_allclose(batch_obs["observation"][0], obs["observation"], atol=1e-6)
+            np.testing.assert_array_equal(batch_obs["action_mask"][0], obs["action_mask"])
+
+    def test_mid_battle_states_match_the_codec(self):
+        for seed in range(20):
+            obs, _ = self.env.reset(seed=seed)
+            simulated = self.env.unwrapped
+            batch_env = self._batch_env(_packed_teams(simulated._engine))
+            batch_env.reset()
+            for _ in range(self.rng.integers(1, 40)):
+                obs, _, terminated, truncated, _ = self.env.step(self.rng.choice(np.flatnonzero(self.env.action_masks())))
+                if terminated or truncated:
+                    break
+            else:
+                _sync(batch_env._engine, simulated._engine, simulated.battle1)
+                batch_obs, _ = batch_env._observe()
+                np.testing.assert_allclose(batch_obs["observation"][0], obs["observation"], atol=1e-5)
+                np.testing.assert_array_equal(batch_obs["action_mask"][0], obs["action_mask"])
+
+
+# ---------------------------------------------------------------------------
+# 2. Steps
+# ---------------------------------------------------------------------------
+
+class TestSteps(unittest.TestCase):
+
+    def setUp(self):
+        self.env = BatchBattleVecEnv(16, seed=0, reward_components=True)
+        self.rng = np.random.default_rng(0)
+
+    def test_masks_follow_every_step(self):
+        obs = self.env.reset()
+        for _ in range(20):
+            np.testing.assert_array_equal(obs["action_mask"].astype(bool), self.env.action_masks())
+            self.assertTrue(self.env.action_masks().any(axis=1).all())
+            obs, *_ = self.env.step(_random_actions(self.env, self.rng))
+
+    def test_episodes_end_with_outcomes_and_restart(self):
+        self.env.reset()
+        episodes = 0
+        while episodes < 16:
+            obs, rewards, dones, infos = self.env.step(_random_actions(self.env, self.rng))
+            components = np.stack([info["reward_components"] for info in infos])
+            np.testing.assert_allclose(components.sum(axis=1), rewards, atol=1e-4)
+            for i in np.flatnonzero(dones):
+                episodes += 1
+                info = infos[i]
+                outcome = info["battle_outcome"]
+                self.assertEqual(outcome.opponent, "max-power")
+                if outcome.won or outcome.lost:
+                    self.assertFalse(info["TimeLimit.truncated"])
+                self.assertEqual(info["terminal_observation"]["observation"].shape, obs["observation"][i].shape)
+                self.assertEqual(self.env._engine.turn[i], 1)
+                self.assertFalse(self.env._engine.finished[i])
+        self.assertEqual(self.env.rounds_played, episodes)
+
+    def test_illegal_actions(self):
+        self.env.reset()
+        actions = self.env.action_masks().argmin(axis=1)
+        with self.assertRaises(ValueError):
+            self.env.step(actions)
+
+        lenient = BatchBattleVecEnv(4, seed=0, strict=False)
+        lenient.reset()
+        lenient.step(lenient.action_masks().argmin(axis=1))
+        engine = lenient._engine
+        self.assertTrue(((engine.turn == 2) | engine.must_switch.any(axis=1)).all())
+
+    def test_uint8_observations(self):
+        env = BatchBattleVecEnv(2, seed=0, obs_dtype="uint8")
+        obs = env.reset()
+        self.assertEqual(obs["observation"].dtype, np.uint8)
+        self.assertEqual(env.observation_space["observation"].dtype, np.uint8)
+
+
+# ---------------------------------------------------------------------------
+# 3. Opponents
+# ---------------------------------------------------------------------------
+
+class TestOpponents(unittest.TestCase):
+
+    def test_opponent_swap(self):
+        env = BatchBattleVecEnv(2, seed=0)
+        env.reset()
+        env.env_method("schedule_opponent_player", RANDOM, indices=[1])
+        self.assertEqual([s.id for s in env.env_method("get_opponent_player_spec")], ["max-power", "max-power"])
+        rng = np.random.default_rng(0)
+        while True:
+            _, _, dones, infos = env.step(_random_actions(env, rng))
+            if dones[1]:
+                break
+        self.assertEqual(infos[1]["battle_outcome"].opponent, "max-power")
+        self.assertEqual(env.env_method("get_opponent_player_spec", indices=[1])[0].id, "random")
+
+    def test_unsupported_opponents(self):
+        with self.assertRaises(ValueError):
+            BatchBattleVecEnv(2, opponent_player_spec=OpponentPlayerSpec(id="heuristic"))
+        env = BatchBattleVecEnv(2)
+        with self.assertRaises(ValueError):
+            env.env_method("schedule_opponent_player", OpponentPlayerSpec(id="heuristic"))
+
+    def test_gen1_only(self):
+        with self.assertRaises(ValueError):
+            BatchBattleVecEnv(2, battle_config=dataclasses.replace(BattleConfig.gen1(), gen=2))
+
+
+# ---------------------------------------------------------------------------
+# 4. build_vec_env
+# ---------------------------------------------------------------------------
+
+class TestBuildVecEnv(unittest.TestCase):
+
+    def test_batch_engine(self):
+        env = build_vec_env(4, "gen1ou", None, 10, batch_engine=True)
+        self.assertIsInstance(env, VecMonitor)
+        self.assertIsInstance(env.venv, BatchBattleVecEnv)
+        self.assertEqual(env.num_envs, 4)
+
+    def test_batch_engine_rejects_other_topologies(self):
+        for kwargs in (
+                {"simulated": True}, {"async_battles": True},
+                {"battles_per_process": 2}, {"prewarm_battles": True},
+        ):
+            with self.assertRaises(ValueError):
+                build_vec_env(2, "gen1ou", None, 10, batch_engine=True, **kwargs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,6 +14,7 @@ from dataclasses import FrozenInstanceError
 
 from env.battle_config import BattleConfig
 from env.states.gen1.battle_state_gen_1 import BattleStateGen1
+from env.states.gen1.incremental_encoder_gen1 import IncrementalBattleEncoderGen1
 from env.states.gen1.my_pokemon_state_gen_1 import MyPokemonStateGen1
 from env.states.move_state import MoveState
 from env.states.state_utils import MAX_TEAM_SIZE, MAX_MOVES
@@ -39,6 +40,15 @@ class TestGen1Factory:
     def test_gen1_action_space_size_is_10(self):
         assert BattleConfig.gen1().action_space_size == 10
 
+    def test_gen1_incremental_encoder_cls_is_gen1(self):
+        assert BattleConfig.gen1().incremental_encoder_cls is IncrementalBattleEncoderGen1
+
+    def test_gen1_encoder_is_compiled_once(self):
+        from env.states.feature_spec import CompiledBattleEncoder
+        encoder = BattleConfig.gen1().encoder
+        assert isinstance(encoder, CompiledBattleEncoder)
+        assert BattleConfig.gen1().encoder is encoder
+
     def test_gen1_factory_returns_equal_instances(self):
         """Two calls to gen1() must return equal (value-equal) configs."""
         assert BattleConfig.gen1() == BattleConfig.gen1()
@@ -93,6 +103,12 @@ class TestGen1Properties:
         )
         assert expected == self.cfg.obs_dim
 
+    def test_obs_signed_mask_shape_and_alive_vector(self):
+        """Signed mask covers every feature; the trailing alive vector is signed."""
+        mask = self.cfg.obs_signed_mask
+        assert mask.shape == (self.cfg.obs_dim,)
+        assert mask[-MAX_TEAM_SIZE:].all()
+
 
 # ─── 3. Immutability ─────────────────────────────────────────────────────────
 
@@ -0,0 +1,85 @@
+"""
+Tests for env.env_builder.VecObservedActionMasks.
+
+Covers:
+  1. Masks come from the last step/reset observation, without env_method
+  2. Other env_method calls and calls before the first reset reach the workers
+"""
+import unittest
+
+import gymnasium as gym
+import numpy as np
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from env.env_builder import VecObservedActionMasks
+
+
+class MaskedEnv(gym.Env):
+    """Legal action is ``t % 3``; ``action_masks`` calls are counted."""
+
+    observation_space = gym.spaces.Dict({
+        "observation": gym.spaces.Box(0.0, 10.0, shape=(1,), dtype=np.float32),
+        "action_mask": gym.spaces.Box(0, 1, shape=(3,), dtype=np.int8),
+    })
+    action_space = gym.spaces.Discrete(3)
+
+    def __init__(self):
+        self.t = 0
+        self.mask_calls = 0
+
+    def _obs(self):
+        mask = np.zeros(3, dtype=np.int8)
+        mask[self.t % 3] = 1
+        return {"observation": np.array([self.t], dtype=np.float32), "action_mask": mask}
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed)
+        self.t = 0
+        return self._obs(), {}
+
+    def step(self, action):
+        self.t += 1
+        return self._obs(), 0.0, self.t >= 4, False, {}
+
+    def action_masks(self) -> np.ndarray:
+        self.mask_calls += 1
+        return self._obs()["action_mask"].astype(bool)
+
+
+class TestVecObservedActionMasks(unittest.TestCase):
+
+    def setUp(self):
+        self.inner = DummyVecEnv([MaskedEnv, MaskedEnv])
+        self.env = VecObservedActionMasks(self.inner)
+
+    def mask_calls(self) -> list[int]:
+        return self.inner.get_attr("mask_calls")
+
+    def test_masks_follow_observations(self):
+        self.env.reset()
+        np.testing.assert_array_equal(self.env.action_masks(), [[True, False, False]] * 2)
+        self.env.step(np.array([0, 0]))
+        np.testing.assert_array_equal(np.stack(self.env.env_method("action_masks")), [[False, True, False]] * 2)
+        self.assertEqual(self.env.env_method("action_masks", indices=[1])[0].tolist(), [False, True, False])
+        self.assertEqual(self.mask_calls(), [0, 0])
+
+    def test_masks_after_auto_reset_belong_to_new_episode(self):
+        self.env.reset()
+        for _ in range(4):
+            _, _, dones, _ = self.env.step(np.array([0, 0]))
+        self.assertTrue(dones.all())
+        np.testing.assert_array_equal(self.env.action_masks(), [[True, False, False]] * 2)
+
+    def test_falls_back_to_workers_before_reset(self):
+        np.testing.assert_array_equal(self.env.action_masks(), [[True, False, False]] * 2)
+        self.assertEqual(self.mask_calls(), [1, 1])
+
+    def test_other_methods_are_forwarded(self):
+        self.env.reset()
+        self.env.step(np.array([0, 0]))
+        self.env.env_method("reset", indices=[0])
+        self.assertEqual(self.env.get_attr("t"), [0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""Unit tests for env.observation_layout."""
+import numpy as np
+import pytest
+import torch
+
+from env.battle_config import BattleConfig
+from env.observation_layout import ObservationLayout
+from env.states.gen1.arena_state_gen1 import ArenaStateGen1
+from env.states.gen1.battle_state_gen_1 import BattleStateGen1
+from env.states.gen1.my_pokemon_state_gen_1 import MyPokemonStateGen1
+from env.states.gen1.opponent_pokemon_state_gen_1 import OpponentPokemonStateGen1
+from env.states.move_state import MoveState
+from env.states.state_utils import MAX_MOVES, MAX_TEAM_SIZE
+
+
+@pytest.fixture(scope="module")
+def layout():
+    return BattleConfig.gen1().layout
+
+
+class TestLayoutOffsets:
+
+    def test_gen1_layout_is_built_once(self):
+        assert BattleStateGen1.layout() is BattleStateGen1.layout()
+
+    def test_obs_dim_matches_battle_state(self, layout):
+        assert layout.obs_dim == BattleStateGen1.array_len()
+
+    def test_arena_opponent_len_matches_battle_state(self, layout):
+        assert layout.arena_opponent_len == BattleStateGen1.battle_before_me_len()
+
+    def test_block_lengths_match_state_classes(self, layout):
+        assert layout.arena_len == ArenaStateGen1.array_len()
+        assert layout.move_len == MoveState.array_len()
+        assert layout.opp_pokemon_len == OpponentPokemonStateGen1.array_len()
+        assert layout.my_pokemon_len == MyPokemonStateGen1.array_len()
+
+    def test_sections_are_contiguous_and_cover_obs(self, layout):
+        stop = 0
+        for name, section in layout.sections().items():
+            assert section.start == stop, name
+            stop = section.stop
+        assert stop == layout.obs_dim
+
+    def test_offsets_match_write_into_offsets(self, layout):
+        BattleStateGen1._init_buffer()
+        assert layout.opp_moves.start == BattleStateGen1._o_opp_moves
+        assert layout.opp_team.start == BattleStateGen1._o_opp_bench
+        assert layout.my_team.start == BattleStateGen1._o_my_bench
+
+    def test_custom_layout(self):
+        lay = ObservationLayout(arena_len=2, move_len=3, opp_pokemon_len=4, my_pokemon_len=14,
+                                my_moves_start=2, n_moves=4, team_size=2)
+        assert lay.obs_dim == 2 + 12 + 8 + 2 + 28 + 2
+
+
+class TestNumpyViews:
+
+    def test_views_share_memory(self, layout):
+        obs = np.zeros((3, layout.obs_dim), dtype=np.float32)
+        view = layout.view(obs)
+        for arr in (view.arena, view.opp_moves.data, view.opp_team.data, view.my_team.data,
+                    view.my_team[2].moves.data, view.my_moves, view.my_alive):
+            assert np.shares_memory(arr, obs)
+
+    def test_shapes_batched(self, layout):
+        view = layout.view(np.zeros((5, layout.obs_dim), dtype=np.float32))
+        assert view.opp_moves.data.shape == (5, MAX_MOVES, layout.move_len)
+        assert view.opp_team.data.shape == (5, MAX_TEAM_SIZE, layout.opp_pokemon_len)
+        assert view.my_team.data.shape == (5, MAX_TEAM_SIZE, layout.my_pokemon_len)
+        assert view.my_moves.shape == (5, MAX_TEAM_SIZE, MAX_MOVES, layout.move_len)
+        assert view.my_team[0].features.shape == (5, layout.my_moves_start)
+        assert view.my_team[0].moves[3].shape == (5, layout.move_len)
+
+    def test_nested_slot_move_matches_flat_offset(self, layout):
+        obs = np.arange(layout.obs_dim, dtype=np.float32)
+        slot, i = 4, 2
+        start = layout.my_team.start + slot * layout.my_pokemon_len + layout.my_moves_start + i * layout.move_len
+        np.testing.assert_array_equal(
+            layout.view(obs).my_team[slot].moves[i], obs[start : start + layout.move_len]
+        )
+
+    def test_writes_go_through(self, layout):
+        obs = np.zeros(layout.obs_dim, dtype=np.float32)
+        layout.view(obs).opp_team[1][0] = 7.0
+        assert obs[layout.opp_team.start + layout.opp_pokemon_len] == 7.0
+
+    def test_slot_index_out_of_range(self, layout):
+        with pytest.raises(IndexError):
+            layout.view(np.zeros(layout.obs_dim, dtype=np.float32)).my_team[MAX_TEAM_SIZE]
+
+    def test_wrong_width_rejected(self, layout):
+        with pytest.raises(ValueError):
+            layout.view(np.zeros(layout.obs_dim + 1, dtype=np.float32))
+
+
+class TestTorchViews:
+
+    def test_views_share_storage(self, layout):
+        obs = torch.zeros(2, layout.obs_dim)
+        view = layout.view(obs)
+        for t in (view.my_team.data, view.my_moves, view.my_team[1].moves[0], view.opp_moves.data):
+            assert t.untyped_storage().data_ptr() == obs.untyped_storage().data_ptr()
+
+    def test_matches_numpy(self, layout):
+        arr = np.random.default_rng(0).random((2, layout.obs_dim), dtype=np.float32)
+        np_view, t_view = layout.view(arr), layout.view(torch.from_numpy(arr.copy()))
+        np.testing.assert_array_equal(t_view.my_moves.numpy(), np_view.my_moves)
+        np.testing.assert_array_equal(t_view.arena_opponent.numpy(), np_view.arena_opponent)
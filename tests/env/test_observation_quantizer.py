@@ -0,0 +1,86 @@
+"""Unit tests for env.observation_quantizer."""
+import numpy as np
+import pytest
+
+from env.battle_config import BattleConfig
+from env.observation_quantizer import ObservationQuantizer, quantization_table
+from env.states.gen1.battle_state_gen_1 import BattleStateGen1
+from tests.states.test_battle_state import make_battle_mock
+
+
+@pytest.fixture(scope="module")
+def cfg():
+    return BattleConfig.gen1()
+
+
+@pytest.fixture(scope="module")
+def encoded():
+    return BattleStateGen1(make_battle_mock()).to_array()
+
+
+def _random_obs(cfg, n=16, seed=0):
+    low = np.where(cfg.obs_signed_mask, -1.0, 0.0)
+    return np.random.default_rng(seed).uniform(low, 1.0, size=(n, cfg.obs_dim)).astype(np.float32)
+
+
+class TestSignedMask:
+
+    def test_encoded_battle_negative_only_on_signed_features(self, cfg, encoded):
+        assert not (encoded[~cfg.obs_signed_mask] < 0).any()
+
+    def test_encoded_battle_within_unit_range(self, encoded):
+        assert encoded.min() >= -1.0 and encoded.max() <= 1.0
+
+
+class TestQuantizationTable:
+
+    def test_signed_features_are_centred(self, cfg):
+        zero_point, divisor = quantization_table(cfg)
+        assert (zero_point[cfg.obs_signed_mask] == 127).all()
+        assert (zero_point[~cfg.obs_signed_mask] == 0).all()
+        assert (divisor[cfg.obs_signed_mask] == 127).all()
+        assert (divisor[~cfg.obs_signed_mask] == 255).all()
+
+
+class TestObservationQuantizer:
+
+    def test_rejects_unknown_dtype(self, cfg):
+        with pytest.raises(ValueError):
+            ObservationQuantizer(cfg, "int8")
+
+    def test_float32_is_identity(self, cfg, encoded):
+        q = ObservationQuantizer(cfg, "float32")
+        assert q.quantize(encoded) is encoded
+        assert q.observation_space().dtype == np.float32
+
+    def test_float16_round_trip(self, cfg, encoded):
+        q = ObservationQuantizer(cfg, "float16")
+        packed = q.quantize(encoded)
+        assert packed.dtype == np.float16
+        np.testing.assert_allclose(q.dequantize(packed), encoded, atol=1e-3)
+
+    @pytest.mark.parametrize("dtype", ["float16", "uint8"])
+    def test_one_hot_and_sign_values_are_exact(self, cfg, encoded, dtype):
+        q = ObservationQuantizer(cfg, dtype)
+        exact = np.isin(encoded, (-1.0, 0.0, 1.0))
+        assert exact.sum() > 0.5 * cfg.obs_dim
+        np.testing.assert_array_equal(q.dequantize(q.quantize(encoded))[exact], encoded[exact])
+
+    def test_uint8_round_trip_error_bound(self, cfg):
+        q = ObservationQuantizer(cfg, "uint8")
+        obs = _random_obs(cfg)
+        packed = q.quantize(obs)
+        assert packed.dtype == np.uint8
+        bound = np.where(cfg.obs_signed_mask, 0.5 / 127, 0.5 / 255) + 1e-6
+        assert (np.abs(q.dequantize(packed) - obs) <= bound).all()
+
+    def test_uint8_clips_out_of_range(self, cfg):
+        q = ObservationQuantizer(cfg, "uint8")
+        obs = np.full(cfg.obs_dim, 2.0, dtype=np.float32)
+        np.testing.assert_array_equal(q.dequantize(q.quantize(obs)), 1.0)
+
+    def test_uint8_observation_space_contains_quantized(self, cfg, encoded):
+        q = ObservationQuantizer(cfg, "uint8")
+        space = q.observation_space()
+        assert space.dtype == np.uint8 and space.shape == (cfg.obs_dim,)
+        assert space.contains(q.quantize(encoded))
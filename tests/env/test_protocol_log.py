@@ -0,0 +1,102 @@
+"""Unit tests for env.protocol_log (recording and reading protocol logs)."""
+import asyncio
+import gzip
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from env.protocol_log import ProtocolLogRecorder, read_protocol_log
+
+BATTLE = [
+    "|player|p1|alice|", "|player|p2|bob|", "|gen|1", "|tier|[Gen 1] OU", "|start", "|turn|1",
+    '|request|{"rqid": 1}',
+]
+
+
+class TestProtocolLogRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "alice.log.gz")
+        self.recorder = ProtocolLogRecorder(self.path, "alice")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _play(self, recorder, tag="battle-gen1ou-1", result="|win|alice"):
+        recorder.record(tag, BATTLE)
+        recorder.record_choice(tag, "/choose move 1")
+        recorder.record(tag, ["|move|p1a: Tauros|Body Slam|p2a: Chansey", "", result])
+
+    def test_round_trip(self):
+        self._play(self.recorder)
+        [record] = read_protocol_log(self.path)
+        self.assertEqual((record.battle_tag, record.username), ("battle-gen1ou-1", "alice"))
+        self.assertEqual(record.battle_format, "gen1ou")
+        self.assertEqual(record.lines, (
+            *BATTLE, ">/choose move 1", "|move|p1a: Tauros|Body Slam|p2a: Chansey", "|win|alice",
+        ))
+
+    def test_battles_are_written_when_they_end(self):
+        self.recorder.record("battle-gen1ou-1", BATTLE)
+        self.assertFalse(os.path.exists(self.path))
+        self.recorder.record("battle-gen1ou-1", ["|tie"])
+        self.assertEqual(self.recorder.battles_written, 1)
+        self.assertEqual(len(list(read_protocol_log(self.path))), 1)
+
+    def test_close_writes_unfinished_battles(self):
+        self.recorder.record("battle-gen1ou-1", BATTLE)
+        self.recorder.close()
+        [record] = read_protocol_log(self.path)
+        self.assertEqual(record.lines, tuple(BATTLE))
+
+    def test_choices_of_unknown_battles_are_ignored(self):
+        self.recorder.record_choice("battle-gen1ou-9", "/choose move 1")
+        self.recorder.close()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_logs_are_append_only(self):
+        self._play(self.recorder, "battle-gen1ou-1")
+        self._play(ProtocolLogRecorder(self.path, "alice"), "battle-gen1ou-2", "|win|bob")
+        tags = [record.battle_tag for record in read_protocol_log(self.path)]
+        self.assertEqual(tags, ["battle-gen1ou-1", "battle-gen1ou-2"])
+
+    def test_truncated_battle_is_skipped(self):
+        self._play(self.recorder, "battle-gen1ou-1")
+        size = os.path.getsize(self.path)
+        self._play(self.recorder, "battle-gen1ou-2")
+        with open(self.path, "r+b") as f:
+            f.truncate(size + 20)
+        with self.assertLogs("env.protocol_log", level="WARNING"):
+            tags = [record.battle_tag for record in read_protocol_log(self.path)]
+        self.assertEqual(tags, ["battle-gen1ou-1"])
+
+    def test_each_battle_is_a_gzip_member(self):
+        self._play(self.recorder, "battle-gen1ou-1")
+        self._play(self.recorder, "battle-gen1ou-2")
+        with open(self.path, "rb") as f:
+            data = f.read()
+        self.assertEqual(data.count(b"\x1f\x8b\x08"), 2)
+        self.assertIn(b">battle-gen1ou-2|alice", gzip.decompress(data))
+
+    def test_attach_records_battle_frames(self):
+        handled = []
+
+        async def handle(split_messages):
+            handled.append(split_messages)
+
+        player = MagicMock()
+        player.ps_client._on_battle_message = handle
+        self.recorder.attach(player)
+        frame = [[">battle-gen1ou-1"], *[line.split("|") for line in BATTLE], ["", "win", "alice"]]
+        asyncio.run(player.ps_client._on_battle_message(frame))
+        asyncio.run(player.ps_client._on_battle_message([[">lobby"], ["", "raw", "hi"]]))
+
+        self.assertEqual(len(handled), 2)
+        [record] = read_protocol_log(self.path)
+        self.assertEqual(record.lines, (*BATTLE, "|win|alice"))
+
+
+if __name__ == "__main__":
+    unittest.main()
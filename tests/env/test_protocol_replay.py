@@ -0,0 +1,109 @@
+"""
+Tests for env.protocol_replay, replaying battles recorded by a simulated env.
+
+Covers:
+  1. Replayed observations, masks, actions, rewards and outcomes match the live env
+  2. Unfinished battles and choices outside the action space
+  3. Replaying many files in worker processes
+"""
+import dataclasses
+import glob
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from env.env_builder import build_env, build_vec_env
+from env.protocol_log import BattleRecord, read_protocol_log
+from env.protocol_replay import replay_battle, replay_protocol_log, replay_protocol_logs
+
+
+class TestProtocolReplay(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.env = build_env("gen1ou", None, 10, simulated=True, protocol_log_dir=self._tmp.name)
+        self.rng = np.random.default_rng(0)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _play_episode(self, seed: int, max_steps: int | None = None):
+        obs, _ = self.env.reset(seed=seed)
+        observations, masks, actions, rewards = [], [], [], []
+        info = {}
+        while max_steps is None or len(actions) < max_steps:
+            action = self.rng.choice(np.flatnonzero(self.env.action_masks()))
+            observations.append(obs["observation"])
+            masks.append(obs["action_mask"].astype(bool))
+            actions.append(action)
+            obs, reward, terminated, truncated, info = self.env.step(action)
+            rewards.append(reward)
+            if terminated or truncated:
+                break
+        return np.array(observations), np.array(masks), np.array(actions), np.array(rewards), info
+
+    def _log_path(self) -> str:
+        [path] = glob.glob(os.path.join(self._tmp.name, "*.log.gz"))
+        return path
+
+    def test_replay_matches_the_live_env(self):
+        episodes = [self._play_episode(seed) for seed in range(3)]
+        replayed = replay_protocol_log(self._log_path())
+        self.assertEqual(len(replayed), 3)
+        for battle, (observations, masks, actions, rewards, info) in zip(replayed, episodes):
+            np.testing.assert_array_equal(battle.observations, observations)
+            np.testing.assert_array_equal(battle.action_masks, masks)
+            np.testing.assert_array_equal(battle.actions, actions)
+            np.testing.assert_allclose(battle.rewards, rewards, atol=1e-6)
+            self.assertEqual(battle.outcome, dataclasses.replace(info["battle_outcome"], opponent=None))
+
+    def test_uint8_observations(self):
+        self._play_episode(0)
+        [record] = read_protocol_log(self._log_path())
+        battle = replay_battle(record, obs_dtype="uint8")
+        self.assertEqual(battle.observations.dtype, np.uint8)
+
+    def test_unfinished_battle(self):
+        self._play_episode(0, max_steps=3)
+        self.env.close()
+        [record] = read_protocol_log(self._log_path())
+        battle = replay_battle(record)
+        self.assertEqual(len(battle), 3)
+        self.assertIsNone(battle.outcome)
+        self.assertEqual(battle.rewards[-1], 0.0)
+
+    def test_choices_outside_the_action_space_are_skipped(self):
+        self._play_episode(0, max_steps=3)
+        self.env.close()
+        [record] = read_protocol_log(self._log_path())
+        first = record.lines.index(next(line for line in record.lines if line.startswith(">")))
+        lines = (*record.lines[:first], ">/choose default", *record.lines[first + 1:])
+        battle = replay_battle(BattleRecord(record.battle_tag, record.username, lines))
+        self.assertEqual(len(battle), 2)
+
+    def test_replay_in_worker_processes(self):
+        self._play_episode(0)
+        self._play_episode(1)
+        in_process = list(replay_protocol_logs([self._log_path()], n_workers=0))
+        in_workers = list(replay_protocol_logs([self._log_path()], n_workers=2))
+        self.assertEqual(len(in_workers), 2)
+        for a, b in zip(in_process, in_workers):
+            np.testing.assert_array_equal(a.observations, b.observations)
+            np.testing.assert_array_equal(a.rewards, b.rewards)
+
+
+class TestBuildVecEnv(unittest.TestCase):
+
+    def test_protocol_logs_need_one_battle_per_process(self):
+        for kwargs in (
+                {"batch_engine": True}, {"async_battles": True},
+                {"battles_per_process": 2}, {"prewarm_battles": True},
+        ):
+            with self.assertRaises(ValueError):
+                build_vec_env(2, "gen1ou", None, 10, protocol_log_dir="logs", **kwargs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,8 +14,12 @@ Covers:
   7. get_state_value — WIN_BONUS / LOSS_PENALTY asymmetry
   8. get_state_value — missing team members padding
   9. get_state_value — additive combination of all components
+ 10. fused_state_value / state_value_from_obs — parity with get_state_value
+     on encoded synthetic battles
+ 11. get_state_value(components=True) — per-component breakdown
 """
 
+import numpy as np
 import pytest
 from unittest.mock import MagicMock
 from poke_env.battle import Status
@@ -30,8 +34,15 @@ from env.reward import (
     OWN_BOOST_VALUES,
     OPP_BOOST_PENALTIES,
     _STATUS_WEIGHTS,
+    fused_state_value,
+    fused_state_value_components,
+    state_value_from_obs,
+    state_value_weights,
+    REWARD_COMPONENTS,
 )
-from env.states.gen1.battle_state_gen_1 import MAX_TEAM_SIZE
+from env.battle_config import BattleConfig
+from env.states.gen1.battle_state_gen_1 import BattleStateGen1, MAX_TEAM_SIZE
+from tests.conftest import SYNTHETIC_STAGES, make_synthetic_battle
 
 
 # ---------------------------------------------------------------------------
@@ -337,3 +348,108 @@ class TestTeamPadding:
         battle = make_battle(own_team=own, opp_team=opp)
         # own: 6*1.0 - 0 padding; opp: -6*1.0 - 0 padding → sum = 0
         assert get_state_value(battle) == pytest.approx(0.0)
+
+
+# ---------------------------------------------------------------------------
+# 10. Fused state value from encoded observations
+# ---------------------------------------------------------------------------
+
+SYNTHETIC = [(stage, seed) for stage in SYNTHETIC_STAGES for seed in range(4)]
+
+
+class TestFusedStateValue:
+
+    @pytest.mark.parametrize("stage,seed", SYNTHETIC)
+    def test_matches_get_state_value(self, stage, seed):
+        battle = make_synthetic_battle(stage, seed)
+        obs = BattleStateGen1(battle).to_array()
+        assert fused_state_value(obs, battle) == pytest.approx(get_state_value(battle), abs=1e-5)
+
+    @pytest.mark.parametrize("won,lost,bonus", [(True, False, WIN_BONUS), (False, True, LOSS_PENALTY)])
+    def test_outcome_bonus(self, won, lost, bonus):
+        battle = make_synthetic_battle("late", 0)
+        obs = BattleStateGen1(battle).to_array()
+        base = fused_state_value(obs, battle)
+        battle._won = won
+        battle._finished = True
+        assert fused_state_value(obs, battle) == pytest.approx(base + bonus)
+
+    def test_batch_matches_scalar(self):
+        battles = [make_synthetic_battle(stage, seed) for stage, seed in SYNTHETIC]
+        obs = BattleStateGen1.encode_batch(battles)
+        values = state_value_from_obs(
+            obs,
+            [len(b.team) for b in battles],
+            [len(b.opponent_team) for b in battles],
+            [bool(b.won) for b in battles],
+            [bool(b.lost) for b in battles],
+        )
+        expected = [get_state_value(b) for b in battles]
+        np.testing.assert_allclose(values, expected, atol=1e-5)
+
+    def test_weights_are_cached_and_read_only(self):
+        weights = state_value_weights(BattleConfig.gen1())
+        assert weights is state_value_weights(BattleConfig.gen1())
+        assert weights.shape == (BattleConfig.gen1().obs_dim,)
+        with pytest.raises(ValueError):
+            weights[0] = 1.0
+
+    def test_spd_weight_folded_into_spa(self):
+        """Gen 1 encodes only spa; its weight carries the spd weight too."""
+        cfg = BattleConfig.gen1()
+        weights = cfg.layout.view(state_value_weights(cfg))
+        state_cls = cfg.my_pokemon_state_cls
+        spa = state_cls.boost_columns()[state_cls.BOOST_KEYS.index("spa")]
+        expected = (OWN_BOOST_VALUES["spa"] + OWN_BOOST_VALUES["spd"]) * 6.0
+        assert weights.my_team[0].data[spa] == pytest.approx(expected)
+
+    def test_moves_and_alive_vectors_carry_no_weight(self):
+        cfg = BattleConfig.gen1()
+        weights = cfg.layout.view(state_value_weights(cfg))
+        assert not weights.my_moves.any()
+        assert not weights.opp_moves.data.any()
+        assert not weights.my_alive.any() and not weights.opp_alive.any()
+
+
+# ---------------------------------------------------------------------------
+# 11. Per-component breakdown
+# ---------------------------------------------------------------------------
+
+class TestRewardComponents:
+
+    def _index(self, name):
+        return REWARD_COMPONENTS.index(name)
+
+    def test_components_sum_to_scalar(self):
+        battle = make_battle(
+            own_team=[make_pokemon(0.5, status=Status.PAR, boosts={"atk": 2})],
+            opp_team=[make_pokemon(0.0, fainted=True), make_pokemon(0.3, boosts={"spe": -1})],
+            won=True,
+        )
+        components = get_state_value(battle, components=True)
+        assert components.shape == (len(REWARD_COMPONENTS),)
+        assert components.sum() == pytest.approx(get_state_value(battle))
+
+    def test_each_term_lands_in_its_component(self):
+        battle = make_battle(
+            own_team=[make_pokemon(1.0, fainted=True)],
+            opp_team=[make_pokemon(1.0, status=Status.SLP, boosts={"atk": -1})],
+            lost=True,
+        )
+        c = get_state_value(battle, components=True)
+        assert c[self._index("faint")] == pytest.approx(-FAINTED_VALUE)
+        assert c[self._index("status")] == pytest.approx(_STATUS_WEIGHTS[Status.SLP])
+        assert c[self._index("boost")] == pytest.approx(OPP_BOOST_PENALTIES["atk"])
+        assert c[self._index("terminal")] == pytest.approx(LOSS_PENALTY)
+        # 1.0 own + 5 own padding - 1.0 opp - 5 opp padding
+        assert c[self._index("hp")] == pytest.approx(0.0)
+
+    @pytest.mark.parametrize("stage,seed", SYNTHETIC)
+    def test_fused_components_match(self, stage, seed):
+        battle = make_synthetic_battle(stage, seed)
+        obs = BattleStateGen1(battle).to_array()
+        np.testing.assert_allclose(
+            fused_state_value_components(obs, battle),
+            get_state_value(battle, components=True),
+            atol=1e-5,
+        )
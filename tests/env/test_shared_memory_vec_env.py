@@ -0,0 +1,193 @@
+"""
+Tests for env.shared_memory_vec_env.SharedMemoryVecEnv.
+
+Covers:
+  1. SharedStepBuffers — layout, and views shared between creator and attacher
+  2. Gymnasium env workers — step results and terminal observations via the ring
+  3. AsyncBattleVecEnv workers — P processes of K battles, masks without IPC
+"""
+import unittest
+from functools import partial
+
+import gymnasium as gym
+import numpy as np
+
+from env.async_vec_env import AsyncBattleVecEnv
+from env.battle_config import BattleConfig
+from env.shared_memory_vec_env import SharedMemoryVecEnv, SharedStepBuffers
+from tests.env.test_async_vec_env import RANDOM, FakeShowdown, _legal_actions
+
+OBS_SPACE = gym.spaces.Dict({
+    "observation": gym.spaces.Box(-1.0, 1.0, shape=(3,), dtype=np.float32),
+    "action_mask": gym.spaces.Box(0, 1, shape=(4,), dtype=np.int8),
+})
+
+
+class CountingEnv(gym.Env):
+    """Observation ``[t, action, offset]``; episodes last ``length`` steps, reward is the action."""
+
+    observation_space = OBS_SPACE
+    action_space = gym.spaces.Discrete(4)
+
+    def __init__(self, offset: float = 0.0, length: int = 3):
+        self.offset = offset
+        self.length = length
+        self.t = 0
+
+    def _obs(self, action: int = 0):
+        mask = np.zeros(4, dtype=np.int8)
+        mask[self.t % 4] = 1
+        obs = np.array([self.t / 10, action / 10, self.offset], dtype=np.float32)
+        return {"observation": obs, "action_mask": mask}
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed)
+        self.t = 0
+        return self._obs(), {"offset": self.offset, "seed": seed, "options": options}
+
+    def step(self, action):
+        self.t += 1
+        return self._obs(int(action)), float(action), self.t >= self.length, False, {}
+
+    def action_masks(self) -> np.ndarray:
+        return self._obs()["action_mask"].astype(bool)
+
+
+def _fake_battles(n_envs: int, turns: int = 2) -> AsyncBattleVecEnv:
+    env = AsyncBattleVecEnv(
+        n_envs, battle_format="gen1ou", opponent_player_spec=RANDOM,
+        unique_id="shm", start_listening=False, challenge_timeout=5.0,
+    )
+    env.server = FakeShowdown(env, turns=turns)
+    return env
+
+
+# ---------------------------------------------------------------------------
+# 1. SharedStepBuffers
+# ---------------------------------------------------------------------------
+
+class TestSharedStepBuffers(unittest.TestCase):
+
+    def test_layout(self):
+        buffers = SharedStepBuffers(OBS_SPACE, n_actions=4, n_envs=5, ring_size=3)
+        self.addCleanup(buffers.close)
+        self.assertEqual(buffers.obs["observation"].shape, (3, 5, 3))
+        self.assertEqual(buffers.obs["action_mask"].dtype, np.int8)
+        self.assertEqual(buffers.terminal_obs["observation"].shape, (5, 3))
+        self.assertEqual(buffers.masks.shape, (3, 5, 4))
+        self.assertEqual(buffers.rewards.dtype, np.float32)
+        self.assertEqual(buffers.actions.shape, (5,))
+
+    def test_attached_views_share_memory(self):
+        owner = SharedStepBuffers(OBS_SPACE, n_actions=4, n_envs=2)
+        self.addCleanup(owner.close)
+        attached = SharedStepBuffers(OBS_SPACE, n_actions=4, n_envs=2, name=owner.name)
+        self.addCleanup(attached.close)
+        attached.write_obs(1, slice(1, 2), {"observation": np.full((1, 3), 0.5, dtype=np.float32)})
+        attached.masks[1, 1, 2] = True
+        np.testing.assert_array_equal(owner.read_obs(1)["observation"][1], [0.5, 0.5, 0.5])
+        self.assertTrue(owner.masks[1, 1, 2])
+        self.assertFalse(owner.masks[0].any())
+
+
+# ---------------------------------------------------------------------------
+# 2. Gymnasium env workers
+# ---------------------------------------------------------------------------
+
+class TestGymWorkers(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.env = SharedMemoryVecEnv([partial(CountingEnv, 0.1), partial(CountingEnv, 0.2)])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.env.close()
+
+    def test_reset_writes_every_row(self):
+        obs = self.env.reset()
+        np.testing.assert_allclose(obs["observation"][:, 2], [0.1, 0.2])
+        self.assertEqual([info["offset"] for info in self.env.reset_infos], [0.1, 0.2])
+
+    def test_reset_forwards_seeds_and_options(self):
+        self.env.seed(7)
+        self.env.set_options({"k": 1})
+        self.env.reset()
+        self.assertEqual([info["seed"] for info in self.env.reset_infos], [7, 8])
+        self.assertEqual([info["options"] for info in self.env.reset_infos], [{"k": 1}] * 2)
+        self.env.reset()
+        self.assertEqual([info["seed"] for info in self.env.reset_infos], [None, None])
+
+    def test_step_returns_actions_rewards_and_dones(self):
+        self.env.reset()
+        obs, rewards, dones, _ = self.env.step(np.array([1, 3]))
+        np.testing.assert_allclose(obs["observation"][:, 1], [0.1, 0.3])
+        np.testing.assert_array_equal(rewards, [1.0, 3.0])
+        self.assertFalse(dones.any())
+
+    def test_returned_obs_survive_the_next_step(self):
+        self.env.reset()
+        first, *_ = self.env.step(np.array([1, 1]))
+        kept = first["observation"].copy()
+        self.env.step(np.array([2, 2]))
+        np.testing.assert_array_equal(first["observation"], kept)
+
+    def test_terminal_observation_rebuilt_from_shared_memory(self):
+        self.env.reset()
+        for action in (1, 2):
+            self.env.step(np.array([action, action]))
+        obs, _, dones, infos = self.env.step(np.array([3, 3]))
+        self.assertTrue(dones.all())
+        terminal = infos[1]["terminal_observation"]
+        np.testing.assert_allclose(terminal["observation"], [0.3, 0.3, 0.2])
+        np.testing.assert_allclose(obs["observation"][1], [0.0, 0.0, 0.2])
+
+    def test_action_masks_served_from_shared_memory(self):
+        self.env.reset()
+        self.env.step(np.array([0, 0]))
+        expected = np.array([[False, True, False, False]] * 2)
+        np.testing.assert_array_equal(self.env.action_masks(), expected)
+        np.testing.assert_array_equal(np.stack(self.env.env_method("action_masks")), expected)
+
+    def test_ring_size_must_hold_previous_obs(self):
+        with self.assertRaises(ValueError):
+            SharedMemoryVecEnv([CountingEnv], ring_size=1)
+
+
+# ---------------------------------------------------------------------------
+# 3. AsyncBattleVecEnv workers
+# ---------------------------------------------------------------------------
+
+class TestBattleWorkers(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.env = SharedMemoryVecEnv([partial(_fake_battles, 2), partial(_fake_battles, 3)])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.env.close()
+
+    def test_envs_span_every_worker(self):
+        self.assertEqual(self.env.num_envs, 5)
+        obs = self.env.reset()
+        self.assertEqual(obs["observation"].shape, (5, BattleConfig.gen1().obs_dim))
+        np.testing.assert_array_equal(self.env.action_masks(), obs["action_mask"].astype(bool))
+
+    def test_episode_end(self):
+        self.env.reset()
+        _, _, dones, _ = self.env.step(_legal_actions(self.env))
+        self.assertFalse(dones.any())
+        obs, _, dones, infos = self.env.step(_legal_actions(self.env))
+        self.assertTrue(dones.all())
+        self.assertEqual(infos[4]["terminal_observation"]["observation"].shape, (BattleConfig.gen1().obs_dim,))
+        np.testing.assert_array_equal(self.env.action_masks(), obs["action_mask"].astype(bool))
+
+    def test_indices_map_to_worker_slots(self):
+        self.assertEqual(self.env.get_attr("index", indices=[4, 0, 2]), [2, 0, 0])
+        self.env.set_attr("last_battle", "x", indices=[1, 3])
+        self.assertEqual(self.env.env_method("get_last_battle", indices=[1, 3]), ["x", "x"])
+
+
+if __name__ == "__main__":
+    unittest.main()
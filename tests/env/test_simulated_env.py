@@ -0,0 +1,94 @@
+"""
+Tests for env.simulated_env.SimulatedSinglesEnv built through build_env.
+
+Covers:
+  1. Observations and masks match the codec's encoding of the parsed battle
+  2. Episodes end with a finished poke-env battle and a battle outcome
+  3. Resets mid-battle forfeit; opponent swaps stay off the server
+  4. build_vec_env rejects simulated battles in multi-battle topologies
+"""
+import random
+import unittest
+
+import numpy as np
+
+from curriculum.models import OpponentPlayerSpec
+from env.battle_config import BattleConfig
+from env.env_builder import build_env, build_vec_env
+
+
+def _random_action(env, rng) -> np.int64:
+    return rng.choice(np.flatnonzero(env.action_masks()))
+
+
+class TestSimulatedSinglesEnv(unittest.TestCase):
+
+    def setUp(self):
+        self.env = build_env("gen1ou", None, 10, simulated=True)
+        self.rng = np.random.default_rng(0)
+
+    def _play_episode(self):
+        self.env.reset(seed=1)
+        while True:
+            obs, reward, terminated, truncated, info = self.env.step(_random_action(self.env, self.rng))
+            if terminated or truncated:
+                return obs, info
+
+    def test_reset_observation(self):
+        obs, _ = self.env.reset(seed=0)
+        self.assertEqual(obs["observation"].shape, (BattleConfig.gen1().obs_dim,))
+        np.testing.assert_array_equal(obs["action_mask"].astype(bool), self.env.action_masks())
+        battle = self.env.unwrapped.battle1
+        self.assertEqual(len(battle.team), 6)
+        self.assertEqual(len(battle.available_moves), 4)
+        self.assertEqual(len(battle.opponent_team), 1)
+
+    def test_masks_follow_every_step(self):
+        obs, _ = self.env.reset(seed=0)
+        for _ in range(10):
+            obs, *_ = self.env.step(_random_action(self.env, self.rng))
+            np.testing.assert_array_equal(obs["action_mask"].astype(bool), self.env.action_masks())
+
+    def test_episode_ends_with_outcome(self):
+        _, info = self._play_episode()
+        battle = self.env.get_last_battle()
+        self.assertTrue(battle.finished)
+        outcome = info["battle_outcome"]
+        self.assertEqual(outcome.won, battle.won is True)
+        self.assertEqual(outcome.opponent, "max-power")
+
+    def test_seeded_episodes_repeat(self):
+        turns = []
+        for _ in range(2):
+            # The opponent's random fallbacks draw from ``random``.
+            random.seed(0)
+            self.rng = np.random.default_rng(0)
+            self._play_episode()
+            turns.append(self.env.get_last_battle().turn)
+        self.assertEqual(turns[0], turns[1])
+
+    def test_reset_forfeits_the_running_battle(self):
+        self.env.reset(seed=0)
+        battle = self.env.unwrapped.battle1
+        self.env.reset()
+        self.assertTrue(battle.finished)
+        self.assertFalse(battle.won)
+
+    def test_opponent_swap(self):
+        self.env.schedule_opponent_player(OpponentPlayerSpec(id="random", kwargs={}))
+        self.env.reset()
+        self.assertEqual(self.env.get_opponent_player_spec().id, "random")
+        self.assertEqual(type(self.env.unwrapped.opponent).__name__, "RandomPlayer")
+        self._play_episode()
+
+
+class TestBuildVecEnv(unittest.TestCase):
+
+    def test_simulated_needs_one_battle_per_process(self):
+        for kwargs in ({"async_battles": True}, {"battles_per_process": 2}, {"prewarm_battles": True}):
+            with self.assertRaises(ValueError):
+                build_vec_env(2, "gen1ou", None, 10, simulated=True, **kwargs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,10 +4,12 @@ from unittest.mock import MagicMock, patch, PropertyMock
 import numpy as np
 
 from env.battle_config import BattleConfig
-from env.singles_env_wrapper import PokemonRLWrapper, print_state
+from env.observation_quantizer import ObservationQuantizer
+from curriculum.models import OpponentPlayerSpec
+from env.singles_env_wrapper import BattleOutcome, PokemonRLWrapper, print_state
 from tests.conftest import (
     make_mock_battle, make_mock_move, make_mock_pokemon,
-    MockTeamGenerator,
+    make_synthetic_battle, MockTeamGenerator,
 )
 
 
@@ -32,9 +34,24 @@ def _create_wrapper(**kwargs):
         wrapper.observation_spaces = {}
         wrapper._reward_buffer = {}
         wrapper._obs_cache = {}
+        wrapper._encoders = {}
+        wrapper._incremental_encoding = False
+        wrapper._fused_reward = False
+        wrapper._value_weights = None
+        wrapper._state_values = {}
+        wrapper._reward_components = False
+        wrapper._component_weights = None
+        wrapper._component_buffer = {}
+        wrapper._last_reward_components = None
+        wrapper._last_outcome = None
+        wrapper.protocol_log = None
         wrapper.action_mask = MagicMock()
         wrapper.rounds_played = 0
         wrapper._battle_config = BattleConfig.gen1()
+        wrapper._quantizer = ObservationQuantizer(wrapper._battle_config, kwargs.get('obs_dtype', 'float32'))
+        wrapper._blank_obs = wrapper._quantizer.quantize(
+            np.zeros(wrapper._battle_config.obs_dim, dtype=np.float32)
+        )
         return wrapper
 
 
@@ -93,6 +110,12 @@ class TestPokemonRLWrapperInit(unittest.TestCase):
         self.assertEqual(wrapper.agent_team_generator, agent_gen)
         self.assertEqual(wrapper.opponent_team_generator, opponent_gen)
 
+    def test_compiled_encoder_is_the_default(self):
+        """Verify incremental encoding is opt-in."""
+        self.assertFalse(PokemonRLWrapper(battle_format="gen1ou", start_listening=False)._incremental_encoding)
+        wrapper = PokemonRLWrapper(battle_format="gen1ou", start_listening=False, incremental_encoding=True)
+        self.assertTrue(wrapper._incremental_encoding)
+
     def test_action_space_is_discrete_26(self):
         """Verify action space is Discrete(26)."""
         import gymnasium as gym
@@ -190,7 +213,7 @@ class TestEmbedBattle(unittest.TestCase):
         mock_array = np.array([1.0, -0.5, 0.0] * 256)[:768]
         mock_state.to_array.return_value = mock_array
         mock_state_class = MagicMock(return_value=mock_state)
-        wrapper._battle_config = MagicMock(battle_state_cls=mock_state_class)
+        wrapper._battle_config = MagicMock(battle_state_cls=mock_state_class, encoder=None)
 
         battle = make_mock_battle(player_username="player")
 
@@ -208,7 +231,7 @@ class TestEmbedBattle(unittest.TestCase):
         mock_state = MagicMock()
         mock_state.to_array.return_value = np.zeros(768)
         mock_state_class = MagicMock(return_value=mock_state)
-        wrapper._battle_config = MagicMock(battle_state_cls=mock_state_class)
+        wrapper._battle_config = MagicMock(battle_state_cls=mock_state_class, encoder=None)
 
         battle = make_mock_battle(player_username="opponent")
 
@@ -216,6 +239,63 @@ class TestEmbedBattle(unittest.TestCase):
 
         wrapper.action_mask.set_mask.assert_not_called()
 
+    def test_embed_battle_uses_compiled_encoder_when_not_incremental(self):
+        """Verify the config's compiled encoder replaces the generic state path."""
+        wrapper = _create_wrapper()
+        encoded = np.ones(768, dtype=np.float32)
+        encoder = MagicMock(return_value=encoded)
+        state_cls = MagicMock()
+        wrapper._battle_config = MagicMock(battle_state_cls=state_cls, encoder=encoder)
+
+        battle = make_mock_battle(player_username="player")
+        result = wrapper.embed_battle(battle)
+
+        encoder.assert_called_once_with(battle)
+        state_cls.assert_not_called()
+        np.testing.assert_array_equal(result, encoded)
+
+    def test_embed_battle_incremental_reuses_encoder_per_battle(self):
+        """Verify the incremental path keeps one encoder per battle across turns."""
+        wrapper = _create_wrapper()
+        wrapper._incremental_encoding = True
+
+        mock_encoder = MagicMock()
+        mock_encoder.encode.return_value = np.zeros(768)
+        encoder_cls = MagicMock(return_value=mock_encoder)
+        state_cls = MagicMock()
+        wrapper._battle_config = MagicMock(
+            battle_state_cls=state_cls, incremental_encoder_cls=encoder_cls,
+        )
+
+        battle = make_mock_battle(player_username="player")
+        wrapper.embed_battle(battle)
+        battle.turn += 1
+        wrapper.embed_battle(battle)
+
+        encoder_cls.assert_called_once_with()
+        self.assertEqual(mock_encoder.encode.call_count, 2)
+        state_cls.assert_not_called()
+
+    def test_embed_battle_uint8_quantizes_and_blanks_opponent_turn(self):
+        """Verify obs_dtype='uint8' quantizes player obs and the opponent fallback."""
+        wrapper = _create_wrapper(obs_dtype="uint8")
+        obs_dim = wrapper._battle_config.obs_dim
+        encoded = np.zeros(obs_dim, dtype=np.float32)
+        encoded[0] = 1.0
+        wrapper._battle_config = MagicMock(
+            battle_state_cls=MagicMock(return_value=MagicMock(to_array=MagicMock(return_value=encoded))),
+            obs_dim=obs_dim,
+            encoder=None,
+        )
+
+        result = wrapper.embed_battle(make_mock_battle(player_username="player"))
+        blank = wrapper.embed_battle(make_mock_battle(player_username="opponent"))
+
+        self.assertEqual(result.dtype, np.uint8)
+        np.testing.assert_array_equal(wrapper._quantizer.dequantize(result), encoded)
+        self.assertEqual(blank.dtype, np.uint8)
+        np.testing.assert_array_equal(wrapper._quantizer.dequantize(blank), 0.0)
+
 
 class TestCalcReward(unittest.TestCase):
     """Test calc_reward method."""
@@ -286,6 +366,44 @@ class TestCalcReward(unittest.TestCase):
         
         self.assertEqual(wrapper.rounds_played, 0)
 
+    @patch('env.singles_env_wrapper.get_state_value')
+    def test_calc_reward_uses_fused_value_from_embed(self, mock_get_value):
+        """Verify the value computed in embed_battle is consumed once, then the fallback is used."""
+        wrapper = _create_wrapper()
+        wrapper._fused_reward = True
+        wrapper._value_weights = np.ones(wrapper._battle_config.obs_dim)
+        encoded = np.full(wrapper._battle_config.obs_dim, 0.001, dtype=np.float32)
+        wrapper._encode = MagicMock(return_value=encoded)
+        mock_get_value.return_value = 9.0
+
+        battle = make_mock_battle(player_username="player")
+        battle.opponent_team = {}
+        wrapper.embed_battle(battle)
+
+        self.assertAlmostEqual(wrapper.calc_reward(battle), float(encoded.sum()), places=4)
+        mock_get_value.assert_not_called()
+        wrapper.calc_reward(battle)
+        mock_get_value.assert_called_once_with(battle, components=False)
+
+    @patch('env.singles_env_wrapper.get_state_value')
+    def test_calc_reward_components_reports_deltas_in_info(self, mock_get_value):
+        """Verify component deltas reach the agent1 info once and the scalar reward is their sum."""
+        wrapper = _create_wrapper()
+        wrapper._reward_components = True
+        mock_get_value.side_effect = [np.array([1.0, 0.0, -0.5, 0.2, 0.0]),
+                                      np.array([0.5, 5.0, -0.5, 0.2, 0.0])]
+        battle = make_mock_battle(player_username="player")
+
+        self.assertAlmostEqual(wrapper.calc_reward(battle), 0.7)
+        reward = wrapper.calc_reward(battle)
+
+        self.assertAlmostEqual(reward, 4.5)
+        with patch('env.singles_env_wrapper.SinglesEnv.get_additional_info',
+                   side_effect=lambda: {"agent1": {}, "agent2": {}}):
+            info = wrapper.get_additional_info()
+            np.testing.assert_allclose(info["agent1"]["reward_components"], [-0.5, 5.0, 0.0, 0.0, 0.0])
+            self.assertNotIn("reward_components", wrapper.get_additional_info()["agent1"])
+
 
 class TestReset(unittest.TestCase):
     """Test reset method."""
@@ -408,5 +526,59 @@ class TestGetLastBattle(unittest.TestCase):
         self.assertIsNone(result)
 
 
+class TestBattleOutcome(unittest.TestCase):
+    """Test the compact outcome record reported at the end of a battle."""
+
+    def test_from_battle_summarises_result_turns_and_hp(self):
+        battle = make_synthetic_battle("late", seed=1)
+        battle.won_by("me")
+
+        outcome = BattleOutcome.from_battle(battle)
+
+        self.assertTrue(outcome.won)
+        self.assertFalse(outcome.lost or outcome.draw)
+        self.assertEqual(outcome.score, 1.0)
+        self.assertEqual(outcome.turns, battle.turn)
+        expected_hp = np.mean([mon.current_hp_fraction for mon in battle.team.values()])
+        self.assertAlmostEqual(outcome.hp_fraction, expected_hp)
+        self.assertLess(outcome.opponent_hp_fraction, 1.0)
+        self.assertIsNone(outcome.opponent)
+
+    def test_unrevealed_opponents_count_at_full_hp(self):
+        battle = make_synthetic_battle("early")
+        battle.tied()
+
+        outcome = BattleOutcome.from_battle(battle)
+
+        self.assertTrue(outcome.draw)
+        self.assertEqual(outcome.score, 0.5)
+        self.assertEqual(outcome.opponent_hp_fraction, 1.0)
+
+    def test_with_opponent_tags_spec_id_or_class_path(self):
+        outcome = BattleOutcome(won=False, lost=True, turns=3, hp_fraction=0.0, opponent_hp_fraction=0.5)
+        self.assertEqual(outcome.with_opponent(OpponentPlayerSpec(id="random")).opponent, "random")
+        self.assertEqual(
+            outcome.with_opponent(OpponentPlayerSpec(class_path="pkg.Player")).opponent, "pkg.Player"
+        )
+        self.assertEqual(outcome.score, 0.0)
+
+    @patch('env.singles_env_wrapper.get_state_value')
+    def test_outcome_reported_once_in_agent_info(self, mock_get_value):
+        wrapper = _create_wrapper()
+        mock_get_value.return_value = 0.0
+        battle = make_synthetic_battle("mid")
+        battle.player_username = "player"
+        battle.won_by("foe")
+
+        wrapper.calc_reward(battle)
+
+        with patch('env.singles_env_wrapper.SinglesEnv.get_additional_info',
+                   side_effect=lambda: {"agent1": {}, "agent2": {}}):
+            info = wrapper.get_additional_info()
+            self.assertTrue(info["agent1"]["battle_outcome"].lost)
+            self.assertNotIn("battle_outcome", info["agent2"])
+            self.assertNotIn("battle_outcome", wrapper.get_additional_info()["agent1"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,105 @@
+"""
+Tests for env.worker_vec_env (the plumbing shared by the worker-process vec envs).
+
+Covers:
+  1. Index routing — get_attr/set_attr/env_method across workers of different sizes
+  2. Reset arguments — each worker's share of the seeds and options
+"""
+import unittest
+from functools import partial
+
+import gymnasium as gym
+import numpy as np
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from env.worker_vec_env import WorkerVecEnv, serve_worker, start_worker_env
+
+
+class TaggedEnv(gym.Env):
+    observation_space = gym.spaces.Box(0.0, 1.0, shape=(1,), dtype=np.float32)
+    action_space = gym.spaces.Discrete(2)
+
+    def __init__(self, tag: str):
+        self.tag = tag
+
+    def describe(self, prefix: str) -> str:
+        return f"{prefix}{self.tag}"
+
+
+def _tagged(*tags: str) -> DummyVecEnv:
+    return DummyVecEnv([partial(TaggedEnv, tag) for tag in tags])
+
+
+def _generic_worker(remote, parent_remote, env_fn_wrapper):
+    serve_worker(remote, start_worker_env(remote, parent_remote, env_fn_wrapper), {})
+
+
+class GenericVecEnv(WorkerVecEnv):
+    """Only the generic commands; stepping is not needed here."""
+
+    def __init__(self, env_fns):
+        super().__init__(env_fns, _generic_worker)
+
+    def reset(self):
+        raise NotImplementedError
+
+    def step_async(self, actions):
+        raise NotImplementedError
+
+    def step_wait(self):
+        raise NotImplementedError
+
+
+class _EnvTestCase(unittest.TestCase):
+    """Workers of 2, 1 and 2 envs; the middle one hosts a plain gymnasium env."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.env = GenericVecEnv([partial(_tagged, "a", "b"), partial(TaggedEnv, "c"), partial(_tagged, "d", "e")])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.env.close()
+
+
+# ---------------------------------------------------------------------------
+# 1. Index routing
+# ---------------------------------------------------------------------------
+
+class TestIndexRouting(_EnvTestCase):
+
+    def test_indices_map_to_worker_envs(self):
+        self.assertEqual(self.env.num_envs, 5)
+        self.assertEqual(self.env.get_attr("tag"), ["a", "b", "c", "d", "e"])
+        self.assertEqual(self.env.get_attr("tag", indices=[4, 0, 2]), ["e", "a", "c"])
+        self.assertEqual(self.env.env_method("describe", "env-", indices=[3, 1]), ["env-d", "env-b"])
+
+    def test_set_attr_reaches_only_the_given_envs(self):
+        self.env.set_attr("tag", "x", indices=[1, 2])
+        self.addCleanup(self.env.set_attr, "tag", "b", indices=[1])
+        self.addCleanup(self.env.set_attr, "tag", "c", indices=[2])
+        self.assertEqual(self.env.get_attr("tag"), ["a", "x", "x", "d", "e"])
+
+    def test_env_is_wrapped(self):
+        self.assertEqual(self.env.env_is_wrapped(gym.Wrapper), [False] * 5)
+
+
+# ---------------------------------------------------------------------------
+# 2. Reset arguments
+# ---------------------------------------------------------------------------
+
+class TestResetArguments(_EnvTestCase):
+
+    def test_reset_arguments_are_split_by_worker(self):
+        self.env.seed(10)
+        self.env.set_options([{"i": i} for i in range(5)])
+        self.addCleanup(self.env._reset_seeds)
+        self.addCleanup(self.env._reset_options)
+        seeds, options = self.env._reset_arguments(2)
+        self.assertEqual(seeds, [13, 14])
+        self.assertEqual(options, [{"i": 3}, {"i": 4}])
+        self.assertEqual(self.env._reset_arguments(1), ([12], [{"i": 2}]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -378,3 +378,18 @@ class TestInternalMethods:
         with torch.no_grad():
             out = self.policy._run_extractor(obs)
         assert out.features.shape == (2, TRUNK_HIDDEN)
+
+    def test_run_extractor_dequantizes_uint8_obs(self):
+        """uint8 observations are decoded with the layout's scale table before extraction."""
+        from env.battle_config import BattleConfig
+        from env.observation_quantizer import ObservationQuantizer
+
+        quantizer = ObservationQuantizer(BattleConfig.gen1(), "uint8")
+        signed = BattleConfig.gen1().obs_signed_mask
+        low = np.where(signed, -1.0, 0.0)
+        obs = np.random.default_rng(0).uniform(low, 1.0, size=(2, OBS_DIM)).astype(np.float32)
+        q = quantizer.quantize(obs)
+        with torch.no_grad():
+            from_uint8 = self.policy._run_extractor(torch.as_tensor(q))
+            from_float = self.policy._run_extractor(torch.as_tensor(quantizer.dequantize(q)))
+        torch.testing.assert_close(from_uint8.features, from_float.features)
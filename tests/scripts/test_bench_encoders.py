@@ -0,0 +1,117 @@
+"""Unit tests for scripts.bench_encoders and the synthetic battle fixtures."""
+import json
+import unittest
+
+import numpy as np
+
+from env.states.gen1.battle_state_gen_1 import BattleStateGen1
+from scripts.bench_encoders import (
+    COMPONENTS, find_regressions, format_report, main, run_benchmarks,
+)
+from tests.conftest import SYNTHETIC_STAGES, make_synthetic_battle
+
+METRIC_KEYS = {"ns_per_turn", "ns_per_turn_min", "alloc_bytes_per_turn", "peak_bytes", "retained_blocks_per_turn"}
+
+
+def _report(ns_by_key: dict) -> dict:
+    results = {}
+    for (stage, name), ns in ns_by_key.items():
+        results.setdefault(stage, {})[name] = {"ns_per_turn": ns}
+    return {"results": results}
+
+
+class TestSyntheticBattles(unittest.TestCase):
+    """Test make_synthetic_battle."""
+
+    def test_stages_have_full_teams_and_expected_turns(self):
+        for stage, turn in zip(SYNTHETIC_STAGES, (1, 12, 40)):
+            battle = make_synthetic_battle(stage, seed=1)
+            self.assertEqual(len(battle.team), 6)
+            self.assertEqual(battle.turn, turn)
+            self.assertFalse(battle.active_pokemon.fainted)
+
+    def test_late_game_has_fainted_opponents(self):
+        battle = make_synthetic_battle("late", seed=0)
+        self.assertEqual(len(battle.opponent_team), 6)
+        self.assertEqual(sum(p.fainted for p in battle.opponent_team.values()), 3)
+
+    def test_seed_varies_move_sets(self):
+        move_sets = {
+            tuple(make_synthetic_battle("mid", seed=s).active_pokemon.moves) for s in range(5)
+        }
+        self.assertGreater(len(move_sets), 1)
+
+    def test_same_seed_is_deterministic(self):
+        a = BattleStateGen1(make_synthetic_battle("mid", seed=3)).to_array()
+        b = BattleStateGen1(make_synthetic_battle("mid", seed=3)).to_array()
+        np.testing.assert_array_equal(a, b)
+
+    def test_unknown_stage_raises(self):
+        with self.assertRaises(ValueError):
+            make_synthetic_battle("overtime")
+
+
+class TestRunBenchmarks(unittest.TestCase):
+    """Test run_benchmarks on a tiny configuration."""
+
+    def test_reports_every_stage_and_component(self):
+        report = run_benchmarks(seeds=1, repeats=1, number=1)
+        self.assertEqual(set(report["results"]), set(SYNTHETIC_STAGES))
+        for comps in report["results"].values():
+            self.assertEqual(set(comps), set(COMPONENTS))
+            for metrics in comps.values():
+                self.assertEqual(set(metrics), METRIC_KEYS)
+                self.assertGreater(metrics["ns_per_turn"], 0)
+        self.assertEqual(report["meta"]["seeds"], 1)
+        json.dumps(report)   # JSON serialisable
+
+    def test_component_subset(self):
+        report = run_benchmarks(seeds=1, repeats=1, number=1, stages=("early",),
+                                components={"reward": COMPONENTS["reward"]})
+        self.assertEqual(list(report["results"]["early"]), ["reward"])
+
+
+class TestFindRegressions(unittest.TestCase):
+    """Test find_regressions."""
+
+    def test_flags_only_slowdowns_above_threshold(self):
+        base = _report({("mid", "reward"): 100.0, ("mid", "move_state"): 100.0})
+        new = _report({("mid", "reward"): 130.0, ("mid", "move_state"): 110.0})
+        regressions = find_regressions(base, new, threshold=1.2)
+        self.assertEqual([(r["stage"], r["component"]) for r in regressions], [("mid", "reward")])
+        self.assertAlmostEqual(regressions[0]["ratio"], 1.3)
+
+    def test_ignores_components_missing_from_baseline(self):
+        new = _report({("late", "reward"): 500.0})
+        self.assertEqual(find_regressions(_report({}), new), [])
+
+
+class TestMain(unittest.TestCase):
+    """Test the CLI entry point."""
+
+    def test_writes_json_and_detects_regression(self):
+        import tempfile
+        from pathlib import Path
+
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / "run.json"
+            args = ["--seeds", "1", "--repeats", "1", "--number", "1",
+                    "--stages", "early", "--components", "reward"]
+            self.assertEqual(main(args + ["--out", str(out)]), 0)
+            saved = json.loads(out.read_text())
+            self.assertIn("reward", saved["results"]["early"])
+
+            saved["results"]["early"]["reward"]["ns_per_turn"] = 1e-3
+            baseline = Path(tmp) / "base.json"
+            baseline.write_text(json.dumps(saved))
+            self.assertEqual(main(args + ["--compare", str(baseline)]), 1)
+
+    def test_format_report_includes_ratio_column(self):
+        report = run_benchmarks(seeds=1, repeats=1, number=1, stages=("early",),
+                                components={"reward": COMPONENTS["reward"]})
+        self.assertIn("vs base", format_report(report, baseline=report))
+        self.assertIn("1.00x", format_report(report, baseline=report))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -70,6 +70,9 @@ class TestArenaStateEmpty(ArenaStateBaseTest, unittest.TestCase):
     def test_turn_is_zero(self):
         self.assertEqual(self.arena.turn, 0)
 
+    def test_uses_slots(self):
+        self.assertFalse(hasattr(self.arena, "__dict__"))
+
     def test_turn_encoded_is_zero(self):
         self.assertEqual(self.arena.turn_encoded(), 0.0)
 
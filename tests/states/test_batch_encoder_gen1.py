@@ -0,0 +1,132 @@
+"""
+Tests for BattleStateGen1.encode_batch / BatchBattleEncoderGen1.
+
+Covers:
+  1. Parity — each row matches BattleStateGen1(battle).to_array()
+  2. Shapes — empty batch, dtype, caller-provided ``out`` buffer
+  3. Gather — raw columns hold unnormalised values and padding defaults
+"""
+import unittest
+
+import numpy as np
+from poke_env.battle.effect import Effect
+from poke_env.battle.pokemon_type import PokemonType
+from poke_env.battle.side_condition import SideCondition
+from poke_env.battle.status import Status
+
+from env.states.gen1.battle_state_gen_1 import BattleStateGen1
+from env.states.gen1.batch_encoder_gen1 import BatchBattleEncoderGen1
+from env.states.move_feature_table import MoveFeatureTable
+from env.states.state_utils import ALL_STATUSES
+from tests.states.test_battle_state import make_battle_mock
+
+
+def make_varied_battles() -> list:
+    """A handful of battles that exercise every encoded field."""
+    plain = make_battle_mock()
+
+    damaged = make_battle_mock(
+        my_team_species=["tauros", "chansey", "snorlax", "starmie", "jolteon", "exeggutor"],
+        opp_team_species=["zapdos", "rhydon", "gengar"],
+    )
+    damaged.turn = 45
+    damaged.side_conditions = {SideCondition.REFLECT: 1}
+    damaged.opponent_side_conditions = {SideCondition.LIGHT_SCREEN: 1}
+    zapdos = damaged.opponent_team["zapdos"]
+    zapdos.current_hp_fraction = 0.3
+    zapdos.types = (PokemonType.ELECTRIC, PokemonType.FLYING)
+    zapdos.boosts["atk"] = 2
+    zapdos.status = Status.PAR
+    zapdos.effects = {Effect.CONFUSION: 1}
+    zapdos.must_recharge = True
+    zapdos.protect_counter = 1
+    gengar = damaged.opponent_team["gengar"]
+    gengar.current_hp_fraction, gengar.fainted = 0.0, True
+    tauros = damaged.team["tauros"]
+    tauros.boosts["spe"] = -3
+    tauros.status = Status.BRN
+    damaged.team["starmie"].types = (PokemonType.WATER, PokemonType.PSYCHIC)
+
+    one_move = make_battle_mock()
+    one_move.available_moves = one_move.available_moves[:1]
+    one_move.team["pikachu"].status = Status.SLP
+
+    return [plain, damaged, one_move]
+
+
+# ---------------------------------------------------------------------------
+# 1. Parity with the per-battle encoder
+# ---------------------------------------------------------------------------
+
+class TestEncodeBatchParity(unittest.TestCase):
+
+    def setUp(self):
+        self.battles = make_varied_battles()
+
+    def test_rows_match_single_battle_encoding(self):
+        batch = BattleStateGen1.encode_batch(self.battles)
+        for i, battle in enumerate(self.battles):
+            np.testing.assert_array_equal(batch[i], BattleStateGen1(battle).to_array())
+
+    def test_batch_order_does_not_matter(self):
+        forward = BattleStateGen1.encode_batch(self.battles)
+        backward = BattleStateGen1.encode_batch(self.battles[::-1])
+        np.testing.assert_array_equal(forward, backward[::-1])
+
+
+# ---------------------------------------------------------------------------
+# 2. Shapes and output buffer
+# ---------------------------------------------------------------------------
+
+class TestEncodeBatchShapes(unittest.TestCase):
+
+    def test_shape_and_dtype(self):
+        batch = BattleStateGen1.encode_batch(make_varied_battles())
+        self.assertEqual(batch.shape, (3, BattleStateGen1.array_len()))
+        self.assertEqual(batch.dtype, np.float32)
+
+    def test_empty_batch(self):
+        batch = BattleStateGen1.encode_batch([])
+        self.assertEqual(batch.shape, (0, BattleStateGen1.array_len()))
+
+    def test_writes_into_out(self):
+        battles = make_varied_battles()
+        out = np.full((len(battles), BattleStateGen1.array_len()), 9.0, dtype=np.float32)
+        result = BattleStateGen1.encode_batch(battles, out=out)
+        self.assertIs(result, out)
+        np.testing.assert_array_equal(out[0], BattleStateGen1(battles[0]).to_array())
+
+
+# ---------------------------------------------------------------------------
+# 3. Gathered columns
+# ---------------------------------------------------------------------------
+
+class TestGather(unittest.TestCase):
+
+    def setUp(self):
+        self.cols = BatchBattleEncoderGen1().gather(make_varied_battles())
+
+    def test_raw_values_are_unnormalised(self):
+        self.assertEqual(self.cols.turn[1], 45)
+        self.assertEqual(self.cols.opp.boosts[1, 0, 0], 2)
+        self.assertEqual(self.cols.opp_protect[1, 0], 1)
+
+    def test_status_index(self):
+        self.assertEqual(self.cols.opp.status[1, 0], ALL_STATUSES.index(Status.PAR))
+        self.assertEqual(self.cols.opp.status[0, 0], -1)
+
+    def test_padding_slots(self):
+        self.assertTrue(self.cols.opp.present[1, :3].all())
+        self.assertFalse(self.cols.opp.present[1, 3:].any())
+        self.assertEqual(self.cols.opp_protect[1, 5], -1.0)
+        self.assertTrue((self.cols.my_move_rows[0, 3:] == MoveFeatureTable.EMPTY_ROW).all())
+
+    def test_unavailable_active_moves_are_empty(self):
+        self.assertNotEqual(self.cols.my_move_rows[2, 0, 0], MoveFeatureTable.EMPTY_ROW)
+        self.assertTrue((self.cols.my_move_rows[2, 0, 1:] == MoveFeatureTable.EMPTY_ROW).all())
+        # Only the active slot is filtered by the battle's available moves.
+        self.assertTrue((self.cols.my_move_rows[2, 1] != MoveFeatureTable.EMPTY_ROW).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -306,6 +306,33 @@ class TestBattleStateArenaWiring(unittest.TestCase):
         self.assertAlmostEqual(float(bs.to_array()[0]), expected_turn, places=5)
 
 
+# ---------------------------------------------------------------------------
+# 6b. write_into — in-place encoding matches to_array()
+# ---------------------------------------------------------------------------
+
+class TestBattleStateWriteInto(unittest.TestCase):
+
+    def test_matches_to_array(self):
+        battle = make_battle_mock(my_team_species=["a", "b", "c", "d", "e", "f"])
+        expected = BattleStateGen1(battle).to_array()
+        buf = np.full(BattleStateGen1.array_len() + 5, 9.0, dtype=np.float32)
+        end = BattleStateGen1(battle).write_into(buf, 5)
+        self.assertEqual(end, 5 + BattleStateGen1.array_len())
+        np.testing.assert_array_equal(buf[5:], expected)
+
+    def test_overwrites_stale_buffer(self):
+        battle = make_battle_mock(all_moves_available=False)
+        buf = np.full(BattleStateGen1.array_len(), 9.0, dtype=np.float32)
+        BattleStateGen1(battle).write_into(buf, 0)
+        np.testing.assert_array_equal(buf, BattleStateGen1(battle).to_array())
+
+    def test_to_array_returns_independent_copy(self):
+        first = BattleStateGen1(make_battle_mock()).to_array()
+        snapshot = first.copy()
+        BattleStateGen1(make_battle_mock(all_moves_available=False)).to_array()
+        np.testing.assert_array_equal(first, snapshot)
+
+
 # ---------------------------------------------------------------------------
 # 7. describe() smoke test
 # ---------------------------------------------------------------------------
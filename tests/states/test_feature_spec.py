@@ -0,0 +1,225 @@
+"""
+Tests for env.states.feature_spec and the Gen 1 spec.
+
+Covers:
+  1. Parity — the compiled encoder matches BattleStateGen1(battle).to_array()
+  2. Layout — spec widths and columns agree with the state classes
+  3. Records — per-record compiled encoders match the state classes
+  4. Generated code — specialised source, compiled once per spec
+  5. Feature kinds — normalisation rules on a hand-written spec
+  6. Validation — malformed specs are rejected
+"""
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+from poke_env.battle.status import Status
+
+from env.states.feature_spec import (
+    BattleSpec, Computed, DictVector, MultiHot, OneHot, RecordSpec, Scalar,
+)
+from env.states.gen1.arena_state_gen1 import ArenaStateGen1
+from env.states.gen1.battle_state_gen_1 import BattleStateGen1
+from env.states.gen1.feature_spec_gen1 import (
+    ARENA_SPEC_GEN1, GEN1_FEATURE_SPEC, MY_POKEMON_SPEC_GEN1, OPPONENT_POKEMON_SPEC_GEN1,
+)
+from env.states.gen1.my_pokemon_state_gen_1 import MyPokemonStateGen1
+from env.states.gen1.opponent_pokemon_state_gen_1 import OpponentPokemonStateGen1
+from tests.conftest import SYNTHETIC_STAGES, make_synthetic_battles
+from tests.states.test_batch_encoder_gen1 import make_varied_battles
+
+
+def _all_battles() -> list:
+    synthetic = make_synthetic_battles(3, SYNTHETIC_STAGES)
+    return make_varied_battles() + [b for stage in synthetic.values() for b in stage]
+
+
+# ---------------------------------------------------------------------------
+# 1. Parity with the per-battle encoder
+# ---------------------------------------------------------------------------
+
+class TestCompiledParity(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.encoder = GEN1_FEATURE_SPEC.compile()
+        cls.battles = _all_battles()
+
+    def test_matches_battle_state(self):
+        for battle in self.battles:
+            np.testing.assert_array_equal(self.encoder(battle), BattleStateGen1(battle).to_array())
+
+    def test_overwrites_every_column_of_out(self):
+        out = np.full(BattleStateGen1.array_len(), 9.0, dtype=np.float32)
+        for battle in self.battles:
+            out[:] = 9.0
+            result = self.encoder(battle, out)
+            self.assertIs(result, out)
+            np.testing.assert_array_equal(out, BattleStateGen1(battle).to_array())
+
+    def test_fresh_array_per_call(self):
+        a = self.encoder(self.battles[0])
+        b = self.encoder(self.battles[1])
+        self.assertFalse(np.shares_memory(a, b))
+        self.assertEqual(a.dtype, np.float32)
+
+
+# ---------------------------------------------------------------------------
+# 2. Layout
+# ---------------------------------------------------------------------------
+
+class TestSpecLayout(unittest.TestCase):
+
+    def test_layout_matches_battle_state(self):
+        self.assertEqual(GEN1_FEATURE_SPEC.layout(), BattleStateGen1.layout())
+
+    def test_record_widths_match_state_classes(self):
+        layout = BattleStateGen1.layout()
+        self.assertEqual(ARENA_SPEC_GEN1.width, ArenaStateGen1.array_len())
+        self.assertEqual(OPPONENT_POKEMON_SPEC_GEN1.width, OpponentPokemonStateGen1.array_len())
+        self.assertEqual(MY_POKEMON_SPEC_GEN1.width, layout.my_moves_start)
+
+    def test_boost_and_status_columns_match_pokemon_state(self):
+        for spec, state_cls in ((OPPONENT_POKEMON_SPEC_GEN1, OpponentPokemonStateGen1),
+                                (MY_POKEMON_SPEC_GEN1, MyPokemonStateGen1)):
+            slices = spec.slices()
+            self.assertEqual(range(slices["boosts"].start, slices["boosts"].stop), state_cls.boost_columns())
+            self.assertEqual(range(slices["status"].start, slices["status"].stop), state_cls.status_columns())
+
+    def test_value_and_move_columns_partition_the_observation(self):
+        encoder = GEN1_FEATURE_SPEC.compile()
+        cols = np.concatenate([encoder.value_columns, encoder.move_columns])
+        np.testing.assert_array_equal(np.sort(cols), np.arange(BattleStateGen1.array_len()))
+
+
+# ---------------------------------------------------------------------------
+# 3. Records
+# ---------------------------------------------------------------------------
+
+class TestRecordEncoders(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.battles = _all_battles()
+
+    def _encode(self, spec, record) -> np.ndarray:
+        buf = np.full(spec.width + 2, 9.0, dtype=np.float32)
+        self.assertEqual(spec.compile()(record, buf, 1), spec.width + 1)
+        self.assertEqual((buf[0], buf[-1]), (9.0, 9.0))
+        return buf[1:-1]
+
+    def test_arena(self):
+        for battle in self.battles:
+            np.testing.assert_array_equal(
+                self._encode(ARENA_SPEC_GEN1, battle), ArenaStateGen1(battle).to_array(),
+            )
+
+    def test_opponent_pokemon(self):
+        for battle in self.battles:
+            for p in battle.opponent_team.values():
+                np.testing.assert_array_equal(
+                    self._encode(OPPONENT_POKEMON_SPEC_GEN1, p), OpponentPokemonStateGen1(p).to_array(),
+                )
+
+    def test_my_pokemon_features(self):
+        n = MY_POKEMON_SPEC_GEN1.width
+        for battle in self.battles:
+            for p in battle.team.values():
+                np.testing.assert_array_equal(
+                    self._encode(MY_POKEMON_SPEC_GEN1, p), MyPokemonStateGen1(p).to_array()[:n],
+                )
+
+
+# ---------------------------------------------------------------------------
+# 4. Generated code
+# ---------------------------------------------------------------------------
+
+class TestGeneratedCode(unittest.TestCase):
+
+    def test_compiled_once_per_spec(self):
+        self.assertIs(GEN1_FEATURE_SPEC.compile(), GEN1_FEATURE_SPEC.compile())
+        self.assertIs(ARENA_SPEC_GEN1.compile(), ARENA_SPEC_GEN1.compile())
+
+    def test_source_is_specialised(self):
+        source = GEN1_FEATURE_SPEC.compile().source
+        for generic in ("getattr", "assert", "isinstance", "pull_attribute"):
+            self.assertNotIn(generic, source)
+        self.assertIn("p_boosts.get('atk')", source)
+        self.assertTrue(source.startswith("def encode_gen1(battle, buf):"))
+
+
+# ---------------------------------------------------------------------------
+# 5. Feature kinds
+# ---------------------------------------------------------------------------
+
+class TestFeatureKinds(unittest.TestCase):
+
+    SPEC = RecordSpec("toy", (
+        Scalar("raw", "raw"),
+        Scalar("scaled", "nested.value", norm=10.0),
+        DictVector("boosts", "boosts", ["a", "b", "c"], norm=2.0, symmetric=True),
+        OneHot("status", "status", [Status.BRN, Status.PAR]),
+        MultiHot("flags", "flags", ["x", "y"]),
+        Computed("pair", lambda r: (r.raw, -r.raw), width=2, norm=4.0, symmetric=True),
+    ))
+
+    def _record(self, **overrides) -> SimpleNamespace:
+        fields = dict(raw=3.0, nested=SimpleNamespace(value=25.0), boosts={"a": 1, "c": -6, "z": 5},
+                      status=Status.PAR, flags={"y"})
+        fields.update(overrides)
+        return SimpleNamespace(**fields)
+
+    def _encode(self, record) -> list:
+        buf = np.zeros(self.SPEC.width, dtype=np.float32)
+        self.SPEC.compile()(record, buf, 0)
+        return buf.tolist()
+
+    def test_values_are_normalised_per_feature(self):
+        self.assertEqual(
+            self._encode(self._record()),
+            [3.0, 1.0, 0.5, 0.0, -1.0, 0.0, 1.0, 0.0, 1.0, 0.75, -0.75],
+        )
+
+    def test_missing_values_encode_as_zero(self):
+        record = self._record(boosts={"a": None}, status=None, flags=set())
+        self.assertEqual(self._encode(record)[2:9], [0.0] * 7)
+
+    def test_unknown_one_hot_value_is_all_zero(self):
+        self.assertEqual(self._encode(self._record(status=Status.SLP))[5:7], [0.0, 0.0])
+
+    def test_slices(self):
+        self.assertEqual(self.SPEC.slices()["pair"], slice(9, 11))
+        self.assertEqual(self.SPEC.width, 11)
+
+
+# ---------------------------------------------------------------------------
+# 6. Validation
+# ---------------------------------------------------------------------------
+
+class TestValidation(unittest.TestCase):
+
+    def test_source_must_be_attribute_path(self):
+        with self.assertRaises(ValueError):
+            Scalar("hp", "hp; import os")
+
+    def test_norm_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            DictVector("boosts", "boosts", ["atk"], norm=0.0)
+
+    def test_duplicate_feature_names(self):
+        with self.assertRaises(ValueError):
+            RecordSpec("dup", (Scalar("hp", "hp"), Scalar("hp", "current_hp")))
+
+    def test_record_name_must_be_identifier(self):
+        with self.assertRaises(ValueError):
+            RecordSpec("my record", (Scalar("hp", "hp"),))
+
+    def test_custom_battle_spec_layout(self):
+        spec = BattleSpec(gen=1, arena=ARENA_SPEC_GEN1, opponent=OPPONENT_POKEMON_SPEC_GEN1,
+                          mine=MY_POKEMON_SPEC_GEN1, team_size=3)
+        self.assertEqual(spec.layout().team_size, 3)
+        self.assertEqual(spec.layout().my_moves_start, MY_POKEMON_SPEC_GEN1.width)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Tests for IncrementalBattleEncoderGen1.
+
+Covers:
+  1. Parity — every encode() matches BattleStateGen1(battle).to_array()
+  2. Dirty tracking — only the slices whose inputs changed are re-encoded
+  3. Output ownership — encode() returns a copy of the stored observation
+"""
+import unittest
+
+import numpy as np
+from poke_env.battle.pokemon_type import PokemonType
+
+from env.states.gen1.battle_state_gen_1 import BattleStateGen1
+from env.states.gen1.incremental_encoder_gen1 import IncrementalBattleEncoderGen1
+from tests.states.test_battle_state import make_battle_mock
+
+
+class _EncoderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.battle = make_battle_mock()
+        self.encoder = IncrementalBattleEncoderGen1()
+        self.encoder.encode(self.battle)
+
+    def assert_matches_full_encode(self, obs: np.ndarray) -> None:
+        np.testing.assert_array_equal(obs, BattleStateGen1(self.battle).to_array())
+
+
+# ---------------------------------------------------------------------------
+# 1. Parity with the full encoder
+# ---------------------------------------------------------------------------
+
+class TestIncrementalEncoderParity(_EncoderTestCase):
+
+    def test_first_encode_matches_full_encode(self):
+        self.assert_matches_full_encode(IncrementalBattleEncoderGen1().encode(self.battle))
+
+    def test_first_encode_marks_every_present_slice(self):
+        self.assertEqual(
+            self.encoder.last_dirty,
+            ["arena", "opp_moves", "opp_team[0]", "my_team[0]", "my_team[1]", "my_team[2]"],
+        )
+
+    def test_matches_after_opponent_damage(self):
+        self.battle.opponent_active_pokemon.current_hp_fraction = 0.25
+        self.assert_matches_full_encode(self.encoder.encode(self.battle))
+
+    def test_matches_after_switch(self):
+        old, new = self.battle.team["charizard"], self.battle.team["pikachu"]
+        old.active, new.active = False, True
+        self.battle.active_pokemon = new
+        self.battle.available_moves = list(new.moves.values())
+        self.assert_matches_full_encode(self.encoder.encode(self.battle))
+
+    def test_matches_after_faint(self):
+        bench = self.battle.team["snorlax"]
+        bench.current_hp_fraction, bench.fainted = 0.0, True
+        self.assert_matches_full_encode(self.encoder.encode(self.battle))
+
+
+# ---------------------------------------------------------------------------
+# 2. Dirty tracking
+# ---------------------------------------------------------------------------
+
+class TestIncrementalEncoderDirtySlots(_EncoderTestCase):
+
+    def test_unchanged_battle_re_encodes_nothing(self):
+        self.encoder.encode(self.battle)
+        self.assertEqual(self.encoder.last_dirty, [])
+
+    def test_turn_change_only_touches_arena(self):
+        self.battle.turn += 1
+        self.encoder.encode(self.battle)
+        self.assertEqual(self.encoder.last_dirty, ["arena"])
+
+    def test_opponent_hp_change_only_touches_its_slot(self):
+        self.battle.opponent_active_pokemon.current_hp_fraction = 0.5
+        self.encoder.encode(self.battle)
+        self.assertEqual(self.encoder.last_dirty, ["opp_team[0]"])
+
+    def test_bench_status_change_only_touches_its_slot(self):
+        self.battle.team["snorlax"].status = "par"
+        self.encoder.encode(self.battle)
+        self.assertEqual(self.encoder.last_dirty, ["my_team[2]"])
+
+    def test_opponent_type_change_touches_moves_and_my_team(self):
+        self.battle.opponent_active_pokemon.types = (PokemonType.WATER,)
+        self.encoder.encode(self.battle)
+        self.assertIn("opp_moves", self.encoder.last_dirty)
+        self.assertIn("my_team[0]", self.encoder.last_dirty)
+        self.assertIn("my_team[2]", self.encoder.last_dirty)
+        self.assertNotIn("arena", self.encoder.last_dirty)
+
+
+# ---------------------------------------------------------------------------
+# 3. Output ownership
+# ---------------------------------------------------------------------------
+
+class TestIncrementalEncoderOutput(_EncoderTestCase):
+
+    def test_returns_copy(self):
+        obs = self.encoder.encode(self.battle)
+        obs[:] = 7.0
+        self.assert_matches_full_encode(self.encoder.encode(self.battle))
+
+    def test_dtype_and_length(self):
+        obs = self.encoder.encode(self.battle)
+        self.assertEqual(obs.dtype, np.float32)
+        self.assertEqual(len(obs), BattleStateGen1.array_len())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Tests for MoveFeatureTable.
+
+Covers:
+  1. Rows reproduce MoveState.to_array() exactly for any matchup
+  2. Per-matchup columns (STAB, type multiplier) follow the attacker/defender
+  3. Padding rows write zeros
+  4. Row bookkeeping — one row per move id, growth past the initial capacity
+  5. encode_rows — a block of rows matches write_into row by row
+"""
+import unittest
+
+import numpy as np
+from poke_env.battle import Move, PokemonType
+
+from combat.combat_utils import defender_type_indices
+from env.states.move_feature_table import MoveFeatureTable
+from env.states.move_state import MoveState
+
+
+_WATER   = (PokemonType.WATER,)
+_GRASS   = (PokemonType.GRASS, PokemonType.POISON)
+_ELECTRIC = (PokemonType.ELECTRIC,)
+_GROUND  = (PokemonType.GROUND, PokemonType.ROCK)
+
+
+def _write(table: MoveFeatureTable, move, attacking, defending) -> np.ndarray:
+    buf = np.full(MoveState.array_len(), 9.0, dtype=np.float32)
+    row = table.row(move, defending, attacking)
+    table.write_into(buf, 0, row, attacking, defending)
+    return buf
+
+
+class TestMoveFeatureTableMatchesMoveState(unittest.TestCase):
+
+    def setUp(self):
+        self.table = MoveFeatureTable(gen=1)
+
+    def test_rows_match_move_state_for_every_matchup(self):
+        moves = [Move(m, gen=1) for m in ("thunderbolt", "surf", "earthquake", "sleeppowder", "hyperbeam")]
+        matchups = [(_ELECTRIC, _WATER), (_WATER, _GROUND), (_GRASS, _ELECTRIC), (_GROUND, _GRASS)]
+        for move in moves:
+            for attacking, defending in matchups:
+                expected = MoveState(move, defending, attacking, 1).to_array()
+                np.testing.assert_array_equal(
+                    _write(self.table, move, attacking, defending), expected,
+                    err_msg=f"{move.id} {attacking} -> {defending}",
+                )
+
+    def test_stab_column_follows_attacker(self):
+        move = Move("thunderbolt", gen=1)
+        self.assertEqual(_write(self.table, move, _ELECTRIC, _WATER)[self.table.stab_col], 1.0)
+        self.assertEqual(_write(self.table, move, _WATER, _WATER)[self.table.stab_col], 0.0)
+
+    def test_type_column_follows_defender(self):
+        move = Move("thunderbolt", gen=1)
+        self.assertAlmostEqual(_write(self.table, move, _ELECTRIC, _WATER)[self.table.type_col], 0.5)
+        self.assertEqual(_write(self.table, move, _ELECTRIC, _GROUND)[self.table.type_col], -1.0)
+
+
+class TestMoveFeatureTableRows(unittest.TestCase):
+
+    def setUp(self):
+        self.table = MoveFeatureTable(gen=1)
+
+    def test_none_is_empty_row_and_writes_zeros(self):
+        self.assertEqual(self.table.row(None, _WATER, _WATER), MoveFeatureTable.EMPTY_ROW)
+        buf = _write(self.table, None, _WATER, _WATER)
+        np.testing.assert_array_equal(buf, np.zeros(MoveState.array_len(), dtype=np.float32))
+
+    def test_same_id_reuses_row(self):
+        first  = self.table.row(Move("surf", gen=1), _WATER, _WATER)
+        second = self.table.row(Move("surf", gen=1), _GROUND, _ELECTRIC)
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.table), 1)
+
+    def test_grows_past_initial_capacity(self):
+        class _SmallTable(MoveFeatureTable):
+            INITIAL_CAPACITY = 2
+
+        table = _SmallTable(gen=1)
+        move_ids = ["surf", "thunderbolt", "earthquake", "psychic", "blizzard"]
+        rows = [table.row(Move(m, gen=1), _WATER, _WATER) for m in move_ids]
+        self.assertEqual(rows, list(range(len(move_ids))))
+        self.assertGreaterEqual(len(table.features), len(move_ids))
+        np.testing.assert_array_equal(table.features[table.EMPTY_ROW], 0.0)
+        for m in move_ids:
+            expected = MoveState(Move(m, gen=1), _WATER, _WATER, 1).to_array()
+            np.testing.assert_array_equal(_write(table, Move(m, gen=1), _WATER, _WATER), expected)
+
+    def test_for_gen_returns_shared_table(self):
+        self.assertIs(MoveFeatureTable.for_gen(1), MoveFeatureTable.for_gen(1))
+
+
+class TestEncodeRows(unittest.TestCase):
+
+    def test_block_matches_write_into(self):
+        table = MoveFeatureTable(gen=1)
+        blocks = [
+            (_WATER, _GROUND, ["surf", "thunderbolt", None, "earthquake"]),
+            (_GRASS, _ELECTRIC, ["razorleaf", None, None, None]),
+        ]
+        rows = np.array([
+            [table.row(Move(m, gen=1) if m else None, defending, attacking) for m in moves]
+            for attacking, defending, moves in blocks
+        ])
+        attacker = np.array([defender_type_indices(a) for a, _, _ in blocks])
+        defender = np.array([defender_type_indices(d) for _, d, _ in blocks])
+
+        feats = table.encode_rows(rows, attacker, defender)
+        self.assertEqual(feats.shape, (2, 4, MoveState.array_len()))
+        for b, (attacking, defending, moves) in enumerate(blocks):
+            for k, m in enumerate(moves):
+                expected = (MoveState(Move(m, gen=1), defending, attacking, 1).to_array()
+                            if m else np.zeros(MoveState.array_len(), dtype=np.float32))
+                np.testing.assert_array_equal(feats[b, k], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -78,6 +78,13 @@ class TestMyPokemonStateGen1ArrayIntegrity(unittest.TestCase):
         ps = MyPokemonStateGen1()
         self.assertEqual(len(ps.to_array()), ps.array_len())
 
+    def test_uses_slots(self):
+        self.assertFalse(hasattr(self._make(self.FIXTURES[0]), "__dict__"))
+
+    def test_moves_reference_pokemon_moves(self):
+        pokemon = make_mock_from_fixture(self.FIXTURES[0])
+        self.assertIs(MyPokemonStateGen1(pokemon=pokemon).moves, pokemon.moves)
+
 
 # ---------------------------------------------------------------------------
 # to_array() stats slice — normalised by STAT_NORM, clamped to [0, 1]
@@ -231,6 +231,9 @@ class TestOpponentNewFields(unittest.TestCase):
         self.assertEqual(ops.preparing, 1.0)
         self.assertEqual(ops.must_recharge, 0.0)
 
+    def test_uses_slots(self):
+        self.assertFalse(hasattr(OpponentPokemonStateGen1(), "__dict__"))
+
 
 
 # ---------------------------------------------------------------------------
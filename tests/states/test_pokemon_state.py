@@ -23,6 +23,7 @@ FIXTURES_DIR = Path(__file__).parent.parent / "fixtures"
 
 class _StubState(PokemonState):
     def to_array(self): return np.array([])
+    def write_into(self, buf, offset): return offset
     def array_len(self): return 0
     def describe(self): return ""
     def __repr__(self): return ""
@@ -0,0 +1,104 @@
+"""
+Tests for the Gen 1 opponent stat table.
+
+Covers:
+  1. Dex table — one read-only row per species, matching the stat formula
+  2. estimated_stats() — dex fast path vs memoised fallback (custom / transformed)
+  3. estimate_team_stats() — whole-team gather equals per-Pokémon estimates
+"""
+import unittest
+
+import numpy as np
+from poke_env.battle.pokemon import Pokemon
+
+from env.states.gen1.stat_table_gen1 import (
+    DEFAULT_LEVEL, GEN1_DEX_STATS, GEN1_POKEDEX, GEN1_SPECIES,
+    base_stat_vector, estimate_team_stats, estimated_stats, stat_formula,
+)
+from env.states.state_utils import GEN1_STAT_KEYS
+
+
+def _formula(base: dict, level: int = DEFAULT_LEVEL) -> np.ndarray:
+    """Reference Gen 1 estimate, written out longhand."""
+    out = []
+    for key in GEN1_STAT_KEYS:
+        b = base.get(key) or 0
+        out.append((b + 15) * 2 + 64 + (level + 10 if key == "hp" else 5))
+    return np.array(out, dtype=np.float32)
+
+
+class TestDexTable(unittest.TestCase):
+
+    def test_one_row_per_species(self):
+        self.assertEqual(GEN1_DEX_STATS.shape, (len(GEN1_SPECIES), len(GEN1_STAT_KEYS)))
+        self.assertEqual(GEN1_DEX_STATS.dtype, np.float32)
+
+    def test_read_only(self):
+        with self.assertRaises(ValueError):
+            GEN1_DEX_STATS[0, 0] = 1.0
+
+    def test_rows_match_formula(self):
+        for species in ("starmie", "tauros", "chansey"):
+            i = GEN1_SPECIES.index(species)
+            np.testing.assert_array_equal(
+                GEN1_DEX_STATS[i], _formula(GEN1_POKEDEX[species]["baseStats"]),
+            )
+
+    def test_formula_broadcasts_over_leading_axes(self):
+        base = np.stack([base_stat_vector({"hp": 50}), base_stat_vector({"atk": 80})])
+        np.testing.assert_array_equal(
+            stat_formula(base), np.stack([_formula({"hp": 50}), _formula({"atk": 80})]),
+        )
+
+
+class TestEstimatedStats(unittest.TestCase):
+
+    def test_dex_pokemon_uses_table_row(self):
+        p = Pokemon(gen=1, species="starmie")
+        stats = estimated_stats(p.species, p.base_stats)
+        self.assertTrue(np.shares_memory(stats, GEN1_DEX_STATS))
+        np.testing.assert_array_equal(stats, _formula(p.base_stats))
+
+    def test_custom_base_stats_use_formula(self):
+        base = {"hp": 60, "atk": 75, "def": 85, "spc": 100, "spe": 115}
+        np.testing.assert_array_equal(estimated_stats("starmie", base), _formula(base))
+
+    def test_custom_base_stats_are_memoised(self):
+        base = {"hp": 61, "atk": 75, "def": 85, "spc": 100, "spe": 115}
+        self.assertIs(estimated_stats("starmie", base), estimated_stats("starmie", dict(base)))
+
+    def test_other_level(self):
+        p = Pokemon(gen=1, species="starmie")
+        np.testing.assert_array_equal(
+            estimated_stats(p.species, p.base_stats, level=50), _formula(p.base_stats, level=50),
+        )
+
+    def test_result_is_read_only(self):
+        with self.assertRaises(ValueError):
+            estimated_stats("missingno", {"hp": 1})[0] = 0.0
+
+
+class TestEstimateTeamStats(unittest.TestCase):
+
+    def test_matches_per_pokemon_estimates(self):
+        team = [Pokemon(gen=1, species=s) for s in ("zapdos", "rhydon", "gengar")]
+        team[1]._temporary_base_stats = GEN1_POKEDEX["mew"]["baseStats"]   # transformed
+        expected = np.stack([estimated_stats(p.species, p.base_stats) for p in team])
+        np.testing.assert_array_equal(estimate_team_stats(team), expected)
+
+    def test_transformed_pokemon_uses_its_current_base_stats(self):
+        p = Pokemon(gen=1, species="ditto")
+        p._temporary_base_stats = GEN1_POKEDEX["mew"]["baseStats"]
+        np.testing.assert_array_equal(estimate_team_stats([p])[0], _formula(GEN1_POKEDEX["mew"]["baseStats"]))
+
+    def test_empty_team(self):
+        self.assertEqual(estimate_team_stats([]).shape, (0, len(GEN1_STAT_KEYS)))
+
+    def test_output_is_writable_copy(self):
+        out = estimate_team_stats([Pokemon(gen=1, species="starmie")])
+        out[0, 0] = 0.0
+        self.assertNotEqual(GEN1_DEX_STATS[GEN1_SPECIES.index("starmie"), 0], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
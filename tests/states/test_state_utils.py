@@ -7,6 +7,9 @@ from env.states.state_utils import (
     encode_enum,
     encode_dicts,
     pull_attribute,
+    write_normalized,
+    write_enum,
+    write_dicts,
     ALL_STATUSES,
     GEN1_BOOST_KEYS,
     GEN1_STAT_KEYS,
@@ -340,6 +343,35 @@ class TestPullAttribute(unittest.TestCase):
         self.assertAlmostEqual(pull_attribute(Obj(), "stab_multiplier", 1.5, float), 1.5)
 
 
+class TestWriteHelpers(unittest.TestCase):
+    """In-place writers must produce the same values as their allocating twins."""
+
+    def test_write_normalized_matches_normalize_vector(self):
+        vec = np.array([-9.0, -3.0, 0.0, 2.0, 12.0], dtype=np.float32)
+        buf = np.zeros(7, dtype=np.float32)
+        end = write_normalized(buf, 1, vec, BOOST_NORM, symmetric=True)
+        self.assertEqual(end, 6)
+        np.testing.assert_array_equal(buf[1:6], normalize_vector(vec, BOOST_NORM, symmetric=True))
+
+    def test_write_enum_single_value(self):
+        buf = np.full(len(ALL_STATUSES), 5.0, dtype=np.float32)
+        write_enum(buf, 0, ALL_STATUSES[2], ALL_STATUSES)
+        np.testing.assert_array_equal(buf, encode_enum(ALL_STATUSES[2], ALL_STATUSES))
+
+    def test_write_enum_collection_and_none(self):
+        buf = np.full(len(GEN1_TRACKED_EFFECTS), 5.0, dtype=np.float32)
+        write_enum(buf, 0, {Effect.ENCORE: 1}, GEN1_TRACKED_EFFECTS)
+        np.testing.assert_array_equal(buf, encode_enum({Effect.ENCORE: 1}, GEN1_TRACKED_EFFECTS))
+        write_enum(buf, 0, None, GEN1_TRACKED_EFFECTS)
+        np.testing.assert_array_equal(buf, np.zeros(len(GEN1_TRACKED_EFFECTS)))
+
+    def test_write_dicts_matches_encode_dicts(self):
+        boosts = {"atk": 2, "spe": -6, "spd": 1}
+        buf = np.full(len(GEN1_BOOST_KEYS), 5.0, dtype=np.float32)
+        write_dicts(buf, 0, boosts, GEN1_BOOST_KEYS, BOOST_NORM, symmetric=True)
+        expected = normalize_vector(encode_dicts(boosts, GEN1_BOOST_KEYS), BOOST_NORM, symmetric=True)
+        np.testing.assert_array_equal(buf, expected)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -100,6 +100,10 @@ class FakePokemonState:
     def to_array(self) -> np.ndarray:
         return np.full(SLOT_LEN, self.hp, dtype=np.float32)
 
+    def write_into(self, buf: np.ndarray, offset: int) -> int:
+        buf[offset : offset + SLOT_LEN] = self.hp
+        return offset + SLOT_LEN
+
     def array_len(self) -> int:
         return SLOT_LEN
 
@@ -0,0 +1,64 @@
+"""Tests for the battle metrics callback."""
+
+import unittest
+
+import numpy as np
+
+from env.reward import REWARD_COMPONENTS
+from env.singles_env_wrapper import BattleOutcome
+from training.battle_metrics_log import BattleMetricsCallback
+
+
+class TestRewardComponentMetrics(unittest.TestCase):
+    """Verify per-component reward deltas from step infos are averaged for logging."""
+
+    def _step(self, callback, infos):
+        callback.locals = {"infos": infos, "actions": np.zeros(len(infos), dtype=int)}
+        callback.n_calls = 1
+        callback._on_step()
+
+    def test_means_over_collected_infos(self):
+        callback = BattleMetricsCallback(log_freq=1000)
+        self._step(callback, [{"reward_components": np.array([1.0, 0.0, 0.0, 0.5, 0.0])},
+                              {"reward_components": np.array([-1.0, 5.0, 0.0, 0.5, 0.0])}])
+        self._step(callback, [{}, {"reward_components": np.array([0.0, 0.0, 0.3, 0.5, 15.0])}])
+
+        metrics = callback._reward_component_metrics()
+        self.assertEqual(set(metrics), {f"reward_components/{name}" for name in REWARD_COMPONENTS})
+        self.assertAlmostEqual(metrics["reward_components/faint"], 5.0 / 3)
+        self.assertAlmostEqual(metrics["reward_components/boost"], 0.5)
+        self.assertAlmostEqual(metrics["reward_components/terminal"], 5.0)
+
+    def test_disabled_logs_nothing(self):
+        callback = BattleMetricsCallback(log_freq=1000)
+        self._step(callback, [{}, {}])
+        self.assertEqual(callback._reward_component_metrics(), {})
+
+
+class TestBattleOutcomes(unittest.TestCase):
+    """Verify win rates come from the outcome records in terminal infos."""
+
+    @staticmethod
+    def _battle_outcome(won=False, lost=False, turns=10):
+        return BattleOutcome(won=won, lost=lost, turns=turns, hp_fraction=0.5, opponent_hp_fraction=0.5)
+
+    def test_results_read_from_infos(self):
+        callback = BattleMetricsCallback(log_freq=1000)
+        callback.locals = {
+            "infos": [
+                {"episode": {"r": 1.0, "l": 10}, "battle_outcome": self._battle_outcome(won=True, turns=10)},
+                {},
+                {"episode": {"r": -1.0, "l": 20}, "battle_outcome": self._battle_outcome(lost=True, turns=20)},
+                {"episode": {"r": 0.0, "l": 30}, "battle_outcome": self._battle_outcome(turns=30)},
+            ],
+            "actions": np.zeros(4, dtype=int),
+        }
+        callback.n_calls = 1
+        callback._on_step()
+
+        self.assertEqual(list(callback._results), [1.0, 0.0, 0.5])
+        self.assertEqual(list(callback._battle_turns), [10, 20, 30])
+
+
+if __name__ == "__main__":
+    unittest.main()
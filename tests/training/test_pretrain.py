@@ -0,0 +1,176 @@
+"""
+Tests for training.pretrain (behavior cloning on trajectory datasets).
+
+Covers:
+  1. ShuffledChunkStream — every row once per epoch, across workers, reshuffled
+  2. Loss               — masked cross-entropy, illegal recorded actions
+  3. Pretraining        — fitting recorded actions, frozen value head, hand-off to MaskablePPO
+  4. Protocol logs      — replayed battles appended to the dataset
+"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+from sb3_contrib import MaskablePPO
+from torch.utils.data import DataLoader
+
+from env.batch_vec_env import BatchBattleVecEnv
+from env.battle_config import BattleConfig
+from env.env_builder import build_env
+from policy.policy import AttentionPointerPolicy
+from training.config import POLICY_KWARGS
+from training.pretrain import (
+    ShuffledChunkStream,
+    append_protocol_logs,
+    behavior_cloning_loss,
+    build_policy,
+    pretrain_policy,
+)
+from training.trajectory_dataset import TrajectoryDataset, TrajectoryWriter
+
+OBS_DIM = BattleConfig.gen1().obs_dim
+N_ACTIONS = BattleConfig.gen1().action_space_size
+
+
+def _write_dataset(path: str, n: int, chunk_size: int = 100, seed: int = 0):
+    """``n`` random decisions whose action is a fixed function of the observation."""
+    rng = np.random.default_rng(seed)
+    observations = rng.uniform(-1, 1, (n, OBS_DIM)).astype(np.float32)
+    masks = rng.random((n, N_ACTIONS)) < 0.6
+    masks[np.arange(n), rng.integers(0, N_ACTIONS, n)] = True
+    # The legal action with the highest value of one feature per action.
+    scores = np.where(masks, observations[:, :N_ACTIONS], -np.inf)
+    with TrajectoryWriter(path, chunk_size=chunk_size) as writer:
+        writer.add(
+            observations, masks, scores.argmax(axis=1), np.zeros(n),
+            np.zeros(n, bool), np.arange(n), np.zeros(n),
+        )
+
+
+class _DatasetTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "trajectories")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+
+# ---------------------------------------------------------------------------
+# 1. ShuffledChunkStream
+# ---------------------------------------------------------------------------
+
+class TestShuffledChunkStream(_DatasetTestCase):
+
+    def _epoch(self, stream, n_workers: int) -> list[dict[str, torch.Tensor]]:
+        return list(DataLoader(stream, batch_size=None, num_workers=n_workers))
+
+    def test_every_row_once_per_epoch(self):
+        _write_dataset(self.path, 250, chunk_size=100)
+        for n_workers in (0, 2):
+            stream = ShuffledChunkStream(self.path, batch_size=16, block_size=32, shuffle_blocks=2)
+            batches = self._epoch(stream, n_workers)
+            self.assertTrue(all(len(batch["actions"]) <= 16 for batch in batches))
+            self.assertEqual(set(batches[0]), {"observations", "action_masks", "actions"})
+            # Observations are unique rows; the first feature identifies them.
+            seen = torch.cat([batch["observations"][:, 0] for batch in batches]).numpy()
+            expected = TrajectoryDataset(self.path)[np.arange(250)]["observations"][:, 0]
+            np.testing.assert_array_equal(np.sort(seen), np.sort(expected))
+
+    def test_epochs_are_reshuffled(self):
+        _write_dataset(self.path, 200)
+        stream = ShuffledChunkStream(self.path, batch_size=50, block_size=20)
+        first = torch.cat([batch["actions"] for batch in self._epoch(stream, 0)])
+        self.assertTrue(torch.equal(first, torch.cat([batch["actions"] for batch in self._epoch(stream, 0)])))
+        stream.set_epoch(1)
+        second = torch.cat([batch["actions"] for batch in self._epoch(stream, 0)])
+        self.assertFalse(torch.equal(first, second))
+
+
+# ---------------------------------------------------------------------------
+# 2. Loss
+# ---------------------------------------------------------------------------
+
+class TestBehaviorCloningLoss(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.policy = build_policy()
+
+    def test_masked_cross_entropy(self):
+        observations = torch.rand(4, OBS_DIM)
+        masks = torch.zeros(4, N_ACTIONS, dtype=torch.bool)
+        masks[:, 6] = True
+        loss, correct, n = behavior_cloning_loss(
+            self.policy, {"observations": observations, "action_masks": masks, "actions": torch.full((4,), 6)},
+        )
+        # A single legal action is certain: nothing to learn, always matched.
+        self.assertAlmostEqual(loss.item(), 0.0, places=5)
+        self.assertEqual((int(correct), n), (4, 4))
+
+    def test_illegal_recorded_actions_are_ignored(self):
+        masks = torch.ones(3, N_ACTIONS, dtype=torch.bool)
+        masks[1, 2] = False
+        loss, correct, n = behavior_cloning_loss(
+            self.policy, {"observations": torch.rand(3, OBS_DIM), "action_masks": masks,
+                          "actions": torch.tensor([0, 2, 9])},
+        )
+        self.assertEqual(n, 2)
+        self.assertTrue(torch.isfinite(loss))
+
+
+# ---------------------------------------------------------------------------
+# 3. Pretraining
+# ---------------------------------------------------------------------------
+
+class TestPretrainPolicy(_DatasetTestCase):
+
+    def test_fits_recorded_actions(self):
+        _write_dataset(self.path, 512)
+        torch.manual_seed(0)
+        policy = build_policy()
+        value_head = policy.value_head.weight.detach().clone()
+
+        history = pretrain_policy(policy, self.path, epochs=8, batch_size=64, learning_rate=1e-3, n_workers=0)
+
+        self.assertEqual([result.samples for result in history], [512] * 8)
+        self.assertLess(history[-1].loss, history[0].loss)
+        self.assertGreater(history[-1].accuracy, history[0].accuracy)
+        self.assertTrue(torch.equal(policy.value_head.weight, value_head))
+
+    def test_weights_load_into_maskable_ppo(self):
+        policy = build_policy()
+        model = MaskablePPO(AttentionPointerPolicy, BatchBattleVecEnv(2, seed=0), policy_kwargs=POLICY_KWARGS)
+        model.policy.load_state_dict(policy.state_dict())
+        self.assertTrue(torch.equal(model.policy.move_ptr_proj.weight, policy.move_ptr_proj.weight))
+
+
+# ---------------------------------------------------------------------------
+# 4. Protocol logs
+# ---------------------------------------------------------------------------
+
+class TestAppendProtocolLogs(_DatasetTestCase):
+
+    def test_replayed_battles_are_appended(self):
+        log_dir = os.path.join(self._tmp.name, "logs")
+        env = build_env("gen1ou", None, 10, simulated=True, protocol_log_dir=log_dir)
+        rng = np.random.default_rng(0)
+        env.reset(seed=0)
+        steps = 0
+        while True:
+            _, _, terminated, truncated, _ = env.step(rng.choice(np.flatnonzero(env.action_masks())))
+            steps += 1
+            if terminated or truncated:
+                break
+
+        self.assertEqual(append_protocol_logs(self.path, log_dir), steps)
+        rows = TrajectoryDataset(self.path)[np.arange(steps)]
+        np.testing.assert_array_equal(rows["steps"], np.arange(steps))
+        self.assertTrue(rows["dones"][-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
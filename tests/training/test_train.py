@@ -390,6 +390,38 @@ class TestTrainModel(unittest.TestCase):
         
         mock_run.finish.assert_called_once()
 
+    @patch('training.train.torch')
+    @patch('training.train.WandbCallback')
+    @patch('training.train.BattleMetricsCallback')
+    @patch('training.train.wandb')
+    @patch('training.train.build_env')
+    @patch('training.train.MaskablePPO')
+    @patch('training.train.set_random_seed')
+    def test_train_model_loads_pretrained_policy(
+        self, mock_set_seed, mock_ppo_class, mock_build_env, mock_wandb,
+        mock_metrics_cb, mock_wandb_cb, mock_torch
+    ):
+        """Verify pretrained policy weights are loaded before training."""
+        mock_build_env.return_value = MagicMock()
+        model = make_mock_model()
+        mock_ppo_class.return_value = model
+        mock_wandb.init.return_value = MagicMock()
+
+        train_model(
+            model_path="test_model",
+            battle_format="gen1ou",
+            opponent_generator=MockTeamGenerator(["opp1"]),
+            timesteps=100,
+            rounds_per_opponent=10,
+            eval_every_timesteps=0,
+            seed=42,
+            pretrained_policy="models/bc_policy.pt",
+        )
+
+        mock_torch.load.assert_called_once_with("models/bc_policy.pt", map_location=model.device)
+        model.policy.load_state_dict.assert_called_once_with(mock_torch.load.return_value)
+        model.learn.assert_called_once()
+
     @patch('training.train.WandbCallback')
     @patch('training.train.BattleMetricsCallback')
     @patch('training.train.wandb')
@@ -482,6 +514,40 @@ class TestTrainModelIntegration(unittest.TestCase):
         self.assertIsNotNone(result)
         mock_build_env.assert_called_once()
 
+    @patch('training.train.WandbCallback')
+    @patch('training.train.BattleMetricsCallback')
+    @patch('training.train.wandb')
+    @patch('training.train.build_vec_env')
+    @patch('training.train.build_env')
+    @patch('training.train.MaskablePPO')
+    @patch('training.train.set_random_seed')
+    def test_topology_flags_use_vec_env_for_one_battle(
+        self, mock_set_seed, mock_ppo_class, mock_build_env, mock_build_vec_env, mock_wandb,
+        mock_metrics_cb, mock_wandb_cb
+    ):
+        """Verify a single env with a topology flag is built by build_vec_env."""
+        mock_ppo_class.return_value = make_mock_model()
+        mock_wandb.init.return_value = MagicMock()
+
+        for flag in (
+                {"async_battles": True}, {"prewarm_battles": True},
+                {"shared_memory": True}, {"battles_per_process": 4},
+        ):
+            mock_build_vec_env.reset_mock()
+            train_model(
+                model_path="test_model",
+                battle_format="gen1ou",
+                opponent_generator=MockTeamGenerator(["opp1"]),
+                timesteps=100,
+                rounds_per_opponent=10,
+                eval_every_timesteps=0,
+                seed=42,
+                **flag,
+            )
+            mock_build_vec_env.assert_called_once()
+            self.assertEqual(mock_build_vec_env.call_args.kwargs["n_envs"], 1)
+        mock_build_env.assert_not_called()
+
 if __name__ == "__main__":
     unittest.main()
 
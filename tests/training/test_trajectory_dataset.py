@@ -0,0 +1,192 @@
+"""
+Tests for training.trajectory_dataset and training.trajectory_callback.
+
+Covers:
+  1. Writer  — chunking, the index, appending, schema checks, replayed battles
+  2. Reader  — memory-mapped columns, random access, minibatch sampling
+  3. Callback — recording the rollouts of a MaskablePPO run
+"""
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from sb3_contrib import MaskablePPO
+
+from env.batch_vec_env import BatchBattleVecEnv
+from env.protocol_replay import ReplayedBattle
+from training.trajectory_callback import TrajectoryCallback
+from training.trajectory_dataset import COLUMNS, INDEX_FILE, TrajectoryDataset, TrajectoryWriter
+
+OBS_DIM = 5
+N_ACTIONS = 10
+
+
+def _rows(start: int, n: int) -> dict[str, np.ndarray]:
+    """``n`` recognisable rows whose observations and actions encode their global index."""
+    index = np.arange(start, start + n)
+    return {
+        "observations": np.repeat(index[:, None], OBS_DIM, axis=1).astype(np.float32),
+        "action_masks": np.ones((n, N_ACTIONS), dtype=bool),
+        "actions": index % N_ACTIONS,
+        "rewards": index / 10,
+        "dones": index % 4 == 3,
+        "battle_ids": index // 4,
+        "steps": index % 4,
+    }
+
+
+class _DatasetTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "trajectories")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, n: int, chunk_size: int, batch: int = 7):
+        with TrajectoryWriter(self.path, chunk_size=chunk_size) as writer:
+            for start in range(0, n, batch):
+                writer.add(**_rows(start, min(batch, n - start)))
+        return writer
+
+
+# ---------------------------------------------------------------------------
+# 1. Writer
+# ---------------------------------------------------------------------------
+
+class TestTrajectoryWriter(_DatasetTestCase):
+
+    def test_rows_are_split_into_chunks(self):
+        writer = self._write(50, chunk_size=16)
+        self.assertEqual(writer.rows_written, 50)
+        with open(os.path.join(self.path, INDEX_FILE)) as f:
+            index = json.load(f)
+        self.assertEqual([chunk["rows"] for chunk in index["chunks"]], [16, 16, 16, 2])
+        self.assertEqual(index["columns"]["observations"], {"dtype": "<f4", "shape": [OBS_DIM]})
+        for column in COLUMNS:
+            self.assertTrue(os.path.exists(os.path.join(self.path, "chunk-000000", f"{column}.npy")))
+
+    def test_chunks_are_written_before_close(self):
+        writer = TrajectoryWriter(self.path, chunk_size=8)
+        writer.add(**_rows(0, 10))
+        self.assertEqual(len(TrajectoryDataset(self.path)), 8)
+        writer.close()
+        self.assertEqual(len(TrajectoryDataset(self.path)), 10)
+
+    def test_reopening_appends(self):
+        self._write(10, chunk_size=8)
+        with TrajectoryWriter(self.path, chunk_size=8) as writer:
+            self.assertEqual(writer.rows_written, 10)
+            writer.add(**_rows(10, 5))
+        dataset = TrajectoryDataset(self.path)
+        np.testing.assert_array_equal(dataset[np.arange(15)]["actions"], np.arange(15) % N_ACTIONS)
+
+    def test_battle_ids_are_never_reused(self):
+        with TrajectoryWriter(self.path) as writer:
+            np.testing.assert_array_equal(writer.new_battle_ids(3), [0, 1, 2])
+        with TrajectoryWriter(self.path) as writer:
+            np.testing.assert_array_equal(writer.new_battle_ids(2), [3, 4])
+
+    def test_mismatched_rows_are_rejected(self):
+        with TrajectoryWriter(self.path) as writer:
+            writer.add(**_rows(0, 4))
+            rows = _rows(4, 4)
+            with self.assertRaises(ValueError):
+                writer.add(**{**rows, "observations": rows["observations"].astype(np.uint8)})
+            with self.assertRaises(ValueError):
+                writer.add(**{**rows, "actions": rows["actions"][:3]})
+
+    def test_replayed_battles(self):
+        battle = ReplayedBattle(
+            "battle-gen1ou-1", np.zeros((3, OBS_DIM), np.float32), np.ones((3, N_ACTIONS), bool),
+            np.array([6, 7, 0]), np.array([0.5, 0.0, 1.0], np.float32), outcome=None,
+        )
+        with TrajectoryWriter(self.path) as writer:
+            writer.add_battle(battle)
+            writer.add_battle(battle)
+        rows = TrajectoryDataset(self.path)[np.arange(6)]
+        np.testing.assert_array_equal(rows["battle_ids"], [0, 0, 0, 1, 1, 1])
+        np.testing.assert_array_equal(rows["steps"], [0, 1, 2, 0, 1, 2])
+        self.assertFalse(rows["dones"].any())
+
+
+# ---------------------------------------------------------------------------
+# 2. Reader
+# ---------------------------------------------------------------------------
+
+class TestTrajectoryDataset(_DatasetTestCase):
+
+    def test_columns_are_memory_mapped(self):
+        self._write(20, chunk_size=8)
+        dataset = TrajectoryDataset(self.path)
+        self.assertEqual((len(dataset), dataset.n_chunks), (20, 3))
+        for chunk in dataset.iter_chunks():
+            for column in chunk.values():
+                self.assertIsInstance(column, np.memmap)
+
+    def test_random_access_across_chunks(self):
+        self._write(50, chunk_size=16)
+        dataset = TrajectoryDataset(self.path)
+        indices = np.array([49, 0, 17, 16, 15, 17, -1])
+        rows = dataset[indices]
+        expected = _rows(0, 50)
+        for column in COLUMNS:
+            np.testing.assert_array_equal(rows[column], expected[column][indices].astype(rows[column].dtype))
+        self.assertEqual(dataset[33]["observations"].shape, (OBS_DIM,))
+        self.assertEqual(dataset[33]["steps"], 1)
+        np.testing.assert_array_equal(dataset[10:20]["actions"], np.arange(10, 20) % N_ACTIONS)
+        with self.assertRaises(IndexError):
+            dataset[[50]]
+
+    def test_sample(self):
+        self._write(50, chunk_size=16)
+        dataset = TrajectoryDataset(self.path, columns=("observations", "actions"))
+        batch = dataset.sample(64, np.random.default_rng(0))
+        self.assertEqual(set(batch), {"observations", "actions"})
+        self.assertEqual(batch["observations"].shape, (64, OBS_DIM))
+        np.testing.assert_array_equal(batch["observations"][:, 0] % N_ACTIONS, batch["actions"])
+
+    def test_missing_dataset(self):
+        with self.assertRaises(FileNotFoundError):
+            TrajectoryDataset(self.path)
+        self._write(4, chunk_size=4)
+        with self.assertRaises(ValueError):
+            TrajectoryDataset(self.path, columns=("values",))
+
+
+# ---------------------------------------------------------------------------
+# 3. Callback
+# ---------------------------------------------------------------------------
+
+class TestTrajectoryCallback(_DatasetTestCase):
+
+    def test_records_rollouts(self):
+        env = BatchBattleVecEnv(4, seed=0)
+        model = MaskablePPO("MultiInputPolicy", env, n_steps=64, batch_size=64, n_epochs=1, seed=0)
+        writer = TrajectoryWriter(self.path, chunk_size=100)
+        callback = TrajectoryCallback(writer)
+        model.learn(total_timesteps=256, callback=callback)
+        model.learn(total_timesteps=256, callback=callback, reset_num_timesteps=False)
+        writer.close()
+
+        dataset = TrajectoryDataset(self.path)
+        self.assertEqual(len(dataset), 512)
+        rows = dataset[np.arange(len(dataset))]
+        self.assertTrue(rows["action_masks"][np.arange(512), rows["actions"]].all())
+        self.assertTrue(rows["dones"].any())
+        # Rows are written env by env within a step; each battle's steps count up from 0.
+        for battle_id in np.unique(rows["battle_ids"]):
+            steps = rows["steps"][rows["battle_ids"] == battle_id]
+            np.testing.assert_array_equal(steps, np.arange(len(steps)))
+        # The second learn() call continued the running battles instead of restarting them.
+        first_env = {column: values[0::4] for column, values in rows.items()}
+        if not first_env["dones"][63]:
+            self.assertEqual(first_env["battle_ids"][64], first_env["battle_ids"][63])
+            self.assertEqual(first_env["steps"][64], first_env["steps"][63] + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
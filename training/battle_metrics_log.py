@@ -4,21 +4,21 @@ import wandb
 import numpy as np
 
 from stable_baselines3.common.callbacks import BaseCallback
-from stable_baselines3.common.vec_env import VecEnv, VecMonitor
 
-from env.singles_env_wrapper import PokemonRLWrapper
+from env.reward import REWARD_COMPONENTS
 from training.config import LOG_FREQ
 
 
 class BattleMetricsCallback(BaseCallback):
-    def __init__(self, env, log_freq: int = 100, verbose=0):
+    def __init__(self, log_freq: int = 100, verbose=0):
         super().__init__(verbose)
-        self.env = env
         self.log_freq = log_freq
         self._episode_rewards = []
         self._episode_lengths = []
         self._results = deque(maxlen=LOG_FREQ)
+        self._battle_turns = deque(maxlen=LOG_FREQ)
         self._switch_actions = deque(maxlen=LOG_FREQ)
+        self._reward_components = deque(maxlen=LOG_FREQ)
 
     def _on_step(self) -> bool:
         infos = self.locals.get("infos", [{}])
@@ -28,18 +28,19 @@ class BattleMetricsCallback(BaseCallback):
             if i < len(actions):
                 self._switch_actions.append(int(actions[i]))
 
+            components = info.get("reward_components")
+            if components is not None:
+                self._reward_components.append(components)
+
             if "episode" in info:
                 self._episode_rewards.append(info["episode"]["r"])
                 self._episode_lengths.append(info["episode"]["l"])
 
-                battle = self._get_battle(env_idx=i)
-                if battle is not None:
-                    if battle.won:
-                        self._results.append(1)
-                    elif battle.lost:
-                        self._results.append(0)
-                    else:
-                        self._results.append(0.5)
+            # Terminal steps carry a BattleOutcome, so no Battle has to be fetched from the workers.
+            outcome = info.get("battle_outcome")
+            if outcome is not None:
+                self._results.append(outcome.score)
+                self._battle_turns.append(outcome.turns)
 
         if self.n_calls % self.log_freq == 0 and self._episode_rewards:
             action_list = list(self._switch_actions)
@@ -53,19 +54,20 @@ class BattleMetricsCallback(BaseCallback):
                 "win_rate": np.mean(self._results) if self._results else 0.0,
                 "mean_episode_reward": np.mean(self._episode_rewards[-50:]),
                 "mean_episode_length": np.mean(self._episode_lengths[-50:]),
+                "mean_battle_turns": np.mean(self._battle_turns) if self._battle_turns else 0.0,
                 "action_distribution": wandb.Histogram(action_list) if action_list else wandb.Histogram([0]),
                 "switch_action_rate": switch_rate,
+                **self._reward_component_metrics(),
             }, step=self.num_timesteps)
 
         return True
 
-    def _get_battle(self, env_idx: int = 0):
-        env = self.env
-        if isinstance(env, VecMonitor):
-            battles = env.env_method("get_last_battle")
-            return battles[env_idx] if env_idx < len(battles) else None
-        while hasattr(env, "env"):
-            env = env.env
-        if isinstance(env, PokemonRLWrapper):
-            return env.get_last_battle()
-        return None
+    def _reward_component_metrics(self) -> dict[str, float]:
+        """Mean per-step reward contribution of each ``REWARD_COMPONENTS`` entry.
+
+        Empty unless the env was built with ``reward_components=True``.
+        """
+        if not self._reward_components:
+            return {}
+        means = np.mean(self._reward_components, axis=0)
+        return {f"reward_components/{name}": float(m) for name, m in zip(REWARD_COMPONENTS, means)}
@@ -4,4 +4,12 @@ N_STEPS = 4096
 BATCH_SIZE = 256
 GAMMA = 0.999
 ENT_COEF = 0.1
-LOG_FREQ = 500
\ No newline at end of file
+LOG_FREQ = 500
+
+# AttentionPointerPolicy sizes; pretrained weights only load into a policy of the same sizes.
+POLICY_KWARGS = dict(
+    context_hidden=256,
+    move_hidden=128,
+    trunk_hidden=256,
+    n_attention_heads=4,
+)
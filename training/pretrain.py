@@ -0,0 +1,265 @@
+"""
+Behavior-cloning pretraining of ``AttentionPointerPolicy``.
+
+Recorded decisions from a trajectory dataset (``training.trajectory_dataset``)
+are streamed in shuffled blocks through a multi-worker ``DataLoader``, and
+the extractor and pointer heads are fit with a masked cross-entropy: the
+negative log-probability of the recorded action under the policy's
+distribution over the legal actions.  The saved weights warm-start PPO::
+
+    python -m training.pretrain --trajectory-dir trajectories --output models/bc_policy.pt
+    python -m training.train --pretrained-policy models/bc_policy.pt ...
+
+The value head is left untouched; PPO fits it from its first rollouts.
+"""
+
+from __future__ import annotations
+
+import glob
+import os
+import random
+from dataclasses import dataclass
+from typing import Iterator
+
+import numpy as np
+import torch
+from gymnasium import spaces
+from torch.utils.data import DataLoader, IterableDataset, get_worker_info
+
+from env.battle_config import BattleConfig
+from env.observation_quantizer import ObservationQuantizer
+from env.protocol_replay import replay_protocol_logs
+from policy.policy import AttentionPointerPolicy
+from training.config import BATCH_SIZE, LR, POLICY_KWARGS
+from training.device_config import DeviceConfig
+from training.parse import build_pretrain_arg_parser
+from training.trajectory_dataset import TrajectoryDataset, TrajectoryWriter
+
+# The columns behavior cloning reads; the others are never paged in.
+BC_COLUMNS = ("observations", "action_masks", "actions")
+
+
+class ShuffledChunkStream(IterableDataset):
+    """Minibatches of recorded decisions, streamed from a trajectory dataset.
+
+    Every epoch the dataset is cut into blocks of ``block_size`` consecutive
+    rows, the blocks are shuffled and dealt out to the ``DataLoader``
+    workers, and each worker reads ``shuffle_blocks`` of its blocks at a time
+    (sequential reads of the memory-mapped columns), shuffles their rows and
+    yields minibatches.  A worker holds at most
+    ``block_size * shuffle_blocks`` rows.
+
+    Use with ``DataLoader(stream, batch_size=None)``; call ``set_epoch``
+    before each epoch to reshuffle.
+
+    :param path: Trajectory dataset directory.
+    :param batch_size: Rows per minibatch (the last one of a group may be shorter).
+    :param block_size: Consecutive rows read at once.
+    :param shuffle_blocks: Blocks whose rows are shuffled together.
+    :param seed: Seed of the block and row permutations.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            batch_size: int = BATCH_SIZE,
+            block_size: int = 4096,
+            shuffle_blocks: int = 8,
+            seed: int = 0,
+    ):
+        super().__init__()
+        self.path = path
+        self.batch_size = batch_size
+        self.block_size = block_size
+        self.shuffle_blocks = shuffle_blocks
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int):
+        self.epoch = epoch
+
+    def __iter__(self) -> Iterator[dict[str, torch.Tensor]]:
+        worker = get_worker_info()
+        worker_id, n_workers = (worker.id, worker.num_workers) if worker is not None else (0, 1)
+        # Opened per worker: memmaps would be pickled as full copies.
+        dataset = TrajectoryDataset(self.path, columns=BC_COLUMNS)
+        blocks = [
+            (i, start, min(start + self.block_size, len(chunk["actions"])))
+            for i, chunk in enumerate(dataset.iter_chunks())
+            for start in range(0, len(chunk["actions"]), self.block_size)
+        ]
+        # Every worker draws the same block order and takes its share of it.
+        order = np.random.default_rng([self.seed, self.epoch]).permutation(len(blocks))[worker_id::n_workers]
+        rng = np.random.default_rng([self.seed, self.epoch, worker_id])
+        for group in range(0, len(order), self.shuffle_blocks):
+            parts = [blocks[b] for b in order[group:group + self.shuffle_blocks]]
+            rows = {
+                column: np.concatenate([dataset.chunk(i)[column][start:stop] for i, start, stop in parts])
+                for column in BC_COLUMNS
+            }
+            permutation = rng.permutation(len(rows["actions"]))
+            for start in range(0, len(permutation), self.batch_size):
+                batch = permutation[start:start + self.batch_size]
+                yield {column: torch.from_numpy(values[batch]) for column, values in rows.items()}
+
+
+@dataclass(frozen=True)
+class PretrainEpoch:
+    """Mean masked cross-entropy and greedy-action accuracy of one epoch."""
+
+    epoch: int
+    loss: float
+    accuracy: float
+    samples: int
+
+
+def build_policy(observation_dtype: str = "float32", battle_config: BattleConfig | None = None) -> AttentionPointerPolicy:
+    """An ``AttentionPointerPolicy`` shaped like the one ``train_model`` builds."""
+    battle_config = battle_config if battle_config is not None else BattleConfig.gen1()
+    observation_space = spaces.Dict({
+        "action_mask": spaces.Box(0, 1, shape=(battle_config.action_space_size,), dtype=np.int8),
+        "observation": ObservationQuantizer(battle_config, observation_dtype).observation_space(),
+    })
+    return AttentionPointerPolicy(
+        observation_space,
+        spaces.Discrete(battle_config.action_space_size),
+        lambda _: LR,
+        battle_config=battle_config,
+        **POLICY_KWARGS,
+    )
+
+
+def behavior_cloning_loss(
+        policy: AttentionPointerPolicy,
+        batch: dict[str, torch.Tensor],
+) -> tuple[torch.Tensor, torch.Tensor, int]:
+    """Masked cross-entropy of the recorded actions, how many of them the policy's
+    greedy action matches, and how many rows were scored.
+
+    Rows whose recorded action is not legal under their own mask are ignored."""
+    masks, actions = batch["action_masks"], batch["actions"]
+    legal = masks.gather(1, actions.unsqueeze(1)).squeeze(1)
+    observations, masks, actions = batch["observations"][legal], masks[legal], actions[legal]
+    distribution = policy.get_distribution(observations, action_masks=masks)
+    loss = -distribution.log_prob(actions).mean()
+    correct = (distribution.get_actions(deterministic=True) == actions).sum()
+    return loss, correct, len(actions)
+
+
+def pretrain_policy(
+        policy: AttentionPointerPolicy,
+        trajectory_dir: str,
+        epochs: int = 1,
+        batch_size: int = BATCH_SIZE,
+        learning_rate: float = LR,
+        n_workers: int = 2,
+        block_size: int = 4096,
+        shuffle_blocks: int = 8,
+        seed: int = 0,
+) -> list[PretrainEpoch]:
+    """Fit ``policy``'s extractor and pointer heads to the decisions in ``trajectory_dir``.
+
+    :param policy: Policy to train in place, on its own device.
+    :param trajectory_dir: Trajectory dataset directory.
+    :param epochs: Passes over the dataset.
+    :param batch_size: Rows per gradient step.
+    :param learning_rate: Adam learning rate.
+    :param n_workers: ``DataLoader`` worker processes (0 reads in this process).
+    :param block_size: Consecutive rows each worker reads at once.
+    :param shuffle_blocks: Blocks each worker shuffles rows across.
+    :param seed: Seed of the shuffling.
+    :returns: Per-epoch loss and accuracy."""
+    stream = ShuffledChunkStream(trajectory_dir, batch_size, block_size, shuffle_blocks, seed)
+    loader = DataLoader(
+        stream, batch_size=None, num_workers=n_workers,
+        pin_memory=policy.device.type == "cuda",
+    )
+    parameters = [
+        *policy.mlp_extractor.parameters(),
+        *policy.move_ptr_proj.parameters(),
+        *policy.switch_ptr_proj.parameters(),
+    ]
+    optimizer = torch.optim.Adam(parameters, lr=learning_rate)
+
+    policy.set_training_mode(True)
+    history = []
+    for epoch in range(epochs):
+        stream.set_epoch(epoch)
+        total_loss, total_correct, samples = 0.0, 0, 0
+        for batch in loader:
+            batch = {column: values.to(policy.device, non_blocking=True) for column, values in batch.items()}
+            loss, correct, n = behavior_cloning_loss(policy, batch)
+            if not n:
+                continue
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item() * n
+            total_correct += int(correct)
+            samples += n
+        history.append(PretrainEpoch(
+            epoch=epoch,
+            loss=total_loss / samples if samples else 0.0,
+            accuracy=total_correct / samples if samples else 0.0,
+            samples=samples,
+        ))
+    policy.set_training_mode(False)
+    return history
+
+
+def append_protocol_logs(trajectory_dir: str, protocol_log_dir: str) -> int:
+    """Replay every protocol log in ``protocol_log_dir`` into the trajectory dataset.
+
+    :returns: The number of decisions appended."""
+    paths = sorted(glob.glob(os.path.join(protocol_log_dir, "*.log.gz")))
+    with TrajectoryWriter(trajectory_dir) as writer:
+        before = writer.rows_written
+        obs_dtype = writer.observation_dtype or np.dtype(np.float32)
+        for battle in replay_protocol_logs(paths, obs_dtype=obs_dtype.name):
+            writer.add_battle(battle)
+    return writer.rows_written - before
+
+
+def main():
+    """Parse arguments, pretrain the policy and save its weights.
+
+    :returns: ``None``."""
+    args = build_pretrain_arg_parser().parse_args()
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    torch.manual_seed(args.seed)
+
+    if args.protocol_log_dir is not None:
+        rows = append_protocol_logs(args.trajectory_dir, args.protocol_log_dir)
+        print(f"Appended {rows} replayed decisions from {args.protocol_log_dir}.")
+
+    dataset = TrajectoryDataset(args.trajectory_dir, columns=BC_COLUMNS)
+    if not len(dataset):
+        raise ValueError(f"The trajectory dataset {args.trajectory_dir} is empty.")
+    print(f"Cloning {len(dataset)} decisions from {args.trajectory_dir}.")
+
+    device_config = DeviceConfig(device=args.device)
+    device_config.print_info()
+    policy = build_policy(dataset.chunk(0)["observations"].dtype.name).to(str(device_config))
+
+    history = pretrain_policy(
+        policy,
+        args.trajectory_dir,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        learning_rate=args.learning_rate,
+        n_workers=args.n_workers,
+        block_size=args.block_size,
+        shuffle_blocks=args.shuffle_blocks,
+        seed=args.seed,
+    )
+    for result in history:
+        print(f"[Epoch {result.epoch + 1}] loss={result.loss:.4f} accuracy={result.accuracy:.3f}")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    torch.save(policy.state_dict(), args.output)
+    print(f"Pretrained policy saved as {args.output}; continue with --pretrained-policy {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import random
 import time
 import numpy as np
+import torch
 import wandb
 
 from curriculum.runtime import Curriculum
@@ -15,8 +16,10 @@ from training.parse import build_arg_parser
 from training.device_config import DeviceConfig
 from wandb.integration.sb3 import WandbCallback
 from training.battle_metrics_log import BattleMetricsCallback
-from training.config import LR, N_STEPS, BATCH_SIZE, GAMMA, ENT_COEF, LR_DECAY, LOG_FREQ
+from training.config import LR, N_STEPS, BATCH_SIZE, GAMMA, ENT_COEF, LR_DECAY, LOG_FREQ, POLICY_KWARGS
 from training.curriculum_callback import CurriculumCallback
+from training.trajectory_callback import TrajectoryCallback
+from training.trajectory_dataset import TrajectoryWriter
 from training.evaluation import evaluate_model, print_eval_summary
 from env.runtime_safety import ThirdPartyBattleError
 
@@ -56,7 +59,19 @@ def train_model(
         seed: int = 42,
         device: str = "auto",
         n_envs: int = 1,
+        battles_per_process: int = 1,
+        async_battles: bool = False,
+        shared_memory: bool = False,
+        prewarm_battles: bool = False,
+        simulated: bool = False,
+        batch_engine: bool = False,
+        protocol_log_dir: str | None = None,
+        trajectory_dir: str | None = None,
+        pretrained_policy: str | None = None,
         curriculum: Curriculum | None = None,
+        obs_dtype: str = "float32",
+        log_reward_components: bool = False,
+        incremental_encoding: bool = False,
 ) -> MaskablePPO:
     """Train a MaskablePPO agent and optionally run periodic evaluation.
 
@@ -73,8 +88,29 @@ def train_model(
     :param device: "auto", "cuda", or "cpu"
     :param n_envs: Number of parallel environment workers. Values > 1 use
         ``SubprocVecEnv`` for true parallelism. Each worker runs its own
-        asyncio event loop and Pokémon Showdown connections.
+        asyncio event loop and Pokémon Showdown connections. A single env is
+        vectorized too when any of the topology flags below is set.
+    :param battles_per_process: Concurrent battles per worker process when
+        ``n_envs > 1``; ``n_envs`` must be a multiple.
+    :param async_battles: Host all ``n_envs`` battles in this process.
+    :param shared_memory: Exchange worker step results through shared memory.
+    :param prewarm_battles: Start each battle's successor in the background.
+    :param simulated: Train on the in-process Gen 1 engine instead of Showdown.
+    :param batch_engine: Train on ``n_envs`` battles of the vectorized Gen 1
+        engine, stepped together in this process.
+    :param protocol_log_dir: Record the training battles as Showdown protocol
+        logs in this directory (one battle per worker).
+    :param trajectory_dir: Append every collected rollout step to the
+        trajectory dataset in this directory.
+    :param pretrained_policy: Start from the policy weights saved by
+        ``training.pretrain`` (behavior cloning) instead of a random init.
     :param curriculum: Optional staged opponent-player curriculum.
+    :param obs_dtype: Observation dtype of the training env; ``"uint8"`` and
+        ``"float16"`` shrink the rollout buffer and IPC payloads.
+    :param log_reward_components: Log per-component reward means
+        (``reward_components/*``) from the training envs.
+    :param incremental_encoding: Encode observations incrementally instead of
+        with the compiled encoder (see ``build_env``).
     :returns: The trained ``MaskablePPO`` model."""
     random.seed(seed)
     np.random.seed(seed)
@@ -91,7 +127,10 @@ def train_model(
         if curriculum is not None else None
     )
 
-    if n_envs > 1:
+    # Topology flags only exist on the vectorized path; one battle still goes
+    # through build_vec_env when any of them is set, so they are never ignored.
+    vec_topology = async_battles or shared_memory or prewarm_battles or battles_per_process > 1
+    if n_envs > 1 or batch_engine or vec_topology:
         train_env = build_vec_env(
             n_envs=n_envs,
             battle_format=battle_format,
@@ -100,8 +139,36 @@ def train_model(
             opponent_player_spec=initial_opponent_player_spec,
             agent_team_generator=agent_team_generator,
             battle_team_generator=battle_team_generator,
+            obs_dtype=obs_dtype,
+            reward_components=log_reward_components,
+            incremental_encoding=incremental_encoding,
+            battles_per_process=battles_per_process,
+            async_battles=async_battles,
+            shared_memory=shared_memory,
+            prewarm_battles=prewarm_battles,
+            simulated=simulated,
+            batch_engine=batch_engine,
+            protocol_log_dir=protocol_log_dir,
         )
-        print(f"Using {n_envs} parallel environment workers (SubprocVecEnv).")
+        if batch_engine:
+            print(f"Using {n_envs} battles on the vectorized Gen 1 engine (BatchBattleVecEnv).")
+        elif async_battles:
+            print(f"Using {n_envs} concurrent battles in the training process (AsyncBattleVecEnv).")
+        elif battles_per_process > 1 or prewarm_battles:
+            print(
+                f"Using {n_envs // battles_per_process} worker processes x {battles_per_process} "
+                f"concurrent battles (SubprocBattleVecEnv)."
+            )
+        else:
+            print(f"Using {n_envs} parallel environment workers (SubprocVecEnv).")
+        if shared_memory and not async_battles:
+            print("Worker step results are exchanged through shared memory (SharedMemoryVecEnv).")
+        if prewarm_battles:
+            print("Each battle's successor is started in the background.")
+        if simulated:
+            print("Training battles run on the in-process Gen 1 engine.")
+        if protocol_log_dir is not None:
+            print(f"Training battles are recorded to {protocol_log_dir}.")
     else:
         train_env = build_env(
             battle_format,
@@ -110,6 +177,11 @@ def train_model(
             opponent_player_spec=initial_opponent_player_spec,
             agent_team_generator=agent_team_generator,
             battle_team_generator=battle_team_generator,
+            obs_dtype=obs_dtype,
+            reward_components=log_reward_components,
+            incremental_encoding=incremental_encoding,
+            simulated=simulated,
+            protocol_log_dir=protocol_log_dir,
         )
 
     run = wandb.init(
@@ -129,17 +201,10 @@ def train_model(
         save_code=True,
     )
 
-    policy_kwargs = dict(
-        context_hidden=256,
-        move_hidden=128,
-        trunk_hidden=256,
-        n_attention_heads=4,
-    )
-
     model = MaskablePPO(
         AttentionPointerPolicy,
         env=train_env,
-        policy_kwargs=policy_kwargs,
+        policy_kwargs=POLICY_KWARGS,
         learning_rate=lambda progress: LR * (0.1 + LR_DECAY * progress),
         n_steps=N_STEPS,
         batch_size=BATCH_SIZE,
@@ -155,15 +220,23 @@ def train_model(
         n_epochs=5,
         device=str(device_config),
     )
+    if pretrained_policy is not None:
+        model.policy.load_state_dict(torch.load(pretrained_policy, map_location=model.device))
+        print(f"Policy initialised from the pretrained weights in {pretrained_policy}.")
 
     print(f"rounds_per_opponent={rounds_per_opponent}")
     callbacks = [
-        BattleMetricsCallback(env=train_env, log_freq=LOG_FREQ),
+        BattleMetricsCallback(log_freq=LOG_FREQ),
         WandbCallback(verbose=0),
     ]
     if curriculum is not None:
         _print_curriculum_summary(curriculum)
         callbacks.insert(0, CurriculumCallback(curriculum=curriculum))
+    trajectory_writer = None
+    if trajectory_dir is not None:
+        trajectory_writer = TrajectoryWriter(trajectory_dir)
+        callbacks.append(TrajectoryCallback(trajectory_writer))
+        print(f"Rollout steps are recorded to the trajectory dataset {trajectory_dir}.")
 
     if eval_every_timesteps > 0 and eval_kwargs:
         trained_steps = 0
@@ -189,6 +262,8 @@ def train_model(
             callback=callbacks,
         )
 
+    if trajectory_writer is not None:
+        trajectory_writer.close()
     model.save(model_path)
     run.finish()
     print(f"Training complete! Model saved as {model_path}.zip")
@@ -262,7 +337,19 @@ def main():
         seed=args.seed,
         device=args.device,
         n_envs=args.n_envs,
+        battles_per_process=args.battles_per_process,
+        async_battles=args.async_battles,
+        shared_memory=args.shared_memory,
+        prewarm_battles=args.prewarm_battles,
+        simulated=args.simulated,
+        batch_engine=args.batch_engine,
+        protocol_log_dir=args.protocol_log_dir,
+        trajectory_dir=args.trajectory_dir,
+        pretrained_policy=args.pretrained_policy,
         curriculum=curriculum,
+        obs_dtype=args.obs_dtype,
+        log_reward_components=args.log_reward_components,
+        incremental_encoding=args.incremental_encoding,
     )
 
     if args.skip_eval:
@@ -0,0 +1,48 @@
+"""SB3 callback that records rollout decisions into a trajectory dataset."""
+
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+
+from training.trajectory_dataset import TrajectoryWriter
+
+
+class TrajectoryCallback(BaseCallback):
+    """Append every collected step of every env to a ``TrajectoryWriter``.
+
+    Each env slot's battle gets a fresh battle id after it ends; a battle
+    that is still running when ``learn`` returns keeps its id in the next
+    ``learn`` call as long as the env was not reset in between.
+    """
+
+    def __init__(self, writer: TrajectoryWriter, verbose: int = 0):
+        super().__init__(verbose=verbose)
+        self.writer = writer
+        self._battle_ids: np.ndarray | None = None
+        self._steps: np.ndarray | None = None
+        self._next_obs = None
+
+    def _on_training_start(self) -> None:
+        # ``learn`` resets the env unless it continues from the last observation.
+        if self._battle_ids is None or self.model._last_obs is not self._next_obs:
+            n_envs = self.training_env.num_envs
+            self._battle_ids = self.writer.new_battle_ids(n_envs)
+            self._steps = np.zeros(n_envs, dtype=np.int32)
+
+    def _on_step(self) -> bool:
+        # Called after ``env.step``, before the model moves on to ``new_obs``.
+        obs = self.model._last_obs
+        dones = np.asarray(self.locals["dones"], dtype=bool)
+        self.writer.add(
+            obs["observation"], obs["action_mask"], self.locals["actions"],
+            self.locals["rewards"], dones, self._battle_ids, self._steps,
+        )
+        self._steps += 1
+        done = np.flatnonzero(dones)
+        if len(done):
+            self._battle_ids[done] = self.writer.new_battle_ids(len(done))
+            self._steps[done] = 0
+        self._next_obs = self.locals["new_obs"]
+        return True
+
+    def _on_training_end(self) -> None:
+        self.writer.flush()
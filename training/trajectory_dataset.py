@@ -0,0 +1,284 @@
+"""
+Chunked, columnar on-disk trajectory datasets.
+
+A dataset is a directory of chunks, each holding one ``.npy`` file per
+column, and an ``index.json`` listing the chunks::
+
+    trajectories/
+        index.json
+        chunk-000000/observations.npy
+        chunk-000000/action_masks.npy
+        chunk-000000/actions.npy
+        chunk-000000/rewards.npy
+        chunk-000000/dones.npy
+        chunk-000000/battle_ids.npy
+        chunk-000000/steps.npy
+        chunk-000001/...
+
+Row ``i`` of every column in a chunk is one decision: the observation and
+action mask the agent acted on, the action, the reward and done flag the
+step returned, the battle it belongs to and its index within that battle.
+Battle ids are unique across the dataset, so one battle's rows can be
+gathered again even when they are spread over chunks.
+
+``TrajectoryWriter`` buffers rows and appends a chunk every ``chunk_size``
+rows; the index is rewritten atomically after each one, so a crash loses at
+most the buffered rows.  ``TrajectoryDataset`` opens every column with
+``np.load(mmap_mode="r")`` and only reads the rows a minibatch asks for,
+so datasets may be far larger than memory.
+
+Usage
+-----
+    with TrajectoryWriter("trajectories") as writer:
+        ids = writer.new_battle_ids(n_envs)
+        writer.add(observations, action_masks, actions, rewards, dones, ids, steps)
+
+    dataset = TrajectoryDataset("trajectories")
+    batch = dataset.sample(256, rng)
+    batch["observations"], batch["actions"]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from typing import Iterator
+
+import numpy as np
+
+from env.protocol_replay import ReplayedBattle
+
+INDEX_FILE = "index.json"
+FORMAT_VERSION = 1
+
+COLUMNS = ("observations", "action_masks", "actions", "rewards", "dones", "battle_ids", "steps")
+
+# dtypes of every column but the observations, which keep the env's dtype.
+_DTYPES = {
+    "action_masks": np.bool_,
+    "actions": np.int64,
+    "rewards": np.float32,
+    "dones": np.bool_,
+    "battle_ids": np.int64,
+    "steps": np.int32,
+}
+
+
+def _read_index(path: str) -> dict | None:
+    index_path = os.path.join(path, INDEX_FILE)
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path) as f:
+        index = json.load(f)
+    if index["version"] != FORMAT_VERSION:
+        raise ValueError(f"{path} has trajectory format version {index['version']}, expected {FORMAT_VERSION}.")
+    return index
+
+
+class TrajectoryWriter:
+    """Append decisions to a trajectory dataset directory, one chunk every ``chunk_size`` rows.
+
+    Opening an existing dataset appends to it; new rows must have the same
+    column dtypes and shapes.
+
+    :param path: Dataset directory; created if missing.
+    :param chunk_size: Rows buffered in memory before a chunk is written.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 65_536):
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}.")
+        self.path = path
+        self.chunk_size = chunk_size
+        os.makedirs(path, exist_ok=True)
+        self._index = _read_index(path) or {
+            "version": FORMAT_VERSION, "columns": None, "chunks": [], "next_battle_id": 0,
+        }
+        self._buffer: dict[str, list[np.ndarray]] = {name: [] for name in COLUMNS}
+        self._buffered = 0
+
+    def __enter__(self) -> TrajectoryWriter:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def rows_written(self) -> int:
+        return sum(chunk["rows"] for chunk in self._index["chunks"])
+
+    @property
+    def observation_dtype(self) -> np.dtype | None:
+        """dtype of the dataset's observations, ``None`` before the first rows."""
+        columns = self._index["columns"]
+        return np.dtype(columns["observations"]["dtype"]) if columns is not None else None
+
+    def new_battle_ids(self, n: int) -> np.ndarray:
+        """Reserve ``n`` battle ids not used anywhere in the dataset."""
+        start = self._index["next_battle_id"]
+        self._index["next_battle_id"] = start + n
+        return np.arange(start, start + n, dtype=np.int64)
+
+    def add(
+            self,
+            observations: np.ndarray,
+            action_masks: np.ndarray,
+            actions: np.ndarray,
+            rewards: np.ndarray,
+            dones: np.ndarray,
+            battle_ids: np.ndarray,
+            steps: np.ndarray,
+    ):
+        """Buffer a batch of decisions (leading axis = rows), writing full chunks as they fill.
+
+        The rows are copied: vec envs and callbacks reuse their arrays between steps."""
+        batch = {
+            "observations": np.array(observations),
+            "action_masks": np.array(action_masks, dtype=_DTYPES["action_masks"]),
+            "actions": np.array(actions, dtype=_DTYPES["actions"]).reshape(-1),
+            "rewards": np.array(rewards, dtype=_DTYPES["rewards"]).reshape(-1),
+            "dones": np.array(dones, dtype=_DTYPES["dones"]).reshape(-1),
+            "battle_ids": np.array(battle_ids, dtype=_DTYPES["battle_ids"]).reshape(-1),
+            "steps": np.array(steps, dtype=_DTYPES["steps"]).reshape(-1),
+        }
+        rows = {len(column) for column in batch.values()}
+        if len(rows) != 1:
+            raise ValueError(f"Columns of one batch must have the same number of rows, got {sorted(rows)}.")
+        self._check_schema(batch)
+        for name, column in batch.items():
+            self._buffer[name].append(column)
+        self._buffered += rows.pop()
+        while self._buffered >= self.chunk_size:
+            self._write_chunk(self.chunk_size)
+
+    def add_battle(self, battle: ReplayedBattle):
+        """Append a battle replayed from a protocol log under a new battle id."""
+        n = len(battle)
+        if n == 0:
+            return
+        dones = np.zeros(n, dtype=bool)
+        dones[-1] = battle.outcome is not None
+        [battle_id] = self.new_battle_ids(1)
+        self.add(
+            battle.observations, battle.action_masks, battle.actions, battle.rewards,
+            dones, np.full(n, battle_id), np.arange(n),
+        )
+
+    def flush(self):
+        """Write the buffered rows as a (possibly short) chunk."""
+        if self._buffered:
+            self._write_chunk(self._buffered)
+        else:
+            self._write_index()
+
+    def close(self):
+        self.flush()
+
+    def _check_schema(self, batch: dict[str, np.ndarray]):
+        schema = {
+            name: {"dtype": column.dtype.str, "shape": list(column.shape[1:])}
+            for name, column in batch.items()
+        }
+        if self._index["columns"] is None:
+            self._index["columns"] = schema
+        elif schema != self._index["columns"]:
+            raise ValueError(f"Rows do not match the columns of {self.path}: {schema} != {self._index['columns']}.")
+
+    def _write_chunk(self, rows: int):
+        name = f"chunk-{len(self._index['chunks']):06d}"
+        tmp = os.path.join(self.path, f".{name}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for column in COLUMNS:
+            data = np.concatenate(self._buffer[column])
+            np.save(os.path.join(tmp, f"{column}.npy"), data[:rows])
+            self._buffer[column] = [data[rows:]] if len(data) > rows else []
+        # A chunk directory the index does not list is left over from a crash; replace it.
+        target = os.path.join(self.path, name)
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp, target)
+        self._buffered -= rows
+        self._index["chunks"].append({"name": name, "rows": rows})
+        self._write_index()
+
+    def _write_index(self):
+        tmp = os.path.join(self.path, f".{INDEX_FILE}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp, os.path.join(self.path, INDEX_FILE))
+
+
+class TrajectoryDataset:
+    """Memory-mapped, read-only view of a trajectory dataset directory.
+
+    Columns stay on disk; indexing and ``sample`` read only the requested
+    rows of each chunk they touch.
+
+    :param path: Dataset directory written by ``TrajectoryWriter``.
+    :param columns: Columns to load (all by default).
+    """
+
+    def __init__(self, path: str, columns: tuple[str, ...] = COLUMNS):
+        index = _read_index(path)
+        if index is None:
+            raise FileNotFoundError(f"No trajectory dataset at {path} ({INDEX_FILE} is missing).")
+        unknown = set(columns) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown trajectory columns {sorted(unknown)}; expected a subset of {COLUMNS}.")
+        self.path = path
+        self.columns = tuple(columns)
+        self._chunks = [
+            {column: np.load(os.path.join(path, chunk["name"], f"{column}.npy"), mmap_mode="r")
+             for column in self.columns}
+            for chunk in index["chunks"]
+        ]
+        rows = [chunk["rows"] for chunk in index["chunks"]]
+        # offsets[i] is the global index of chunk i's first row; offsets[-1] is the length.
+        self._offsets = np.concatenate([[0], np.cumsum(rows, dtype=np.int64)])
+
+    def __len__(self) -> int:
+        return int(self._offsets[-1])
+
+    @property
+    def n_chunks(self) -> int:
+        return len(self._chunks)
+
+    def chunk(self, i: int) -> dict[str, np.ndarray]:
+        """The memory-mapped columns of chunk ``i``."""
+        return self._chunks[i]
+
+    def iter_chunks(self) -> Iterator[dict[str, np.ndarray]]:
+        return iter(self._chunks)
+
+    def __getitem__(self, indices) -> dict[str, np.ndarray]:
+        """Rows at ``indices`` (an int, slice or integer array), as in-memory arrays."""
+        if isinstance(indices, slice):
+            indices = np.arange(len(self))[indices]
+        indices = np.asarray(indices, dtype=np.int64)
+        scalar = indices.ndim == 0
+        indices = indices.reshape(-1)
+        indices = np.where(indices < 0, indices + len(self), indices)
+        if len(indices) and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError(f"Trajectory index out of range for a dataset of {len(self)} rows.")
+
+        batch = {
+            column: np.empty((len(indices), *data.shape[1:]), dtype=data.dtype)
+            for column, data in (self._chunks[0].items() if self._chunks else ())
+        }
+        chunk_ids = np.searchsorted(self._offsets, indices, side="right") - 1
+        for chunk_id in np.unique(chunk_ids):
+            positions = np.flatnonzero(chunk_ids == chunk_id)
+            local = indices[positions] - self._offsets[chunk_id]
+            # Reading rows in file order keeps the page cache access sequential.
+            order = np.argsort(local, kind="stable")
+            for column, data in self._chunks[chunk_id].items():
+                batch[column][positions[order]] = data[local[order]]
+        if scalar:
+            return {column: values[0] for column, values in batch.items()}
+        return batch
+
+    def sample(self, batch_size: int, rng: np.random.Generator | None = None) -> dict[str, np.ndarray]:
+        """A minibatch of ``batch_size`` rows drawn uniformly with replacement."""
+        rng = rng if rng is not None else np.random.default_rng()
+        return self[rng.integers(0, len(self), size=batch_size)]